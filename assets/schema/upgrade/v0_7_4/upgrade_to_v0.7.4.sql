@@ -0,0 +1,30 @@
+-- From 0.7.3 to 0.7.4, we have the following changes:
+USE dbgpt;
+
+-- Add the document sync job table
+CREATE TABLE IF NOT EXISTS `document_sync_job`
+(
+    `id`               int          NOT NULL AUTO_INCREMENT COMMENT 'auto increment id',
+    `document_id`      int          NOT NULL COMMENT 'knowledge document id',
+    `space_id`         int          NOT NULL COMMENT 'knowledge space id',
+    `status`           varchar(50)  NOT NULL COMMENT 'status TODO,RUNNING,FAILED,FINISHED,CANCELED',
+    `chunk_parameters` text         NULL COMMENT 'chunk parameters, JSON format',
+    `retry_count`      int          NULL DEFAULT 0 COMMENT 'retry count',
+    `max_retries`      int          NULL DEFAULT 0 COMMENT 'max retries',
+    `worker_id`        varchar(255) NULL COMMENT 'the worker running the job',
+    `error`            text         NULL COMMENT 'the error of the last run',
+    `loaded_vector_ids` LONGTEXT    NULL COMMENT 'the ids of the vectors loaded by the running job',
+    `checkpoint`       int          NULL DEFAULT 0 COMMENT 'the number of the leading chunks loaded by the running job',
+    `next_run_at`      timestamp    NULL COMMENT 'the job can be run after this time',
+    `gmt_created`      timestamp NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'created time',
+    `gmt_modified`     timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'update time, the heartbeat of the running job',
+    PRIMARY KEY (`id`),
+    KEY `idx_sync_job_status` (`status`, `next_run_at`),
+    KEY `idx_sync_job_document_id` (`document_id`)
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8mb4 COMMENT='knowledge document sync job';
+
+-- Add the content hash and the vector id of the document chunks
+ALTER TABLE `document_chunk`
+    ADD COLUMN `content_hash` varchar(64) NULL COMMENT 'sha256 of the chunk content' AFTER `meta_info`,
+    ADD COLUMN `vector_id` varchar(255) NULL COMMENT 'the id of the chunk in the index store' AFTER `content_hash`,
+    ADD INDEX `idx_chunk_content_hash` (`content_hash`);
@@ -45,7 +45,12 @@ def initialize_components(
 
     system_app.register_instance(multi_agents)
 
-    _initialize_embedding_model(system_app, default_embedding_name)
+    _initialize_embedding_model(
+        system_app,
+        default_embedding_name,
+        web_config.query_embedding_cache,
+        web_config.document_embedding_cache,
+    )
     _initialize_rerank_model(system_app, default_rerank_name)
     _initialize_model_cache(system_app, web_config)
     _initialize_awel(system_app, web_config.awel_dirs)
@@ -75,7 +80,19 @@ def _initialize_model_cache(system_app: SystemApp, web_config: ServiceWebParamet
     else:
         persist_dir = f"{MODEL_DISK_CACHE_DIR}_{web_config.port}"
     persist_dir = resolve_root_path(persist_dir)
-    initialize_cache(system_app, storage_type, max_memory_mb, persist_dir)
+    initialize_cache(
+        system_app,
+        storage_type,
+        max_memory_mb,
+        persist_dir,
+        enable_semantic_cache=web_config.model_cache.enable_semantic_cache,
+        similarity_threshold=web_config.model_cache.similarity_threshold,
+        num_shards=web_config.model_cache.num_shards,
+        ttl=web_config.model_cache.ttl,
+        cache_policy=web_config.model_cache.cache_policy,
+        remote_cache_url=web_config.model_cache.remote_cache_url,
+        write_behind=web_config.model_cache.write_behind,
+    )
 
 
 def _initialize_awel(system_app: SystemApp, awel_dirs: Optional[str] = None):
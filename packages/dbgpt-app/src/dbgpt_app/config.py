@@ -6,6 +6,10 @@ from dbgpt.model.parameter import (
     ModelsDeployParameters,
     ModelServiceConfig,
 )
+from dbgpt.storage.cache.embedding_cache import (
+    DocumentEmbeddingCacheParameters,
+    QueryEmbeddingCacheParameters,
+)
 from dbgpt.storage.cache.manager import ModelCacheParameters
 from dbgpt.util.configure import HookConfig
 from dbgpt.util.i18n_utils import _
@@ -310,6 +314,14 @@ class ServiceWebParameters(BaseParameters):
         default_factory=ModelCacheParameters,
         metadata={"help": _("Model cache configuration")},
     )
+    query_embedding_cache: QueryEmbeddingCacheParameters = field(
+        default_factory=QueryEmbeddingCacheParameters,
+        metadata={"help": _("Query embedding cache configuration")},
+    )
+    document_embedding_cache: DocumentEmbeddingCacheParameters = field(
+        default_factory=DocumentEmbeddingCacheParameters,
+        metadata={"help": _("Document embedding cache configuration")},
+    )
     embedding_model_max_seq_len: Optional[int] = field(
         default=512,
         metadata={
@@ -19,6 +19,7 @@ from dbgpt_serve.prompt.models.models import ServeEntity as PromptManageEntity
 from dbgpt_serve.rag.models.chunk_db import DocumentChunkEntity
 from dbgpt_serve.rag.models.document_db import KnowledgeDocumentEntity
 from dbgpt_serve.rag.models.models import KnowledgeSpaceEntity
+from dbgpt_serve.rag.models.sync_job_db import DocumentSyncJobEntity
 
 _MODELS = [
     PluginHubEntity,
@@ -28,6 +29,7 @@ _MODELS = [
     KnowledgeSpaceEntity,
     KnowledgeDocumentEntity,
     DocumentChunkEntity,
+    DocumentSyncJobEntity,
     ChatFeedBackEntity,
     ConnectConfigEntity,
     ChatHistoryEntity,
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Optional, Type
+from typing import Any, Optional, Type, Union
 
 from dbgpt.component import ComponentType, SystemApp
+from dbgpt.configs.model_config import resolve_root_path
 from dbgpt.core import Embeddings, RerankEmbeddings
 from dbgpt.rag.embedding.embedding_factory import (
     EmbeddingFactory,
     RerankEmbeddingFactory,
 )
+from dbgpt.storage.cache.embedding_cache import (
+    DocumentEmbeddingCacheParameters,
+    QueryEmbeddingCache,
+    QueryEmbeddingCacheParameters,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +22,31 @@ logger = logging.getLogger(__name__)
 def _initialize_embedding_model(
     system_app: SystemApp,
     default_embedding_name: Optional[str] = None,
+    query_cache_params: Optional[QueryEmbeddingCacheParameters] = None,
+    document_cache_params: Optional[DocumentEmbeddingCacheParameters] = None,
 ):
     if default_embedding_name:
+        query_cache = _create_embedding_cache(query_cache_params)
+        document_cache = _create_embedding_cache(document_cache_params)
         logger.info("Register remote RemoteEmbeddingFactory")
-        system_app.register(RemoteEmbeddingFactory, model_name=default_embedding_name)
+        system_app.register(
+            RemoteEmbeddingFactory,
+            model_name=default_embedding_name,
+            query_cache=query_cache,
+            document_cache=document_cache,
+        )
+
+
+def _create_embedding_cache(
+    params: Optional[
+        Union[QueryEmbeddingCacheParameters, DocumentEmbeddingCacheParameters]
+    ],
+) -> Optional[QueryEmbeddingCache]:
+    if not params:
+        return None
+    if params.persist_dir:
+        params.persist_dir = resolve_root_path(params.persist_dir)
+    return QueryEmbeddingCache.from_parameters(params)
 
 
 def _initialize_rerank_model(
@@ -34,9 +61,18 @@ def _initialize_rerank_model(
 
 
 class RemoteEmbeddingFactory(EmbeddingFactory):
-    def __init__(self, system_app, model_name: str = None, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        system_app,
+        model_name: str = None,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        document_cache: Optional[QueryEmbeddingCache] = None,
+        **kwargs: Any,
+    ) -> None:
         super().__init__(system_app=system_app)
         self._default_model_name = model_name
+        self._query_cache = query_cache
+        self._document_cache = document_cache
         self.kwargs = kwargs
         self.system_app = system_app
 
@@ -55,7 +91,10 @@ class RemoteEmbeddingFactory(EmbeddingFactory):
             ComponentType.WORKER_MANAGER_FACTORY, WorkerManagerFactory
         ).create()
         # Ignore model_name args
-        return RemoteEmbeddings(self._default_model_name, worker_manager)
+        return self._with_query_cache(
+            RemoteEmbeddings(self._default_model_name, worker_manager),
+            self._default_model_name,
+        )
 
 
 class RemoteRerankEmbeddingFactory(RerankEmbeddingFactory):
@@ -41,6 +41,8 @@ from dbgpt_serve.rag.models.document_db import (
 )
 from dbgpt_serve.rag.models.models import KnowledgeSpaceDao, KnowledgeSpaceEntity
 from dbgpt_serve.rag.retriever.knowledge_space import KnowledgeSpaceRetriever
+from dbgpt_serve.rag.retriever.question_index import question_index_manager
+from dbgpt_serve.rag.retriever.space_cache import space_resources_cache
 from dbgpt_serve.rag.service.service import SyncStatus
 from dbgpt_serve.rag.storage_manager import StorageManager
 
@@ -192,7 +194,9 @@ class KnowledgeService:
             raise Exception(f"there are no or more than one space called {space}")
         space = spaces[0]
         space.context = argument_request.argument
-        return knowledge_space_dao.update_knowledge_space(space)
+        result = knowledge_space_dao.update_knowledge_space(space)
+        space_resources_cache.invalidate(space.name)
+        return result
 
     def get_knowledge_documents(self, space, request: DocumentQueryRequest):
         """get knowledge documents
@@ -410,6 +414,8 @@ class KnowledgeService:
         )
 
         knowledge_space_dao.update_knowledge_space(entity)
+        # The space may be renamed, the old name is unknown here
+        space_resources_cache.invalidate()
 
     def delete_space(self, space_name: str):
         """delete knowledge space
@@ -439,7 +445,10 @@ class KnowledgeService:
         # delete documents
         knowledge_document_dao.raw_delete(document_query)
         # delete space
-        return knowledge_space_dao.delete_knowledge_space(space)
+        result = knowledge_space_dao.delete_knowledge_space(space)
+        question_index_manager.invalidate(space.name)
+        space_resources_cache.invalidate(space.name)
+        return result
 
     def delete_document(self, space_name: str, doc_name: str):
         """delete document
@@ -467,7 +476,9 @@ class KnowledgeService:
         # delete chunks
         document_chunk_dao.raw_delete(documents[0].id)
         # delete document
-        return str(knowledge_document_dao.raw_delete(document_query))
+        result = knowledge_document_dao.raw_delete(document_query)
+        question_index_manager.invalidate(space_name)
+        return str(result)
 
     def get_document_chunks(self, request: ChunkQueryRequest):
         """get document chunks
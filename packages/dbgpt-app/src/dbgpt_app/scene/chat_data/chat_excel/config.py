@@ -36,6 +36,25 @@ class ChatExcelConfig(GPTsAppCommonConfig):
             )
         },
     )
+    cache_dir: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The directory to cache the uploaded files read into DuckDB, by the "
+                "file content, so the same file is read only once. If None, use "
+                "'_chat_excel_cache' in the data directory."
+            )
+        },
+    )
+    cache_max_files: int = field(
+        default=100,
+        metadata={
+            "help": _(
+                "The max number of the cached files, the least recently used ones are "
+                "removed."
+            )
+        },
+    )
 
     memory: Optional[BaseGPTsAppMemoryConfig] = field(
         default_factory=lambda: BufferWindowGPTsAppMemoryConfig(
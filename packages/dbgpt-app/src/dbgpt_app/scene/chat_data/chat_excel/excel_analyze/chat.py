@@ -60,11 +60,14 @@ class ChatExcel(BaseChat):
             chat_param.chat_session_id,
             file_path,
             file_name,
-            read_type="direct",
+            read_type="stream",
             database_name=database_file_path,
             table_name=self._curr_table,
             duckdb_extensions_dir=self.curr_config.duckdb_extensions_dir,
             force_install=self.curr_config.force_install,
+            cache_dir=self.curr_config.cache_dir
+            or os.path.join(DATA_DIR, "_chat_excel_cache"),
+            cache_max_files=self.curr_config.cache_max_files,
         )
 
         self.api_call = ApiCall()
@@ -1,6 +1,11 @@
+import codecs
+import hashlib
 import io
 import logging
 import os
+import shutil
+import tempfile
+import threading
 from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
 
 import chardet
@@ -222,6 +227,270 @@ def read_direct(
         return read_from_df(db, file_path, file_name, table_name)
 
 
+# The bytes read to detect the encoding of a csv file
+_SNIFF_SIZE = 64 * 1024
+# The encodings read by DuckDB itself, the others are converted to utf-8 first
+_DUCKDB_ENCODINGS = {
+    "utf-8": "utf-8",
+    "ascii": "utf-8",
+    "utf-16": "utf-16",
+    "utf-16le": "utf-16",
+    "iso-8859-1": "latin-1",
+    "latin-1": "latin-1",
+}
+# The table of the file in a cached database
+_CACHED_TABLE = "ingested_table"
+
+
+def sniff_encoding(file_path: str, sniff_size: int = _SNIFF_SIZE) -> str:
+    """Detect the encoding of a file from its first bytes."""
+    with open(file_path, "rb") as f:
+        prefix = f.read(sniff_size)
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8"
+    try:
+        # The prefix may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    result = chardet.detect(prefix)
+    encoding = (result["encoding"] or "utf-8").lower()
+    logger.info(
+        f"Detected Encoding: {encoding} (Confidence: {result['confidence']}) from "
+        f"the first {len(prefix)} bytes"
+    )
+    if encoding in ("gb2312", "gbk"):
+        # GB18030 is the superset of them
+        encoding = "gb18030"
+    return encoding
+
+
+def transcode_to_utf8(
+    file_path: str, encoding: str, dest_path: str, chunk_size: int = 1024 * 1024
+) -> None:
+    """Convert a file to utf-8 chunk by chunk."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    with (
+        open(file_path, "rb") as fin,
+        open(dest_path, "w", encoding="utf-8", newline="") as fout,
+    ):
+        while True:
+            chunk = fin.read(chunk_size)
+            if not chunk:
+                break
+            fout.write(decoder.decode(chunk))
+        fout.write(decoder.decode(b"", final=True))
+
+
+def file_content_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the sha256 of the file content."""
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _create_normalized_table(
+    db: "DuckDBPyConnection", from_exp: str, table_name: str
+) -> None:
+    """Create the table from the relation, with the normalized column names."""
+    columns = [row[0] for row in db.sql(f"DESCRIBE SELECT * {from_exp}").fetchall()]
+    select_list = []
+    seen = set()
+    for column in columns:
+        new_column = excel_colunm_format(str(column)) or "column"
+        unique_column, num = new_column, 1
+        while unique_column.lower() in seen:
+            num += 1
+            unique_column = f"{new_column}_{num}"
+        seen.add(unique_column.lower())
+        select_list.append(
+            f"{_quote_identifier(column)} AS {_quote_identifier(unique_column)}"
+        )
+    db.sql(f"CREATE TABLE {table_name} AS SELECT {', '.join(select_list)} {from_exp}")
+
+
+def read_streaming(
+    db: "DuckDBPyConnection",
+    file_path: str,
+    file_name: str,
+    table_name: str,
+):
+    """Read the file with the readers of DuckDB without loading it into memory.
+
+    The encoding of a csv file is detected from its first bytes, the column names
+    are normalized in SQL. It falls back to :func:`read_from_df` if DuckDB can not
+    read the file.
+    """
+    file_extension = os.path.splitext(file_name or file_path)[1].lower()
+    if file_extension == ".xls":
+        return read_from_df(db, file_path, file_name, table_name)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = file_path
+        load_params = {}
+        if file_extension == ".csv":
+            load_func = "read_csv"
+            encoding = sniff_encoding(file_path)
+            if encoding in _DUCKDB_ENCODINGS:
+                if _DUCKDB_ENCODINGS[encoding] != "utf-8":
+                    load_params["encoding"] = _quote_literal(
+                        _DUCKDB_ENCODINGS[encoding]
+                    )
+            else:
+                source = os.path.join(tmp_dir, "utf8.csv")
+                transcode_to_utf8(file_path, encoding, source)
+        elif file_extension == ".xlsx":
+            load_func = "read_xlsx"
+            load_params["empty_as_varchar"] = "true"
+            load_params["ignore_errors"] = "true"
+        elif file_extension == ".json":
+            load_func = "read_json_auto"
+        elif file_extension == ".parquet":
+            load_func = "read_parquet"
+        else:
+            raise ValueError(f"Unsupported file format: {file_extension}")
+
+        func_args = "".join(f", {k}={v}" for k, v in load_params.items())
+        from_exp = f"FROM {load_func}({_quote_literal(source)}{func_args})"
+        try:
+            _create_normalized_table(db, from_exp, table_name)
+            return table_name
+        except Exception as e:
+            logger.warning(f"Error while reading file with DuckDB: {str(e)}")
+        if load_func == "read_csv":
+            # The types sniffed from the first rows may not fit the later rows
+            from_exp = (
+                f"FROM read_csv({_quote_literal(source)}{func_args}, all_varchar=true)"
+            )
+            try:
+                _create_normalized_table(db, from_exp, table_name)
+                return table_name
+            except Exception as e:
+                logger.warning(f"Error while reading file with DuckDB: {str(e)}")
+    return read_from_df(db, file_path, file_name, table_name)
+
+
+def _evict_cache(cache_dir: str, max_files: int) -> None:
+    """Remove the least recently used database files over ``max_files``."""
+    files = [
+        os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith(".db")
+    ]
+    if len(files) <= max_files:
+        return
+    files.sort(key=lambda f: os.path.getmtime(f))
+    for file in files[: len(files) - max_files]:
+        try:
+            os.remove(file)
+        except OSError as e:
+            logger.warning(f"Failed to remove the cached database {file}: {e}")
+
+
+def install_extensions(
+    db: "DuckDBPyConnection",
+    duckdb_extensions_dir: Optional[List[str]],
+    force_install: bool = False,
+) -> int:
+    """Install and load the DuckDB extensions in the directories to the connection.
+
+    Returns:
+        int: The number of the extensions installed.
+    """
+    if not duckdb_extensions_dir:
+        return 0
+    cnt = 0
+    for extension_dir in duckdb_extensions_dir:
+        if not os.path.exists(extension_dir):
+            logger.warning(f"Extension directory not exists: {extension_dir}")
+            continue
+        extension_files = [
+            os.path.join(extension_dir, f)
+            for f in os.listdir(extension_dir)
+            if f.endswith(".duckdb_extension.gz") or f.endswith(".duckdb_extension")
+        ]
+        installed_extensions = [
+            ext[0]
+            for ext in db.sql(
+                "SELECT extension_name, installed FROM duckdb_extensions();"
+            ).fetchall()
+            if ext[1]
+        ]
+        for extension_file in extension_files:
+            try:
+                extension_name = os.path.basename(extension_file).split(".")[0]
+                if not force_install and extension_name in installed_extensions:
+                    logger.info(f"Extension {extension_name} has been installed, skip")
+                    continue
+                db.install_extension(extension_file, force_install=force_install)
+                db.load_extension(extension_name)
+                cnt += 1
+                logger.info(f"Installed extension {extension_name} for DuckDB")
+            except Exception as e:
+                logger.warning(
+                    f"Error while installing extension {extension_file}: {str(e)}"
+                )
+    logger.debug(f"Installed extensions: {cnt}")
+    return cnt
+
+
+def read_to_cache(
+    file_path: str,
+    file_name: str,
+    cache_dir: str,
+    max_files: int = 100,
+    duckdb_extensions_dir: Optional[List[str]] = None,
+    force_install: bool = False,
+) -> str:
+    """Read the file into a DuckDB database file cached by the file content.
+
+    The same file, even uploaded with another name, is read only once. The
+    extensions in ``duckdb_extensions_dir`` are installed to the connection which
+    reads the file, e.g. the excel extension of an offline deployment.
+
+    Returns:
+        str: The path of the cached database file, the file is in the table
+            ``ingested_table``.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    file_extension = os.path.splitext(file_name or file_path)[1].lower()
+    cache_path = os.path.join(
+        cache_dir, f"{file_content_hash(file_path)}{file_extension}.db"
+    )
+    if os.path.exists(cache_path):
+        logger.info(f"Use the cached database {cache_path} of {file_name}")
+        # Mark it as recently used
+        os.utime(cache_path)
+        return cache_path
+
+    tmp_path = f"{cache_path}.{os.getpid()}_{threading.get_ident()}.tmp"
+    db = duckdb.connect(database=tmp_path, read_only=False)
+    try:
+        install_extensions(db, duckdb_extensions_dir, force_install)
+        read_streaming(db, file_path, file_name, _CACHED_TABLE)
+        db.close()
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        db.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _evict_cache(cache_dir, max_files)
+    return cache_path
+
+
 class ExcelReader:
     def __init__(
         self,
@@ -234,13 +503,36 @@ class ExcelReader:
         duckdb_extensions_dir: Optional[List[str]] = None,
         force_install: bool = False,
         show_columns: bool = False,
+        cache_dir: Optional[str] = None,
+        cache_max_files: int = 100,
     ):
+        """Read the file into the DuckDB database.
+
+        Args:
+            read_type (str): "df" reads the file with pandas, "direct" with DuckDB
+                and "stream" with DuckDB without loading the file into memory.
+            cache_dir (Optional[str]): The directory of the database files cached by
+                the file content, only for the "stream" read type.
+            cache_max_files (int): The max number of the cached database files.
+        """
         if not file_name:
             file_name = os.path.basename(file_path)
         self.conv_uid = conv_uid
         # connect DuckDB
 
         db_exists = os.path.exists(database_name)
+        cache_path = None
+        if not db_exists and read_type == "stream" and cache_dir:
+            cache_path = read_to_cache(
+                file_path,
+                file_name,
+                cache_dir,
+                cache_max_files,
+                duckdb_extensions_dir=duckdb_extensions_dir,
+                force_install=force_install,
+            )
+            if database_name != ":memory:":
+                shutil.copyfile(cache_path, database_name)
 
         self.db = duckdb.connect(database=database_name, read_only=False)
 
@@ -254,7 +546,17 @@ class ExcelReader:
 
         if not db_exists:
             curr_table = self.temp_table_name
-            if read_type == "df":
+            if cache_path and database_name != ":memory:":
+                self.db.sql(f"ALTER TABLE {_CACHED_TABLE} RENAME TO {curr_table}")
+            elif cache_path:
+                self.db.sql(f"ATTACH {_quote_literal(cache_path)} AS cache (READ_ONLY)")
+                self.db.sql(
+                    f"CREATE TABLE {curr_table} AS SELECT * FROM cache.{_CACHED_TABLE}"
+                )
+                self.db.sql("DETACH cache")
+            elif read_type == "stream":
+                read_streaming(self.db, file_path, file_name, curr_table)
+            elif read_type == "df":
                 read_from_df(self.db, file_path, file_name, curr_table)
             else:
                 read_direct(self.db, file_path, file_name, curr_table)
@@ -441,37 +743,7 @@ AND dc.schema_name = 'main';
     ) -> int:
         if not duckdb_extensions_dir:
             return 0
-        cnt = 0
-        for extension_dir in duckdb_extensions_dir:
-            if not os.path.exists(extension_dir):
-                logger.warning(f"Extension directory not exists: {extension_dir}")
-                continue
-            extension_files = [
-                os.path.join(extension_dir, f)
-                for f in os.listdir(extension_dir)
-                if f.endswith(".duckdb_extension.gz") or f.endswith(".duckdb_extension")
-            ]
-            _, extensions = self._query_extension()
-            installed_extensions = [ext[0] for ext in extensions if ext[1]]
-            for extension_file in extension_files:
-                try:
-                    extension_name = os.path.basename(extension_file).split(".")[0]
-                    if not force_install and extension_name in installed_extensions:
-                        logger.info(
-                            f"Extension {extension_name} has been installed, skip"
-                        )
-                        continue
-                    self.db.install_extension(
-                        extension_file, force_install=force_install
-                    )
-                    self.db.load_extension(extension_name)
-                    cnt += 1
-                    logger.info(f"Installed extension {extension_name} for DuckDB")
-                except Exception as e:
-                    logger.warning(
-                        f"Error while installing extension {extension_file}: {str(e)}"
-                    )
-        logger.debug(f"Installed extensions: {cnt}")
+        cnt = install_extensions(self.db, duckdb_extensions_dir, force_install)
         self.list_extensions()
         return cnt
 
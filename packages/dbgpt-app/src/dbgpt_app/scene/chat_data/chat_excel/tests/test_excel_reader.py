@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+from ..excel_reader import ExcelReader, read_to_cache, sniff_encoding
+
+_CSV = "name, sales amount ,date\n张三,100.5,2024-01-01\nLi Si,,2024-01-02\n"
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text(_CSV, encoding="utf-8")
+    return str(path)
+
+
+def _read(reader: ExcelReader):
+    columns, rows = reader.run(
+        f"SELECT * FROM {reader.temp_table_name} ORDER BY 1 DESC",
+        reader.temp_table_name,
+        transform=False,
+    )
+    reader.close()
+    return columns, rows
+
+
+def test_read_streaming(csv_file):
+    reader = ExcelReader("conv1", csv_file, read_type="stream")
+    columns, rows = _read(reader)
+    assert columns == ["name", "sales_amount", "date"]
+    assert rows[0][:2] == ("张三", 100.5)
+    assert rows[1][1] is None
+
+
+def test_read_gbk_csv(tmp_path):
+    path = tmp_path / "sales_gbk.csv"
+    path.write_bytes(_CSV.encode("gbk"))
+    assert sniff_encoding(str(path)) == "gb18030"
+    reader = ExcelReader("conv1", str(path), read_type="stream")
+    _columns, rows = _read(reader)
+    assert rows[0][0] == "张三"
+
+
+def test_duplicate_columns(tmp_path):
+    path = tmp_path / "dup.csv"
+    path.write_text("a b,a_b,A B\n1,2,3\n", encoding="utf-8")
+    columns, _rows = _read(ExcelReader("conv1", str(path), read_type="stream"))
+    assert columns == ["a_b", "a_b_2", "A_B_1"]
+
+
+def test_cache_by_content(csv_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    copied = tmp_path / "renamed.csv"
+    copied.write_bytes(open(csv_file, "rb").read())
+
+    expected = _read(
+        ExcelReader(
+            "conv1",
+            csv_file,
+            read_type="stream",
+            database_name=str(tmp_path / "conv1.duckdb"),
+            cache_dir=cache_dir,
+        )
+    )
+    cache_path = read_to_cache(str(copied), "renamed.csv", cache_dir)
+    assert os.listdir(cache_dir) == [os.path.basename(cache_path)]
+    # Read from the cache, to a database file and to memory
+    for database_name in [str(tmp_path / "conv2.duckdb"), ":memory:"]:
+        reader = ExcelReader(
+            "conv2",
+            str(copied),
+            read_type="stream",
+            database_name=database_name,
+            cache_dir=cache_dir,
+        )
+        assert _read(reader) == expected
+    assert len(os.listdir(cache_dir)) == 1
+
+    other = tmp_path / "other.csv"
+    other.write_text("x\n1\n", encoding="utf-8")
+    read_to_cache(str(other), "other.csv", cache_dir, max_files=1)
+    assert os.listdir(cache_dir) != [os.path.basename(cache_path)]
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_cache_installs_extensions(csv_file, tmp_path, monkeypatch):
+    from .. import excel_reader
+
+    extensions_dir = str(tmp_path / "extensions")
+    calls = []
+
+    def _install_extensions(db, duckdb_extensions_dir, force_install=False):
+        # Installed on the connection which reads the file into the cache
+        assert db.sql("SHOW TABLES").fetchall() == []
+        calls.append((duckdb_extensions_dir, force_install))
+        return 0
+
+    monkeypatch.setattr(excel_reader, "install_extensions", _install_extensions)
+    reader = ExcelReader(
+        "conv1",
+        csv_file,
+        read_type="stream",
+        cache_dir=str(tmp_path / "cache"),
+        duckdb_extensions_dir=[extensions_dir],
+        force_install=True,
+    )
+    _read(reader)
+    # The cache connection, then the connection of the reader
+    assert calls == [([extensions_dir], True), ([extensions_dir], True)]
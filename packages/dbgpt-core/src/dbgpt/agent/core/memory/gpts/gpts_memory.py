@@ -15,8 +15,11 @@ from ...action.base import ActionOutput
 from ...schema import Status
 from .base import GptsMessage, GptsMessageMemory, GptsPlansMemory
 from .default_gpts_memory import DefaultGptsMessageMemory, DefaultGptsPlansMemory
-
-NONE_GOAL_PREFIX: str = "none_goal_count_"
+from .vis_renderer import (
+    NONE_GOAL_PREFIX,  # noqa: F401
+    IncrementalVisRenderer,
+    VisFragment,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,8 +32,14 @@ class GptsMemory:
         plans_memory: Optional[GptsPlansMemory] = None,
         message_memory: Optional[GptsMessageMemory] = None,
         executor: Optional[Executor] = None,
+        compact_finished_vis: bool = True,
     ):
-        """Create a memory to store plans and messages."""
+        """Create a memory to store plans and messages.
+
+        Args:
+            compact_finished_vis (bool): Whether to drop the cached vis fragments of
+                a conversation when it is completed, only its whole view is kept.
+        """
         self._plans_memory: GptsPlansMemory = (
             plans_memory if plans_memory is not None else DefaultGptsPlansMemory()
         )
@@ -42,6 +51,11 @@ class GptsMemory:
         self.channels: defaultdict = defaultdict(Queue)
         self.enable_vis_map: defaultdict = defaultdict(bool)
         self.start_round_map: defaultdict = defaultdict(int)
+        self.incremental_vis_map: defaultdict = defaultdict(bool)
+        self._compact_finished_vis = compact_finished_vis
+        self._vis_renderers: Dict[str, IncrementalVisRenderer] = {}
+        # The vis fragments last pushed to the queue of the conversation
+        self._pushed_fragments: Dict[str, List[VisFragment]] = {}
 
     @property
     def plans_memory(self) -> GptsPlansMemory:
@@ -59,12 +73,22 @@ class GptsMemory:
         enable_vis_message: bool = True,
         history_messages: Optional[List[GptsMessage]] = None,
         start_round: int = 0,
+        incremental_vis: bool = False,
     ):
-        """Gpt memory init."""
+        """Gpt memory init.
+
+        Args:
+            incremental_vis (bool): Whether to push only the changed vis fragments
+                with their ids instead of the whole vis view, the consumer of the
+                queue updates its view by the fragment ids.
+        """
         self.channels[conv_id] = asyncio.Queue()
         self.enable_vis_map[conv_id] = enable_vis_message
         self.messages_cache[conv_id] = history_messages if history_messages else []
         self.start_round_map[conv_id] = start_round
+        self.incremental_vis_map[conv_id] = incremental_vis
+        self._vis_renderers.pop(conv_id, None)
+        self._pushed_fragments.pop(conv_id, None)
 
     def enable_vis_message(self, conv_id):
         """Enable conversation message vis tag."""
@@ -92,11 +116,18 @@ class GptsMemory:
         start_round = self.start_round_map.pop(conv_id)  # noqa
         del start_round
 
+        # clear the vis caches
+        self.incremental_vis_map.pop(conv_id, None)
+        self._vis_renderers.pop(conv_id, None)
+        self._pushed_fragments.pop(conv_id, None)
+
     async def push_message(self, conv_id: str, temp_msg: Optional[str] = None):
         """Push conversation message."""
         queue = self.queue(conv_id)
         enable_vis_tag = self.enable_vis_message(conv_id=conv_id)
-        if enable_vis_tag:
+        if enable_vis_tag and self.incremental_vis_map.get(conv_id):
+            await queue.put(await self._changed_vis_fragments(conv_id, temp_msg))
+        elif enable_vis_tag:
             # 如果有临时消息内容需要push 拼接再最末尾，否则直接从短期记忆中发布最后消息
             message_view = await self.app_link_chat_message(conv_id)
             if temp_msg:
@@ -118,6 +149,19 @@ class GptsMemory:
         queue = self.queue(conv_id)
 
         await queue.put("[DONE]")
+        if self._compact_finished_vis:
+            self.compact_vis(conv_id)
+
+    def compact_vis(self, conv_id: str):
+        """Drop the cached vis fragments of a finished conversation.
+
+        Only the whole vis view is kept, a later push renders all the fragments
+        again.
+        """
+        renderer = self._vis_renderers.get(conv_id)
+        if renderer is not None:
+            renderer.compact()
+        self._pushed_fragments.pop(conv_id, None)
 
     async def append_message(self, conv_id: str, message: GptsMessage):
         """Append message."""
@@ -178,45 +222,6 @@ class GptsMemory:
         # Just use the action_output now
         return [m["action_output"] for m in new_list if m["action_output"]]
 
-    async def _message_group_vis_build(self, message_group, vis_items: list):
-        num: int = 0
-        if message_group:
-            last_goal = next(reversed(message_group))
-            last_goal_message = None
-            if not last_goal.startswith(NONE_GOAL_PREFIX):
-                last_goal_messages = message_group[last_goal]
-                last_goal_message = last_goal_messages[-1]
-
-            plan_temps: List[dict] = []
-            need_show_singe_last_message = False
-            for key, value in message_group.items():
-                num = num + 1
-                if key.startswith(NONE_GOAL_PREFIX):
-                    vis_items.append(await self._messages_to_plan_vis(plan_temps))
-                    plan_temps = []
-                    num = 0
-                    vis_items.append(await self._messages_to_agents_vis(value))
-                else:
-                    num += 1
-                    plan_temps.append(
-                        {
-                            "name": key,
-                            "num": num,
-                            "status": "complete",
-                            "agent": value[0].receiver if value else "",
-                            "markdown": await self._messages_to_agents_vis(value),
-                        }
-                    )
-                    need_show_singe_last_message = True
-
-            if len(plan_temps) > 0:
-                vis_items.append(await self._messages_to_plan_vis(plan_temps))
-            if need_show_singe_last_message and last_goal_message:
-                vis_items.append(
-                    await self._messages_to_agents_vis([last_goal_message], True)
-                )
-        return "\n".join(vis_items)
-
     async def agent_stream_message(
         self,
         message: Union[Dict, str],
@@ -316,59 +321,45 @@ class GptsMemory:
                 self._executor, self.message_memory.get_by_conv_id, conv_id=conv_id
             )
 
-        # VIS消息组装
-        temp_group: Dict = {}
-        app_link_message: Optional[GptsMessage] = None
-        app_lanucher_message: Optional[GptsMessage] = None
+        return await self._vis_renderer(conv_id).render_view(messages)
 
-        none_goal_count = 1
-        for message in messages:
-            if message.sender in [
-                "Intent Recognition Expert",
-                "App Link",
-            ] or message.receiver in ["Intent Recognition Expert", "App Link"]:
-                if (
-                    message.sender in ["Intent Recognition Expert", "App Link"]
-                    and message.receiver == "AppLauncher"
-                ):
-                    app_link_message = message
-                if message.receiver != "Human":
-                    continue
-
-            if message.sender == "AppLauncher":
-                if message.receiver == "Human":
-                    app_lanucher_message = message
-                continue
-
-            current_gogal = message.current_goal
-
-            last_goal = next(reversed(temp_group)) if temp_group else None
-            if last_goal:
-                last_goal_messages = temp_group[last_goal]
-                if current_gogal:
-                    if current_gogal == last_goal:
-                        last_goal_messages.append(message)
-                    else:
-                        temp_group[current_gogal] = [message]
-                else:
-                    temp_group[f"{NONE_GOAL_PREFIX}{none_goal_count}"] = [message]
-                    none_goal_count += 1
-            else:
-                if current_gogal:
-                    temp_group[current_gogal] = [message]
-                else:
-                    temp_group[f"{NONE_GOAL_PREFIX}{none_goal_count}"] = [message]
-                    none_goal_count += 1
-
-        vis_items: list = []
-        if app_link_message:
-            vis_items.append(
-                await self._messages_to_app_link_vis(
-                    app_link_message, app_lanucher_message
-                )
+    def _vis_renderer(self, conv_id: str) -> IncrementalVisRenderer:
+        renderer = self._vis_renderers.get(conv_id)
+        if renderer is None:
+            renderer = IncrementalVisRenderer(
+                self._messages_to_agents_vis,
+                self._messages_to_plan_vis,
+                self._messages_to_app_link_vis,
             )
-
-        return await self._message_group_vis_build(temp_group, vis_items)
+            self._vis_renderers[conv_id] = renderer
+        return renderer
+
+    async def _changed_vis_fragments(
+        self, conv_id: str, temp_msg: Optional[Union[Dict, str]] = None
+    ) -> Dict[str, List]:
+        """Render the vis fragments changed since the last push.
+
+        Returns:
+            Dict[str, List]: The changed fragments and the ids of the removed ones,
+                the streaming message is the fragment with the id "stream".
+        """
+        await self.app_link_chat_message(conv_id)
+        renderer = self._vis_renderer(conv_id)
+        fragments = list(renderer.fragments)
+        if temp_msg:
+            fragments.append(
+                VisFragment("stream", await self.agent_stream_message(temp_msg))
+            )
+        last = self._pushed_fragments.get(conv_id, [])
+        self._pushed_fragments[conv_id] = fragments
+        last_contents = {f.id: f.content for f in last}
+        ids = {f.id for f in fragments}
+        return {
+            "fragments": [
+                f.to_dict() for f in fragments if last_contents.get(f.id) != f.content
+            ],
+            "removed": [f.id for f in last if f.id not in ids],
+        }
 
     async def _messages_to_agents_vis(
         self, messages: List[GptsMessage], is_last_message: bool = False
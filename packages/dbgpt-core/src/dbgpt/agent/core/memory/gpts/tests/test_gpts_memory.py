@@ -0,0 +1,88 @@
+import json
+from typing import List, Optional
+
+import pytest
+
+from ..base import GptsMessage
+from ..gpts_memory import GptsMemory
+
+
+def _message(
+    i: int, goal: Optional[str] = None, receiver: str = "Human"
+) -> GptsMessage:
+    report = json.dumps({"is_exe_success": True, "content": f"c{i}", "view": f"v{i}"})
+    return GptsMessage(
+        conv_id="conv1",
+        sender="Agent",
+        receiver=receiver,
+        role="assistant",
+        content=f"m{i}",
+        rounds=i,
+        current_goal=goal,
+        action_report=report if i % 2 else None,
+    )
+
+
+def _messages() -> List[GptsMessage]:
+    goals = [None, "goal1", "goal1", "goal2", None, None, "goal3", "goal3", "goal1"]
+    return [_message(i, goal) for i, goal in enumerate(goals)]
+
+
+@pytest.mark.asyncio
+async def test_incremental_view_is_full_view():
+    memory = GptsMemory()
+    memory.init("conv1")
+    for message in _messages():
+        memory.messages_cache["conv1"].append(message)
+        view = await memory.app_link_chat_message("conv1")
+        # The same as rendered from scratch
+        full_memory = GptsMemory()
+        full_memory.init("conv1", history_messages=list(memory.messages_cache["conv1"]))
+        assert view == await full_memory.app_link_chat_message("conv1")
+
+    metrics = memory._vis_renderers["conv1"].get_metrics()
+    assert metrics["grouped_messages"] == 9
+    assert metrics["reused_fragments"] > metrics["rendered_fragments"]
+
+
+@pytest.mark.asyncio
+async def test_push_changed_fragments():
+    memory = GptsMemory()
+    memory.init("conv1", incremental_vis=True)
+    queue = memory.queue("conv1")
+    messages = _messages()
+    for message in messages[:3]:
+        await memory.append_message("conv1", message)
+    for _i in range(3):
+        await queue.get()
+
+    await memory.append_message("conv1", messages[3])
+    pushed = await queue.get()
+    # Only the plans of the goals and the last message are changed
+    assert [f["id"] for f in pushed["fragments"]] == ["plans-1", "last-message"]
+    assert pushed["removed"] == []
+
+    await memory.push_message("conv1", "streaming")
+    pushed = await queue.get()
+    assert [f["id"] for f in pushed["fragments"]] == ["stream"]
+
+    await memory.append_message("conv1", messages[4])
+    pushed = await queue.get()
+    assert [f["id"] for f in pushed["fragments"]] == ["agents-4"]
+    assert sorted(pushed["removed"]) == ["last-message", "stream"]
+
+
+@pytest.mark.asyncio
+async def test_compact_finished_conversation():
+    memory = GptsMemory()
+    memory.init("conv1")
+    for message in _messages():
+        await memory.append_message("conv1", message)
+    view = await memory.app_link_chat_message("conv1")
+    await memory.complete("conv1")
+
+    renderer = memory._vis_renderers["conv1"]
+    assert renderer.get_metrics()["grouped_messages"] == 0
+    assert renderer.view == view
+    # Rendered again from the messages
+    assert await memory.app_link_chat_message("conv1") == view
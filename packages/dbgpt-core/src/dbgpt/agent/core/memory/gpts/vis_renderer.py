@@ -0,0 +1,282 @@
+"""Incremental vis rendering of the agent messages.
+
+The vis view of a conversation is a list of fragments: the app link, the messages of
+each agent without a goal, the plans of the consecutive goals and the last message.
+Each fragment has a stable id, from the index of its first message, and is rendered
+again only when messages are added to it, so a push of a new message renders the
+fragments of the last goal instead of the whole conversation.
+"""
+
+import dataclasses
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .base import GptsMessage
+
+NONE_GOAL_PREFIX: str = "none_goal_count_"
+
+_APP_LINK_AGENTS = ["Intent Recognition Expert", "App Link"]
+
+AgentsVisRender = Callable[[List[GptsMessage], bool], Awaitable[str]]
+PlanVisRender = Callable[[List[Dict]], Awaitable[str]]
+AppLinkVisRender = Callable[[GptsMessage, Optional[GptsMessage]], Awaitable[str]]
+
+
+@dataclasses.dataclass
+class VisFragment:
+    """A fragment of the vis view."""
+
+    id: str
+    content: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a dictionary representation of the fragment."""
+        return dataclasses.asdict(self)
+
+
+class IncrementalVisRenderer:
+    """Render the vis fragments of a conversation, reuse the unchanged ones.
+
+    The messages are expected to be appended only. The messages already grouped are
+    not grouped again, when the messages do not start with the messages of the last
+    render, e.g. another start round, all the messages are grouped and rendered
+    again.
+    """
+
+    def __init__(
+        self,
+        agents_vis: AgentsVisRender,
+        plan_vis: PlanVisRender,
+        app_link_vis: AppLinkVisRender,
+    ):
+        """Create a new IncrementalVisRenderer.
+
+        Args:
+            agents_vis (AgentsVisRender): Render the messages of the agents, and
+                whether they are the last message.
+            plan_vis (PlanVisRender): Render the plans.
+            app_link_vis (AppLinkVisRender): Render the app link and the app
+                launcher messages.
+        """
+        self._agents_vis = agents_vis
+        self._plan_vis = plan_vis
+        self._app_link_vis = app_link_vis
+        self._fragments: List[VisFragment] = []
+        self._view: Optional[str] = None
+        self._renders = 0
+        self._reuses = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        # The grouped messages
+        self._seen = 0
+        self._first_message: Optional[GptsMessage] = None
+        self._last_message: Optional[GptsMessage] = None
+        self._none_goal_count = 1
+        # The messages of each goal, and the index of the first message of a goal
+        self._groups: Dict[str, List[GptsMessage]] = {}
+        self._group_index: Dict[str, int] = {}
+        self._app_link_message: Optional[GptsMessage] = None
+        self._app_lanucher_message: Optional[GptsMessage] = None
+        # The rendered fragments, with what they are rendered from
+        self._group_cache: Dict[str, Tuple[List[GptsMessage], int, str]] = {}
+        self._plan_cache: Dict[str, Tuple[Tuple, str]] = {}
+        self._last_message_cache: Optional[Tuple[GptsMessage, str]] = None
+        self._app_link_cache: Optional[Tuple[Tuple, str]] = None
+
+    @property
+    def fragments(self) -> List[VisFragment]:
+        """Return the fragments of the last render."""
+        return self._fragments
+
+    async def render(self, messages: List[GptsMessage]) -> List[VisFragment]:
+        """Render the fragments of the messages."""
+        if not (
+            self._seen
+            and len(messages) >= self._seen
+            and messages[0] is self._first_message
+            and messages[self._seen - 1] is self._last_message
+        ):
+            self._reset()
+        self._group(messages)
+        fragments = await self._render()
+        if [f.id for f in fragments] != [f.id for f in self._fragments] or any(
+            new.content is not old.content
+            for new, old in zip(fragments, self._fragments)
+        ):
+            self._view = None
+        self._fragments = fragments
+        return fragments
+
+    async def render_view(self, messages: List[GptsMessage]) -> str:
+        """Render the whole vis view of the messages."""
+        await self.render(messages)
+        return self.view
+
+    @property
+    def view(self) -> str:
+        """Return the whole vis view of the last render."""
+        if self._view is None:
+            self._view = "\n".join(f.content for f in self._fragments)
+        return self._view
+
+    def compact(self) -> None:
+        """Keep only the whole view and drop the grouped messages and fragments.
+
+        It is called when the conversation is finished, the next render groups and
+        renders all the messages again.
+        """
+        view = self.view
+        self._reset()
+        self._fragments = [VisFragment("view", view)]
+        self._view = view
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return the number of the fragments rendered and reused."""
+        return {
+            "rendered_fragments": self._renders,
+            "reused_fragments": self._reuses,
+            "grouped_messages": self._seen,
+        }
+
+    def _group(self, messages: List[GptsMessage]) -> None:
+        """Group the messages appended since the last render by their goals."""
+        groups = self._groups
+        for i in range(self._seen, len(messages)):
+            message = messages[i]
+            if (
+                message.sender in _APP_LINK_AGENTS
+                or message.receiver in _APP_LINK_AGENTS
+            ):
+                if (
+                    message.sender in _APP_LINK_AGENTS
+                    and message.receiver == "AppLauncher"
+                ):
+                    self._app_link_message = message
+                if message.receiver != "Human":
+                    continue
+
+            if message.sender == "AppLauncher":
+                if message.receiver == "Human":
+                    self._app_lanucher_message = message
+                continue
+
+            current_goal = message.current_goal
+            last_goal = next(reversed(groups)) if groups else None
+            if last_goal and current_goal and current_goal == last_goal:
+                groups[last_goal].append(message)
+                continue
+            if current_goal:
+                key = current_goal
+            else:
+                key = f"{NONE_GOAL_PREFIX}{self._none_goal_count}"
+                self._none_goal_count += 1
+            groups[key] = [message]
+            self._group_index[key] = i
+        if messages:
+            self._seen = len(messages)
+            self._first_message = messages[0]
+            self._last_message = messages[-1]
+
+    async def _render_group(self, key: str, messages: List[GptsMessage]) -> str:
+        cached = self._group_cache.get(key)
+        if cached and cached[0] is messages and cached[1] == len(messages):
+            self._reuses += 1
+            return cached[2]
+        self._renders += 1
+        content = await self._agents_vis(messages, False)
+        self._group_cache[key] = (messages, len(messages), content)
+        return content
+
+    async def _render_plans(
+        self, plan_id: str, plans: List[Dict], plan_cache: Dict
+    ) -> str:
+        signature = tuple(tuple(p.values()) for p in plans)
+        cached = self._plan_cache.get(plan_id)
+        if cached and cached[0] == signature:
+            self._reuses += 1
+            content = cached[1]
+        else:
+            self._renders += 1
+            content = await self._plan_vis(plans)
+        plan_cache[plan_id] = (signature, content)
+        return content
+
+    async def _render(self) -> List[VisFragment]:
+        fragments: List[VisFragment] = []
+        if self._app_link_message:
+            signature = (self._app_link_message, self._app_lanucher_message)
+            cached = self._app_link_cache
+            if cached and all(a is b for a, b in zip(cached[0], signature)):
+                self._reuses += 1
+                content = cached[1]
+            else:
+                self._renders += 1
+                content = await self._app_link_vis(*signature)
+                self._app_link_cache = (signature, content)
+            fragments.append(VisFragment("app_link", content))
+        temp_group = self._groups
+        if not temp_group:
+            return fragments
+
+        last_goal = next(reversed(temp_group))
+        last_goal_message = None
+        if not last_goal.startswith(NONE_GOAL_PREFIX):
+            last_goal_message = temp_group[last_goal][-1]
+
+        # Only keep the plans of this render
+        plan_cache: Dict[str, Tuple[Tuple, str]] = {}
+        num = 0
+        plan_temps: List[Dict] = []
+        plan_id: Optional[str] = None
+        need_show_singe_last_message = False
+        for key, value in temp_group.items():
+            num = num + 1
+            index = self._group_index[key]
+            if key.startswith(NONE_GOAL_PREFIX):
+                current_plan_id = plan_id or f"plans-before-{index}"
+                fragments.append(
+                    VisFragment(
+                        current_plan_id,
+                        await self._render_plans(
+                            current_plan_id, plan_temps, plan_cache
+                        ),
+                    )
+                )
+                plan_temps = []
+                plan_id = None
+                num = 0
+                fragments.append(
+                    VisFragment(f"agents-{index}", await self._render_group(key, value))
+                )
+            else:
+                num += 1
+                plan_id = plan_id or f"plans-{index}"
+                plan_temps.append(
+                    {
+                        "name": key,
+                        "num": num,
+                        "status": "complete",
+                        "agent": value[0].receiver if value else "",
+                        "markdown": await self._render_group(key, value),
+                    }
+                )
+                need_show_singe_last_message = True
+
+        if plan_temps and plan_id:
+            fragments.append(
+                VisFragment(
+                    plan_id, await self._render_plans(plan_id, plan_temps, plan_cache)
+                )
+            )
+        self._plan_cache = plan_cache
+        if need_show_singe_last_message and last_goal_message:
+            cached_last = self._last_message_cache
+            if cached_last and cached_last[0] is last_goal_message:
+                self._reuses += 1
+                content = cached_last[1]
+            else:
+                self._renders += 1
+                content = await self._agents_vis([last_goal_message], True)
+                self._last_message_cache = (last_goal_message, content)
+            fragments.append(VisFragment("last-message", content))
+        return fragments
@@ -4,6 +4,8 @@ from concurrent.futures import Executor
 from datetime import datetime
 from typing import Any, Dict, Generic, List, Optional
 
+import numpy as np
+
 from dbgpt.core import Chunk
 from dbgpt.rag.retriever.time_weighted import TimeWeightedEmbeddingRetriever
 from dbgpt.storage.vector_store.base import VectorStoreBase
@@ -34,6 +36,17 @@ class LongTermRetriever(TimeWeightedEmbeddingRetriever):
         self.now = now
         super().__init__(**kwargs)
 
+    def _is_excluded(self, chunk: Chunk) -> bool:
+        """Skip documents that are marked for forgetting or merging."""
+        return (
+            chunk.content.find(_FORGET_PLACEHOLDER) != -1
+            or chunk.content.find(_MERGE_PLACEHOLDER) != -1
+        )
+
+    def _candidate_rows(self) -> List[int]:
+        """All the memories are candidates."""
+        return list(range(len(self.memory_stream)))
+
     @mutable
     def _retrieve(
         self, query: str, filters: Optional[MetadataFilters] = None
@@ -55,60 +68,7 @@ class LongTermRetriever(TimeWeightedEmbeddingRetriever):
             # with custom adjustments for long-term memory
             return self._retrieve_vector_store_only(query, filters, current_time)
 
-        # Process all memories in memory_stream
-        docs_and_scores = {}
-        for doc in self.memory_stream:
-            if _METADATA_BUFFER_IDX in doc.metadata:
-                buffer_idx = doc.metadata[_METADATA_BUFFER_IDX]
-                docs_and_scores[buffer_idx] = (doc, self.default_salience)
-
-        # If a doc is considered salient, update the salience score
-        docs_and_scores.update(self.get_salient_docs(query, filters))
-
-        # If no documents found and we're in vector store only mode, fall back
-        if not docs_and_scores and self._use_vector_store_only:
-            return self._retrieve_vector_store_only(query, filters, current_time)
-
-        # Calculate combined scores for all documents
-        rescored_docs = [
-            (doc, self._get_combined_score(doc, relevance, current_time))
-            for doc, relevance in docs_and_scores.values()
-        ]
-
-        # Sort by score
-        rescored_docs.sort(key=lambda x: x[1], reverse=True)
-
-        result = []
-        retrieved_num = 0
-
-        # Process documents in order of score
-        for doc, _ in rescored_docs:
-            # Skip documents that are marked for forgetting or merging
-            if (
-                retrieved_num < self._k
-                and doc.content.find(_FORGET_PLACEHOLDER) == -1
-                and doc.content.find(_MERGE_PLACEHOLDER) == -1
-            ):
-                retrieved_num += 1
-
-                # Get the document from memory stream
-                if _METADATA_BUFFER_IDX in doc.metadata and 0 <= doc.metadata[
-                    _METADATA_BUFFER_IDX
-                ] < len(self.memory_stream):
-                    buffered_doc = self.memory_stream[
-                        doc.metadata[_METADATA_BUFFER_IDX]
-                    ]
-                    buffered_doc.metadata[_METADATA_LAST_ACCESSED_AT] = current_time
-                    result.append(buffered_doc)
-                else:
-                    # Handle case where buffer_idx is invalid
-                    doc.metadata[_METADATA_LAST_ACCESSED_AT] = current_time
-                    result.append(doc)
-
-        # Save memory stream after updating access times
-        self._save_memory_stream()
-
-        return result
+        return self._retrieve_from_memory_stream(query, filters, current_time) or []
 
     def _retrieve_vector_store_only(
         self,
@@ -125,49 +85,42 @@ class LongTermRetriever(TimeWeightedEmbeddingRetriever):
         Returns:
             List of relevant document chunks
         """
+        current_time = current_time or self.now
         # Get documents from vector store
         docs = self._index_store.similar_search_with_scores(
             query, topk=self._top_k * 2, score_threshold=0, filters=filters
         )
 
         # Filter out documents that are marked for forgetting or merging
-        filtered_docs = [
-            doc
-            for doc in docs
-            if (
-                doc.content.find(_FORGET_PLACEHOLDER) == -1
-                and doc.content.find(_MERGE_PLACEHOLDER) == -1
+        filtered_docs = [doc for doc in docs if not self._is_excluded(doc)]
+        if not filtered_docs:
+            return []
+
+        # Apply time weighting and the importance to the documents with the last
+        # access time, just use vector similarity if no time data
+        scores = np.array([doc.score for doc in filtered_docs], dtype=np.float64)
+        timed = np.array(
+            [_METADATA_LAST_ACCESSED_AT in doc.metadata for doc in filtered_docs],
+            dtype=bool,
+        )
+        if timed.any():
+            importances = np.array(
+                [
+                    float(doc.metadata.get(_METADAT_IMPORTANCE, 0))
+                    for doc in filtered_docs
+                ],
+                dtype=np.float64,
+            )
+            scores = np.where(
+                timed,
+                self._score_chunks(filtered_docs, scores, current_time) + importances,
+                scores,
             )
-        ]
-
-        # Apply time weighting
-        rescored_docs = []
-        for doc in filtered_docs:
-            if _METADATA_LAST_ACCESSED_AT in doc.metadata:
-                last_accessed_time = datetime.fromtimestamp(
-                    float(doc.metadata[_METADATA_LAST_ACCESSED_AT])
-                )
-                hours_passed = self._get_hours_passed(current_time, last_accessed_time)
-                time_score = (1.0 - self.decay_rate) ** hours_passed
-
-                # Add importance score if available
-                importance_score = 0
-                if _METADAT_IMPORTANCE in doc.metadata:
-                    importance_score = float(doc.metadata[_METADAT_IMPORTANCE])
-
-                # Combine scores
-                combined_score = doc.score + time_score + importance_score
-                rescored_docs.append((doc, combined_score))
-            else:
-                # Just use vector similarity if no time data
-                rescored_docs.append((doc, doc.score))
-
-        # Sort by combined score
-        rescored_docs.sort(key=lambda x: x[1], reverse=True)
 
         # Return top results, updating last_accessed_at
         result = []
-        for doc, _ in rescored_docs[: self._k]:
+        for i in np.argsort(-scores, kind="stable")[: self._k]:
+            doc = filtered_docs[i]
             doc.metadata[_METADATA_LAST_ACCESSED_AT] = current_time
             result.append(doc)
 
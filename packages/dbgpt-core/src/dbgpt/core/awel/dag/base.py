@@ -5,6 +5,7 @@ DAG is the core component of AWEL, it is used to define the relationship between
 
 import asyncio
 import contextvars
+import copy
 import dataclasses
 import logging
 import threading
@@ -686,10 +687,28 @@ class DAGContext:
         When the task is running, the current task context
         will be set to the task context.
 
-        TODO: We should support parallel task running in the future.
+        For parallel task running, use :meth:`_fork` to get a task-scoped context
+        instead.
         """
         self._curr_task_ctx = _curr_task_ctx
 
+    def _fork(self, task_ctx: TaskContext) -> "DAGContext":
+        """Create a task-scoped view of current DAG context.
+
+        The new context shares the task outputs, share data(and its lock) and DAG
+        variables with current context, only the current task context is isolated,
+        so that multiple tasks can run concurrently in the same DAG.
+
+        Args:
+            task_ctx (TaskContext): The task context of the new context.
+
+        Returns:
+            DAGContext: The task-scoped DAG context
+        """
+        forked = copy.copy(self)
+        forked._curr_task_ctx = task_ctx
+        return forked
+
     def get_task_output(self, task_name: str) -> TaskOutput:
         """Get the task output by task name.
 
@@ -798,8 +817,23 @@ class DAG:
         tags: Optional[Dict[str, str]] = None,
         description: Optional[str] = None,
         default_dag_variables: Optional[DAGVariables] = None,
+        max_concurrency: Optional[int] = None,
     ) -> None:
-        """Initialize a DAG."""
+        """Initialize a DAG.
+
+        Args:
+            dag_id (str): The DAG id.
+            resource_group (Optional[ResourceGroup], optional): The resource group.
+            tags (Optional[Dict[str, str]], optional): The tags of the DAG.
+            description (Optional[str], optional): The description of the DAG.
+            default_dag_variables (Optional[DAGVariables], optional): The default
+                DAG variables.
+            max_concurrency (Optional[int], optional): The max number of tasks run
+                concurrently in this DAG, only works with the parallel runner.
+                Defaults to None, use the setting of the runner.
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
         self._dag_id = dag_id
         self._tags: Dict[str, str] = tags or {}
         self._description = description
@@ -812,6 +846,7 @@ class DAG:
         self._lock = asyncio.Lock()
         self._event_loop_task_id_to_ctx: Dict[int, DAGContext] = {}
         self._default_dag_variables = default_dag_variables
+        self._max_concurrency = max_concurrency
 
     def _append_node(self, node: DAGNode) -> None:
         if node.node_id in self.node_map:
@@ -848,6 +883,11 @@ class DAG:
         """Return the description of current DAG."""
         return self._description
 
+    @property
+    def max_concurrency(self) -> Optional[int]:
+        """Return the max number of tasks run concurrently in current DAG."""
+        return self._max_concurrency
+
     @property
     def dev_mode(self) -> bool:
         """Whether the current DAG is in dev mode.
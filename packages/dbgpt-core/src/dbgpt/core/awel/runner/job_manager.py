@@ -72,6 +72,43 @@ class JobManager(DAGLifecycle):
         """
         return self._id2node_data.get(node_id)
 
+    def topological_levels(self) -> List[List[BaseOperator]]:
+        """Group all nodes of the DAG by their topological level.
+
+        The level of a root node is 0, and the level of other nodes is one more than
+        the max level of its upstream nodes. So all nodes in the same level are
+        independent of each other and can be run concurrently.
+
+        Returns:
+            List[List[BaseOperator]]: The nodes of each level, from the root level to
+                the level of the end node.
+        """
+        node_levels: Dict[str, int] = {}
+
+        def _level(node: BaseOperator) -> int:
+            if node.node_id in node_levels:
+                return node_levels[node.node_id]
+            upstream_levels = [
+                _level(cast(BaseOperator, up))
+                for up in node.upstream
+                if isinstance(up, BaseOperator)
+            ]
+            level = max(upstream_levels) + 1 if upstream_levels else 0
+            node_levels[node.node_id] = level
+            return level
+
+        levels: List[List[BaseOperator]] = []
+        seen = set()
+        for node in reversed(self._all_nodes):
+            if node.node_id in seen:
+                continue
+            seen.add(node.node_id)
+            level = _level(node)
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].append(node)
+        return levels
+
     async def before_dag_run(self):
         """Execute the callback before DAG run."""
         tasks = []
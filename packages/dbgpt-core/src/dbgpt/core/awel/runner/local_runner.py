@@ -12,7 +12,12 @@ from dbgpt.component import SystemApp
 from dbgpt.util.tracer import root_tracer
 
 from ..dag.base import DAGContext, DAGVar, DAGVariables
-from ..operators.base import CALL_DATA, BaseOperator, WorkflowRunner
+from ..operators.base import (
+    CALL_DATA,
+    CURRENT_DAG_CONTEXT,
+    BaseOperator,
+    WorkflowRunner,
+)
 from ..operators.common_operator import BranchOperator
 from ..task.base import SKIP_DATA, TaskContext, TaskState
 from ..task.task_impl import DefaultInputContext, DefaultTaskContext, SimpleTaskOutput
@@ -22,13 +27,36 @@ logger = logging.getLogger(__name__)
 
 
 class DefaultWorkflowRunner(WorkflowRunner):
-    """The default workflow runner."""
+    """The default workflow runner.
 
-    def __init__(self):
-        """Init the default workflow runner."""
+    By default, the runner runs the upstream nodes one by one. If ``parallel`` is
+    True, the nodes are scheduled by topological level, and all ready nodes of the
+    same level run concurrently, each one with its own task context.
+
+    Examples:
+        .. code-block:: python
+
+            runner = DefaultWorkflowRunner(parallel=True, max_concurrency=8)
+            initialize_runner(runner)
+    """
+
+    def __init__(self, parallel: bool = False, max_concurrency: Optional[int] = None):
+        """Init the default workflow runner.
+
+        Args:
+            parallel (bool, optional): Whether to run independent nodes concurrently.
+                Defaults to False.
+            max_concurrency (Optional[int], optional): The default max number of
+                nodes run concurrently in one DAG, it can be overridden by
+                :attr:`DAG.max_concurrency`. Defaults to None, no limit.
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
         self._running_dag_ctx: Dict[str, DAGContext] = {}
         self._task_log_index_map: Dict[str, int] = {}
         self._lock = asyncio.Lock()
+        self._parallel = parallel
+        self._max_concurrency = max_concurrency
 
     async def _log_task(self, task_id: str) -> int:
         async with self._lock:
@@ -101,19 +129,45 @@ class DefaultWorkflowRunner(WorkflowRunner):
             await node.dag._save_dag_ctx(dag_ctx)
         await job_manager.before_dag_run()
 
-        with root_tracer.start_span(
-            "dbgpt.awel.workflow.run_workflow",
-            metadata={
-                "exist_dag_ctx": exist_dag_ctx is not None,
-                "event_loop_task_id": event_loop_task_id,
-                "streaming_call": streaming_call,
-                "awel_node_id": node.node_id,
-                "awel_node_name": node.node_name,
-            },
-        ):
-            await self._execute_node(
-                job_manager, node, dag_ctx, node_outputs, skip_node_ids, system_app
-            )
+        try:
+            with root_tracer.start_span(
+                "dbgpt.awel.workflow.run_workflow",
+                metadata={
+                    "exist_dag_ctx": exist_dag_ctx is not None,
+                    "event_loop_task_id": event_loop_task_id,
+                    "streaming_call": streaming_call,
+                    "awel_node_id": node.node_id,
+                    "awel_node_name": node.node_name,
+                    "parallel": self._parallel,
+                },
+            ):
+                if self._parallel:
+                    await self._execute_node_parallel(
+                        job_manager,
+                        node,
+                        dag_ctx,
+                        node_outputs,
+                        skip_node_ids,
+                        system_app,
+                    )
+                else:
+                    await self._execute_node(
+                        job_manager,
+                        node,
+                        dag_ctx,
+                        node_outputs,
+                        skip_node_ids,
+                        system_app,
+                    )
+        except BaseException:
+            if not streaming_call and node.dag and exist_dag_ctx is None:
+                # The nodes release their resources of this run in after_dag_end,
+                # end the DAG when a node failed too, keep the error of the node.
+                try:
+                    await node.dag._after_dag_end(dag_ctx._event_loop_task_id)
+                except Exception as e:
+                    logger.warning(f"End DAG after the failed run error: {e}")
+            raise
         if not streaming_call and node.dag and exist_dag_ctx is None:
             # streaming call not work for dag end
             # if exist_dag_ctx is not None, it means current dag is a sub dag
@@ -136,8 +190,6 @@ class DefaultWorkflowRunner(WorkflowRunner):
             return
 
         # Run all upstream nodes
-        # TODO: run in parallel, there are some code to be changed:
-        #  dag_ctx.set_current_task_context(task_ctx)
         for upstream_node in node.upstream:
             if isinstance(upstream_node, BaseOperator):
                 await self._execute_node(
@@ -149,6 +201,67 @@ class DefaultWorkflowRunner(WorkflowRunner):
                     system_app,
                 )
 
+        await self._run_node(
+            job_manager, node, dag_ctx, node_outputs, skip_node_ids, system_app
+        )
+
+    async def _execute_node_parallel(
+        self,
+        job_manager: JobManager,
+        node: BaseOperator,
+        dag_ctx: DAGContext,
+        node_outputs: Dict[str, TaskContext],
+        skip_node_ids: Set[str],
+        system_app: Optional[SystemApp],
+    ):
+        """Run the nodes level by level, nodes in the same level run concurrently."""
+        max_concurrency = self._max_concurrency
+        if node.dag and node.dag.max_concurrency:
+            max_concurrency = node.dag.max_concurrency
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def _run_with_limit(n: BaseOperator):
+            if not semaphore:
+                return await self._run_node(
+                    job_manager, n, dag_ctx, node_outputs, skip_node_ids, system_app
+                )
+            async with semaphore:
+                return await self._run_node(
+                    job_manager, n, dag_ctx, node_outputs, skip_node_ids, system_app
+                )
+
+        for level_nodes in job_manager.topological_levels():
+            ready_nodes = [n for n in level_nodes if n.node_id not in node_outputs]
+            if not ready_nodes:
+                continue
+            if len(ready_nodes) == 1:
+                await _run_with_limit(ready_nodes[0])
+                continue
+            tasks = [asyncio.create_task(_run_with_limit(n)) for n in ready_nodes]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        if node.node_id in node_outputs:
+            # Keep the same behavior as the sequential mode, the current task context
+            # is the end node's task context after the workflow finished.
+            dag_ctx.set_current_task_context(node_outputs[node.node_id])
+        CURRENT_DAG_CONTEXT.set(dag_ctx)
+
+    async def _run_node(
+        self,
+        job_manager: JobManager,
+        node: BaseOperator,
+        dag_ctx: DAGContext,
+        node_outputs: Dict[str, TaskContext],
+        skip_node_ids: Set[str],
+        system_app: Optional[SystemApp],
+    ):
+        """Run a single node whose upstream nodes have been finished."""
         inputs = [
             node_outputs[upstream_node.node_id] for upstream_node in node.upstream
         ]
@@ -163,7 +276,12 @@ class DefaultWorkflowRunner(WorkflowRunner):
             task_ctx.set_call_data(current_call_data)
 
         task_ctx.set_task_input(input_ctx)
-        dag_ctx.set_current_task_context(task_ctx)
+        if self._parallel:
+            # Every task has its own view of DAG context, don't share the current task
+            # context between concurrent tasks.
+            dag_ctx = dag_ctx._fork(task_ctx)
+        else:
+            dag_ctx.set_current_task_context(task_ctx)
         task_ctx.set_current_state(TaskState.RUNNING)
 
         if node.node_id in skip_node_ids:
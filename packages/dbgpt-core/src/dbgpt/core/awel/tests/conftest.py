@@ -15,9 +15,9 @@ from .. import DAGVar, DefaultWorkflowRunner, InputOperator, SimpleInputSource
 from ..task.task_impl import _is_async_iterator
 
 
-@pytest.fixture
-def runner():
-    return DefaultWorkflowRunner()
+@pytest.fixture(params=[False, True], ids=["sequential", "parallel"])
+def runner(request):
+    return DefaultWorkflowRunner(parallel=request.param)
 
 
 def _create_stream(num_nodes) -> List[AsyncIterator[int]]:
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List
 
 import pytest
@@ -6,6 +7,7 @@ from .. import (
     DAG,
     BranchOperator,
     DAGContext,
+    DefaultWorkflowRunner,
     InputOperator,
     JoinOperator,
     MapOperator,
@@ -138,3 +140,132 @@ async def test_branch_node(
         assert res.current_task_context.current_state == TaskState.SUCCESS
         expect_res = 999 if is_odd else 888
         assert res.current_task_context.task_output.output == expect_res
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "input_node",
+    [
+        ({"outputs": [1]}),
+    ],
+    indirect=["input_node"],
+)
+async def test_parallel_branches(input_node: InputOperator):
+    running = 0
+    max_running = 0
+
+    async def slow_map(x: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.1)
+        running -= 1
+        return x
+
+    def join_func(*args) -> int:
+        return sum(args)
+
+    with DAG("test_parallel_branches") as _dag:
+        join_node = JoinOperator(join_func)
+        for i in range(4):
+            input_node >> MapOperator(slow_map, task_id=f"slow_{i}") >> join_node
+
+    runner = DefaultWorkflowRunner(parallel=True)
+    res: DAGContext[int] = await runner.execute_workflow(join_node)
+    assert res.current_task_context.current_state == TaskState.SUCCESS
+    assert res.current_task_context.task_output.output == 4
+    assert max_running == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "input_node",
+    [
+        ({"outputs": [1]}),
+    ],
+    indirect=["input_node"],
+)
+async def test_parallel_max_concurrency(input_node: InputOperator):
+    running = 0
+    max_running = 0
+
+    async def slow_map(x: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return x
+
+    def join_func(*args) -> int:
+        return sum(args)
+
+    with DAG("test_parallel_max_concurrency", max_concurrency=2) as _dag:
+        join_node = JoinOperator(join_func)
+        for i in range(5):
+            input_node >> MapOperator(slow_map, task_id=f"slow_{i}") >> join_node
+
+    runner = DefaultWorkflowRunner(parallel=True, max_concurrency=4)
+    res: DAGContext[int] = await runner.execute_workflow(join_node)
+    assert res.current_task_context.task_output.output == 5
+    assert max_running == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "input_node",
+    [
+        ({"outputs": [1]}),
+    ],
+    indirect=["input_node"],
+)
+async def test_parallel_failed_node(input_node: InputOperator):
+    async def fail_map(x: int) -> int:
+        raise ValueError("fail")
+
+    with DAG("test_parallel_failed_node") as _dag:
+        join_node = JoinOperator(lambda a, b: a + b)
+        input_node >> MapOperator(fail_map) >> join_node
+        input_node >> MapOperator(lambda x: x) >> join_node
+
+    runner = DefaultWorkflowRunner(parallel=True)
+    with pytest.raises(ValueError, match="fail"):
+        await runner.execute_workflow(join_node)
+
+
+class _EndRecordOperator(MapOperator[int, int]):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.ended_tasks: List[int] = []
+
+    async def map(self, x: int) -> int:
+        return x
+
+    async def after_dag_end(self, event_loop_task_id: int):
+        self.ended_tasks.append(event_loop_task_id)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "input_node",
+    [
+        ({"outputs": [1]}),
+    ],
+    indirect=["input_node"],
+)
+async def test_dag_end_after_failed_node(
+    runner: WorkflowRunner, input_node: InputOperator
+):
+    async def fail_map(x: int) -> int:
+        raise ValueError("fail")
+
+    with DAG("test_dag_end_after_failed_node") as dag:
+        record_node = _EndRecordOperator()
+        fail_node = MapOperator(fail_map)
+        input_node >> record_node >> fail_node
+
+    with pytest.raises(ValueError, match="fail"):
+        await runner.execute_workflow(fail_node)
+    # The nodes release the resources of the failed run, the DAG context is cleaned
+    assert len(record_node.ended_tasks) == 1
+    assert not dag._event_loop_task_id_to_ctx
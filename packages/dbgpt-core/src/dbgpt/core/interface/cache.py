@@ -28,6 +28,7 @@ class CachePolicy(str, Enum):
 
     LRU = "lru"
     FIFO = "fifo"
+    LFU = "lfu"
 
 
 @dataclass
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import copy
+import json
 from abc import ABC, abstractmethod
 from collections.abc import Iterable
 from datetime import datetime
@@ -1235,6 +1237,10 @@ class StorageConversation(OnceConversation, StorageItem):
         self._has_stored_message_index = (
             len(kwargs["messages"]) - 1 if "messages" in kwargs else -1
         )
+        # The fingerprints of the stored messages by the message index, and of the
+        # stored conversation, to only save the changed ones
+        self._stored_message_states: Dict[int, str] = {}
+        self._stored_conv_state: Optional[Tuple] = None
         # Whether to load the message from the storage
         self._load_message = load_message
         self.save_message_independent = save_message_independent
@@ -1271,21 +1277,61 @@ class StorageConversation(OnceConversation, StorageItem):
         ]
 
     def save_to_storage(self) -> None:
-        """Save the conversation to the storage."""
+        """Save the conversation to the storage.
+
+        Only the new or changed messages are saved, and the conversation is saved
+        only if it is changed.
+        """
         # Save messages first
         message_list = self._get_message_items()
         self._message_ids = [
             message.identifier.str_identifier for message in message_list
         ]
-        messages_to_save = message_list[self._has_stored_message_index + 1 :]
+        messages_to_save = []
+        for message in message_list:
+            state = _message_state(message.message_detail)
+            if (
+                message.index > self._has_stored_message_index
+                or self._stored_message_states.get(message.index, state) != state
+            ):
+                messages_to_save.append(message)
+            self._stored_message_states[message.index] = state
         self._has_stored_message_index = len(message_list) - 1
-        if self.save_message_independent:
+        if self.save_message_independent and messages_to_save:
             # Save messages independently
-            self.message_storage.save_list(messages_to_save)
+            self.message_storage.save_or_update_list(messages_to_save)
         # Save conversation
         if self.summary is not None and len(self.summary) > 4000:
             self.summary = self.summary[0:4000]
-        self.conv_storage.save_or_update(self)
+        conv_state = self._conv_state()
+        if messages_to_save or conv_state != self._stored_conv_state:
+            # The storage may write it later, so save a snapshot of the conversation
+            self.conv_storage.save_or_update(self._snapshot())
+            self._stored_conv_state = conv_state
+
+    def _conv_state(self) -> Tuple:
+        """Return the fingerprint of the stored fields of the conversation."""
+        return (
+            self.chat_mode,
+            self.user_name,
+            self.sys_code,
+            self.app_code,
+            self.summary,
+            self.save_message_independent,
+            tuple(self.message_ids),
+        )
+
+    def _snapshot(self) -> "StorageConversation":
+        """Return a shallow copy of the conversation with its own message list."""
+        snapshot = copy.copy(self)
+        snapshot.messages = list(self.messages)
+        return snapshot
+
+    def _reset_stored_state(self) -> None:
+        """Forget what was saved, all the messages are saved next time."""
+        self._has_stored_message_index = -1
+        self._stored_message_states = {}
+        self._stored_conv_state = None
 
     def load_from_storage(
         self, conv_storage: StorageInterface, message_storage: StorageInterface
@@ -1331,6 +1377,11 @@ class StorageConversation(OnceConversation, StorageItem):
         self._has_stored_message_index = len(real_messages) - 1
         self.save_message_independent = conversation.save_message_independent
         self.from_conversation(conversation)
+        self._stored_message_states = {
+            message.index: _message_state(message.message_detail)
+            for message in self._get_message_items()
+        }
+        self._stored_conv_state = self._conv_state()
 
     def _append_additional_kwargs(
         self, conversation: StorageConversation, messages: List[BaseMessage]
@@ -1370,6 +1421,7 @@ class StorageConversation(OnceConversation, StorageItem):
                 message_storage=self.message_storage,
             )
         )
+        self._reset_stored_state()
 
     def clear(self) -> None:
         """Clear all the messages and conversation."""
@@ -1394,6 +1446,12 @@ class StorageConversation(OnceConversation, StorageItem):
                 message_storage=self.message_storage,
             )
         )
+        self._reset_stored_state()
+
+
+def _message_state(message_detail: Dict) -> str:
+    """Return the fingerprint of a message to find the changed messages."""
+    return json.dumps(message_detail, sort_keys=True, ensure_ascii=False, default=str)
 
 
 def _conversation_to_dict(once: OnceConversation) -> Dict:
@@ -49,6 +49,21 @@ class BaseDeployModelParameters(BaseParameters):
     concurrency: Optional[int] = field(
         default=5, metadata={"help": _("Model concurrency limit")}
     )
+    selection_strategy: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The strategy to select one instance when the model has multiple "
+                "instances, random by default"
+            ),
+            "valid_values": [
+                "random",
+                "least_outstanding",
+                "power_of_two",
+                "weighted_round_robin",
+            ],
+        },
+    )
 
     @property
     def real_provider_model_name(self) -> str:
@@ -144,6 +159,26 @@ class EmbeddingDeployModelParameters(BaseDeployModelParameters, RegisterParamete
     concurrency: Optional[int] = field(
         default=100, metadata={"help": _("Model concurrency limit")}
     )
+    max_batch_size: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The max number of texts merged into one model call by the "
+                "micro-batching scheduler of the worker, concurrent requests are "
+                "merged until this size or the max batch wait time is reached. "
+                "None or 0 to disable batching."
+            )
+        },
+    )
+    max_batch_wait_ms: Optional[float] = field(
+        default=5,
+        metadata={
+            "help": _(
+                "The max time in milliseconds to wait for more requests to merge "
+                "into one batch, only works when max_batch_size is set."
+            )
+        },
+    )
 
     @classmethod
     def worker_type(cls) -> "WorkerType":
@@ -162,6 +197,26 @@ class RerankerDeployModelParameters(BaseDeployModelParameters, RegisterParameter
     concurrency: Optional[int] = field(
         default=50, metadata={"help": _("Model concurrency limit")}
     )
+    max_batch_size: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The max number of texts merged into one model call by the "
+                "micro-batching scheduler of the worker, concurrent requests are "
+                "merged until this size or the max batch wait time is reached. "
+                "None or 0 to disable batching."
+            )
+        },
+    )
+    max_batch_wait_ms: Optional[float] = field(
+        default=5,
+        metadata={
+            "help": _(
+                "The max time in milliseconds to wait for more requests to merge "
+                "into one batch, only works when max_batch_size is set."
+            )
+        },
+    )
 
     @classmethod
     def worker_type(cls) -> "WorkerType":
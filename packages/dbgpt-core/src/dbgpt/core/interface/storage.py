@@ -1,10 +1,11 @@
 """The storage interface for storing and loading data."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, cast
+from typing import Any, Dict, Generic, List, Optional, Set, Type, TypeVar, cast
 
 from dbgpt.core.interface.serialization import Serializable, Serializer
 from dbgpt.util.annotations import PublicAPI
+from dbgpt.util.executor_utils import blocking_func_to_async_no_executor
 from dbgpt.util.i18n_utils import _
 from dbgpt.util.pagination_utils import PaginationResult
 from dbgpt.util.serialization.json_serialization import JsonSerializer
@@ -118,6 +119,28 @@ class StorageItemAdapter(Generic[T, TDataRepresentation]):
             Any: The query for the resource identifier
         """
 
+    def get_query_for_identifiers(
+        self,
+        storage_format: Type[TDataRepresentation],
+        resource_ids: List[ResourceIdentifier],
+        **kwargs,
+    ) -> Any:
+        """Get the query for several resource identifiers at once.
+
+        Override it to load a list of data with one query, e.g. a ``IN`` query in
+        database storage.
+
+        Args:
+            storage_format (Type[TDataRepresentation]): The storage format
+            resource_ids (List[ResourceIdentifier]): The resource identifiers
+            kwargs: The additional arguments
+
+        Returns:
+            Any: The query for the resource identifiers, None if not supported, then
+                the data are loaded one by one.
+        """
+        return None
+
 
 class DefaultStorageItemAdapter(StorageItemAdapter[T, T]):
     """Default storage item adapter.
@@ -175,18 +198,26 @@ class QuerySpec:
     """The query specification for querying data from the storage.
 
     Attributes:
-        conditions (Dict[str, Any]): The conditions for querying data
+        conditions (Dict[str, Any]): The conditions for querying data, a list, tuple
+            or set value matches any of its values
         limit (int): The maximum number of data to return
         offset (int): The offset of the data to return
+        order_by (List[str]): The fields to sort the data, a field with the prefix
+            "-" is sorted in descending order
     """
 
     def __init__(
-        self, conditions: Dict[str, Any], limit: Optional[int] = None, offset: int = 0
+        self,
+        conditions: Dict[str, Any],
+        limit: Optional[int] = None,
+        offset: int = 0,
+        order_by: Optional[List[str]] = None,
     ) -> None:
         """Create a new QuerySpec."""
         self.conditions = conditions
         self.limit = limit
         self.offset = offset
+        self.order_by = order_by or []
 
 
 @PublicAPI(stability="beta")
@@ -313,6 +344,20 @@ class StorageInterface(Generic[T, TDataRepresentation], ABC):
                 result.append(item)
         return result
 
+    async def aload_list(self, resource_id: List[ID], cls: Type[T]) -> List[T]:
+        """Load the data from the storage asynchronously.
+
+        Args:
+            resource_id (List[ID]): The resource identifiers of the data
+            cls (Type[T]): The type of the data
+
+        Returns:
+            List[T]: The loaded data, in the order of the resource identifiers
+        """
+        return await blocking_func_to_async_no_executor(
+            self.load_list, resource_id, cls
+        )
+
     @abstractmethod
     def delete(self, resource_id: ID) -> None:
         """Delete the data from the storage.
@@ -345,6 +390,18 @@ class StorageInterface(Generic[T, TDataRepresentation], ABC):
             List[T]: The queried data
         """
 
+    async def aquery(self, spec: QuerySpec, cls: Type[T]) -> List[T]:
+        """Query data from the storage asynchronously.
+
+        Args:
+            spec (QuerySpec): The query specification
+            cls (Type[T]): The type of the data
+
+        Returns:
+            List[T]: The queried data
+        """
+        return await blocking_func_to_async_no_executor(self.query, spec, cls)
+
     @abstractmethod
     def count(self, spec: QuerySpec, cls: Type[T]) -> int:
         """Count the number of data from the storage.
@@ -377,7 +434,11 @@ class StorageInterface(Generic[T, TDataRepresentation], ABC):
         spec.limit = page_size
         spec.offset = (page - 1) * page_size
         items = self.query(spec, cls)
-        total = self.count(spec, cls)
+        if spec.offset == 0 and len(items) < page_size:
+            # All the data are in the first page
+            total = len(items)
+        else:
+            total = self.count(spec, cls)
         return PaginationResult(
             items=items,
             total_count=total,
@@ -418,6 +479,11 @@ class InMemoryStorage(StorageInterface[T, T]):
         super().__init__(serializer)
         # Key: ResourceIdentifier, Value: Serialized data
         self._data: Dict[str, bytes] = {}
+        # The indexes of the fields queried, built on the first query of the field.
+        # Key: field name, Value: {field value: identifiers}
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {}
+        # The field values of the data indexed, to remove them from the indexes
+        self._indexed_values: Dict[str, Dict[str, Any]] = {}
 
     def save(self, data: T) -> None:
         """Save the data to the storage.
@@ -435,6 +501,7 @@ class InMemoryStorage(StorageInterface[T, T]):
                 f"Data with identifier {data.identifier.str_identifier} already exists"
             )
         self._data[data.identifier.str_identifier] = data.serialize()
+        self._index_data(data.identifier.str_identifier, data)
 
     def update(self, data: T) -> None:
         """Update the data to the storage."""
@@ -443,6 +510,7 @@ class InMemoryStorage(StorageInterface[T, T]):
         if not data._serializer:
             data.set_serializer(self.serializer)
         self._data[data.identifier.str_identifier] = data.serialize()
+        self._index_data(data.identifier.str_identifier, data)
 
     def save_or_update(self, data: T) -> None:
         """Save or update the data to the storage."""
@@ -459,6 +527,51 @@ class InMemoryStorage(StorageInterface[T, T]):
         """Delete the data from the storage."""
         if resource_id.str_identifier in self._data:
             del self._data[resource_id.str_identifier]
+            self._unindex_data(resource_id.str_identifier)
+
+    def _index_data(self, identifier: str, data: Any) -> None:
+        """Update the field indexes with the data."""
+        if not self._indexes:
+            return
+        self._unindex_data(identifier)
+        values = {key: getattr(data, key, None) for key in self._indexes}
+        for key, value in values.items():
+            self._indexes[key].setdefault(_index_key(value), set()).add(identifier)
+        self._indexed_values[identifier] = values
+
+    def _unindex_data(self, identifier: str) -> None:
+        values = self._indexed_values.pop(identifier, None)
+        if not values:
+            return
+        for key, value in values.items():
+            ids = self._indexes[key].get(_index_key(value))
+            if ids is not None:
+                ids.discard(identifier)
+
+    def _build_index(self, key: str, cls: Type[T]) -> None:
+        self._indexes[key] = {}
+        for identifier, serialized_data in self._data.items():
+            data = self._serializer.deserialize(serialized_data, cls)
+            value = getattr(data, key, None)
+            self._indexes[key].setdefault(_index_key(value), set()).add(identifier)
+            self._indexed_values.setdefault(identifier, {})[key] = value
+
+    def _candidates(self, spec: QuerySpec, cls: Type[T]) -> List[str]:
+        """Return the identifiers which may match the conditions, in saved order."""
+        candidates: Optional[Set[str]] = None
+        for key, value in spec.conditions.items():
+            if key not in self._indexes:
+                self._build_index(key, cls)
+            values = (
+                value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+            )
+            ids: Set[str] = set()
+            for v in values:
+                ids.update(self._indexes[key].get(_index_key(v), ()))
+            candidates = ids if candidates is None else candidates & ids
+        if candidates is None:
+            return list(self._data)
+        return [identifier for identifier in self._data if identifier in candidates]
 
     def query(self, spec: QuerySpec, cls: Type[T]) -> List[T]:
         """Query data from the storage.
@@ -470,20 +583,27 @@ class InMemoryStorage(StorageInterface[T, T]):
         Returns:
             List[T]: The queried data
         """
-        result = []
-        for serialized_data in self._data.values():
-            data = cast(T, self._serializer.deserialize(serialized_data, cls))
-            if all(
-                getattr(data, key) == value for key, value in spec.conditions.items()
-            ):
-                result.append(data)
-
-        # Apply limit and offset
-        if spec.limit is not None:
-            result = result[spec.offset : spec.offset + spec.limit]
-        else:
-            result = result[spec.offset :]
-        return result
+        identifiers = self._candidates(spec, cls)
+        if spec.order_by:
+            result = [
+                cast(T, self._serializer.deserialize(self._data[i], cls))
+                for i in identifiers
+            ]
+            # Sort by the last field first, the sort is stable
+            for field_name in reversed(spec.order_by):
+                reverse = field_name.startswith("-")
+                result.sort(
+                    key=lambda d: _sort_key(getattr(d, field_name.lstrip("-"))),
+                    reverse=reverse,
+                )
+            end = spec.offset + spec.limit if spec.limit is not None else None
+            return result[spec.offset : end]
+        # Apply limit and offset, only the data returned are deserialized
+        end = spec.offset + spec.limit if spec.limit is not None else None
+        return [
+            cast(T, self._serializer.deserialize(self._data[i], cls))
+            for i in identifiers[spec.offset : end]
+        ]
 
     def count(self, spec: QuerySpec, cls: Type[T]) -> int:
         """Count the number of data from the storage.
@@ -495,11 +615,18 @@ class InMemoryStorage(StorageInterface[T, T]):
         Returns:
             int: The number of data
         """
-        count = 0
-        for serialized_data in self._data.values():
-            data = self._serializer.deserialize(serialized_data, cls)
-            if all(
-                getattr(data, key) == value for key, value in spec.conditions.items()
-            ):
-                count += 1
-        return count
+        return len(self._candidates(spec, cls))
+
+
+def _index_key(value: Any) -> Any:
+    """Return the key of the value in the field indexes."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def _sort_key(value: Any) -> Any:
+    # None is sorted last
+    return value is None, value
@@ -17,6 +17,7 @@ from dbgpt.core.interface.message import (
     ViewMessage,
     parse_model_messages,
 )
+from dbgpt.core.interface.storage import InMemoryStorage
 
 
 @pytest.fixture
@@ -368,6 +369,51 @@ def test_delete(storage_conversation, in_memory_storage):
     assert len(no_messages_conv.messages) == 0
 
 
+class _RecordingStorage(InMemoryStorage):
+    def __init__(self):
+        super().__init__()
+        self.saved = []
+
+    def save_or_update(self, data):
+        self.saved.append(data.identifier.str_identifier)
+        super().save_or_update(data)
+
+
+def test_save_only_changed(storage_conversation):
+    storage = _RecordingStorage()
+    storage_conversation.conv_storage = storage
+    storage_conversation.message_storage = storage
+
+    storage_conversation.start_new_round()
+    storage_conversation.add_user_message("User message")
+    storage_conversation.add_ai_message("AI response")
+    storage_conversation.end_current_round()
+    assert storage.saved == [
+        "message___conv1___0",
+        "message___conv1___1",
+        "conversation:conv1",
+    ]
+
+    storage.saved.clear()
+    storage_conversation.save_to_storage()
+    assert storage.saved == []
+
+    storage_conversation.messages[1].content = "AI response edited"
+    storage_conversation.save_to_storage()
+    assert storage.saved == ["message___conv1___1", "conversation:conv1"]
+
+    # Nothing is changed after loading
+    storage.saved.clear()
+    loaded = StorageConversation("conv1", conv_storage=storage, message_storage=storage)
+    assert loaded.messages[1].content == "AI response edited"
+    loaded.save_to_storage()
+    assert storage.saved == []
+    loaded.start_new_round()
+    loaded.add_user_message("Second message")
+    loaded.end_current_round()
+    assert storage.saved == ["message___conv1___2", "conversation:conv1"]
+
+
 def test_parse_model_messages_no_history_messages():
     messages = [
         ModelMessage(role=ModelMessageRoleType.HUMAN, content="Hello"),
@@ -129,3 +129,36 @@ def test_paginate_query(in_memory_storage):
     assert page_result.total_count == 10
     assert page_result.total_pages == 4
     assert page_result.page == 2
+
+
+def test_query_index_is_updated(in_memory_storage):
+    for i in range(10):
+        in_memory_storage.save(MockStorageItem(str(i), f"data_{i % 3}"))
+    spec = QuerySpec(conditions={"data": "data_1"})
+    assert [r.data for r in in_memory_storage.query(spec, MockStorageItem)] == [
+        "data_1"
+    ] * 3
+
+    in_memory_storage.update(MockStorageItem("1", "data_2"))
+    in_memory_storage.delete(MockResourceIdentifier("4"))
+    in_memory_storage.save(MockStorageItem("10", "data_1"))
+    results = in_memory_storage.query(spec, MockStorageItem)
+    assert [r.identifier.str_identifier for r in results] == ["7", "10"]
+    assert in_memory_storage.count(spec, MockStorageItem) == 2
+
+    spec = QuerySpec(
+        conditions={"data": ["data_0", "data_2"]}, order_by=["-data"], limit=3
+    )
+    results = in_memory_storage.query(spec, MockStorageItem)
+    assert [r.identifier.str_identifier for r in results] == ["1", "2", "5"]
+    assert in_memory_storage.count(spec, MockStorageItem) == 8
+
+
+@pytest.mark.asyncio
+async def test_aload_list(in_memory_storage):
+    for i in range(3):
+        in_memory_storage.save(MockStorageItem(str(i), f"data_{i}"))
+    items = await in_memory_storage.aload_list(
+        [MockResourceIdentifier("2"), MockResourceIdentifier("5")], MockStorageItem
+    )
+    assert [item.data for item in items] == ["data_2"]
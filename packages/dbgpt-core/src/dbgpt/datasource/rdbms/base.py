@@ -2,6 +2,7 @@
 
 import logging
 import re
+import threading
 import weakref
 from concurrent.futures import ThreadPoolExecutor
 from concurrent.futures import TimeoutError as FutureTimeoutError
@@ -162,8 +163,10 @@ class RDBMSConnector(BaseConnector):
         self._sample_rows_in_table_info = sample_rows_in_table_info
         self._indexes_in_table_info = indexes_in_table_info
 
+        # Table metadata is reflected lazily, only the tables actually used are
+        # reflected, see `_reflect_tables`.
         self._metadata = metadata or MetaData()
-        self._metadata.reflect(bind=self._engine)
+        self._reflect_lock = threading.Lock()
 
         self._all_tables: Set[str] = cast(Set[str], self._sync_tables_from_db())
 
@@ -242,6 +245,35 @@ class RDBMSConnector(BaseConnector):
         )
         return self._all_tables
 
+    def _reflect_schema(self) -> Optional[str]:
+        """Return the schema used to reflect table metadata."""
+        return None
+
+    def _reflect_tables(self, table_names: Iterable[str]) -> None:
+        """Reflect the metadata of the given tables if not reflected yet.
+
+        Reflecting the whole database is very slow for databases with thousands of
+        tables, so we only reflect the tables actually needed.
+
+        Args:
+            table_names (Iterable[str]): The table names to reflect.
+        """
+        reflected = {tbl.name for tbl in self._metadata.tables.values()}
+        missing = set(table_names) - reflected
+        if not missing:
+            return
+        with self._reflect_lock:
+            reflected = {tbl.name for tbl in self._metadata.tables.values()}
+            missing = missing - reflected
+            if not missing:
+                return
+            # Use a callable to skip the tables(e.g. views) can't be reflected
+            self._metadata.reflect(
+                bind=self._engine,
+                schema=self._reflect_schema(),
+                only=lambda name, _: name in missing,
+            )
+
     def get_usable_table_names(self) -> Iterable[str]:
         """Get names of tables available."""
         if self._include_tables:
@@ -336,6 +368,7 @@ class RDBMSConnector(BaseConnector):
                 raise ValueError(f"table_names {missing_tables} not found in database")
             all_table_names = table_names
 
+        self._reflect_tables(all_table_names)
         meta_tables = [
             tbl
             for tbl in self._metadata.sorted_tables
@@ -36,6 +36,12 @@ class ModelInstance:
     last_heartbeat: Optional[datetime] = None
     # Remove from the registry
     remove_from_registry: Optional[bool] = False
+    # The load hints reported by the heartbeats, used by the load-aware selection
+    outstanding_requests: Optional[int] = None
+    max_concurrency: Optional[int] = None
+    # The metrics of the request batching reported by the heartbeats, e.g. the batch
+    # size and the queue depth of an embedding worker
+    batch_metrics: Optional[Dict] = None
 
     def to_dict(self) -> Dict:
         """Convert to dict"""
@@ -34,6 +34,8 @@ class PromptRequest(BaseModel):
     frequency_penalty: Optional[float] = None
     chat_model: Optional[bool] = True
     """Whether to use chat model"""
+    delta_stream: Optional[bool] = None
+    """Whether to stream only the new text of each step, just for the stream API"""
 
 
 class EmbeddingsRequest(BaseModel):
@@ -142,3 +142,23 @@ async def test_same_model_name_different_ip_port(model_registry):
     assert len(instances) == 2
     assert instances[0].host != instances[1].host
     assert instances[0].port != instances[1].port
+
+
+@pytest.mark.asyncio
+async def test_select_one_health_instance_by_load(model_registry):
+    """
+    Test if the least loaded instance is selected by the load hints of heartbeats
+    """
+    busy = ModelInstance(model_name="test_model", host="192.168.1.1", port=5000)
+    idle = ModelInstance(model_name="test_model", host="192.168.1.2", port=5000)
+    await model_registry.register_instance(busy)
+    await model_registry.register_instance(idle)
+    busy.outstanding_requests = 10
+    idle.outstanding_requests = 1
+    await model_registry.send_heartbeat(busy)
+    await model_registry.send_heartbeat(idle)
+
+    model_registry.set_selection_strategy("test_model", "least_outstanding")
+    for _ in range(5):
+        selected = await model_registry.select_one_health_instance("test_model")
+        assert selected.host == "192.168.1.2"
@@ -0,0 +1,212 @@
+"""The strategies to select one instance from the instances of a model.
+
+The load-aware strategies use the number of outstanding requests and the capacity of
+each instance, so the requests are not piled onto the saturated instances when the
+instances have different sizes or long streaming generations.
+"""
+
+import random
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+
+class SelectionStrategy(str, Enum):
+    """The strategy to select one instance of a model."""
+
+    RANDOM = "random"
+    LEAST_OUTSTANDING = "least_outstanding"
+    POWER_OF_TWO = "power_of_two"
+    WEIGHTED_ROUND_ROBIN = "weighted_round_robin"
+
+    @staticmethod
+    def values() -> List[str]:
+        """Return all the values of the strategies."""
+        return [s.value for s in SelectionStrategy]
+
+
+@dataclass
+class SelectCandidate:
+    """A candidate instance to select.
+
+    Args:
+        instance (Any): The instance, e.g. ``WorkerRunData`` or ``ModelInstance``.
+        key (str): The unique key of the instance, e.g. ``host:port``.
+        weight (float): The weight of the instance.
+        outstanding (int): The number of requests running or waiting on the instance.
+        capacity (Optional[int]): The max concurrency of the instance, if known.
+    """
+
+    instance: Any
+    key: str
+    weight: float = 1.0
+    outstanding: int = 0
+    capacity: Optional[int] = None
+
+    @property
+    def load_score(self) -> float:
+        """Return the load score, the lower the better.
+
+        The score is the outstanding requests(including the new one) per unit of
+        capacity, so the larger instances take more requests.
+        """
+        weight = self.weight if self.weight and self.weight > 0 else 1.0
+        capacity = self.capacity if self.capacity and self.capacity > 0 else 1
+        return (self.outstanding + 1) / (weight * capacity)
+
+
+class InstanceSelector(ABC):
+    """Select one instance from the candidates."""
+
+    @abstractmethod
+    def select(self, candidates: List[SelectCandidate]) -> SelectCandidate:
+        """Select one instance.
+
+        Args:
+            candidates (List[SelectCandidate]): The candidates, must not be empty.
+
+        Returns:
+            SelectCandidate: The selected candidate.
+        """
+
+
+class RandomSelector(InstanceSelector):
+    """Select one instance randomly."""
+
+    def select(self, candidates: List[SelectCandidate]) -> SelectCandidate:
+        """Select one instance randomly."""
+        return random.choice(candidates)
+
+
+class LeastOutstandingSelector(InstanceSelector):
+    """Select the instance with the lowest load score.
+
+    The ties are broken randomly, so the idle instances are used evenly.
+    """
+
+    def select(self, candidates: List[SelectCandidate]) -> SelectCandidate:
+        """Select the least loaded instance."""
+        min_score = min(c.load_score for c in candidates)
+        return random.choice([c for c in candidates if c.load_score == min_score])
+
+
+class PowerOfTwoSelector(InstanceSelector):
+    """Sample two instances randomly and select the less loaded one.
+
+    It is close to the least outstanding strategy, but avoids all the clients with the
+    same stale load information rushing to the same instance.
+    """
+
+    def select(self, candidates: List[SelectCandidate]) -> SelectCandidate:
+        """Select the less loaded one of two random instances."""
+        if len(candidates) < 2:
+            return candidates[0]
+        first, second = random.sample(candidates, 2)
+        return first if first.load_score <= second.load_score else second
+
+
+class WeightedRoundRobinSelector(InstanceSelector):
+    """The smooth weighted round robin.
+
+    Each instance is selected in proportion to its weight, and the selections of the
+    heavier instances are interleaved with the others instead of in a row.
+    """
+
+    def __init__(self):
+        self._current_weights: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def select(self, candidates: List[SelectCandidate]) -> SelectCandidate:
+        """Select the next instance by weights."""
+        with self._lock:
+            keys = {c.key for c in candidates}
+            # Forget the instances removed
+            for key in list(self._current_weights.keys()):
+                if key not in keys:
+                    del self._current_weights[key]
+            total = 0.0
+            best: Optional[SelectCandidate] = None
+            for c in candidates:
+                weight = c.weight if c.weight and c.weight > 0 else 1.0
+                total += weight
+                current = self._current_weights.get(c.key, 0.0) + weight
+                self._current_weights[c.key] = current
+                if best is None or current > self._current_weights[best.key]:
+                    best = c
+            self._current_weights[best.key] -= total  # type: ignore
+            return best  # type: ignore
+
+
+def create_selector(strategy: Optional[str] = None) -> InstanceSelector:
+    """Create the instance selector of the strategy.
+
+    Args:
+        strategy (Optional[str]): The strategy name, random if not provided.
+
+    Returns:
+        InstanceSelector: The selector.
+    """
+    strategy = SelectionStrategy(strategy or SelectionStrategy.RANDOM.value)
+    if strategy == SelectionStrategy.LEAST_OUTSTANDING:
+        return LeastOutstandingSelector()
+    elif strategy == SelectionStrategy.POWER_OF_TWO:
+        return PowerOfTwoSelector()
+    elif strategy == SelectionStrategy.WEIGHTED_ROUND_ROBIN:
+        return WeightedRoundRobinSelector()
+    return RandomSelector()
+
+
+class SelectorRegistry:
+    """Keep one selector for each model, the stateful selectors need it."""
+
+    def __init__(self, default_strategy: Optional[str] = None):
+        self._default_strategy = default_strategy
+        self._strategies: Dict[str, str] = {}
+        self._selectors: Dict[str, InstanceSelector] = {}
+        self._lock = threading.Lock()
+
+    def set_strategy(self, model_key: str, strategy: Optional[str]) -> None:
+        """Set the strategy of a model.
+
+        Raises:
+            ValueError: If the strategy is not supported.
+        """
+        if strategy:
+            SelectionStrategy(strategy)
+        with self._lock:
+            if strategy:
+                self._strategies[model_key] = strategy
+            else:
+                self._strategies.pop(model_key, None)
+
+    def get_strategy(self, model_key: str) -> Optional[str]:
+        """Return the strategy of a model."""
+        return self._strategies.get(model_key, self._default_strategy)
+
+    def select(
+        self,
+        model_key: str,
+        candidates: List[SelectCandidate],
+        strategy: Optional[str] = None,
+    ) -> SelectCandidate:
+        """Select one instance of a model.
+
+        Args:
+            model_key (str): The key of the model.
+            candidates (List[SelectCandidate]): The candidates, must not be empty.
+            strategy (Optional[str]): The strategy, overrides the strategy of the
+                model if provided.
+
+        Returns:
+            SelectCandidate: The selected candidate.
+        """
+        strategy = strategy or self.get_strategy(model_key)
+        cache_key = f"{model_key}#{strategy}"
+        with self._lock:
+            selector = self._selectors.get(cache_key)
+            if selector is None:
+                selector = create_selector(strategy)
+                self._selectors[cache_key] = selector
+        return selector.select(candidates)
@@ -31,6 +31,11 @@ class WorkerRunData:
     _last_heartbeat: Optional[datetime] = None
     # Remove from the registry, Just for stop worker
     remove_from_registry: bool = False
+    # The weight and the max concurrency of the instance, used to select instance
+    weight: Optional[float] = 1.0
+    max_concurrency: Optional[int] = None
+    # The outstanding requests reported by the heartbeats of the remote instance
+    reported_outstanding: Optional[int] = None
 
     def _to_print_key(self):
         model_name = self.model_params.name
@@ -1,15 +1,15 @@
 import itertools
 import logging
-import random
 import threading
 import time
 from abc import ABC, abstractmethod
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from dbgpt.component import BaseComponent, ComponentType, SystemApp
 from dbgpt.model.base import ModelInstance
+from dbgpt.model.cluster.load_balance import SelectCandidate, SelectorRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +23,13 @@ class ModelRegistry(BaseComponent, ABC):
 
     name = ComponentType.MODEL_REGISTRY
 
-    def __init__(self, system_app: SystemApp | None = None):
+    def __init__(
+        self,
+        system_app: SystemApp | None = None,
+        selection_strategy: Optional[str] = None,
+    ):
         self.system_app = system_app
+        self._selectors = SelectorRegistry(default_strategy=selection_strategy)
         super().__init__(system_app)
 
     def init_app(self, system_app: SystemApp):
@@ -93,22 +98,50 @@ class ModelRegistry(BaseComponent, ABC):
         - List[ModelInstance]: A list of instances for the all models.
         """
 
-    async def select_one_health_instance(self, model_name: str) -> ModelInstance:
+    def set_selection_strategy(self, model_name: str, strategy: Optional[str]):
+        """
+        Set the strategy to select one instance for a given model.
+
+        Args:
+        - model_name (str): Name of the model.
+        - strategy (Optional[str]): The strategy name, e.g. "least_outstanding",
+            reset to the default strategy if None.
+        """
+        self._selectors.set_strategy(model_name, strategy)
+
+    async def select_one_health_instance(
+        self, model_name: str, strategy: Optional[str] = None
+    ) -> ModelInstance:
         """
         Selects one healthy and enabled instance for a given model.
 
+        The load-aware strategies use the load hints reported by the heartbeats of
+        the instances.
+
         Args:
         - model_name (str): Name of the model.
+        - strategy (Optional[str]): The selection strategy, overrides the strategy
+            of the model if provided. Defaults to random.
 
         Returns:
-        - ModelInstance: One randomly selected healthy and enabled instance, or None
-            if no such instance exists.
+        - ModelInstance: One selected healthy and enabled instance, or None if no
+            such instance exists.
         """
         instances = await self.get_all_instances(model_name, healthy_only=True)
         instances = [i for i in instances if i.enabled]
         if not instances:
             return None
-        return random.choice(instances)
+        candidates = [
+            SelectCandidate(
+                instance=ins,
+                key=f"{ins.host}:{ins.port}",
+                weight=ins.weight or 1.0,
+                outstanding=ins.outstanding_requests or 0,
+                capacity=ins.max_concurrency,
+            )
+            for ins in instances
+        ]
+        return self._selectors.select(model_name, candidates, strategy).instance
 
     @abstractmethod
     async def send_heartbeat(self, instance: ModelInstance) -> bool:
@@ -238,4 +271,7 @@ class EmbeddedModelRegistry(ModelRegistry):
         ins = exist_ins[0]
         ins.last_heartbeat = datetime.now()
         ins.healthy = True
+        ins.outstanding_requests = instance.outstanding_requests
+        ins.max_concurrency = instance.max_concurrency
+        ins.batch_metrics = instance.batch_metrics
         return True
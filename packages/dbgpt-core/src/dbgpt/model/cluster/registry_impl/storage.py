@@ -176,6 +176,12 @@ class StorageModelRegistry(ModelRegistry):
         self._executor = executor or ThreadPoolExecutor(max_workers=2)
         self.heartbeat_interval_secs = heartbeat_interval_secs
         self.heartbeat_timeout_secs = heartbeat_timeout_secs
+        # The load hints reported by the heartbeats, they change frequently, so they
+        # are kept in memory instead of the storage. They are dropped when the
+        # instance is deregistered or misses its heartbeats.
+        self._load_hints: Dict[
+            str, Tuple[Optional[int], Optional[int], Optional[Dict]]
+        ] = {}
         self.heartbeat_thread = threading.Thread(target=self._heartbeat_checker)
         self.heartbeat_thread.daemon = True
         self.heartbeat_thread.start()
@@ -243,6 +249,7 @@ class StorageModelRegistry(ModelRegistry):
                 ):
                     instance.healthy = False
                     self._storage.update(instance)
+                    self._load_hints.pop(instance.identifier.str_identifier, None)
             time.sleep(self.heartbeat_interval_secs)
 
     async def register_instance(self, instance: ModelInstance) -> bool:
@@ -285,6 +292,12 @@ class StorageModelRegistry(ModelRegistry):
         _, exist_ins = await self._get_instances_by_model(
             model_name, host, port, healthy_only=False
         )
+        self._load_hints.pop(
+            ModelInstanceIdentifier(
+                model_name=model_name, host=host, port=port
+            ).str_identifier,
+            None,
+        )
         if exist_ins:
             ins = exist_ins[0]
             ins.healthy = False
@@ -330,7 +343,7 @@ class StorageModelRegistry(ModelRegistry):
         )
         if healthy_only:
             instances = [ins for ins in instances if ins.healthy is True]
-        return [ModelInstanceStorageItem.to_model_instance(ins) for ins in instances]
+        return [self._to_model_instance(ins) for ins in instances]
 
     async def get_all_model_instances(
         self, healthy_only: bool = False
@@ -351,9 +364,18 @@ class StorageModelRegistry(ModelRegistry):
         )
         if healthy_only:
             all_instances = [ins for ins in all_instances if ins.healthy is True]
-        return [
-            ModelInstanceStorageItem.to_model_instance(ins) for ins in all_instances
-        ]
+        return [self._to_model_instance(ins) for ins in all_instances]
+
+    def _to_model_instance(self, item: ModelInstanceStorageItem) -> ModelInstance:
+        instance = ModelInstanceStorageItem.to_model_instance(item)
+        hints = self._load_hints.get(item.identifier.str_identifier)
+        if hints:
+            (
+                instance.outstanding_requests,
+                instance.max_concurrency,
+                instance.batch_metrics,
+            ) = hints
+        return instance
 
     async def send_heartbeat(self, instance: ModelInstance) -> bool:
         """Receive heartbeat from model instance.
@@ -370,6 +392,14 @@ class StorageModelRegistry(ModelRegistry):
         model_name = instance.model_name.strip()
         host = instance.host.strip()
         port = instance.port
+        identifier = ModelInstanceIdentifier(
+            model_name=model_name, host=host, port=port
+        )
+        self._load_hints[identifier.str_identifier] = (
+            instance.outstanding_requests,
+            instance.max_concurrency,
+            instance.batch_metrics,
+        )
         _, exist_ins = await self._get_instances_by_model(
             model_name, host, port, healthy_only=False
         )
@@ -218,3 +218,27 @@ async def test_heartbeat_checker(
     await registry.send_heartbeat(model_instance)
     # Should be healthy again
     await check_heartbeat(model_instance.model_name, True)
+
+
+@pytest.mark.asyncio
+async def test_send_heartbeat_batch_metrics(registry, model_instance):
+    """Test the batch metrics reported by the heartbeats."""
+    await registry.register_instance(model_instance)
+    model_instance.batch_metrics = {"last_batch_size": 8, "queue_depth": 2}
+    await registry.send_heartbeat(model_instance)
+
+    instances = await registry.get_all_instances(model_instance.model_name)
+    assert instances[0].batch_metrics == {"last_batch_size": 8, "queue_depth": 2}
+
+
+@pytest.mark.asyncio
+async def test_load_hints_dropped_on_deregister(registry, model_instance):
+    """Test the load hints of a deregistered instance are dropped."""
+    model_instance.outstanding_requests = 3
+    await registry.send_heartbeat(model_instance)
+    assert len(registry._load_hints) == 1
+
+    model_instance.remove_from_registry = True
+    await registry.deregister_instance(model_instance)
+    assert not registry._load_hints
+    assert await registry.get_all_instances(model_instance.model_name) == []
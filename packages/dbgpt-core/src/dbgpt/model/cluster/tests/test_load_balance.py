@@ -0,0 +1,64 @@
+from collections import Counter
+
+import pytest
+
+from dbgpt.model.cluster.load_balance import (
+    SelectCandidate,
+    SelectionStrategy,
+    SelectorRegistry,
+    create_selector,
+)
+
+
+def _candidates(*specs):
+    return [
+        SelectCandidate(instance=key, key=key, weight=weight, outstanding=outstanding)
+        for key, weight, outstanding in specs
+    ]
+
+
+def test_least_outstanding():
+    selector = create_selector(SelectionStrategy.LEAST_OUTSTANDING.value)
+    candidates = _candidates(("a", 1, 5), ("b", 1, 1), ("c", 1, 3))
+    for _ in range(10):
+        assert selector.select(candidates).key == "b"
+
+
+def test_least_outstanding_with_capacity():
+    selector = create_selector("least_outstanding")
+    candidates = [
+        SelectCandidate(instance="small", key="small", outstanding=2, capacity=2),
+        SelectCandidate(instance="large", key="large", outstanding=4, capacity=16),
+    ]
+    assert selector.select(candidates).key == "large"
+
+
+def test_power_of_two_avoids_the_busiest():
+    selector = create_selector("power_of_two")
+    candidates = _candidates(("a", 1, 0), ("b", 1, 100))
+    for _ in range(10):
+        assert selector.select(candidates).key == "a"
+    one = _candidates(("a", 1, 0))
+    assert selector.select(one).key == "a"
+
+
+def test_weighted_round_robin():
+    selector = create_selector("weighted_round_robin")
+    candidates = _candidates(("a", 3, 0), ("b", 1, 0))
+    selected = [selector.select(candidates).key for _ in range(8)]
+    assert Counter(selected) == {"a": 6, "b": 2}
+    # Smooth, the lighter instance is not starved in a row
+    assert selected[:4].count("b") == 1
+
+
+def test_selector_registry():
+    registry = SelectorRegistry()
+    registry.set_strategy("model_a", "least_outstanding")
+    candidates = _candidates(("a", 1, 3), ("b", 1, 0))
+    assert registry.get_strategy("model_a") == "least_outstanding"
+    assert registry.get_strategy("model_b") is None
+    assert registry.select("model_a", candidates).key == "b"
+    with pytest.raises(ValueError):
+        registry.set_strategy("model_a", "not_exist")
+    registry.set_strategy("model_a", None)
+    assert registry.get_strategy("model_a") is None
@@ -0,0 +1,244 @@
+"""Micro-batching scheduler for embedding and reranker workers.
+
+Concurrent requests are merged into one batch up to a max batch size or a max wait
+time, the batch is run with one model call, and the results are scattered back to the
+requests.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from dbgpt.util.executor_utils import blocking_func_to_async_no_executor
+
+logger = logging.getLogger(__name__)
+
+# The batch function receives the group key(e.g. the query of reranker, None for
+# embeddings) and the merged texts, returns one result for each text.
+BatchFunction = Callable[[Optional[str], List[str]], List[Any]]
+
+
+@dataclass
+class _BatchRequest:
+    texts: List[str]
+    group_key: Optional[str]
+    future: asyncio.Future
+
+
+@dataclass
+class BatchMetrics:
+    """The metrics of the batch scheduler."""
+
+    total_requests: int = 0
+    total_batches: int = 0
+    total_texts: int = 0
+    last_batch_size: int = 0
+    max_batch_size: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    @property
+    def avg_batch_size(self) -> float:
+        """Return the average number of texts in a batch."""
+        if not self.total_batches:
+            return 0.0
+        return self.total_texts / self.total_batches
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dict."""
+        return {
+            "total_requests": self.total_requests,
+            "total_batches": self.total_batches,
+            "total_texts": self.total_texts,
+            "avg_batch_size": self.avg_batch_size,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+class BatchScheduler:
+    """Merge concurrent requests into batches and run them with one call.
+
+    Requests with different group keys can't be merged into one call(e.g. rerank
+    requests with different queries), they are collected in the same batch window and
+    run one group after another.
+
+    Examples:
+        .. code-block:: python
+
+            scheduler = BatchScheduler(
+                lambda _, texts: embeddings.embed_documents(texts),
+                max_batch_size=64,
+                max_wait_ms=5,
+            )
+            vectors = await scheduler.submit(["hello", "world"])
+    """
+
+    def __init__(
+        self,
+        batch_func: BatchFunction,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5,
+        max_queue_size: int = 0,
+    ):
+        """Create a new BatchScheduler.
+
+        Args:
+            batch_func (BatchFunction): The blocking function to run a batch.
+            max_batch_size (int): The max number of texts in a batch. A request with
+                more texts than this is run as a batch on its own.
+            max_wait_ms (float): The max time in milliseconds to wait for more
+                requests after the first request of a batch arrives.
+            max_queue_size (int): The max number of waiting requests, 0 means no
+                limit. New requests wait when the queue is full.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be greater than 0")
+        self._batch_func = batch_func
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        # The request taken from the queue but not fit into the last batch
+        self._carry_over: Deque[_BatchRequest] = deque()
+        self._metrics = BatchMetrics()
+        self._lock = threading.Lock()
+
+    @property
+    def metrics(self) -> BatchMetrics:
+        """Return the metrics of the scheduler."""
+        return self._metrics
+
+    async def submit(self, texts: List[str], group_key: Optional[str] = None) -> List:
+        """Submit texts and wait for their results.
+
+        Args:
+            texts (List[str]): The texts to process.
+            group_key (Optional[str]): Only requests with the same group key are
+                merged into one call.
+
+        Returns:
+            List: One result for each text.
+        """
+        if not texts:
+            return []
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_BatchRequest(texts, group_key, future))  # type: ignore
+        self._metrics.total_requests += 1
+        self._update_queue_depth()
+        return await future
+
+    def close(self):
+        """Stop the scheduler, the waiting requests are cancelled."""
+        with self._lock:
+            task, loop = self._task, self._loop
+            self._task = None
+            self._queue = None
+            self._loop = None
+        if task and loop and not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._task and self._loop is loop and not self._task.done():
+                return
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+            self._carry_over.clear()
+            self._task = loop.create_task(self._run(self._queue))
+
+    def _update_queue_depth(self):
+        queue = self._queue
+        depth = (queue.qsize() if queue else 0) + len(self._carry_over)
+        self._metrics.queue_depth = depth
+        self._metrics.max_queue_depth = max(self._metrics.max_queue_depth, depth)
+
+    async def _next_batch(self, queue: asyncio.Queue) -> List[_BatchRequest]:
+        loop = asyncio.get_running_loop()
+        first = self._carry_over.popleft() if self._carry_over else await queue.get()
+        batch = [first]
+        num_texts = len(first.texts)
+        deadline = loop.time() + self._max_wait
+        while num_texts < self._max_batch_size:
+            if not queue.empty():
+                req = queue.get_nowait()
+            else:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    req = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if num_texts + len(req.texts) > self._max_batch_size:
+                self._carry_over.append(req)
+                break
+            batch.append(req)
+            num_texts += len(req.texts)
+        return batch
+
+    async def _run(self, queue: asyncio.Queue):
+        batch: List[_BatchRequest] = []
+        try:
+            while True:
+                batch = await self._next_batch(queue)
+                self._update_queue_depth()
+                await self._run_batch(batch)
+                batch = []
+        except asyncio.CancelledError:
+            pending = batch + list(self._carry_over)
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+            for req in pending:
+                if not req.future.done():
+                    req.future.cancel()
+            raise
+
+    async def _run_batch(self, batch: List[_BatchRequest]):
+        groups: Dict[Optional[str], List[_BatchRequest]] = {}
+        for req in batch:
+            groups.setdefault(req.group_key, []).append(req)
+        num_texts = sum(len(req.texts) for req in batch)
+        self._record_batch(num_texts)
+        logger.debug(
+            f"Run batch with {len(batch)} requests, {num_texts} texts, "
+            f"{len(groups)} groups"
+        )
+        for group_key, requests in groups.items():
+            texts = [text for req in requests for text in req.texts]
+            try:
+                results = await blocking_func_to_async_no_executor(
+                    self._batch_func, group_key, texts
+                )
+                if len(results) != len(texts):
+                    raise ValueError(
+                        f"Batch function returns {len(results)} results for "
+                        f"{len(texts)} texts"
+                    )
+            except Exception as e:
+                for req in requests:
+                    if not req.future.done():
+                        req.future.set_exception(e)
+                continue
+            offset = 0
+            for req in requests:
+                end = offset + len(req.texts)
+                if not req.future.done():
+                    req.future.set_result(results[offset:end])
+                offset = end
+
+    def _record_batch(self, num_texts: int):
+        metrics = self._metrics
+        metrics.total_batches += 1
+        metrics.total_texts += num_texts
+        metrics.last_batch_size = num_texts
+        metrics.max_batch_size = max(metrics.max_batch_size, num_texts)
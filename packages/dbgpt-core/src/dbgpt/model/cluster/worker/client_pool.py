@@ -0,0 +1,159 @@
+"""The pooled HTTP clients to connect the remote model workers.
+
+Every worker address gets a long-lived client, so the TCP(and TLS) connections are
+kept alive and reused by the LLM and embedding calls instead of a new handshake for
+each call.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
+
+class HttpClientPool:
+    """The pool of HTTP clients, one client for each worker address.
+
+    The async clients are bound to the event loop which created them, a new client is
+    created if the pool is used in another event loop.
+
+    Examples:
+        .. code-block:: python
+
+            pool = HttpClientPool(max_connections=100)
+            client = pool.get_async_client("http://127.0.0.1:8001")
+            response = await client.post("/api/worker/generate", json=params)
+            await pool.aclose()
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = 100,
+        max_keepalive_connections: Optional[int] = 20,
+        keepalive_expiry: Optional[float] = 60,
+        http2: bool = False,
+    ):
+        """Create a new HttpClientPool.
+
+        Args:
+            max_connections (Optional[int]): The max number of connections to each
+                worker address, None means no limit.
+            max_keepalive_connections (Optional[int]): The max number of idle
+                connections kept alive for each worker address.
+            keepalive_expiry (Optional[float]): The seconds an idle connection is
+                kept alive.
+            http2 (bool): Whether to use HTTP/2, it requires the ``h2`` package,
+                falls back to HTTP/1.1 keep-alive if not installed.
+        """
+        if http2 and not _h2_available():
+            logger.warning(
+                "HTTP/2 is enabled but the h2 package is not installed, fall back to "
+                "HTTP/1.1, you can install it by `pip install httpx[http2]`"
+            )
+            http2 = False
+        self._max_connections = max_connections
+        self._max_keepalive_connections = max_keepalive_connections
+        self._keepalive_expiry = keepalive_expiry
+        self._http2 = http2
+        self._async_clients: Dict[
+            str, Tuple[asyncio.AbstractEventLoop, "httpx.AsyncClient"]
+        ] = {}
+        self._clients: Dict[str, "httpx.Client"] = {}
+        self._lock = threading.Lock()
+
+    def _limits(self) -> "httpx.Limits":
+        import httpx
+
+        return httpx.Limits(
+            max_connections=self._max_connections,
+            max_keepalive_connections=self._max_keepalive_connections,
+            keepalive_expiry=self._keepalive_expiry,
+        )
+
+    def get_async_client(self, base_url: str) -> "httpx.AsyncClient":
+        """Get the async client of the worker address in the current event loop.
+
+        Args:
+            base_url (str): The worker address, e.g. ``http://127.0.0.1:8001``.
+
+        Returns:
+            httpx.AsyncClient: The pooled async client.
+        """
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            cached = self._async_clients.get(base_url)
+            if cached:
+                client_loop, client = cached
+                if client_loop is loop and not client.is_closed:
+                    return client
+            client = httpx.AsyncClient(limits=self._limits(), http2=self._http2)
+            self._async_clients[base_url] = (loop, client)
+            return client
+
+    def get_client(self, base_url: str) -> "httpx.Client":
+        """Get the sync client of the worker address.
+
+        Args:
+            base_url (str): The worker address, e.g. ``http://127.0.0.1:8001``.
+
+        Returns:
+            httpx.Client: The pooled sync client.
+        """
+        import httpx
+
+        with self._lock:
+            client = self._clients.get(base_url)
+            if client is None or client.is_closed:
+                client = httpx.Client(limits=self._limits(), http2=self._http2)
+                self._clients[base_url] = client
+            return client
+
+    def close(self):
+        """Close the sync clients and drop all the async clients.
+
+        The async clients should be closed with :meth:`aclose` in their event loop,
+        here they are only removed from the pool.
+        """
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._async_clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Close http client failed: {e}")
+
+    async def aclose(self):
+        """Close all the clients of the pool."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            async_clients = list(self._async_clients.values())
+            self._async_clients.clear()
+        for client_loop, client in async_clients:
+            if client_loop is not loop:
+                # The connections are bound to another event loop, close them there
+                if not client_loop.is_closed():
+                    asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+                continue
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Close async http client failed: {e}")
+        self.close()
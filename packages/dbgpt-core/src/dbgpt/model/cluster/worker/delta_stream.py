@@ -0,0 +1,156 @@
+"""The delta streaming protocol between the model workers and their clients.
+
+The model workers stream the cumulative output on each step, the text of a step
+contains all the text of the previous steps. In the delta mode, the worker only sends
+the new text appended to each content since the last frame, and the client rebuilds
+the cumulative output, so the bytes sent and the JSON parsed grow linearly with the
+answer length.
+
+A frame is a dict of the output(``dataclasses.asdict(ModelOutput)``), there are two
+kinds of frames:
+
+1. Full frame: the whole output, the same as the non-delta mode. It is sent as the
+   first frame and whenever the output can't be expressed as appends(e.g. a new
+   content is added, or the text is rewritten).
+2. Delta frame: ``{"delta": true, "appends": [...], ...}``, ``appends`` has the new
+   text of each content, and only the other fields changed since the last frame are
+   included.
+"""
+
+from typing import Any, Dict, List, Optional
+
+DELTA_FIELD = "delta"
+_APPENDS_FIELD = "appends"
+_CONTENT_FIELD = "content"
+_MISSING = object()
+
+
+def _as_list(content: Any) -> List[Dict[str, Any]]:
+    return content if isinstance(content, list) else [content]
+
+
+def _text_data(content: Any) -> Optional[str]:
+    """Return the data of the content if it is a text data."""
+    if not isinstance(content, dict):
+        return None
+    obj = content.get("object")
+    if not isinstance(obj, dict):
+        return None
+    data = obj.get("data")
+    return data if isinstance(data, str) else None
+
+
+class DeltaStreamEncoder:
+    """Encode the cumulative outputs of one stream into frames.
+
+    Examples:
+        .. code-block:: python
+
+            encoder = DeltaStreamEncoder()
+            async for output in worker.async_generate_stream(params):
+                yield json.dumps(encoder.encode(asdict(output))).encode() + b"\\0"
+    """
+
+    def __init__(self):
+        self._last_content: Any = None
+        self._last_fields: Optional[Dict[str, Any]] = None
+
+    def encode(self, output: Dict[str, Any]) -> Dict[str, Any]:
+        """Encode the output dict into a frame.
+
+        Args:
+            output (Dict[str, Any]): The cumulative output dict.
+
+        Returns:
+            Dict[str, Any]: The full frame or the delta frame.
+        """
+        content = output.get(_CONTENT_FIELD)
+        fields = {k: v for k, v in output.items() if k != _CONTENT_FIELD}
+        appends = self._diff(content)
+        if appends is None or self._last_fields is None:
+            frame = dict(output)
+        else:
+            frame = {DELTA_FIELD: True, _APPENDS_FIELD: appends}
+            for k, v in fields.items():
+                if self._last_fields.get(k, _MISSING) != v:
+                    frame[k] = v
+        self._last_content = content
+        self._last_fields = fields
+        return frame
+
+    def _diff(self, content: Any) -> Optional[List[str]]:
+        """Return the appended text of each content, None if not only appends."""
+        last = self._last_content
+        if last is None or isinstance(last, list) != isinstance(content, list):
+            return None
+        last_list, new_list = _as_list(last), _as_list(content)
+        if len(last_list) != len(new_list):
+            return None
+        appends = []
+        for old, new in zip(last_list, new_list):
+            old_data, new_data = _text_data(old), _text_data(new)
+            if (
+                old_data is None
+                or new_data is None
+                or old.get("type") != new.get("type")
+                or old["object"].get("format") != new["object"].get("format")
+                or not new_data.startswith(old_data)
+            ):
+                return None
+            appends.append(new_data[len(old_data) :])
+        return appends
+
+
+class DeltaStreamDecoder:
+    """Rebuild the cumulative outputs from the frames of one stream.
+
+    The full frames are returned as they are, so the decoder also works with the
+    workers which don't support the delta mode.
+
+    Examples:
+        .. code-block:: python
+
+            decoder = DeltaStreamDecoder()
+            for chunk in chunks:
+                yield ModelOutput(**decoder.decode(json.loads(chunk)))
+    """
+
+    def __init__(self):
+        self._last: Optional[Dict[str, Any]] = None
+
+    def decode(self, frame: Dict[str, Any]) -> Dict[str, Any]:
+        """Decode a frame into the cumulative output dict.
+
+        Raises:
+            ValueError: If a delta frame doesn't match the last output.
+        """
+        if not frame.get(DELTA_FIELD):
+            self._last = frame
+            return frame
+        if self._last is None:
+            raise ValueError("Received a delta frame before any full frame")
+        content = self._last[_CONTENT_FIELD]
+        contents = _as_list(content)
+        appends = frame.get(_APPENDS_FIELD) or []
+        if len(appends) != len(contents):
+            raise ValueError(
+                f"The delta frame has {len(appends)} appends for {len(contents)} "
+                "contents"
+            )
+        new_contents = []
+        for c, append in zip(contents, appends):
+            if append:
+                c = {
+                    **c,
+                    "object": {**c["object"], "data": c["object"]["data"] + append},
+                }
+            new_contents.append(c)
+        output = dict(self._last)
+        for k, v in frame.items():
+            if k not in (DELTA_FIELD, _APPENDS_FIELD):
+                output[k] = v
+        output[_CONTENT_FIELD] = (
+            new_contents if isinstance(content, list) else new_contents[0]
+        )
+        self._last = output
+        return output
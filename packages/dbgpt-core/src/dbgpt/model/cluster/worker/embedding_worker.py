@@ -9,6 +9,7 @@ from dbgpt.core.interface.parameter import (
     RerankerDeployModelParameters,
 )
 from dbgpt.model.adapter.base import EmbeddingModelAdapter, get_embedding_adapter
+from dbgpt.model.cluster.worker.batch_scheduler import BatchScheduler
 from dbgpt.model.cluster.worker_base import ModelWorker
 from dbgpt.model.parameter import (
     WorkerType,
@@ -36,6 +37,7 @@ class EmbeddingsModelWorker(ModelWorker):
         self.model_path: str = ""
         self._rerank_model = rerank_model
         self._device = get_device()
+        self._batch_scheduler: Optional[BatchScheduler] = None
 
     def load_worker(
         self,
@@ -82,11 +84,26 @@ class EmbeddingsModelWorker(ModelWorker):
         else:
             logger.info(f"Load embeddings model: {self.model_name}")
             self._embeddings_impl = self._adapter.load_from_params(self._model_params)
+        max_batch_size = self._model_params.max_batch_size
+        if max_batch_size and max_batch_size > 0:
+            max_wait_ms = self._model_params.max_batch_wait_ms
+            logger.info(
+                f"Enable micro-batching for {self.model_name}, max_batch_size: "
+                f"{max_batch_size}, max_batch_wait_ms: {max_wait_ms}"
+            )
+            self._batch_scheduler = BatchScheduler(
+                self._run_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms if max_wait_ms is not None else 5,
+            )
 
     def __del__(self):
         self.stop()
 
     def stop(self) -> None:
+        if self._batch_scheduler:
+            self._batch_scheduler.close()
+            self._batch_scheduler = None
         if not self._embeddings_impl:
             return
         del self._embeddings_impl
@@ -109,6 +126,30 @@ class EmbeddingsModelWorker(ModelWorker):
             "Not supported get_model_metadata for embeddings model"
         )
 
+    def support_async(self) -> bool:
+        # Requests go through the batch scheduler in async mode
+        return self._batch_scheduler is not None
+
+    def batch_metrics(self) -> Optional[Dict]:
+        """Return the metrics of the batch scheduler, None if batching disabled."""
+        if not self._batch_scheduler:
+            return None
+        return self._batch_scheduler.metrics.to_dict()
+
+    async def async_embeddings(self, params: Dict) -> List[List[float]]:
+        if not self._batch_scheduler:
+            raise ValueError("Batching is not enabled")
+        textx: List[str] = params["input"]
+        if isinstance(self._embeddings_impl, RerankEmbeddings):
+            scores = await self._batch_scheduler.submit(textx, params["query"])
+            return [scores]
+        return await self._batch_scheduler.submit(textx)
+
+    def _run_batch(self, query: Optional[str], texts: List[str]) -> List:
+        if isinstance(self._embeddings_impl, RerankEmbeddings):
+            return self._embeddings_impl.predict(query, texts)
+        return self._embeddings_impl.embed_documents(texts)
+
     def embeddings(self, params: Dict) -> List[List[float]]:
         model = params.get("model")
         logger.info(f"Receive embeddings request, model: {model}")
@@ -3,11 +3,12 @@ import itertools
 import json
 import logging
 import os
-import random
 import sys
 import time
 import traceback
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from dataclasses import asdict
 from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
 
@@ -35,6 +36,7 @@ from dbgpt.model.cluster.base import (
     WorkerApplyType,
     WorkerStartupRequest,
 )
+from dbgpt.model.cluster.load_balance import SelectCandidate, SelectorRegistry
 from dbgpt.model.cluster.manager_base import (
     WorkerManager,
     WorkerManagerFactory,
@@ -120,6 +122,10 @@ class LocalWorkerManager(WorkerManager):
         self.port = port
         self.model_storage = model_storage
         self.start_listeners = []
+        # The selection strategies of the models and the outstanding requests of the
+        # instances, used to select one instance for each request
+        self._selectors = SelectorRegistry()
+        self._outstanding: Dict[str, int] = defaultdict(int)
 
         self.run_data = WorkerRunData(
             host=self.host,
@@ -250,7 +256,12 @@ class LocalWorkerManager(WorkerManager):
             stop_event=asyncio.Event(),
             semaphore=asyncio.Semaphore(concurrency),
             command_args=command_args,
+            max_concurrency=concurrency,
         )
+        if deploy_model_params.selection_strategy:
+            self._selectors.set_strategy(
+                worker_key, deploy_model_params.selection_strategy
+            )
         instances = self.workers.get(worker_key)
         if not instances:
             instances = [worker_run_data]
@@ -410,8 +421,60 @@ class LocalWorkerManager(WorkerManager):
                 f"Cound not found worker instances for model name {model_name} and "
                 f"worker type {worker_type}"
             )
-        worker_run_data = random.choice(worker_instances)
-        return worker_run_data
+        if len(worker_instances) == 1:
+            return worker_instances[0]
+        worker_key = self._worker_key(worker_type, model_name)
+        candidates = [
+            SelectCandidate(
+                instance=ins,
+                key=f"{ins.host}:{ins.port}",
+                weight=ins.weight or 1.0,
+                outstanding=max(
+                    self.outstanding_requests(ins), ins.reported_outstanding or 0
+                ),
+                capacity=ins.max_concurrency,
+            )
+            for ins in worker_instances
+        ]
+        return self._selectors.select(worker_key, candidates).instance
+
+    def set_selection_strategy(
+        self, worker_type: str, model_name: str, strategy: Optional[str]
+    ) -> None:
+        """Set the strategy to select one instance of the model.
+
+        Args:
+            worker_type (str): The worker type.
+            model_name (str): The model name.
+            strategy (Optional[str]): The strategy name, e.g. ``least_outstanding``,
+                reset to random if None.
+        """
+        self._selectors.set_strategy(
+            self._worker_key(worker_type, model_name), strategy
+        )
+
+    def outstanding_requests(self, worker_run_data: WorkerRunData) -> int:
+        """Return the number of the requests running or waiting on the instance."""
+        return self._outstanding.get(self._instance_key(worker_run_data), 0)
+
+    def _instance_key(self, worker_run_data: WorkerRunData) -> str:
+        return (
+            f"{worker_run_data.worker_key}@{worker_run_data.host}:"
+            f"{worker_run_data.port}"
+        )
+
+    @asynccontextmanager
+    async def _acquire(self, worker_run_data: WorkerRunData):
+        """Acquire the semaphore of the instance and count the outstanding request."""
+        key = self._instance_key(worker_run_data)
+        self._outstanding[key] += 1
+        try:
+            async with worker_run_data.semaphore:
+                yield
+        finally:
+            self._outstanding[key] -= 1
+            if self._outstanding[key] <= 0:
+                del self._outstanding[key]
 
     async def select_one_instance(
         self, worker_type: str, model_name: str, healthy_only: bool = True
@@ -457,7 +520,7 @@ class LocalWorkerManager(WorkerManager):
                     error_code=1,
                 )
                 return
-            async with worker_run_data.semaphore:
+            async with self._acquire(worker_run_data):
                 if worker_run_data.worker.support_async():
                     async for outout in worker_run_data.worker.async_generate_stream(
                         params
@@ -486,7 +549,7 @@ class LocalWorkerManager(WorkerManager):
                     text=f"**LLMServer Generate Error, Please CheckErrorInfo.**: {e}",
                     error_code=1,
                 )
-            async with worker_run_data.semaphore:
+            async with self._acquire(worker_run_data):
                 if worker_run_data.worker.support_async():
                     return await worker_run_data.worker.async_generate(params)
                 else:
@@ -505,7 +568,7 @@ class LocalWorkerManager(WorkerManager):
                 worker_run_data = await self._get_model(params, worker_type=worker_type)
             except Exception as e:
                 raise e
-            async with worker_run_data.semaphore:
+            async with self._acquire(worker_run_data):
                 if worker_run_data.worker.support_async():
                     return await worker_run_data.worker.async_embeddings(params)
                 else:
@@ -529,7 +592,7 @@ class LocalWorkerManager(WorkerManager):
             except Exception as e:
                 raise e
             prompt = params.get("prompt")
-            async with worker_run_data.semaphore:
+            async with self._acquire(worker_run_data):
                 if worker_run_data.worker.support_async():
                     return await worker_run_data.worker.async_count_token(prompt)
                 else:
@@ -547,7 +610,7 @@ class LocalWorkerManager(WorkerManager):
                 worker_run_data = await self._get_model(params)
             except Exception as e:
                 raise e
-            async with worker_run_data.semaphore:
+            async with self._acquire(worker_run_data):
                 if worker_run_data.worker.support_async():
                     return await worker_run_data.worker.async_get_model_metadata(params)
                 else:
@@ -867,13 +930,19 @@ worker_manager = WorkerManagerAdapter()
 router = APIRouter()
 
 
-async def generate_json_stream(params):
+async def generate_json_stream(params, delta_stream: bool = False):
     from starlette.concurrency import iterate_in_threadpool
 
+    from dbgpt.model.cluster.worker.delta_stream import DeltaStreamEncoder
+
+    encoder = DeltaStreamEncoder() if delta_stream else None
     async for output in worker_manager.generate_stream(
         params, async_wrapper=iterate_in_threadpool
     ):
-        yield json.dumps(asdict(output), ensure_ascii=False).encode() + b"\0"
+        data = asdict(output)
+        if encoder:
+            data = encoder.encode(data)
+        yield json.dumps(data, ensure_ascii=False).encode() + b"\0"
 
 
 @router.post("/worker/generate_stream")
@@ -882,7 +951,8 @@ async def api_generate_stream(request: PromptRequest):
     span_id = root_tracer.get_current_span_id()
     if "span_id" not in params and span_id:
         params["span_id"] = span_id
-    generator = generate_json_stream(params)
+    delta_stream = bool(params.pop("delta_stream", False))
+    generator = generate_json_stream(params, delta_stream=delta_stream)
     return StreamingResponse(generator)
 
 
@@ -1090,11 +1160,17 @@ def _create_local_model_manager(
 
         async def send_heartbeat_func(worker_run_data: WorkerRunData):
             instance = ModelInstance(
-                model_name=worker_run_data.worker_key, host=register_host, port=port
+                model_name=worker_run_data.worker_key,
+                host=register_host,
+                port=port,
+                # Load hints for the load-aware selection
+                outstanding_requests=manager.outstanding_requests(worker_run_data),
+                max_concurrency=worker_run_data.max_concurrency,
+                batch_metrics=worker_run_data.worker.batch_metrics(),
             )
             return await client.send_heartbeat(instance)
 
-        return LocalWorkerManager(
+        manager = LocalWorkerManager(
             register_func=register_func,
             deregister_func=deregister_func,
             send_heartbeat_func=send_heartbeat_func,
@@ -1102,6 +1178,7 @@ def _create_local_model_manager(
             port=port,
             model_storage=model_storage,
         )
+        return manager
 
 
 def _build_worker(
@@ -1266,6 +1343,7 @@ def initialize_worker_manager_in_client(
             ModelRegistryClient,
             initialize_controller,
         )
+        from dbgpt.model.cluster.worker.client_pool import HttpClientPool
         from dbgpt.model.cluster.worker.remote_manager import RemoteWorkerManager
 
         if model_storage:
@@ -1275,7 +1353,28 @@ def initialize_worker_manager_in_client(
             raise ValueError("Controller can`t be None")
         logger.info(f"Worker params: {worker_params}")
         client = ModelRegistryClient(worker_params.controller_addr)
-        worker_manager.worker_manager = RemoteWorkerManager(client)
+        client_pool = HttpClientPool(
+            max_connections=worker_params.remote_max_connections,
+            max_keepalive_connections=worker_params.remote_max_keepalive_connections,
+            keepalive_expiry=worker_params.remote_keepalive_expiry,
+            http2=bool(worker_params.remote_http2),
+        )
+        remote_manager = RemoteWorkerManager(
+            client, client_pool, delta_stream=bool(worker_params.remote_delta_stream)
+        )
+        for worker_type, deploy_configs in [
+            (WorkerType.LLM.value, models_config.llms),
+            (WorkerType.TEXT2VEC.value, models_config.embeddings),
+            (WorkerType.RERANKER.value, models_config.rerankers),
+        ]:
+            for deploy_config in deploy_configs or []:
+                if deploy_config.selection_strategy:
+                    remote_manager.set_selection_strategy(
+                        worker_type,
+                        deploy_config.name,
+                        deploy_config.selection_strategy,
+                    )
+        worker_manager.worker_manager = remote_manager
         worker_manager.after_start(start_listener)
         initialize_controller(
             app=app,
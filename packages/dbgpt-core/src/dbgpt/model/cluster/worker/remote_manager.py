@@ -1,5 +1,5 @@
 import asyncio
-from typing import Any, Callable, List
+from typing import Any, Callable, List, Optional
 
 from dbgpt.model.base import ModelInstance, WorkerApplyOutput, WorkerSupportedModel
 from dbgpt.model.cluster.base import (
@@ -9,14 +9,24 @@ from dbgpt.model.cluster.base import (
     WorkerStartupRequest,
 )
 from dbgpt.model.cluster.registry import ModelRegistry
+from dbgpt.model.cluster.worker.client_pool import HttpClientPool
 from dbgpt.model.cluster.worker.manager import LocalWorkerManager, WorkerRunData, logger
 from dbgpt.model.cluster.worker.remote_worker import RemoteModelWorker
 from dbgpt.model.parameter import WorkerType
 
 
 class RemoteWorkerManager(LocalWorkerManager):
-    def __init__(self, model_registry: ModelRegistry = None) -> None:
+    def __init__(
+        self,
+        model_registry: ModelRegistry = None,
+        client_pool: Optional[HttpClientPool] = None,
+        delta_stream: bool = False,
+    ) -> None:
         super().__init__(model_registry=model_registry)
+        self._delta_stream = delta_stream
+        # The HTTP clients shared by all the remote workers, keep the connections to
+        # each worker address alive across the calls.
+        self._client_pool = client_pool or HttpClientPool()
 
     async def start(self):
         for listener in self.start_listeners:
@@ -26,7 +36,12 @@ class RemoteWorkerManager(LocalWorkerManager):
                 listener(self)
 
     async def stop(self, ignore_exception: bool = False):
-        pass
+        try:
+            await self._client_pool.aclose()
+        except Exception as e:
+            if not ignore_exception:
+                raise e
+            logger.warning(f"Close the http client pool failed: {e}")
 
     async def _fetch_from_worker(
         self,
@@ -39,33 +54,31 @@ class RemoteWorkerManager(LocalWorkerManager):
         success_handler: Callable = None,
         error_handler: Callable = None,
     ) -> Any:
-        # Lazy import to avoid high time cost
-        import httpx
-
-        url = worker_run_data.worker.worker_addr + endpoint
-        headers = {**worker_run_data.worker.headers, **(additional_headers or {})}
-        timeout = worker_run_data.worker.timeout
-
-        async with httpx.AsyncClient() as client:
-            request = client.build_request(
-                method,
-                url,
-                json=json,  # using json for data to ensure it sends as application/json
-                params=params,
-                headers=headers,
-                timeout=timeout,
-            )
+        worker = worker_run_data.worker
+        url = worker.worker_addr + endpoint
+        headers = {**worker.headers, **(additional_headers or {})}
+        timeout = worker.timeout
+
+        client = self._client_pool.get_async_client(worker.base_url)
+        request = client.build_request(
+            method,
+            url,
+            json=json,  # using json for data to ensure it sends as application/json
+            params=params,
+            headers=headers,
+            timeout=timeout,
+        )
 
-            response = await client.send(request)
-            if response.status_code != 200:
-                if error_handler:
-                    return error_handler(response)
-                else:
-                    error_msg = f"Request to {url} failed, error: {response.text}"
-                    raise Exception(error_msg)
-            if success_handler:
-                return success_handler(response)
-            return response.json()
+        response = await client.send(request)
+        if response.status_code != 200:
+            if error_handler:
+                return error_handler(response)
+            else:
+                error_msg = f"Request to {url} failed, error: {response.text}"
+                raise Exception(error_msg)
+        if success_handler:
+            return success_handler(response)
+        return response.json()
 
     async def _apply_to_worker_manager_instances(self):
         pass
@@ -146,7 +159,9 @@ class RemoteWorkerManager(LocalWorkerManager):
         return worker_instances
 
     def _build_single_worker_instance(self, model_name: str, instance: ModelInstance):
-        worker = RemoteModelWorker()
+        worker = RemoteModelWorker(
+            client_pool=self._client_pool, delta_stream=self._delta_stream
+        )
         worker.load_worker(model_name, host=instance.host, port=instance.port)
         wr = WorkerRunData(
             host=instance.host,
@@ -158,6 +173,9 @@ class RemoteWorkerManager(LocalWorkerManager):
             model_params=None,
             stop_event=asyncio.Event(),
             semaphore=asyncio.Semaphore(100),  # Not limit in client
+            weight=instance.weight,
+            max_concurrency=instance.max_concurrency,
+            reported_outstanding=instance.outstanding_requests,
         )
         return wr
 
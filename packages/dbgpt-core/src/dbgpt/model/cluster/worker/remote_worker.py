@@ -1,8 +1,10 @@
 import json
 import logging
-from typing import Dict, Iterator, List
+from typing import Dict, Iterator, List, Optional
 
 from dbgpt.core import ModelMetadata, ModelOutput
+from dbgpt.model.cluster.worker.client_pool import HttpClientPool
+from dbgpt.model.cluster.worker.delta_stream import DeltaStreamDecoder
 from dbgpt.model.cluster.worker_base import ModelWorker
 from dbgpt.util.tracer import DBGPT_TRACER_SPAN_ID, root_tracer
 
@@ -10,16 +12,34 @@ logger = logging.getLogger(__name__)
 
 
 class RemoteModelWorker(ModelWorker):
-    def __init__(self) -> None:
+    def __init__(
+        self, client_pool: Optional[HttpClientPool] = None, delta_stream: bool = False
+    ) -> None:
+        """Create a new RemoteModelWorker.
+
+        Args:
+            client_pool (Optional[HttpClientPool]): The shared pool of HTTP clients,
+                if not provided, the worker creates its own pool and closes it in
+                ``stop``.
+            delta_stream (bool): Whether to ask the worker to stream only the new
+                text of each step, the cumulative outputs are rebuilt here.
+        """
         self.headers = {}
         # TODO Configured by ModelParameters
         self.timeout = 3600
         self.host = None
         self.port = None
+        self._own_client_pool = client_pool is None
+        self._client_pool = client_pool or HttpClientPool()
+        self.delta_stream = delta_stream
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
 
     @property
     def worker_addr(self) -> str:
-        return f"http://{self.host}:{self.port}/api/worker"
+        return f"{self.base_url}/api/worker"
 
     def support_async(self) -> bool:
         return True
@@ -36,7 +56,9 @@ class RemoteModelWorker(ModelWorker):
         pass
 
     def stop(self) -> None:
-        raise NotImplementedError("Remote model worker not support stop methods")
+        """Close the HTTP clients, the shared pool is closed by its owner"""
+        if self._own_client_pool:
+            self._client_pool.close()
 
     def generate_stream(self, params: Dict) -> Iterator[ModelOutput]:
         """Generate stream"""
@@ -44,29 +66,32 @@ class RemoteModelWorker(ModelWorker):
 
     async def async_generate_stream(self, params: Dict) -> Iterator[ModelOutput]:
         """Asynchronous generate stream"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            delimiter = b"\0"
-            buffer = b""
-            url = self.worker_addr + "/generate_stream"
-            logger.debug(f"Send async_generate_stream to url {url}, params: {params}")
-            async with client.stream(
-                "POST",
-                url,
-                headers=self._get_trace_headers(),
-                json=params,
-                timeout=self.timeout,
-            ) as response:
-                async for raw_chunk in response.aiter_raw():
-                    buffer += raw_chunk
-                    while delimiter in buffer:
-                        chunk, buffer = buffer.split(delimiter, 1)
-                        if not chunk:
-                            continue
-                        chunk = chunk.decode()
-                        data = json.loads(chunk)
-                        yield ModelOutput(**data)
+        client = self._client_pool.get_async_client(self.base_url)
+        delimiter = b"\0"
+        buffer = b""
+        url = self.worker_addr + "/generate_stream"
+        logger.debug(f"Send async_generate_stream to url {url}, params: {params}")
+        # Workers without the delta mode ignore it and send the full outputs, the
+        # decoder passes them through.
+        decoder = DeltaStreamDecoder()
+        if self.delta_stream:
+            params = {**params, "delta_stream": True}
+        async with client.stream(
+            "POST",
+            url,
+            headers=self._get_trace_headers(),
+            json=params,
+            timeout=self.timeout,
+        ) as response:
+            async for raw_chunk in response.aiter_raw():
+                buffer += raw_chunk
+                while delimiter in buffer:
+                    chunk, buffer = buffer.split(delimiter, 1)
+                    if not chunk:
+                        continue
+                    chunk = chunk.decode()
+                    data = decoder.decode(json.loads(chunk))
+                    yield ModelOutput(**data)
 
     def generate(self, params: Dict) -> ModelOutput:
         """Generate non stream"""
@@ -74,58 +99,50 @@ class RemoteModelWorker(ModelWorker):
 
     async def async_generate(self, params: Dict) -> ModelOutput:
         """Asynchronous generate non stream"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/generate"
-            logger.debug(f"Send async_generate to url {url}, params: {params}")
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json=params,
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return ModelOutput(**response.json())
+        client = self._client_pool.get_async_client(self.base_url)
+        url = self.worker_addr + "/generate"
+        logger.debug(f"Send async_generate to url {url}, params: {params}")
+        response = await client.post(
+            url,
+            headers=self._get_trace_headers(),
+            json=params,
+            timeout=self.timeout,
+        )
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Request to {url} failed, error: {response.text}")
+        return ModelOutput(**response.json())
 
     def count_token(self, prompt: str) -> int:
         raise NotImplementedError
 
     async def async_count_token(self, prompt: str) -> int:
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/count_token"
-            logger.debug(f"Send async_count_token to url {url}, params: {prompt}")
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json={"prompt": prompt},
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return response.json()
+        client = self._client_pool.get_async_client(self.base_url)
+        url = self.worker_addr + "/count_token"
+        logger.debug(f"Send async_count_token to url {url}, params: {prompt}")
+        response = await client.post(
+            url,
+            headers=self._get_trace_headers(),
+            json={"prompt": prompt},
+            timeout=self.timeout,
+        )
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Request to {url} failed, error: {response.text}")
+        return response.json()
 
     async def async_get_model_metadata(self, params: Dict) -> ModelMetadata:
         """Asynchronously get model metadata"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/model_metadata"
-            logger.debug(
-                f"Send async_get_model_metadata to url {url}, params: {params}"
-            )
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json=params,
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return ModelMetadata.from_dict(response.json())
+        client = self._client_pool.get_async_client(self.base_url)
+        url = self.worker_addr + "/model_metadata"
+        logger.debug(f"Send async_get_model_metadata to url {url}, params: {params}")
+        response = await client.post(
+            url,
+            headers=self._get_trace_headers(),
+            json=params,
+            timeout=self.timeout,
+        )
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Request to {url} failed, error: {response.text}")
+        return ModelMetadata.from_dict(response.json())
 
     def get_model_metadata(self, params: Dict) -> ModelMetadata:
         """Get model metadata"""
@@ -133,11 +150,10 @@ class RemoteModelWorker(ModelWorker):
 
     def embeddings(self, params: Dict) -> List[List[float]]:
         """Get embeddings for input"""
-        import requests
-
+        client = self._client_pool.get_client(self.base_url)
         url = self.worker_addr + "/embeddings"
         logger.debug(f"Send embeddings to url {url}, params: {params}")
-        response = requests.post(
+        response = client.post(
             url,
             headers=self._get_trace_headers(),
             json=params,
@@ -149,20 +165,18 @@ class RemoteModelWorker(ModelWorker):
 
     async def async_embeddings(self, params: Dict) -> List[List[float]]:
         """Asynchronous get embeddings for input"""
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            url = self.worker_addr + "/embeddings"
-            logger.debug(f"Send async_embeddings to url {url}")
-            response = await client.post(
-                url,
-                headers=self._get_trace_headers(),
-                json=params,
-                timeout=self.timeout,
-            )
-            if response.status_code not in [200, 201]:
-                raise Exception(f"Request to {url} failed, error: {response.text}")
-            return response.json()
+        client = self._client_pool.get_async_client(self.base_url)
+        url = self.worker_addr + "/embeddings"
+        logger.debug(f"Send async_embeddings to url {url}")
+        response = await client.post(
+            url,
+            headers=self._get_trace_headers(),
+            json=params,
+            timeout=self.timeout,
+        )
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Request to {url} failed, error: {response.text}")
+        return response.json()
 
     def _get_trace_headers(self):
         span_id = root_tracer.get_current_span_id()
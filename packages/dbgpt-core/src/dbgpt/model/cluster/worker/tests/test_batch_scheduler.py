@@ -0,0 +1,81 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from dbgpt.model.cluster.worker.batch_scheduler import BatchScheduler
+from dbgpt.model.cluster.worker.embedding_worker import EmbeddingsModelWorker
+
+
+class _Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, group_key: Optional[str], texts: List[str]) -> List[str]:
+        self.calls.append((group_key, list(texts)))
+        return [f"{group_key}:{t}" for t in texts]
+
+
+@pytest.mark.asyncio
+async def test_merge_concurrent_requests():
+    recorder = _Recorder()
+    scheduler = BatchScheduler(recorder, max_batch_size=10, max_wait_ms=50)
+    results = await asyncio.gather(
+        *[scheduler.submit([f"t{i}", f"u{i}"]) for i in range(4)]
+    )
+    assert results == [[f"None:t{i}", f"None:u{i}"] for i in range(4)]
+    assert len(recorder.calls) == 1
+    metrics = scheduler.metrics.to_dict()
+    assert metrics["total_requests"] == 4
+    assert metrics["total_batches"] == 1
+    assert metrics["max_batch_size"] == 8
+    scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size():
+    recorder = _Recorder()
+    scheduler = BatchScheduler(recorder, max_batch_size=3, max_wait_ms=50)
+    results = await asyncio.gather(*[scheduler.submit([f"t{i}"]) for i in range(7)])
+    assert results == [[f"None:t{i}"] for i in range(7)]
+    assert [len(texts) for _, texts in recorder.calls] == [3, 3, 1]
+    scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_group_by_key():
+    recorder = _Recorder()
+    scheduler = BatchScheduler(recorder, max_batch_size=10, max_wait_ms=50)
+    results = await asyncio.gather(
+        scheduler.submit(["a"], "q1"),
+        scheduler.submit(["b"], "q2"),
+        scheduler.submit(["c"], "q1"),
+    )
+    assert results == [["q1:a"], ["q2:b"], ["q1:c"]]
+    assert sorted(recorder.calls) == [("q1", ["a", "c"]), ("q2", ["b"])]
+    scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_error():
+    def fail(group_key, texts):
+        raise ValueError("model error")
+
+    scheduler = BatchScheduler(fail, max_batch_size=10, max_wait_ms=10)
+    with pytest.raises(ValueError, match="model error"):
+        await scheduler.submit(["a"])
+    # The scheduler still works after an error
+    with pytest.raises(ValueError, match="model error"):
+        await scheduler.submit(["b"])
+    scheduler.close()
+
+
+def test_worker_batch_metrics():
+    worker = EmbeddingsModelWorker()
+    # Batching disabled
+    assert worker.batch_metrics() is None
+    worker._batch_scheduler = BatchScheduler(lambda query, texts: texts)
+    try:
+        assert worker.batch_metrics()["total_batches"] == 0
+    finally:
+        worker.stop()
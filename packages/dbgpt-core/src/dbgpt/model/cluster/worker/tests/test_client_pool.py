@@ -0,0 +1,59 @@
+import pytest
+
+from dbgpt.model.cluster.worker.client_pool import HttpClientPool
+from dbgpt.model.cluster.worker.remote_worker import RemoteModelWorker
+
+
+@pytest.mark.asyncio
+async def test_async_client_reused_by_address():
+    pool = HttpClientPool(max_connections=10)
+    client1 = pool.get_async_client("http://127.0.0.1:8001")
+    client2 = pool.get_async_client("http://127.0.0.1:8001")
+    client3 = pool.get_async_client("http://127.0.0.1:8002")
+    assert client1 is client2
+    assert client1 is not client3
+
+    await pool.aclose()
+    assert client1.is_closed
+    assert client3.is_closed
+    # A new client is created after the pool is closed
+    assert pool.get_async_client("http://127.0.0.1:8001") is not client1
+    await pool.aclose()
+
+
+def test_sync_client_reused_by_address():
+    pool = HttpClientPool()
+    client1 = pool.get_client("http://127.0.0.1:8001")
+    assert pool.get_client("http://127.0.0.1:8001") is client1
+    pool.close()
+    assert client1.is_closed
+
+
+def test_http2_fallback_without_h2():
+    try:
+        import h2  # noqa: F401
+
+        pytest.skip("h2 is installed")
+    except ImportError:
+        pass
+    pool = HttpClientPool(http2=True)
+    assert not pool._http2
+
+
+@pytest.mark.asyncio
+async def test_remote_workers_share_pool():
+    pool = HttpClientPool()
+    worker1 = RemoteModelWorker(client_pool=pool)
+    worker2 = RemoteModelWorker(client_pool=pool)
+    worker1.load_worker("model", host="127.0.0.1", port=8001)
+    worker2.load_worker("model", host="127.0.0.1", port=8001)
+    assert worker1.worker_addr == "http://127.0.0.1:8001/api/worker"
+    assert pool.get_async_client(worker1.base_url) is pool.get_async_client(
+        worker2.base_url
+    )
+    client = pool.get_client(worker1.base_url)
+    # The shared pool is not closed by the worker
+    worker1.stop()
+    assert not client.is_closed
+    await pool.aclose()
+    assert client.is_closed
@@ -0,0 +1,69 @@
+import json
+from dataclasses import asdict
+
+from dbgpt.core import ModelOutput
+from dbgpt.model.cluster.worker.delta_stream import (
+    DELTA_FIELD,
+    DeltaStreamDecoder,
+    DeltaStreamEncoder,
+)
+
+
+def _round_trip(outputs):
+    encoder = DeltaStreamEncoder()
+    decoder = DeltaStreamDecoder()
+    frames = []
+    results = []
+    for output in outputs:
+        frame = json.loads(json.dumps(encoder.encode(asdict(output))))
+        frames.append(frame)
+        results.append(ModelOutput(**decoder.decode(frame)))
+    return frames, results
+
+
+def test_text_stream():
+    answer = "Hello, this is a long answer."
+    outputs = [ModelOutput.build(answer[:i]) for i in range(1, len(answer) + 1)]
+    outputs[-1].finish_reason = "stop"
+    frames, results = _round_trip(outputs)
+    assert not frames[0].get(DELTA_FIELD)
+    assert all(f[DELTA_FIELD] for f in frames[1:])
+    assert frames[1]["appends"] == ["e"]
+    # Unchanged fields are not sent again
+    assert "error_code" not in frames[1]
+    assert frames[-1]["finish_reason"] == "stop"
+    for output, result in zip(outputs, results):
+        assert result.text == output.text
+        assert result.finish_reason == output.finish_reason
+        assert result.error_code == output.error_code
+
+
+def test_thinking_stream():
+    outputs = [
+        ModelOutput.build(thinking="Let"),
+        ModelOutput.build(thinking="Let me"),
+        ModelOutput.build(text="It", thinking="Let me think"),
+        ModelOutput.build(text="It is", thinking="Let me think"),
+    ]
+    frames, results = _round_trip(outputs)
+    # The content changes from one thinking content to a list, a full frame is sent
+    assert frames[1][DELTA_FIELD]
+    assert not frames[2].get(DELTA_FIELD)
+    assert frames[3]["appends"] == ["", " is"]
+    for output, result in zip(outputs, results):
+        assert result.thinking_text == output.thinking_text
+        if output.has_text:
+            assert result.text == output.text
+
+
+def test_rewritten_text_sends_full_frame():
+    outputs = [ModelOutput.build("abc"), ModelOutput.build("xyz")]
+    frames, results = _round_trip(outputs)
+    assert not frames[1].get(DELTA_FIELD)
+    assert results[1].text == "xyz"
+
+
+def test_decoder_passes_full_frames():
+    decoder = DeltaStreamDecoder()
+    data = asdict(ModelOutput.build("abc"))
+    assert decoder.decode(data) is data
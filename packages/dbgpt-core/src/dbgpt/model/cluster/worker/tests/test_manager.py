@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import asdict
 from typing import List, Tuple
 
@@ -336,6 +337,36 @@ async def test__simple_select(
         assert inst.model_params == worker_params
 
 
+@pytest.mark.asyncio
+async def test__simple_select_least_outstanding():
+    manager = LocalWorkerManager()
+    worker, deploy_params, _ = _create_workers(1)[0]
+    model_name = deploy_params.name
+    worker_type = worker.worker_type().value
+    instances = [
+        WorkerRunData(
+            host="127.0.0.1",
+            port=port,
+            worker_type=worker_type,
+            worker_key=manager._worker_key(worker_type, model_name),
+            worker=worker,
+            worker_params=None,
+            model_params=deploy_params,
+            stop_event=asyncio.Event(),
+            semaphore=asyncio.Semaphore(5),
+            max_concurrency=5,
+        )
+        for port in [8001, 8002]
+    ]
+    manager.set_selection_strategy(worker_type, model_name, "least_outstanding")
+    async with manager._acquire(instances[0]):
+        assert manager.outstanding_requests(instances[0]) == 1
+        for _ in range(5):
+            inst = manager._simple_select(worker_type, model_name, instances)
+            assert inst is instances[1]
+    assert manager.outstanding_requests(instances[0]) == 0
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "is_async",
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Iterator, List, Type
+from typing import Dict, Iterator, List, Optional, Type
 
 from dbgpt.core import ModelMetadata, ModelOutput
 from dbgpt.core.interface.parameter import BaseDeployModelParameters
@@ -26,6 +26,11 @@ class ModelWorker(ABC):
         and async_embeddings instead of generate_stream, generate and embeddings"""
         return False
 
+    def batch_metrics(self) -> Optional[Dict]:
+        """Return the metrics of the request batching, None if the worker does not
+        batch the requests. They are reported to the controller by the heartbeats."""
+        return None
+
     # @abstractmethod
     # def parse_parameters(self, command_args: List[str] = None) -> ModelParameters:
     #     """Parse the parameters using the provided command arguments.
@@ -189,6 +189,48 @@ class ModelWorkerParameters(BaseServerParameters):
         default=20,
         metadata={"help": _("The interval for sending heartbeats (seconds)")},
     )
+    remote_max_connections: Optional[int] = field(
+        default=100,
+        metadata={
+            "help": _(
+                "The max number of HTTP connections to each remote model worker, "
+                "only used when the models are deployed remotely"
+            )
+        },
+    )
+    remote_max_keepalive_connections: Optional[int] = field(
+        default=20,
+        metadata={
+            "help": _(
+                "The max number of idle HTTP connections kept alive to each remote "
+                "model worker"
+            )
+        },
+    )
+    remote_keepalive_expiry: Optional[float] = field(
+        default=60,
+        metadata={
+            "help": _("The seconds an idle HTTP connection to remote workers is kept")
+        },
+    )
+    remote_delta_stream: Optional[bool] = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether the remote model workers stream only the new text of each "
+                "step, it reduces the bandwidth and CPU cost of long answers"
+            )
+        },
+    )
+    remote_http2: Optional[bool] = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to use HTTP/2 to connect the remote model workers, it "
+                "requires the h2 package"
+            )
+        },
+    )
 
 
 @dataclass
@@ -10,6 +10,7 @@ from dbgpt.core import Embeddings, RerankEmbeddings
 from dbgpt.core.awel import DAGVar
 from dbgpt.core.awel.flow import ResourceCategory, register_resource
 from dbgpt.core.interface.parameter import EmbeddingDeployModelParameters
+from dbgpt.storage.cache.embedding_cache import CachedEmbeddings, QueryEmbeddingCache
 from dbgpt.util.i18n_utils import _
 
 logger = logging.getLogger(__name__)
@@ -19,6 +20,8 @@ class EmbeddingFactory(BaseComponent, ABC):
     """Abstract base class for EmbeddingFactory."""
 
     name = "embedding_factory"
+    _query_cache: Optional[QueryEmbeddingCache] = None
+    _document_cache: Optional[QueryEmbeddingCache] = None
 
     @abstractmethod
     def create(
@@ -34,6 +37,21 @@ class EmbeddingFactory(BaseComponent, ABC):
             Embeddings: The embedding instance.
         """
 
+    def _with_query_cache(
+        self, embeddings: Embeddings, model_name: Optional[str] = None
+    ) -> Embeddings:
+        """Cache the query and the document embeddings if the caches are enabled."""
+        if (self._query_cache is None and self._document_cache is None) or isinstance(
+            embeddings, CachedEmbeddings
+        ):
+            return embeddings
+        return CachedEmbeddings(
+            embeddings,
+            model_name or embeddings.__class__.__name__,
+            self._query_cache,
+            self._document_cache,
+        )
+
 
 class RerankEmbeddingFactory(BaseComponent, ABC):
     """Class for RerankEmbeddingFactory."""
@@ -63,6 +81,8 @@ class DefaultEmbeddingFactory(EmbeddingFactory):
         system_app: Optional[SystemApp] = None,
         default_model_name: Optional[str] = None,
         default_model_path: Optional[str] = None,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        document_cache: Optional[QueryEmbeddingCache] = None,
         **kwargs: Any,
     ) -> None:
         """Create a new DefaultEmbeddingFactory."""
@@ -73,8 +93,12 @@ class DefaultEmbeddingFactory(EmbeddingFactory):
             default_model_name = default_model_path
         self._default_model_name = default_model_name
         self._default_model_path = default_model_path
+        self._query_cache = query_cache
+        self._document_cache = document_cache
         self._kwargs = kwargs
-        self._model = self._load_model()
+        self._model = self._with_query_cache(
+            self._load_model(), self._default_model_name
+        )
 
     def init_app(self, system_app):
         """Init the app."""
@@ -215,13 +239,17 @@ class WrappedEmbeddingFactory(EmbeddingFactory):
         self,
         system_app: Optional[SystemApp] = None,
         embeddings: Optional[Embeddings] = None,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        document_cache: Optional[QueryEmbeddingCache] = None,
         **kwargs: Any,
     ) -> None:
         """Create a new DefaultEmbeddingFactory."""
         super().__init__(system_app=system_app)
         if not embeddings:
             raise ValueError("embeddings must be provided.")
-        self._model = embeddings
+        self._query_cache = query_cache
+        self._document_cache = document_cache
+        self._model = self._with_query_cache(embeddings)
 
     def init_app(self, system_app):
         """Init the app."""
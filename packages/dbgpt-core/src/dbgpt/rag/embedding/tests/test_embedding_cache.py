@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+from typing import List
+
+import pytest
+
+from dbgpt.core import Embeddings
+from dbgpt.rag.embedding.embedding_factory import WrappedEmbeddingFactory
+from dbgpt.storage.cache.embedding_cache import (
+    CachedEmbeddings,
+    DocumentEmbeddingCacheParameters,
+    QueryEmbeddingCache,
+)
+
+
+class _CountingEmbeddings(Embeddings):
+    def __init__(self, delay: float = 0.0):
+        self._delay = delay
+        self._lock = threading.Lock()
+        self.query_calls = 0
+        self.embedded_documents: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded_documents.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with self._lock:
+            self.query_calls += 1
+        time.sleep(self._delay)
+        return [float(len(text)), 1.0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        self.query_calls += 1
+        await asyncio.sleep(self._delay)
+        return [float(len(text)), 1.0]
+
+
+def test_factory_caches_query_embeddings():
+    embeddings = _CountingEmbeddings()
+    factory = WrappedEmbeddingFactory(
+        embeddings=embeddings, query_cache=QueryEmbeddingCache()
+    )
+    cached = factory.create()
+    assert isinstance(cached, CachedEmbeddings)
+    assert cached.embed_query("hello") == [5.0, 1.0]
+    assert factory.create().embed_query("hello") == [5.0, 1.0]
+    assert embeddings.query_calls == 1
+    # The documents are not cached
+    assert cached.embed_documents(["a", "bb"]) == [[1.0], [2.0]]
+
+
+def test_cache_key_by_model():
+    cache = QueryEmbeddingCache()
+    embeddings = _CountingEmbeddings()
+    CachedEmbeddings(embeddings, "model1", cache).embed_query("hello")
+    CachedEmbeddings(embeddings, "model2", cache).embed_query("hello")
+    CachedEmbeddings(embeddings, "model1", cache).embed_query("hello")
+    assert embeddings.query_calls == 2
+
+
+def test_lru_and_ttl():
+    embeddings = _CountingEmbeddings()
+    cached = CachedEmbeddings(embeddings, "m", QueryEmbeddingCache(max_size=2))
+    for text in ["a", "b", "a", "c", "a", "b"]:
+        cached.embed_query(text)
+    # "b" is the least recently used when "c" is added
+    assert embeddings.query_calls == 4
+
+    embeddings = _CountingEmbeddings()
+    cached = CachedEmbeddings(embeddings, "m", QueryEmbeddingCache(ttl=0))
+    cached.embed_query("a")
+    cached.embed_query("a")
+    assert embeddings.query_calls == 2
+
+
+def test_single_flight_threads():
+    embeddings = _CountingEmbeddings(delay=0.2)
+    cached = CachedEmbeddings(embeddings, "m", QueryEmbeddingCache())
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cached.embed_query("hello")))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [[5.0, 1.0]] * 5
+    assert embeddings.query_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_async_and_cancel():
+    embeddings = _CountingEmbeddings(delay=0.2)
+    cached = CachedEmbeddings(embeddings, "m", QueryEmbeddingCache())
+    results = await asyncio.gather(*[cached.aembed_query("hello") for _ in range(5)])
+    assert results == [[5.0, 1.0]] * 5
+    assert embeddings.query_calls == 1
+
+    # The waiter computes it again if the request computing it is canceled
+    owner = asyncio.ensure_future(cached.aembed_query("world"))
+    await asyncio.sleep(0.05)
+    waiter = asyncio.ensure_future(cached.aembed_query("world"))
+    await asyncio.sleep(0.05)
+    owner.cancel()
+    assert await waiter == [5.0, 1.0]
+    assert embeddings.query_calls == 3
+
+
+def test_disk_tier(tmp_path):
+    embeddings = _CountingEmbeddings()
+    cached = CachedEmbeddings(
+        embeddings, "m", QueryEmbeddingCache(persist_dir=str(tmp_path))
+    )
+    assert cached.embed_query("hello") == [5.0, 1.0]
+    # A new process reads the embedding from the disk
+    cached = CachedEmbeddings(
+        embeddings, "m", QueryEmbeddingCache(persist_dir=str(tmp_path))
+    )
+    assert cached.embed_query("hello") == [5.0, 1.0]
+    assert embeddings.query_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_document_cache_shared_by_spaces(tmp_path):
+    embeddings = _CountingEmbeddings()
+    document_cache = QueryEmbeddingCache.from_parameters(
+        DocumentEmbeddingCacheParameters(enable=True, persist_dir=str(tmp_path))
+    )
+    factory = WrappedEmbeddingFactory(
+        embeddings=embeddings, document_cache=document_cache
+    )
+    # The embeddings of the two spaces with the same embedding model
+    space1, space2 = factory.create(), factory.create()
+    assert space1.embed_documents(["a", "bb"]) == [[1.0], [2.0]]
+    assert await space2.aembed_documents(["bb", "ccc", "a"]) == [[2.0], [3.0], [1.0]]
+    assert embeddings.embedded_documents == ["a", "bb", "ccc"]
+    # The queries are not cached
+    space1.embed_query("a")
+    space1.embed_query("a")
+    assert embeddings.query_calls == 2
+    # Persisted separately from the query embeddings
+    assert (tmp_path / "document_embedding_cache.db").exists()
+    restored = CachedEmbeddings(
+        embeddings,
+        "_CountingEmbeddings",
+        document_cache=QueryEmbeddingCache(
+            ttl=None, persist_dir=str(tmp_path), name="document_embedding"
+        ),
+    )
+    assert restored.embed_documents(["ccc", "dddd"]) == [[3.0], [4.0]]
+    assert embeddings.embedded_documents[-1:] == ["dddd"]
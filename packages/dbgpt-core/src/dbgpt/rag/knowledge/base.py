@@ -2,7 +2,7 @@
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
 
 from dbgpt.core import Document
 from dbgpt.rag.text_splitter.text_splitter import (
@@ -164,6 +164,14 @@ class Knowledge(ABC):
         documents = self._load()
         return self._postprocess(documents)
 
+    def lazy_load(self) -> Iterator[Document]:
+        """Load knowledge from data loader, one document after another.
+
+        The knowledge which can read its source incrementally should override it, the
+        default implementation loads all the documents first.
+        """
+        yield from self.load()
+
     def extract(
         self,
         documents: List[Document],
@@ -2,6 +2,7 @@
 
 from .base import BaseRetriever, RetrieverStrategy  # noqa: F401
 from .embedding import EmbeddingRetriever  # noqa: F401
+from .hybrid import HybridFusion, HybridRetriever  # noqa: F401
 from .rerank import DefaultRanker, Ranker, RRFRanker  # noqa: F401
 from .rewrite import QueryRewrite  # noqa: F401
 
@@ -9,6 +10,8 @@ __all__ = [
     "RetrieverStrategy",
     "BaseRetriever",
     "EmbeddingRetriever",
+    "HybridRetriever",
+    "HybridFusion",
     "Ranker",
     "DefaultRanker",
     "RRFRanker",
@@ -23,6 +23,7 @@ class EmbeddingRetriever(BaseRetriever):
         query_rewrite: Optional[QueryRewrite] = None,
         rerank: Optional[Ranker] = None,
         retrieve_strategy: Optional[RetrieverStrategy] = RetrieverStrategy.EMBEDDING,
+        concurrency_limit: Optional[int] = None,
     ):
         """Create EmbeddingRetriever.
 
@@ -31,6 +32,9 @@ class EmbeddingRetriever(BaseRetriever):
             top_k (int): top k
             query_rewrite (Optional[QueryRewrite]): query rewrite
             rerank (Ranker): rerank
+            concurrency_limit (Optional[int]): The max number of the queries(the
+                original query and the rewritten queries) searched concurrently, no
+                limit if None.
 
         Examples:
             .. code-block:: python
@@ -70,6 +74,7 @@ class EmbeddingRetriever(BaseRetriever):
         self._index_store = index_store
         self._rerank = rerank or DefaultRanker(self._top_k)
         self._retrieve_strategy = retrieve_strategy
+        self._concurrency_limit = concurrency_limit
 
     def load_document(self, chunks: List[Chunk], **kwargs: Dict[str, Any]) -> List[str]:
         """Load document in vector database.
@@ -139,26 +144,21 @@ class EmbeddingRetriever(BaseRetriever):
         Return:
             List[Chunk]: list of chunks
         """
-        queries = [query]
-        if self._query_rewrite:
-            candidates_tasks = [
-                self._similarity_search(
-                    query, filters, root_tracer.get_current_span_id()
-                )
-                for query in queries
-            ]
-            chunks = await self._run_async_tasks(candidates_tasks)
-            context = "\n".join([chunk.content for chunk in chunks])
-            new_queries = await self._query_rewrite.rewrite(
-                origin_query=query, context=context, nums=1
-            )
-            queries.extend(new_queries)
+        chunks = await self._similarity_search(
+            query, filters, root_tracer.get_current_span_id()
+        )
+        if not self._query_rewrite:
+            return chunks
+        new_queries = await self._rewrite_queries(query, chunks)
+        # The result of the original query is reused, only the rewritten queries
+        # are searched
         candidates = [
-            self._similarity_search(query, filters, root_tracer.get_current_span_id())
-            for query in queries
+            self._similarity_search(
+                new_query, filters, root_tracer.get_current_span_id()
+            )
+            for new_query in new_queries
         ]
-        new_candidates = await run_async_tasks(tasks=candidates, concurrency_limit=1)
-        return new_candidates
+        return chunks + await self._run_async_tasks(candidates)
 
     async def _aretrieve_with_score(
         self,
@@ -175,45 +175,31 @@ class EmbeddingRetriever(BaseRetriever):
         Return:
             List[Chunk]: list of chunks with score
         """
-        queries = [query]
-        if self._query_rewrite:
-            with root_tracer.start_span(
-                "dbgpt.rag.retriever.embeddings.query_rewrite.similarity_search",
-                metadata={"query": query, "score_threshold": score_threshold},
-            ):
-                candidates_tasks = [
-                    self._similarity_search(
-                        query, filters, root_tracer.get_current_span_id()
-                    )
-                    for query in queries
-                ]
-                chunks = await self._run_async_tasks(candidates_tasks)
-                context = "\n".join([chunk.content for chunk in chunks])
-            with root_tracer.start_span(
-                "dbgpt.rag.retriever.embeddings.query_rewrite.rewrite",
-                metadata={"query": query, "context": context, "nums": 1},
-            ):
-                new_queries = await self._query_rewrite.rewrite(
-                    origin_query=query, context=context, nums=1
-                )
-                queries.extend(new_queries)
-
         with root_tracer.start_span(
             "dbgpt.rag.retriever.embeddings.similarity_search_with_score",
             metadata={"query": query, "score_threshold": score_threshold},
         ):
-            candidates_with_score = [
-                self._similarity_search_with_score(
-                    query, score_threshold, filters, root_tracer.get_current_span_id()
-                )
-                for query in queries
-            ]
-            res_candidates_with_score = await run_async_tasks(
-                tasks=candidates_with_score, concurrency_limit=1
-            )
-            new_candidates_with_score = cast(
-                List[Chunk], reduce(lambda x, y: x + y, res_candidates_with_score)
+            new_candidates_with_score = await self._similarity_search_with_score(
+                query, score_threshold, filters, root_tracer.get_current_span_id()
             )
+            if self._query_rewrite:
+                # The result of the original query is the context of the rewrite,
+                # only the rewritten queries are searched again
+                new_queries = await self._rewrite_queries(
+                    query, new_candidates_with_score
+                )
+                candidates_with_score = [
+                    self._similarity_search_with_score(
+                        new_query,
+                        score_threshold,
+                        filters,
+                        root_tracer.get_current_span_id(),
+                    )
+                    for new_query in new_queries
+                ]
+                new_candidates_with_score += await self._run_async_tasks(
+                    candidates_with_score
+                )
 
         with root_tracer.start_span(
             "dbgpt.rag.retriever.embeddings.rerank",
@@ -228,6 +214,17 @@ class EmbeddingRetriever(BaseRetriever):
             )
             return new_candidates_with_score
 
+    async def _rewrite_queries(self, query: str, chunks: List[Chunk]) -> List[str]:
+        """Rewrite the query with the chunks searched by the query as context."""
+        context = "\n".join([chunk.content for chunk in chunks])
+        with root_tracer.start_span(
+            "dbgpt.rag.retriever.embeddings.query_rewrite.rewrite",
+            metadata={"query": query, "context": context, "nums": 1},
+        ):
+            return await self._query_rewrite.rewrite(  # type: ignore
+                origin_query=query, context=context, nums=1
+            )
+
     async def _similarity_search(
         self,
         query,
@@ -245,9 +242,11 @@ class EmbeddingRetriever(BaseRetriever):
             return await self._index_store.asimilar_search(query, self._top_k, filters)
 
     async def _run_async_tasks(self, tasks) -> List[Chunk]:
-        """Run async tasks."""
-        candidates = await run_async_tasks(tasks=tasks, concurrency_limit=1)
-        candidates = reduce(lambda x, y: x + y, candidates)
+        """Run async tasks concurrently, bounded by the concurrency limit."""
+        candidates = await run_async_tasks(
+            tasks=tasks, concurrency_limit=self._concurrency_limit
+        )
+        candidates = reduce(lambda x, y: x + y, candidates, [])
         return cast(List[Chunk], candidates)
 
     async def _similarity_search_with_score(
@@ -0,0 +1,214 @@
+"""Hybrid retriever, the vector search and the keyword search fused together."""
+
+import asyncio
+import logging
+from enum import Enum
+from typing import Dict, List, Optional
+
+from dbgpt.core import Chunk
+from dbgpt.rag.retriever.base import BaseRetriever
+from dbgpt.rag.retriever.rerank import Ranker, RRFRanker
+from dbgpt.storage.base import IndexStoreBase
+from dbgpt.storage.full_text.bm25_index import BM25Index
+from dbgpt.storage.vector_store.filters import MetadataFilters
+from dbgpt.util.executor_utils import blocking_func_to_async_no_executor
+
+logger = logging.getLogger(__name__)
+
+
+class HybridFusion(str, Enum):
+    """How the results of the vector search and the keyword search are fused.
+
+    Args:
+        - RRF: reciprocal rank fusion, only the ranks are used.
+        - WEIGHTED: the weighted sum of the min-max normalized scores.
+    """
+
+    RRF = "rrf"
+    WEIGHTED = "weighted"
+
+
+class HybridRetriever(BaseRetriever):
+    """Hybrid retriever.
+
+    The vector search and the BM25 keyword search run concurrently, their results
+    are fused into one list. The keyword search uses the given BM25 index, or the
+    full text search of the index store if it is supported.
+    """
+
+    def __init__(
+        self,
+        index_store: IndexStoreBase,
+        top_k: int = 4,
+        keyword_index: Optional[BM25Index] = None,
+        fusion: HybridFusion = HybridFusion.RRF,
+        vector_weight: float = 0.5,
+        rrf_k: int = 60,
+        candidates_multiplier: int = 2,
+        rerank: Optional[Ranker] = None,
+    ):
+        """Create HybridRetriever.
+
+        Args:
+            index_store (IndexStoreBase): The vector store.
+            top_k (int): top k
+            keyword_index (Optional[BM25Index]): The BM25 index, the full text search
+                of the index store is used if not set.
+            fusion (HybridFusion): The fusion of the results, rrf or weighted.
+            vector_weight (float): The weight of the vector search in the weighted
+                fusion, the keyword search has the rest.
+            rrf_k (int): The rank constant of the RRF fusion.
+            candidates_multiplier (int): Each search returns top_k times it
+                candidates before the fusion.
+            rerank (Optional[Ranker]): Rerank the fused results.
+        """
+        self._index_store = index_store
+        self._top_k = top_k
+        self._keyword_index = keyword_index
+        self._fusion = HybridFusion(fusion)
+        self._vector_weight = vector_weight
+        self._rrf_k = rrf_k
+        self._num_candidates = top_k * max(1, candidates_multiplier)
+        self._rerank = rerank
+        self._full_text_supported = (
+            keyword_index is not None or index_store.is_support_full_text_search()
+        )
+        if not self._full_text_supported:
+            logger.warning(
+                "No BM25 index and the index store does not support full text "
+                "search, only the vector search is used."
+            )
+
+    def _keyword_search(
+        self, query: str, filters: Optional[MetadataFilters]
+    ) -> List[Chunk]:
+        if self._keyword_index is not None:
+            return self._keyword_index.search(query, self._num_candidates, filters)
+        if self._full_text_supported:
+            return self._index_store.full_text_search(
+                query, self._num_candidates, filters
+            )
+        return []
+
+    async def _akeyword_search(
+        self, query: str, filters: Optional[MetadataFilters]
+    ) -> List[Chunk]:
+        if self._keyword_index is not None:
+            return await blocking_func_to_async_no_executor(
+                self._keyword_index.search, query, self._num_candidates, filters
+            )
+        if self._full_text_supported:
+            return await self._index_store.afull_text_search(
+                query, self._num_candidates, filters
+            )
+        return []
+
+    def _fuse(
+        self, vector_chunks: List[Chunk], keyword_chunks: List[Chunk]
+    ) -> List[Chunk]:
+        if self._fusion == HybridFusion.RRF:
+            return RRFRanker(self._top_k, k=self._rrf_k).fuse(
+                [vector_chunks, keyword_chunks]
+            )
+        scores: Dict[str, float] = {}
+        fused: Dict[str, Chunk] = {}
+        for chunks, weight in (
+            (vector_chunks, self._vector_weight),
+            (keyword_chunks, 1 - self._vector_weight),
+        ):
+            for chunk, score in zip(chunks, _min_max_normalize(chunks)):
+                scores[chunk.content] = scores.get(chunk.content, 0.0) + weight * score
+                fused.setdefault(chunk.content, chunk)
+        for key, chunk in fused.items():
+            chunk.score = scores[key]
+        return sorted(fused.values(), key=lambda x: x.score, reverse=True)[
+            : self._top_k
+        ]
+
+    def _retrieve(
+        self, query: str, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Retrieve knowledge chunks.
+
+        Args:
+            query (str): query text
+            filters: metadata filters.
+        Return:
+            List[Chunk]: list of chunks
+        """
+        return self._retrieve_with_score(query, 0.0, filters)
+
+    def _retrieve_with_score(
+        self,
+        query: str,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        """Retrieve knowledge chunks with score.
+
+        Args:
+            query (str): query text
+            score_threshold (float): score threshold of the vector search, the
+                BM25 scores are not bounded and not filtered.
+            filters: metadata filters.
+        Return:
+            List[Chunk]: list of chunks with the fused score
+        """
+        vector_chunks = self._index_store.similar_search_with_scores(
+            query, self._num_candidates, score_threshold, filters
+        )
+        fused = self._fuse(vector_chunks, self._keyword_search(query, filters))
+        if self._rerank:
+            fused = self._rerank.rank(fused, query)
+        return fused
+
+    async def _aretrieve(
+        self, query: str, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Retrieve knowledge chunks.
+
+        Args:
+            query (str): query text
+            filters: metadata filters.
+        Return:
+            List[Chunk]: list of chunks
+        """
+        return await self._aretrieve_with_score(query, 0.0, filters)
+
+    async def _aretrieve_with_score(
+        self,
+        query: str,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        """Retrieve knowledge chunks with score.
+
+        Args:
+            query (str): query text
+            score_threshold (float): score threshold of the vector search, the
+                BM25 scores are not bounded and not filtered.
+            filters: metadata filters.
+        Return:
+            List[Chunk]: list of chunks with the fused score
+        """
+        vector_chunks, keyword_chunks = await asyncio.gather(
+            self._index_store.asimilar_search_with_scores(
+                query, self._num_candidates, score_threshold, filters
+            ),
+            self._akeyword_search(query, filters),
+        )
+        fused = self._fuse(vector_chunks, keyword_chunks)
+        if self._rerank:
+            fused = await self._rerank.arank(fused, query)
+        return fused
+
+
+def _min_max_normalize(chunks: List[Chunk]) -> List[float]:
+    """Scale the scores of the chunks to [0, 1]."""
+    if not chunks:
+        return []
+    scores = [chunk.score for chunk in chunks]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
@@ -1,7 +1,7 @@
 """Rerank module for RAG retriever."""
 
 from abc import ABC, abstractmethod
-from typing import Callable, List, Optional
+from typing import Callable, Dict, List, Optional
 
 from dbgpt.core import Chunk, RerankEmbeddings
 from dbgpt.core.awel.flow import Parameter, ResourceCategory, register_resource
@@ -147,13 +147,30 @@ class RRFRanker(Ranker):
         self,
         topk: int = 4,
         rank_fn: Optional[RANK_FUNC] = None,
+        k: int = 60,
     ):
-        """RRF rank algorithm implementation."""
+        """RRF rank algorithm implementation.
+
+        Args:
+            topk: int - The number of top k documents.
+            rank_fn: Optional[callable] - The rank function.
+            k: int - The rank constant, a larger k reduces the weight of the top
+                ranked documents of each result set.
+        """
         super().__init__(topk, rank_fn)
+        self.k = k
 
     def rank(
         self, candidates_with_scores: List[Chunk], query: Optional[str] = None
     ) -> List[Chunk]:
+        """Rank a single result set, ordered by the similarity score.
+
+        Use :meth:`fuse` to combine multiple result sets.
+        """
+        candidates = sorted(candidates_with_scores, key=lambda x: x.score, reverse=True)
+        return self.fuse([candidates])
+
+    def fuse(self, results: List[List[Chunk]]) -> List[Chunk]:
         """RRF rank algorithm implementation.
 
         This code implements an algorithm called Reciprocal Rank Fusion (RRF), is a
@@ -169,9 +186,33 @@ class RRFRanker(Ranker):
                 score += 1.0 / ( k + rank( result(q), d ) )
         return score
         reference:https://www.elastic.co/guide/en/elasticsearch/reference/current/rrf.html
+
+        Args:
+            results: List[List[Chunk]] - The result sets, each one is ordered by its
+                own relevance.
+        Return:
+            List[Chunk]: The top k documents, the score is the RRF score
         """
-        # it will be implemented soon when multi recall is implemented
-        return candidates_with_scores
+        scores: Dict[str, float] = {}
+        fused: Dict[str, Chunk] = {}
+        for candidates in results:
+            visited = set()
+            for candidate in candidates:
+                # The same document may be returned by several result sets
+                key = candidate.content
+                if key in visited:
+                    continue
+                visited.add(key)
+                scores[key] = scores.get(key, 0.0) + 1.0 / (self.k + len(visited))
+                fused.setdefault(key, candidate)
+        for key, candidate in fused.items():
+            candidate.score = scores[key]
+        candidates_with_scores = sorted(
+            fused.values(), key=lambda x: x.score, reverse=True
+        )
+        if self.rank_fn is not None:
+            candidates_with_scores = self.rank_fn(candidates_with_scores)
+        return candidates_with_scores[: self.topk]
 
 
 @register_resource(
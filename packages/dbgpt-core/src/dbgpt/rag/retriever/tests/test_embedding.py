@@ -0,0 +1,124 @@
+import asyncio
+from typing import List, Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbgpt.core import Chunk
+from dbgpt.rag.retriever.embedding import EmbeddingRetriever
+from dbgpt.rag.retriever.rerank import RRFRanker
+from dbgpt.storage.base import IndexStoreBase
+from dbgpt.storage.vector_store.base import IndexStoreConfig
+from dbgpt.storage.vector_store.filters import MetadataFilters
+
+
+class _MockIndexStore(IndexStoreBase):
+    def __init__(self):
+        super().__init__()
+        self.queries = []
+        self.running = 0
+        self.max_running = 0
+
+    def get_config(self) -> IndexStoreConfig:
+        return IndexStoreConfig()
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        return []
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:
+        return []
+
+    def similar_search_with_scores(
+        self,
+        text,
+        topk,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        return [Chunk(content=f"{text} result", score=0.9)]
+
+    async def asimilar_search_with_scores(
+        self,
+        query: str,
+        topk: int,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        self.queries.append(query)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return self.similar_search_with_scores(query, topk, score_threshold, filters)
+
+    async def asimilar_search(
+        self, query: str, topk: int, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        return await self.asimilar_search_with_scores(query, topk, 0.0, filters)
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        return []
+
+    def truncate(self) -> List[str]:
+        return []
+
+    def delete_vector_name(self, index_name: str):
+        pass
+
+    def vector_name_exists(self) -> bool:
+        return True
+
+
+def _query_rewrite(new_queries: List[str]):
+    query_rewrite = MagicMock()
+
+    async def _rewrite(origin_query, context, nums):
+        await asyncio.sleep(0.05)
+        return new_queries
+
+    query_rewrite.rewrite = _rewrite
+    return query_rewrite
+
+
+@pytest.mark.asyncio
+async def test_rewritten_queries_searched_concurrently():
+    store = _MockIndexStore()
+    retriever = EmbeddingRetriever(
+        index_store=store,
+        top_k=10,
+        query_rewrite=_query_rewrite(["q1", "q2", "q3"]),
+    )
+    chunks = await retriever.aretrieve_with_scores("q0", 0.0)
+    assert sorted(c.content for c in chunks) == [f"q{i} result" for i in range(4)]
+    assert store.max_running >= 3
+    # The original query is searched once, its result is the rewrite context
+    assert store.queries.count("q0") == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    store = _MockIndexStore()
+    retriever = EmbeddingRetriever(
+        index_store=store,
+        top_k=10,
+        query_rewrite=_query_rewrite(["q1", "q2", "q3"]),
+        concurrency_limit=1,
+    )
+    chunks = await retriever.aretrieve("q0")
+    assert len(chunks) == 4
+    assert store.max_running == 1
+    # The result of the original query is reused after the rewrite
+    assert store.queries.count("q0") == 1
+
+
+def test_rrf_fuse():
+    ranker = RRFRanker(topk=3, k=1)
+    fused = ranker.fuse(
+        [
+            [Chunk(content="a"), Chunk(content="b"), Chunk(content="c")],
+            [Chunk(content="b"), Chunk(content="d")],
+        ]
+    )
+    # b: 1/3 + 1/2, a: 1/2, d: 1/3, c: 1/4
+    assert [c.content for c in fused] == ["b", "a", "d"]
+    assert fused[0].score == pytest.approx(1 / 3 + 1 / 2)
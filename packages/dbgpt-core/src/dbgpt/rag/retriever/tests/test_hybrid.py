@@ -0,0 +1,103 @@
+from typing import List, Optional
+
+import pytest
+
+from dbgpt.core import Chunk
+from dbgpt.rag.retriever.hybrid import HybridRetriever
+from dbgpt.storage.base import IndexStoreBase
+from dbgpt.storage.full_text.bm25_index import BM25Index
+from dbgpt.storage.vector_store.base import IndexStoreConfig
+from dbgpt.storage.vector_store.filters import MetadataFilters
+
+
+class _MockVectorStore(IndexStoreBase):
+    """Return the fixed results of the vector search."""
+
+    def __init__(self, results: List[Chunk]):
+        super().__init__()
+        self._results = results
+
+    def get_config(self) -> IndexStoreConfig:
+        return IndexStoreConfig()
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        return []
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:
+        return []
+
+    def similar_search_with_scores(
+        self,
+        text,
+        topk,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        return [
+            Chunk(content=c.content, score=c.score, chunk_id=c.chunk_id)
+            for c in self._results
+            if c.score >= score_threshold
+        ][:topk]
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        return []
+
+    def truncate(self) -> List[str]:
+        return []
+
+    def delete_vector_name(self, index_name: str):
+        pass
+
+    def vector_name_exists(self) -> bool:
+        return True
+
+
+def _retriever(**kwargs) -> HybridRetriever:
+    vector_store = _MockVectorStore(
+        [
+            Chunk(content="semantic match", score=0.9, chunk_id="s"),
+            Chunk(content="error code E1001 of the connector", score=0.6, chunk_id="e"),
+            Chunk(content="unrelated", score=0.5, chunk_id="u"),
+        ]
+    )
+    index = BM25Index()
+    index.add(
+        [
+            Chunk(content="error code E1001 of the connector", chunk_id="e"),
+            Chunk(content="error code E2002 of the parser", chunk_id="p"),
+            Chunk(content="semantic match", chunk_id="s"),
+        ]
+    )
+    return HybridRetriever(vector_store, top_k=2, keyword_index=index, **kwargs)
+
+
+def test_rrf_fusion():
+    chunks = _retriever().retrieve_with_scores("E1001 error", 0.0)
+    # Found by both searches
+    assert [c.chunk_id for c in chunks] == ["e", "s"]
+
+
+def test_weighted_fusion():
+    chunks = _retriever(fusion="weighted", vector_weight=0.9).retrieve_with_scores(
+        "E1001 error", 0.0
+    )
+    assert chunks[0].chunk_id == "s"
+    chunks = _retriever(fusion="weighted", vector_weight=0.1).retrieve_with_scores(
+        "E1001 error", 0.0
+    )
+    assert chunks[0].chunk_id == "e"
+    assert 0 <= chunks[-1].score <= chunks[0].score <= 1
+
+
+@pytest.mark.asyncio
+async def test_async_retrieve_and_threshold():
+    chunks = await _retriever().aretrieve_with_scores("E2002 parser", 0.8)
+    # The vector search only returns the chunks above the threshold
+    assert {c.chunk_id for c in chunks} == {"s", "p"}
+
+
+def test_vector_search_only():
+    retriever = HybridRetriever(
+        _MockVectorStore([Chunk(content="a", score=0.9)]), top_k=2
+    )
+    assert [c.content for c in retriever.retrieve("a")] == ["a"]
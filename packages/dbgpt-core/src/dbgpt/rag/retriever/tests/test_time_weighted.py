@@ -0,0 +1,199 @@
+import datetime
+from typing import List, Optional
+
+import pytest
+
+from dbgpt.agent.core.memory.long_term import LongTermRetriever
+from dbgpt.core import Chunk
+from dbgpt.rag.retriever.time_weighted import TimeWeightedEmbeddingRetriever
+from dbgpt.storage.base import IndexStoreBase
+from dbgpt.storage.vector_store.base import IndexStoreConfig
+from dbgpt.storage.vector_store.filters import MetadataFilters
+
+_NOW = datetime.datetime(2024, 1, 2, 12, 0, 0)
+
+
+class _MockIndexStore(IndexStoreBase):
+    """Return the loaded chunks whose content contains the query."""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks: List[Chunk] = []
+
+    def get_config(self) -> IndexStoreConfig:
+        return IndexStoreConfig()
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        self.chunks.extend(chunks)
+        return [c.chunk_id for c in chunks]
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:
+        return self.load_document(chunks)
+
+    def similar_search_with_scores(
+        self,
+        text,
+        topk,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        return [
+            Chunk(
+                content=c.content,
+                metadata=dict(c.metadata),
+                score=0.5,
+                chunk_id=c.chunk_id,
+            )
+            for c in self.chunks
+            if text in c.content
+        ][:topk]
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        return []
+
+    def truncate(self) -> List[str]:
+        return []
+
+    def delete_vector_name(self, index_name: str):
+        pass
+
+    def vector_name_exists(self) -> bool:
+        return True
+
+
+class _FullStorage:
+    def __init__(self):
+        self.saved = 0
+
+    def get_all_documents(self) -> List[Chunk]:
+        return []
+
+    def save_documents(self, documents: List[Chunk]) -> bool:
+        self.saved += 1
+        return True
+
+
+class _IncrementalStorage(_FullStorage):
+    def __init__(self):
+        super().__init__()
+        self.updates: List[List[int]] = []
+
+    def update_documents(self, documents: List[Chunk]) -> bool:
+        self.updates.append([d.metadata["buffer_idx"] for d in documents])
+        return True
+
+
+def _load(
+    retriever: TimeWeightedEmbeddingRetriever,
+    n: int,
+    now: Optional[datetime.datetime] = None,
+):
+    now = now or _NOW
+    for i in range(n):
+        retriever.load_document(
+            [Chunk(content=f"memory {i} apple" if i % 2 else f"memory {i}")],
+            current_time=now - datetime.timedelta(hours=n - i),
+        )
+
+
+def test_vectorized_scores_match():
+    retriever = TimeWeightedEmbeddingRetriever(
+        _MockIndexStore(), external_storage=_IncrementalStorage()
+    )
+    retriever.other_score_keys = ["importance"]
+    _load(retriever, 20)
+    retriever.memory_stream[3].metadata["importance"] = 0.7
+    retriever._rebuild_columns()
+    rows = list(range(20))
+    relevances = [0.5 if i % 3 else None for i in rows]
+    import numpy as np
+
+    scores = retriever._score_rows(
+        np.array(rows),
+        np.array([np.nan if r is None else r for r in relevances]),
+        _NOW,
+    )
+    expected = [
+        retriever._get_combined_score(retriever.memory_stream[i], relevances[i], _NOW)
+        for i in rows
+    ]
+    assert scores.tolist() == pytest.approx(expected)
+
+
+def test_access_times_written_in_batches():
+    storage = _IncrementalStorage()
+    retriever = TimeWeightedEmbeddingRetriever(
+        _MockIndexStore(),
+        external_storage=storage,
+        access_flush_size=6,
+        access_flush_interval=3600,
+    )
+    now = datetime.datetime.now()
+    _load(retriever, 10, now)
+    # Each new memory is written alone
+    assert storage.updates == [[i] for i in range(10)]
+    storage.updates.clear()
+
+    chunks = retriever.retrieve("apple")
+    assert len(chunks) == 4
+    # The recent memories are ranked first
+    assert [c.content for c in chunks] == [f"memory {i} apple" for i in (9, 7, 5, 3)]
+    assert all(c.metadata["last_accessed_at"] >= now for c in chunks)
+    # Not written yet
+    assert storage.updates == []
+    retriever.retrieve("memory 1")
+    assert storage.updates and len(storage.updates[0]) >= 5
+    assert storage.saved == 0
+
+    retriever.retrieve("apple")
+    retriever.flush_access_times()
+    assert len(storage.updates) == 2
+    assert storage.saved == 0
+
+
+def test_full_storage_fallback():
+    storage = _FullStorage()
+    retriever = TimeWeightedEmbeddingRetriever(
+        _MockIndexStore(), external_storage=storage, access_flush_size=100
+    )
+    _load(retriever, 4)
+    saved = storage.saved
+    for _ in range(5):
+        retriever.retrieve("apple")
+    # The reads do not rewrite the memory stream
+    assert storage.saved == saved
+    retriever.flush_access_times()
+    assert storage.saved == saved + 1
+
+
+def test_long_term_retriever():
+    store = _MockIndexStore()
+    retriever = LongTermRetriever(
+        now=_NOW, index_store=store, external_storage=_IncrementalStorage()
+    )
+    retriever.load_document(
+        [
+            Chunk(
+                content="old apple",
+                metadata={
+                    "importance": 0.9,
+                    "last_accessed_at": (
+                        _NOW - datetime.timedelta(hours=1)
+                    ).timestamp(),
+                },
+            ),
+            Chunk(content="[FORGET] apple", metadata={"importance": 1.0}),
+            Chunk(content="new apple", metadata={"importance": 0.1}),
+        ],
+        current_time=_NOW,
+    )
+    chunks = retriever.retrieve("apple")
+    # The memory stream is ranked by the recency and the relevance only, the
+    # importance is not a part of the score
+    assert [c.content for c in chunks] == ["new apple", "old apple"]
+    assert chunks[1].metadata["last_accessed_at"] == _NOW
+
+    # Vector store only mode, the importance is added to the score
+    retriever._use_vector_store_only = True
+    chunks = retriever.retrieve("apple")
+    assert [c.content for c in chunks] == ["old apple", "new apple"]
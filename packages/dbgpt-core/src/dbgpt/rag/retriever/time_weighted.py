@@ -2,8 +2,11 @@
 
 import datetime
 import logging
+import time
 from copy import deepcopy
-from typing import Any, Dict, List, Optional, Protocol, Tuple
+from typing import Any, Dict, List, Optional, Protocol, Set, Tuple
+
+import numpy as np
 
 from dbgpt.core import Chunk
 from dbgpt.rag.retriever.rerank import Ranker
@@ -39,13 +42,127 @@ class DocumentStorage(Protocol):
         ...
 
 
+class IncrementalDocumentStorage(DocumentStorage, Protocol):
+    """Protocol for external document storage with incremental updates.
+
+    The new documents and the documents with the updated access time are written
+    by ``update_documents`` instead of rewriting all the documents.
+    """
+
+    def update_documents(self, documents: List[Chunk]) -> bool:
+        """Insert or update the documents, identified by their buffer_idx.
+
+        Args:
+            documents: List of document chunks to insert or update
+
+        Returns:
+            Boolean indicating success
+        """
+        ...
+
+
 def _get_hours_passed(time: datetime.datetime, ref_time: datetime.datetime) -> float:
     """Get the hours passed between two datetime objects."""
     return (time - ref_time).total_seconds() / 3600
 
 
+def _to_timestamp(value: Any) -> float:
+    """Convert the time in the metadata to a timestamp, nan if unknown."""
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return np.nan
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return 0.0
+
+
+class _GrowableArray:
+    """A numpy array with amortized appends."""
+
+    def __init__(self, dtype, fill_value):
+        self._data = np.full(16, fill_value, dtype=dtype)
+        self._fill_value = fill_value
+        self._size = 0
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[: self._size]
+
+    def extend(self, values: List[Any]):
+        end = self._size + len(values)
+        if end > len(self._data):
+            data = np.full(
+                max(end, len(self._data) * 2), self._fill_value, self._data.dtype
+            )
+            data[: self._size] = self._data[: self._size]
+            self._data = data
+        self._data[self._size : end] = values
+        self._size = end
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class _MemoryStreamColumns:
+    """The columns of the memory stream, the row is the buffer index."""
+
+    def __init__(self):
+        self.created_at = _GrowableArray(np.float64, np.nan)
+        self.last_accessed_at = _GrowableArray(np.float64, np.nan)
+        self.excluded = _GrowableArray(bool, False)
+        self._extra: Dict[str, _GrowableArray] = {}
+
+    def __len__(self) -> int:
+        return len(self.created_at)
+
+    def append(self, chunks: List[Chunk], excluded: List[bool]):
+        self.created_at.extend(
+            [_to_timestamp(c.metadata.get("created_at")) for c in chunks]
+        )
+        self.last_accessed_at.extend(
+            [_to_timestamp(c.metadata.get("last_accessed_at")) for c in chunks]
+        )
+        self.excluded.extend(excluded)
+        for key, column in self._extra.items():
+            column.extend([_to_float(c.metadata.get(key)) for c in chunks])
+
+    def extra_scores(self, keys: List[str], memory_stream: List[Chunk]) -> np.ndarray:
+        """Return the sum of the extra scores of all the rows."""
+        scores = np.zeros(len(self), dtype=np.float64)
+        for key in keys:
+            column = self._extra.get(key)
+            if column is None or len(column) != len(self):
+                # Build the column when the key is used for the first time
+                column = _GrowableArray(np.float64, 0.0)
+                column.extend(
+                    [_to_float(c.metadata.get(key)) for c in memory_stream[: len(self)]]
+                )
+                self._extra[key] = column
+            scores += column.values
+        return scores
+
+
 class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
-    """Time weighted embedding retriever with external storage support."""
+    """Time weighted embedding retriever with external storage support.
+
+    The memory stream is also kept in columns(the creation time, the last access
+    time and the extra scores of each buffer index), the candidates are scored
+    together by numpy. The access time updates are written to the external storage
+    in batches.
+    """
 
     def __init__(
         self,
@@ -55,6 +172,8 @@ class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
         rerank: Optional[Ranker] = None,
         decay_rate: float = 0.01,
         external_storage: Optional[DocumentStorage] = None,
+        access_flush_size: int = 64,
+        access_flush_interval: float = 30.0,
     ):
         """Initialize TimeWeightedEmbeddingRetriever.
 
@@ -66,6 +185,10 @@ class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
             decay_rate (float): rate at which relevance decays over time
             external_storage (Optional[DocumentStorage]): external storage for
                 persistence
+            access_flush_size (int): write the access time updates to the external
+                storage when so many documents are updated
+            access_flush_interval (float): write the access time updates to the
+                external storage when so many seconds passed since the last write
         """
         super().__init__(
             index_store=index_store,
@@ -81,15 +204,33 @@ class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
         self._k = 4
         self._external_storage = external_storage
         self._use_vector_store_only = False
+        self._columns = _MemoryStreamColumns()
+        self._access_flush_size = access_flush_size
+        self._access_flush_interval = access_flush_interval
+        # The buffer indices whose access time is not written to the storage
+        self._dirty_rows: Set[int] = set()
+        self._last_flush_time = time.monotonic()
 
         # Initialize memory stream
         self._initialize_memory_stream()
 
+    def _is_excluded(self, chunk: Chunk) -> bool:
+        """Whether the document is never retrieved from the memory stream."""
+        return False
+
+    def _rebuild_columns(self) -> None:
+        self._columns = _MemoryStreamColumns()
+        self._columns.append(
+            self.memory_stream, [self._is_excluded(c) for c in self.memory_stream]
+        )
+        self._dirty_rows.clear()
+
     def _initialize_memory_stream(self) -> None:
         """Initialize memory stream from external storage."""
         if self._external_storage:
             try:
                 self.memory_stream = self._external_storage.get_all_documents()
+                self._rebuild_columns()
                 logger.info(
                     "Loaded memory stream from external storage with "
                     f"{len(self.memory_stream)} documents"
@@ -117,6 +258,46 @@ class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
             except Exception as e:
                 logger.error(f"Error saving documents to external storage: {e}")
 
+    def _write_documents(self, documents: List[Chunk]) -> None:
+        """Write the new or updated documents to the external storage.
+
+        Only the documents are written if the storage supports incremental updates,
+        otherwise the whole memory stream is saved.
+        """
+        if not self._external_storage or not documents:
+            return
+        update_documents = getattr(self._external_storage, "update_documents", None)
+        if update_documents is None:
+            self._save_memory_stream()
+            return
+        try:
+            if not update_documents(documents):
+                logger.warning("Failed to update documents in external storage")
+        except Exception as e:
+            logger.error(f"Error updating documents in external storage: {e}")
+
+    def _take_dirty_documents(self) -> List[Chunk]:
+        documents = [
+            self.memory_stream[row]
+            for row in sorted(self._dirty_rows)
+            if row < len(self.memory_stream)
+        ]
+        self._dirty_rows.clear()
+        self._last_flush_time = time.monotonic()
+        return documents
+
+    def flush_access_times(self) -> None:
+        """Write the pending access time updates to the external storage."""
+        if self._dirty_rows:
+            self._write_documents(self._take_dirty_documents())
+
+    def _maybe_flush_access_times(self) -> None:
+        if len(self._dirty_rows) >= self._access_flush_size or (
+            self._dirty_rows
+            and time.monotonic() - self._last_flush_time >= self._access_flush_interval
+        ):
+            self.flush_access_times()
+
     def load_document(self, chunks: List[Chunk], **kwargs: Dict[str, Any]) -> List[str]:
         """Load document chunks into vector database.
 
@@ -144,13 +325,78 @@ class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
 
         # Add to memory stream
         self.memory_stream.extend(dup_docs)
+        self._columns.append(dup_docs, [self._is_excluded(d) for d in dup_docs])
 
-        # Save memory stream after adding new documents
-        self._save_memory_stream()
+        # Write the new documents with the pending access time updates
+        self._write_documents(self._take_dirty_documents() + dup_docs)
 
         # Add to vector store
         return self._index_store.load_document_with_limit(dup_docs)
 
+    def _time_scores(
+        self, timestamps: np.ndarray, current_time: datetime.datetime
+    ) -> np.ndarray:
+        """Return the decayed scores of the last access times."""
+        hours_passed = (current_time.timestamp() - timestamps) / 3600
+        return np.power(1.0 - self.decay_rate, hours_passed)
+
+    def _score_rows(
+        self,
+        rows: np.ndarray,
+        relevances: np.ndarray,
+        current_time: datetime.datetime,
+    ) -> np.ndarray:
+        """Return the combined scores of the rows of the memory stream.
+
+        The vectorized version of :meth:`_get_combined_score`, the relevance is nan
+        if unknown.
+        """
+        last_accessed = self._columns.last_accessed_at.values[rows]
+        last_accessed = np.where(
+            np.isnan(last_accessed),
+            self._columns.created_at.values[rows],
+            last_accessed,
+        )
+        last_accessed = np.where(
+            np.isnan(last_accessed), current_time.timestamp(), last_accessed
+        )
+        scores = self._time_scores(last_accessed, current_time)
+        if self.other_score_keys:
+            scores += self._columns.extra_scores(
+                self.other_score_keys, self.memory_stream
+            )[rows]
+        return scores + np.nan_to_num(relevances, nan=0.0)
+
+    def _score_chunks(
+        self,
+        chunks: List[Chunk],
+        relevances: np.ndarray,
+        current_time: datetime.datetime,
+    ) -> np.ndarray:
+        """Return the combined scores of the chunks not in the memory stream."""
+        last_accessed = np.array(
+            [_to_timestamp(c.metadata.get("last_accessed_at")) for c in chunks],
+            dtype=np.float64,
+        )
+        created_at = np.array(
+            [_to_timestamp(c.metadata.get("created_at")) for c in chunks],
+            dtype=np.float64,
+        )
+        last_accessed = np.where(np.isnan(last_accessed), created_at, last_accessed)
+        last_accessed = np.where(
+            np.isnan(last_accessed), current_time.timestamp(), last_accessed
+        )
+        scores = self._time_scores(last_accessed, current_time)
+        for key in self.other_score_keys:
+            scores += np.array([_to_float(c.metadata.get(key)) for c in chunks])
+        return scores + np.nan_to_num(relevances, nan=0.0)
+
+    def _candidate_rows(self) -> List[int]:
+        """Return the rows which are always candidates, the most recent ones."""
+        return list(
+            range(max(0, len(self.memory_stream) - self._k), len(self._columns))
+        )
+
     def _retrieve(
         self, query: str, filters: Optional[MetadataFilters] = None
     ) -> List[Chunk]:
@@ -171,68 +417,103 @@ class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
             docs_and_scores = self._index_store.similar_search_with_scores(
                 query, topk=self._top_k, score_threshold=0, filters=filters
             )
+            scores = np.array([doc.score for doc in docs_and_scores], dtype=np.float64)
+            # Apply time weighting to the results with time information, the
+            # others just use the vector similarity
+            timed = np.array(
+                [
+                    "last_accessed_at" in doc.metadata and "created_at" in doc.metadata
+                    for doc in docs_and_scores
+                ],
+                dtype=bool,
+            )
+            if timed.any():
+                scores = np.where(
+                    timed,
+                    self._score_chunks(docs_and_scores, scores, current_time),
+                    scores,
+                )
+            order = np.argsort(-scores, kind="stable")[: self._k]
+            return [docs_and_scores[i] for i in order]
 
-            # Apply time weighting to vector store results
-            rescored_docs = []
-            for doc in docs_and_scores:
-                # Extract time information from metadata
-                if "last_accessed_at" in doc.metadata and "created_at" in doc.metadata:
-                    rescored_docs.append(
-                        (doc, self._get_combined_score(doc, doc.score, current_time))
-                    )
-                else:
-                    # If time info not available, just use vector similarity
-                    rescored_docs.append((doc, doc.score))
-
-            # Sort by combined score
-            rescored_docs.sort(key=lambda x: x[1], reverse=True)
-
-            # Return top k results
-            return [doc for doc, _ in rescored_docs[: self._k]]
-
-        # Normal operation with memory stream
-        # Get the most recent documents
-        docs_and_scores = {}
-        if self.memory_stream:
-            docs_and_scores = {
-                doc.metadata["buffer_idx"]: (doc, self.default_salience)
-                for doc in self.memory_stream[-self._k :]
-                if "buffer_idx" in doc.metadata
-            }
-
-        # If a doc is considered salient, update the salience score
-        docs_and_scores.update(self.get_salient_docs(query, filters))
-
+        result = self._retrieve_from_memory_stream(query, filters, current_time)
         # If no documents found, fall back to vector store query with time weighting
-        if not docs_and_scores:
+        if result is None:
             return self._retrieve_vector_store_only(query, filters, current_time)
+        return result
+
+    def _retrieve_from_memory_stream(
+        self,
+        query: str,
+        filters: Optional[MetadataFilters],
+        current_time: datetime.datetime,
+    ) -> Optional[List[Chunk]]:
+        """Retrieve from the memory stream, None if there is no candidate.
 
-        rescored_docs = [
-            (doc, self._get_combined_score(doc, relevance, current_time))
-            for doc, relevance in docs_and_scores.values()
+        The recent documents and the documents salient to the query are scored
+        together, the access time of the returned documents is updated.
+        """
+        if len(self._columns) != len(self.memory_stream):
+            # The memory stream is replaced
+            self._rebuild_columns()
+        relevance_by_row: Dict[int, Optional[float]] = {
+            row: self.default_salience for row in self._candidate_rows()
+        }
+        # The salient documents not in the memory stream
+        others: List[Tuple[Chunk, float]] = []
+        # If a doc is considered salient, update the salience score
+        for buffer_idx, (doc, relevance) in self.get_salient_docs(
+            query, filters
+        ).items():
+            if 0 <= buffer_idx < len(self._columns):
+                relevance_by_row[buffer_idx] = relevance
+            else:
+                others.append((doc, relevance))
+        if not relevance_by_row and not others:
+            return None
+
+        rows = np.fromiter(relevance_by_row.keys(), dtype=np.int64)
+        relevances = np.array(
+            [np.nan if r is None else r for r in relevance_by_row.values()],
+            dtype=np.float64,
+        )
+        scores = self._score_rows(rows, relevances, current_time)
+        included = ~self._columns.excluded.values[rows]
+        rows, scores = rows[included], scores[included]
+        candidates: List[Tuple[float, Optional[int], Optional[Chunk]]] = [
+            (float(score), int(row), None) for row, score in zip(rows, scores)
         ]
+        others = [(doc, r) for doc, r in others if not self._is_excluded(doc)]
+        if others:
+            other_scores = self._score_chunks(
+                [doc for doc, _ in others],
+                np.array([r for _, r in others], dtype=np.float64),
+                current_time,
+            )
+            candidates.extend(
+                (float(score), None, doc)
+                for score, (doc, _) in zip(other_scores, others)
+            )
+        candidates.sort(key=lambda x: x[0], reverse=True)
 
-        rescored_docs.sort(key=lambda x: x[1], reverse=True)
         result = []
-
+        current_timestamp = current_time.timestamp()
         # Ensure frequently accessed memories aren't forgotten
-        for doc, _ in rescored_docs[: self._k]:
-            if "buffer_idx" in doc.metadata:
-                buffer_idx = doc.metadata["buffer_idx"]
-                if 0 <= buffer_idx < len(self.memory_stream):
-                    buffered_doc = self.memory_stream[buffer_idx]
-                    buffered_doc.metadata["last_accessed_at"] = current_time
-                    result.append(buffered_doc)
-                else:
-                    # If buffer_idx is invalid, still return the document from vector
-                    # store
-                    result.append(doc)
-            else:
+        for _, row, doc in candidates[: self._k]:
+            if row is None:
+                # If buffer_idx is invalid, still return the document from vector
+                # store
+                doc.metadata["last_accessed_at"] = current_time
                 result.append(doc)
-
-        # Save memory stream after updating access times
-        self._save_memory_stream()
-
+                continue
+            buffered_doc = self.memory_stream[row]
+            buffered_doc.metadata["last_accessed_at"] = current_time
+            self._columns.last_accessed_at.values[row] = current_timestamp
+            self._dirty_rows.add(row)
+            result.append(buffered_doc)
+
+        # Write the access time updates in batches
+        self._maybe_flush_access_times()
         return result
 
     def _retrieve_vector_store_only(
@@ -255,27 +536,21 @@ class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
         docs = self._index_store.similar_search_with_scores(
             query, topk=self._top_k, score_threshold=0, filters=filters
         )
+        if not docs:
+            return []
 
-        # Apply time weighting
-        rescored_docs = []
-        for doc in docs:
-            # Update last_accessed_at time if it exists
-            if "last_accessed_at" in doc.metadata:
-                last_accessed_time = doc.metadata["last_accessed_at"]
-                hours_passed = _get_hours_passed(current_time, last_accessed_time)
-                time_score = (1.0 - self.decay_rate) ** hours_passed
-                # Combine with vector similarity score
-                combined_score = doc.score + time_score
-                rescored_docs.append((doc, combined_score))
-            else:
-                # Just use vector similarity if no time data
-                rescored_docs.append((doc, doc.score))
-
-        # Sort by combined score
-        rescored_docs.sort(key=lambda x: x[1], reverse=True)
+        # Apply time weighting, just use vector similarity if no time data
+        last_accessed = np.array(
+            [_to_timestamp(doc.metadata.get("last_accessed_at")) for doc in docs],
+            dtype=np.float64,
+        )
+        scores = np.array([doc.score for doc in docs], dtype=np.float64)
+        time_scores = self._time_scores(last_accessed, current_time)
+        scores += np.nan_to_num(time_scores, nan=0.0)
 
         # Return top results
-        return [doc for doc, _ in rescored_docs[: self._k]]
+        order = np.argsort(-scores, kind="stable")[: self._k]
+        return [docs[i] for i in order]
 
     def _get_combined_score(
         self,
@@ -294,11 +569,13 @@ class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
             Combined score value
         """
         # Default last_accessed_at to creation time if not present
-        last_accessed_at = chunk.metadata.get("last_accessed_at")
-        if last_accessed_at is None:
-            last_accessed_at = chunk.metadata.get("created_at", current_time)
+        last_accessed_at = _to_timestamp(chunk.metadata.get("last_accessed_at"))
+        if np.isnan(last_accessed_at):
+            last_accessed_at = _to_timestamp(chunk.metadata.get("created_at"))
+        if np.isnan(last_accessed_at):
+            last_accessed_at = current_time.timestamp()
 
-        hours_passed = _get_hours_passed(current_time, last_accessed_at)
+        hours_passed = (current_time.timestamp() - last_accessed_at) / 3600
         score = (1.0 - self.decay_rate) ** hours_passed
 
         for key in self.other_score_keys:
@@ -348,6 +625,7 @@ class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
         Args:
             storage: External document storage
         """
+        self.flush_access_times()
         self._external_storage = storage
         self._use_vector_store_only = False
         self._initialize_memory_stream()
@@ -356,7 +634,9 @@ class TimeWeightedEmbeddingRetriever(EmbeddingRetriever):
         """Sync memory stream with external storage."""
         if self._external_storage:
             try:
+                self.flush_access_times()
                 self.memory_stream = self._external_storage.get_all_documents()
+                self._rebuild_columns()
                 self._use_vector_store_only = False
                 logger.info(
                     "Synced memory stream from external storage with "
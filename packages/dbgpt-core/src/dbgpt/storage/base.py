@@ -4,9 +4,9 @@ import asyncio
 import logging
 import time
 from abc import ABC, abstractmethod
-from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Union
 
 from dbgpt.core import Chunk
 from dbgpt.storage.vector_store.filters import MetadataFilters
@@ -16,6 +16,95 @@ from dbgpt.util.executor_utils import blocking_func_to_async_no_executor
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class LoadProgress:
+    """The progress of loading chunks into the index store.
+
+    ``checkpoint`` is the number of the leading chunks which are all loaded, the
+    loading can be resumed from ``chunks[checkpoint:]``.
+    """
+
+    total_chunks: int
+    loaded_chunks: int
+    total_groups: int
+    loaded_groups: int
+    checkpoint: int
+    group_index: int
+    group_ids: List[str]
+
+    @property
+    def finished(self) -> bool:
+        """Whether all the groups are loaded."""
+        return self.loaded_groups == self.total_groups
+
+
+LoadProgressCallback = Callable[[LoadProgress], Union[None, Awaitable[None]]]
+
+_ASYNC_CALLBACK_ERROR = (
+    "The progress callback of load_document_with_limit can not be a coroutine "
+    "function, use aload_document_with_limit instead"
+)
+
+
+def _group_chunks(chunks: List[Chunk], group_size: int) -> List[List[Chunk]]:
+    return [chunks[i : i + group_size] for i in range(0, len(chunks), group_size)]
+
+
+class _LoadProgressTracker:
+    """Track the loaded groups, keep the chunk ids in the order of the chunks."""
+
+    def __init__(
+        self,
+        chunk_groups: List[List[Chunk]],
+        callback: Optional[LoadProgressCallback] = None,
+    ):
+        self._chunk_groups = chunk_groups
+        self._callback = callback
+        self._total_chunks = sum(len(g) for g in chunk_groups)
+        self._group_ids: Dict[int, List[str]] = {}
+        self._loaded_chunks = 0
+        self._checkpoint_group = 0
+        self._checkpoint = 0
+
+    def _update(self, idx: int, ids: List[str]) -> LoadProgress:
+        self._group_ids[idx] = ids
+        self._loaded_chunks += len(self._chunk_groups[idx])
+        while self._checkpoint_group in self._group_ids:
+            self._checkpoint += len(self._chunk_groups[self._checkpoint_group])
+            self._checkpoint_group += 1
+        logger.info(
+            f"Loaded {self._loaded_chunks} chunks, total {self._total_chunks} chunks."
+        )
+        return LoadProgress(
+            total_chunks=self._total_chunks,
+            loaded_chunks=self._loaded_chunks,
+            total_groups=len(self._chunk_groups),
+            loaded_groups=len(self._group_ids),
+            checkpoint=self._checkpoint,
+            group_index=idx,
+            group_ids=ids,
+        )
+
+    def complete(self, idx: int, ids: List[str]) -> None:
+        progress = self._update(idx, ids)
+        if self._callback:
+            ret = self._callback(progress)
+            if asyncio.iscoroutine(ret):
+                # Never awaited in the sync loading
+                ret.close()
+                raise TypeError(_ASYNC_CALLBACK_ERROR)
+
+    async def acomplete(self, idx: int, ids: List[str]) -> None:
+        progress = self._update(idx, ids)
+        if self._callback:
+            ret = self._callback(progress)
+            if asyncio.iscoroutine(ret):
+                await ret
+
+    def ids(self) -> List[str]:
+        return [i for idx in sorted(self._group_ids) for i in self._group_ids[idx]]
+
+
 @dataclass
 class IndexStoreConfig(BaseParameters):
     """Index store config."""
@@ -114,97 +203,153 @@ class IndexStoreBase(ABC):
         chunks: List[Chunk],
         max_chunks_once_load: Optional[int] = None,
         max_threads: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: float = 1.0,
+        progress_callback: Optional[LoadProgressCallback] = None,
     ) -> List[str]:
         """Load document in index database with specified limit.
 
+        The chunks are loaded in groups, ``max_threads`` groups are kept in flight at
+        all times, a new group starts as soon as any group finishes.
+
         Args:
             chunks(List[Chunk]): Document chunks.
             max_chunks_once_load(int): Max number of chunks to load at once.
             max_threads(int): Max number of threads to use.
+            max_retries(int): Max number of retries of a failed group, default 0.
+            retry_backoff(float): The seconds to wait before the first retry, doubled
+                for each retry.
+            progress_callback(LoadProgressCallback): Called after each group is
+                loaded, it can not be a coroutine function.
 
         Return:
             List[str]: Chunk ids.
         """
+        if progress_callback and asyncio.iscoroutinefunction(progress_callback):
+            raise ValueError(_ASYNC_CALLBACK_ERROR)
         max_chunks_once_load = max_chunks_once_load or self._max_chunks_once_load
         max_threads = max_threads or self._max_threads
-        # Group the chunks into chunks of size max_chunks
-        chunk_groups = [
-            chunks[i : i + max_chunks_once_load]
-            for i in range(0, len(chunks), max_chunks_once_load)
-        ]
+        chunk_groups = _group_chunks(chunks, max_chunks_once_load)
         logger.info(
             f"Loading {len(chunks)} chunks in {len(chunk_groups)} groups with "
             f"{max_threads} threads."
         )
-        ids = []
-        loaded_cnt = 0
+        tracker = _LoadProgressTracker(chunk_groups, progress_callback)
         start_time = time.time()
+
+        def _load_group(idx: int) -> List[str]:
+            attempt = 0
+            while True:
+                try:
+                    return self.load_document(chunk_groups[idx])
+                except Exception as e:
+                    if attempt >= (max_retries or 0):
+                        raise
+                    delay = retry_backoff * (2**attempt)
+                    attempt += 1
+                    logger.warning(
+                        f"Failed to load chunk group {idx + 1}, retry {attempt} "
+                        f"after {delay} seconds: {e}"
+                    )
+                    time.sleep(delay)
+
         with ThreadPoolExecutor(max_workers=max_threads) as executor:
-            tasks = []
-            for chunk_group in chunk_groups:
-                tasks.append(executor.submit(self.load_document, chunk_group))
-            for future in tasks:
-                success_ids = future.result()
-                ids.extend(success_ids)
-                loaded_cnt += len(success_ids)
-                logger.info(f"Loaded {loaded_cnt} chunks, total {len(chunks)} chunks.")
+            futures = {
+                executor.submit(_load_group, idx): idx
+                for idx in range(len(chunk_groups))
+            }
+            try:
+                for future in as_completed(futures):
+                    idx = futures[future]
+                    try:
+                        success_ids = future.result()
+                    except Exception as e:
+                        raise RuntimeError(
+                            f"Failed to load chunk group {idx + 1}: {str(e)}"
+                        ) from e
+                    tracker.complete(idx, success_ids)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
         logger.info(
             f"Loaded {len(chunks)} chunks in {time.time() - start_time} seconds"
         )
-        return ids
+        return tracker.ids()
 
     async def aload_document_with_limit(
         self,
         chunks: List[Chunk],
         max_chunks_once_load: Optional[int] = None,
         max_threads: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: float = 1.0,
+        progress_callback: Optional[LoadProgressCallback] = None,
     ) -> List[str]:
         """Load document in index database with specified limit.
 
+        The chunks are loaded in groups, ``max_threads`` groups are kept in flight at
+        all times, a new group starts as soon as any group finishes.
+
         Args:
             chunks(List[Chunk]): Document chunks.
             max_chunks_once_load(int): Max number of chunks to load at once.
             max_threads(int): Max number of threads to use.
+            max_retries(int): Max number of retries of a failed group, default 0.
+            retry_backoff(float): The seconds to wait before the first retry, doubled
+                for each retry.
+            progress_callback(LoadProgressCallback): Called after each group is
+                loaded, it can be a coroutine function.
 
         Return:
             List[str]: Chunk ids.
         """
         max_chunks_once_load = max_chunks_once_load or self._max_chunks_once_load
         max_threads = max_threads or self._max_threads
-        chunk_groups = [
-            chunks[i : i + max_chunks_once_load]
-            for i in range(0, len(chunks), max_chunks_once_load)
-        ]
+        chunk_groups = _group_chunks(chunks, max_chunks_once_load)
         logger.info(
             f"Loading {len(chunks)} chunks in {len(chunk_groups)} groups with "
             f"{max_threads} threads."
         )
-        tasks = []
-        for chunk_group in chunk_groups:
-            tasks.append(self.aload_document(chunk_group))
-
-        results = await self._run_tasks_with_concurrency(tasks, max_threads)
-
-        ids = []
-        loaded_cnt = 0
-        for idx, success_ids in enumerate(results):
-            if isinstance(success_ids, Exception):
-                raise RuntimeError(
-                    f"Failed to load chunk group {idx + 1}: {str(success_ids)}"
-                ) from success_ids
-            ids.extend(success_ids)
-            loaded_cnt += len(success_ids)
-            logger.info(f"Loaded {loaded_cnt} chunks, total {len(chunks)} chunks.")
-
-        return ids
-
-    async def _run_tasks_with_concurrency(self, tasks, max_concurrent):
-        results = []
-        for i in range(0, len(tasks), max_concurrent):
-            batch = tasks[i : i + max_concurrent]
-            batch_results = await asyncio.gather(*batch, return_exceptions=True)
-            results.extend(batch_results)
-        return results
+        tracker = _LoadProgressTracker(chunk_groups, progress_callback)
+        next_group = iter(range(len(chunk_groups)))
+
+        async def _load_group(idx: int) -> List[str]:
+            attempt = 0
+            while True:
+                try:
+                    return await self.aload_document(chunk_groups[idx])
+                except Exception as e:
+                    if attempt >= (max_retries or 0):
+                        raise RuntimeError(
+                            f"Failed to load chunk group {idx + 1}: {str(e)}"
+                        ) from e
+                    delay = retry_backoff * (2**attempt)
+                    attempt += 1
+                    logger.warning(
+                        f"Failed to load chunk group {idx + 1}, retry {attempt} "
+                        f"after {delay} seconds: {e}"
+                    )
+                    await asyncio.sleep(delay)
+
+        async def _worker():
+            # Each worker takes the next group as soon as its group finishes
+            for idx in next_group:
+                success_ids = await _load_group(idx)
+                await tracker.acomplete(idx, success_ids)
+
+        workers = [
+            asyncio.ensure_future(_worker())
+            for _ in range(min(max_threads, len(chunk_groups)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        return tracker.ids()
 
     def similar_search(
         self, text: str, topk: int, filters: Optional[MetadataFilters] = None
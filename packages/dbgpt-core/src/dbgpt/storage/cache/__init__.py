@@ -3,6 +3,7 @@
 from .llm_cache import LLMCacheClient, LLMCacheKey, LLMCacheValue  # noqa: F401
 from .manager import CacheManager, initialize_cache  # noqa: F401
 from .storage.base import MemoryCacheStorage  # noqa: F401
+from .storage.memory.memory_storage import ShardedMemoryCacheStorage  # noqa: F401
 
 __all__ = [
     "LLMCacheKey",
@@ -11,4 +12,5 @@ __all__ = [
     "CacheManager",
     "initialize_cache",
     "MemoryCacheStorage",
+    "ShardedMemoryCacheStorage",
 ]
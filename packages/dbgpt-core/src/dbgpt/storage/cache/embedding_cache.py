@@ -1 +1,441 @@
-"""Embeddings cache."""
+"""Embeddings cache.
+
+The same query is usually embedded several times in one chat turn, e.g. by the
+schema retriever, the knowledge retriever, the agent memory and the rerank. The
+embeddings of the queries are cached by the model and the hash of the query, so the
+query is embedded once.
+
+The embeddings of the documents can be cached too, so the same chunk loaded to
+several knowledge spaces with the same embedding model is embedded once. They are
+cached separately from the queries, usually on the disk and without expiration.
+"""
+
+import array
+import asyncio
+import concurrent.futures
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union, cast
+
+from dbgpt.core import Embeddings
+from dbgpt.util.i18n_utils import _
+from dbgpt.util.parameter_utils import BaseParameters
+
+logger = logging.getLogger(__name__)
+
+# Remove the expired embeddings from the disk every N writes
+_DISK_PRUNE_INTERVAL = 1000
+
+
+@dataclass
+class QueryEmbeddingCacheParameters(BaseParameters):
+    """Query embedding cache configuration."""
+
+    __cfg_type__ = "utils"
+
+    enable: bool = field(
+        default=True,
+        metadata={
+            "help": _("Whether to cache the embeddings of the queries, default is True")
+        },
+    )
+    max_size: int = field(
+        default=1024,
+        metadata={
+            "help": _(
+                "The max number of the embeddings cached in memory, default is 1024"
+            )
+        },
+    )
+    ttl: Optional[float] = field(
+        default=600,
+        metadata={
+            "help": _(
+                "The seconds an embedding is cached, default is 600, no expiration "
+                "if not set"
+            )
+        },
+    )
+    persist_dir: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The directory to persist the embeddings, the embeddings are only "
+                "cached in memory if not set"
+            )
+        },
+    )
+
+
+@dataclass
+class DocumentEmbeddingCacheParameters(BaseParameters):
+    """Document embedding cache configuration."""
+
+    __cfg_type__ = "utils"
+
+    enable: bool = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to cache the embeddings of the documents, the same chunk "
+                "loaded to several knowledge spaces is embedded once, default is False"
+            )
+        },
+    )
+    max_size: int = field(
+        default=10000,
+        metadata={
+            "help": _(
+                "The max number of the embeddings cached in memory, default is 10000"
+            )
+        },
+    )
+    ttl: Optional[float] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The seconds an embedding is cached, no expiration if not set, "
+                "default is not set"
+            )
+        },
+    )
+    persist_dir: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The directory to persist the embeddings, the embeddings are only "
+                "cached in memory if not set"
+            )
+        },
+    )
+
+
+class _DiskEmbeddingStore:
+    """Persist the embeddings in a sqlite database."""
+
+    def __init__(self, persist_dir: str, name: str = "query_embedding"):
+        os.makedirs(persist_dir, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(persist_dir, f"{name}_cache.db"),
+            check_same_thread=False,
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_embedding ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(
+        self, key: str, ttl: Optional[float]
+    ) -> Optional[Tuple[float, List[float]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM query_embedding WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if ttl is not None and time.time() - created_at >= ttl:
+            return None
+        return created_at, array.array("d", value).tolist()
+
+    def set(self, key: str, value: List[float], ttl: Optional[float]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_embedding (key, value, created_at) "
+                "VALUES (?, ?, ?)",
+                (key, array.array("d", value).tobytes(), now),
+            )
+            self._writes += 1
+            if ttl is not None and self._writes % _DISK_PRUNE_INTERVAL == 0:
+                self._conn.execute(
+                    "DELETE FROM query_embedding WHERE created_at < ?", (now - ttl,)
+                )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM query_embedding")
+            self._conn.commit()
+
+
+class QueryEmbeddingCache:
+    """A LRU cache of the query embeddings with expiration.
+
+    The concurrent requests of the same query are deduplicated, only one of them
+    embeds the query and the others wait for its result.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: Optional[float] = 600,
+        persist_dir: Optional[str] = None,
+        name: str = "query_embedding",
+    ):
+        """Create a new QueryEmbeddingCache.
+
+        Args:
+            max_size (int): The max number of the embeddings cached in memory.
+            ttl (Optional[float]): The seconds an embedding is cached, no expiration
+                if None.
+            persist_dir (Optional[str]): The directory to persist the embeddings,
+                the embeddings evicted from the memory are still served from the
+                disk.
+            name (str): The name of the cache, the caches persisted to the same
+                directory must have different names.
+        """
+        self._max_size = max(1, max_size)
+        self._ttl = ttl
+        self._memory: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._disk = _DiskEmbeddingStore(persist_dir, name) if persist_dir else None
+
+    @classmethod
+    def from_parameters(
+        cls,
+        parameters: Union[
+            QueryEmbeddingCacheParameters, DocumentEmbeddingCacheParameters
+        ],
+    ) -> Optional["QueryEmbeddingCache"]:
+        """Create the cache from the parameters, None if the cache is disabled."""
+        if not parameters.enable:
+            return None
+        name = (
+            "document_embedding"
+            if isinstance(parameters, DocumentEmbeddingCacheParameters)
+            else "query_embedding"
+        )
+        return cls(
+            max_size=parameters.max_size,
+            ttl=parameters.ttl,
+            persist_dir=parameters.persist_dir,
+            name=name,
+        )
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """Return the cache key of the query."""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model_name}:{text_hash}"
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return the cached embedding, None if not cached or expired."""
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                created_at, value = cached
+                if self._ttl is None or time.time() - created_at < self._ttl:
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+        if self._disk is None:
+            return None
+        cached = self._disk.get(key, self._ttl)
+        if cached is None:
+            return None
+        # Expired with the time it is written to the disk
+        created_at, value = cached
+        self._set_memory(key, value, created_at)
+        return value
+
+    def set(self, key: str, value: List[float]):
+        """Cache the embedding."""
+        self._set_memory(key, value)
+        if self._disk is not None:
+            try:
+                self._disk.set(key, value, self._ttl)
+            except Exception as e:
+                logger.warning(f"Failed to persist the query embedding: {e}")
+
+    def _set_memory(
+        self, key: str, value: List[float], created_at: Optional[float] = None
+    ):
+        with self._lock:
+            self._memory[key] = (created_at or time.time(), value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._max_size:
+                self._memory.popitem(last=False)
+
+    def clear(self):
+        """Remove all the embeddings."""
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def _acquire(self, key: str) -> Tuple[concurrent.futures.Future, bool]:
+        """Return the future of the query and whether the caller computes it."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = concurrent.futures.Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _release(self, key: str):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], List[float]]
+    ) -> List[float]:
+        """Return the cached embedding, or compute and cache it."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        future, owner = self._acquire(key)
+        if not owner:
+            try:
+                return future.result()
+            except concurrent.futures.CancelledError:
+                # The request computing it is canceled, compute it again
+                return self.get_or_compute(key, compute)
+        try:
+            value = compute()
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release(key)
+
+    async def aget_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[List[float]]]
+    ) -> List[float]:
+        """Return the cached embedding, or compute and cache it asynchronously."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        future, owner = self._acquire(key)
+        if not owner:
+            try:
+                # Not cancel the shared future if this request is canceled
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # The request computing it is canceled, compute it again
+                    return await self.aget_or_compute(key, compute)
+                raise
+        try:
+            value = await compute()
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release(key)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings with the query embeddings and the document embeddings cached."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        cache: Optional[QueryEmbeddingCache] = None,
+        document_cache: Optional[QueryEmbeddingCache] = None,
+    ):
+        """Create a new CachedEmbeddings.
+
+        Args:
+            embeddings (Embeddings): The embeddings to wrap.
+            model_name (str): The name of the embedding model, part of the cache key.
+            cache (Optional[QueryEmbeddingCache]): The cache of the queries, shared
+                by the embeddings.
+            document_cache (Optional[QueryEmbeddingCache]): The cache of the
+                documents, shared by the embeddings.
+        """
+        self._embeddings = embeddings
+        self._model_name = model_name
+        self._cache = cache
+        self._document_cache = document_cache
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """Return the wrapped embeddings."""
+        return self._embeddings
+
+    def _lookup_documents(
+        self, texts: List[str]
+    ) -> Tuple[List[str], List[Optional[List[float]]], List[int]]:
+        """Return the cache keys, the cached embeddings and the indexes missed."""
+        cache = cast(QueryEmbeddingCache, self._document_cache)
+        keys = [cache.make_key(self._model_name, text) for text in texts]
+        results = [cache.get(key) for key in keys]
+        missed = [i for i, value in enumerate(results) if value is None]
+        return keys, results, missed
+
+    def _save_documents(
+        self,
+        keys: List[str],
+        results: List[Optional[List[float]]],
+        missed: List[int],
+        embeddings: List[List[float]],
+    ) -> List[List[float]]:
+        cache = cast(QueryEmbeddingCache, self._document_cache)
+        for i, value in zip(missed, embeddings):
+            cache.set(keys[i], value)
+            results[i] = value
+        return cast(List[List[float]], results)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed search docs, only the docs not cached are embedded."""
+        if self._document_cache is None:
+            return self._embeddings.embed_documents(texts)
+        keys, results, missed = self._lookup_documents(texts)
+        embeddings = (
+            self._embeddings.embed_documents([texts[i] for i in missed])
+            if missed
+            else []
+        )
+        return self._save_documents(keys, results, missed, embeddings)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed query text."""
+        if self._cache is None:
+            return self._embeddings.embed_query(text)
+        return self._cache.get_or_compute(
+            self._cache.make_key(self._model_name, text),
+            lambda: self._embeddings.embed_query(text),
+        )
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Asynchronous Embed search docs, only the docs not cached are embedded."""
+        if self._document_cache is None:
+            return await self._embeddings.aembed_documents(texts)
+        keys, results, missed = self._lookup_documents(texts)
+        embeddings = (
+            await self._embeddings.aembed_documents([texts[i] for i in missed])
+            if missed
+            else []
+        )
+        return self._save_documents(keys, results, missed, embeddings)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Asynchronous Embed query text."""
+        if self._cache is None:
+            return await self._embeddings.aembed_query(text)
+        return await self._cache.aget_or_compute(
+            self._cache.make_key(self._model_name, text),
+            lambda: self._embeddings.aembed_query(text),
+        )
@@ -4,7 +4,7 @@ import logging
 from abc import ABC, abstractmethod
 from concurrent.futures import Executor
 from dataclasses import dataclass, field
-from typing import Optional, Type, cast
+from typing import Any, Dict, Optional, Type, cast
 
 from dbgpt.component import BaseComponent, ComponentType, SystemApp
 from dbgpt.core import CacheConfig, CacheKey, CacheValue, Serializable, Serializer
@@ -13,6 +13,7 @@ from dbgpt.util.executor_utils import ExecutorFactory, blocking_func_to_async
 from dbgpt.util.i18n_utils import _
 from dbgpt.util.parameter_utils import BaseParameters
 
+from .single_flight import SingleFlight
 from .storage.base import CacheStorage
 
 logger = logging.getLogger(__name__)
@@ -33,7 +34,12 @@ class ModelCacheParameters(BaseParameters):
     storage_type: str = field(
         default="memory",
         metadata={
-            "help": _("The storage type, default is memory"),
+            "help": _(
+                "The storage type, memory, sharded_memory, disk or tiered, default is "
+                "memory. sharded_memory is a thread-safe memory storage with "
+                "expiration, tiered looks up the sharded_memory storage, the disk "
+                "storage and the remote cache in order"
+            ),
         },
     )
     max_memory_mb: int = field(
@@ -42,12 +48,75 @@ class ModelCacheParameters(BaseParameters):
             "help": _("The max memory in MB, default is 256"),
         },
     )
+    num_shards: int = field(
+        default=16,
+        metadata={
+            "help": _(
+                "The number of shards of the sharded_memory storage, default is 16"
+            ),
+        },
+    )
+    ttl: Optional[float] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The seconds an entry is cached in the sharded_memory storage and the "
+                "remote cache, no expiration if not set"
+            ),
+        },
+    )
+    cache_policy: str = field(
+        default="lru",
+        metadata={
+            "help": _(
+                "The eviction policy of the sharded_memory storage, lru, lfu or fifo, "
+                "default is lru"
+            ),
+        },
+    )
     persist_dir: str = field(
         default="model_cache",
         metadata={
             "help": _("The persist directory, default is model_cache"),
         },
     )
+    remote_cache_url: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The redis url of the remote cache shared by all the webserver "
+                "replicas, e.g. redis://localhost:6379/0, only used by the tiered "
+                "storage"
+            ),
+        },
+    )
+    write_behind: bool = field(
+        default=True,
+        metadata={
+            "help": _(
+                "Whether to write the disk storage and the remote cache of the tiered "
+                "storage in the background, default is True"
+            ),
+        },
+    )
+    enable_semantic_cache: bool = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to serve the cache by the similarity of prompts, the "
+                "prompts are embedded by the default embedding model, default is False"
+            ),
+        },
+    )
+    similarity_threshold: float = field(
+        default=0.95,
+        metadata={
+            "help": _(
+                "The min cosine similarity of prompts to hit the semantic cache, "
+                "default is 0.95"
+            ),
+        },
+    )
 
 
 class CacheManager(BaseComponent, ABC):
@@ -58,6 +127,7 @@ class CacheManager(BaseComponent, ABC):
     def __init__(self, system_app: SystemApp | None = None):
         """Create cache manager."""
         super().__init__(system_app)
+        self._single_flight = SingleFlight()
 
     def init_app(self, system_app: SystemApp):
         """Initialize cache manager."""
@@ -86,6 +156,15 @@ class CacheManager(BaseComponent, ABC):
     def serializer(self) -> Serializer:
         """Return serializer to serialize/deserialize cache value."""
 
+    @property
+    def single_flight(self) -> SingleFlight:
+        """Return the in-flight model requests of this cache."""
+        return self._single_flight
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return the metrics of the cache, e.g. the hit rate, empty if no metrics."""
+        return {}
+
 
 class LocalCacheManager(CacheManager):
     """Local cache manager."""
@@ -143,9 +222,26 @@ class LocalCacheManager(CacheManager):
         """Return serializer to serialize/deserialize cache value."""
         return self._serializer
 
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return the metrics of the cache storage, empty if it has no metrics."""
+        get_metrics = getattr(self._storage, "get_metrics", None)
+        if callable(get_metrics):
+            return get_metrics()
+        return {}
+
 
 def initialize_cache(
-    system_app: SystemApp, storage_type: str, max_memory_mb: int, persist_dir: str
+    system_app: SystemApp,
+    storage_type: str,
+    max_memory_mb: int,
+    persist_dir: str,
+    enable_semantic_cache: bool = False,
+    similarity_threshold: float = 0.95,
+    num_shards: int = 16,
+    ttl: Optional[float] = None,
+    cache_policy: str = "lru",
+    remote_cache_url: Optional[str] = None,
+    write_behind: bool = True,
 ):
     """Initialize cache manager.
 
@@ -154,6 +250,16 @@ def initialize_cache(
         storage_type (str): The storage type.
         max_memory_mb (int): The max memory in MB.
         persist_dir (str): The persist directory.
+        enable_semantic_cache (bool): Whether to serve the cache by the similarity of
+            prompts.
+        similarity_threshold (float): The min cosine similarity of semantic cache hit.
+        num_shards (int): The number of shards of the sharded_memory storage.
+        ttl (Optional[float]): The seconds an entry is cached in the sharded_memory
+            storage.
+        cache_policy (str): The eviction policy of the sharded_memory storage.
+        remote_cache_url (Optional[str]): The redis url of the remote cache of the
+            tiered storage.
+        write_behind (bool): Whether to write the slower tiers in the background.
     """
     from dbgpt.util.serialization.json_serialization import JsonSerializer
 
@@ -172,8 +278,62 @@ def initialize_cache(
                 f"message: {str(e)}"
             )
             cache_storage = MemoryCacheStorage(max_memory_mb=max_memory_mb)
+    elif storage_type in ("sharded_memory", "tiered"):
+        from .storage.memory.memory_storage import ShardedMemoryCacheStorage
+
+        cache_storage = ShardedMemoryCacheStorage(
+            max_memory_mb=max_memory_mb,
+            num_shards=num_shards,
+            ttl=ttl,
+            cache_policy=cache_policy,
+        )
+        if storage_type == "tiered":
+            cache_storage = _build_tiered_storage(
+                cache_storage, persist_dir, ttl, remote_cache_url, write_behind
+            )
     else:
         cache_storage = MemoryCacheStorage(max_memory_mb=max_memory_mb)
+    if enable_semantic_cache:
+        try:
+            from .storage.semantic.semantic_storage import SemanticCacheStorage
+
+            cache_storage = SemanticCacheStorage(
+                cache_storage,
+                similarity_threshold=similarity_threshold,
+                system_app=system_app,
+            )
+        except ImportError as e:
+            logger.warning(
+                f"Can't import SemanticCacheStorage, use exact match cache, import "
+                f"error message: {str(e)}"
+            )
     system_app.register(
         LocalCacheManager, serializer=JsonSerializer(), storage=cache_storage
     )
+
+
+def _build_tiered_storage(
+    memory_storage: CacheStorage,
+    persist_dir: str,
+    ttl: Optional[float],
+    remote_cache_url: Optional[str],
+    write_behind: bool,
+) -> CacheStorage:
+    """Build the tiered storage of the memory, the disk and the remote tiers."""
+    from .storage.tiered.tiered_storage import RemoteCacheStorage, TieredCacheStorage
+
+    tiers = [memory_storage]
+    try:
+        from .storage.disk.disk_storage import DiskCacheStorage
+
+        tiers.append(DiskCacheStorage(persist_dir))
+    except ImportError as e:
+        logger.warning(
+            f"Can't import DiskCacheStorage, skip the disk tier, import error "
+            f"message: {str(e)}"
+        )
+    if remote_cache_url:
+        from .protocol.kv_store import RedisKVStoreClient
+
+        tiers.append(RemoteCacheStorage(RedisKVStoreClient(remote_cache_url), ttl=ttl))
+    return TieredCacheStorage(tiers, write_behind=write_behind)
@@ -1,7 +1,8 @@
 """Operators for processing model outputs with caching support."""
 
+import asyncio
 import logging
-from typing import AsyncIterator, Dict, List, Optional, Union, cast
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union, cast
 
 from dbgpt.core import ModelOutput, ModelRequest
 from dbgpt.core.awel import (
@@ -20,6 +21,8 @@ logger = logging.getLogger(__name__)
 
 _LLM_MODEL_INPUT_VALUE_KEY = "llm_model_input_value"
 _LLM_MODEL_OUTPUT_CACHE_KEY = "llm_model_output_cache"
+_LLM_MODEL_CACHE_HIT_KEY = "llm_model_cache_hit"
+_LLM_MODEL_FLIGHT_OWNER_KEY = "llm_model_flight_owner"
 
 
 class CachedModelStreamOperator(StreamifyAbsOperator[ModelRequest, ModelOutput]):
@@ -121,6 +124,8 @@ class ModelCacheBranchOperator(BranchOperator[ModelRequest, Dict]):
         self._client = LLMCacheClient(cache_manager)
         self._model_task_name = model_task_name
         self._cache_task_name = cache_task_name
+        # The flights acquired by the runs of the DAG, by the event loop task id
+        self._flights: Dict[int, Tuple[LLMCacheKey, Any]] = {}
 
     async def branches(
         self,
@@ -135,20 +140,19 @@ class ModelCacheBranchOperator(BranchOperator[ModelRequest, Dict]):
         """
 
         async def check_cache_true(input_value: ModelRequest) -> bool:
-            # Check if the cache contains the result for the given input
-            if input_value.context and not input_value.context.cache_enable:
-                return False
-            cache_dict = _parse_cache_key_dict(input_value)
-            cache_key: LLMCacheKey = self._client.new_key(**cache_dict)
-            cache_value = await self._client.get(cache_key)
-            logger.debug(
-                f"cache_key: {cache_key}, hash key: {hash(cache_key)}, cache_value: "
-                f"{cache_value}"
-            )
-            await self.current_dag_context.save_to_share_data(
-                _LLM_MODEL_INPUT_VALUE_KEY, cache_key, overwrite=True
-            )
-            return bool(cache_value)
+            # Both branch functions are called, decide only once for a request
+            dag_ctx = self.current_dag_context
+            decision = asyncio.get_running_loop().create_future()
+            try:
+                await dag_ctx.save_to_share_data(_LLM_MODEL_CACHE_HIT_KEY, decision)
+            except ValueError:
+                decided = await dag_ctx.get_from_share_data(_LLM_MODEL_CACHE_HIT_KEY)
+                return await decided
+            try:
+                decision.set_result(await self._check_cache(input_value))
+            except Exception as e:
+                decision.set_exception(e)
+            return await decision
 
         async def check_cache_false(input_value: ModelRequest):
             # Inverse of check_cache_true
@@ -159,6 +163,48 @@ class ModelCacheBranchOperator(BranchOperator[ModelRequest, Dict]):
             check_cache_false: self._model_task_name,
         }
 
+    async def _check_cache(self, input_value: ModelRequest) -> bool:
+        """Check whether the output of the request is served by the cache.
+
+        A request whose identical request is calling the model waits for that
+        request, it is served by the cache if that request cached its output,
+        otherwise it calls the model itself.
+        """
+        if input_value.context and not input_value.context.cache_enable:
+            return False
+        cache_dict = _parse_cache_key_dict(input_value)
+        cache_key: LLMCacheKey = self._client.new_key(**cache_dict)
+        dag_ctx = self.current_dag_context
+        await dag_ctx.save_to_share_data(
+            _LLM_MODEL_INPUT_VALUE_KEY, cache_key, overwrite=True
+        )
+        single_flight = self._cache_manager.single_flight
+        while True:
+            cache_value = await self._client.get(cache_key)
+            logger.debug(
+                f"cache_key: {cache_key}, hash key: {hash(cache_key)}, cache_value: "
+                f"{cache_value}"
+            )
+            if cache_value:
+                return True
+            owner = object()
+            if single_flight.acquire(cache_key, owner):
+                # Released by the save task, or at the end of the DAG if the model
+                # task failed
+                self._flights[dag_ctx._event_loop_task_id] = (cache_key, owner)
+                await dag_ctx.save_to_share_data(
+                    _LLM_MODEL_FLIGHT_OWNER_KEY, owner, overwrite=True
+                )
+                return False
+            # An identical request is calling the model, wait for it and check again
+            await single_flight.wait(cache_key)
+
+    async def after_dag_end(self, event_loop_task_id: int):
+        """Release the flight of the run, if its model task did not release it."""
+        flight = self._flights.pop(event_loop_task_id, None)
+        if flight is not None:
+            self._cache_manager.single_flight.release(*flight)
+
 
 class ModelStreamSaveCacheOperator(
     TransformStreamAbsOperator[ModelOutput, ModelOutput]
@@ -189,18 +235,25 @@ class ModelStreamSaveCacheOperator(
             AsyncIterator[ModelOutput]: The same input iterator, but the outputs are
                 saved to cache.
         """
-        llm_cache_key: Optional[LLMCacheKey] = None
+        llm_cache_key: Optional[
+            LLMCacheKey
+        ] = await self.current_dag_context.get_from_share_data(
+            _LLM_MODEL_INPUT_VALUE_KEY
+        )
+        owner = await self.current_dag_context.get_from_share_data(
+            _LLM_MODEL_FLIGHT_OWNER_KEY
+        )
         outputs = []
-        async for out in input_value:
-            if not llm_cache_key:
-                llm_cache_key = await self.current_dag_context.get_from_share_data(
-                    _LLM_MODEL_INPUT_VALUE_KEY
-                )
-            outputs.append(out)
-            yield out
-        if llm_cache_key and _is_success_model_output(outputs):
-            llm_cache_value: LLMCacheValue = self._client.new_value(output=outputs)
-            await self._client.set(llm_cache_key, llm_cache_value)
+        try:
+            async for out in input_value:
+                outputs.append(out)
+                yield out
+            if llm_cache_key and _is_success_model_output(outputs):
+                llm_cache_value: LLMCacheValue = self._client.new_value(output=outputs)
+                await self._client.set(llm_cache_key, llm_cache_value)
+        finally:
+            if llm_cache_key and owner:
+                self._cache_manager.single_flight.release(llm_cache_key, owner)
 
 
 class ModelSaveCacheOperator(MapOperator[ModelOutput, ModelOutput]):
@@ -229,9 +282,16 @@ class ModelSaveCacheOperator(MapOperator[ModelOutput, ModelOutput]):
         llm_cache_key: LLMCacheKey = await self.current_dag_context.get_from_share_data(
             _LLM_MODEL_INPUT_VALUE_KEY
         )
+        owner = await self.current_dag_context.get_from_share_data(
+            _LLM_MODEL_FLIGHT_OWNER_KEY
+        )
         llm_cache_value: LLMCacheValue = self._client.new_value(output=input_value)
-        if llm_cache_key and _is_success_model_output(input_value):
-            await self._client.set(llm_cache_key, llm_cache_value)
+        try:
+            if llm_cache_key and _is_success_model_output(input_value):
+                await self._client.set(llm_cache_key, llm_cache_value)
+        finally:
+            if llm_cache_key and owner:
+                self._cache_manager.single_flight.release(llm_cache_key, owner)
         return input_value
 
 
@@ -0,0 +1,109 @@
+"""The key-value store protocol of the remote cache tier.
+
+The remote tier is shared by all the webserver replicas, so a prompt answered by one
+replica is served from the cache by the others. Any key-value store with expiration
+can serve it by implementing :class:`KVStoreClient`.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+
+class KVStoreClient(ABC):
+    """The client of a key-value store."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value of the key, None if not exists or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Set the value of the key.
+
+        Args:
+            key (str): The key.
+            value (bytes): The value.
+            ttl (Optional[float]): The seconds the value is kept, forever if None.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete the key."""
+
+    def close(self) -> None:
+        """Close the client."""
+
+
+class LocalKVStoreClient(KVStoreClient):
+    """A key-value store in the current process.
+
+    It stands in for the remote store in the tests and the single node deployments.
+    """
+
+    def __init__(self):
+        """Create a new LocalKVStoreClient."""
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value of the key, None if not exists or expired."""
+        with self._lock:
+            cached = self._data.get(key)
+            if cached is None:
+                return None
+            value, expire_at = cached
+            if expire_at is not None and expire_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Set the value of the key."""
+        expire_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expire_at)
+
+    def delete(self, key: str) -> None:
+        """Delete the key."""
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class RedisKVStoreClient(KVStoreClient):
+    """A key-value store client of Redis."""
+
+    def __init__(self, url: str):
+        """Create a new RedisKVStoreClient.
+
+        Args:
+            url (str): The url of redis, e.g. redis://localhost:6379/0
+        """
+        try:
+            import redis
+        except ImportError:
+            raise ImportError(
+                "Could not import redis python package. "
+                "Please install it with `pip install redis`."
+            )
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value of the key, None if not exists or expired."""
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Set the value of the key."""
+        if ttl is None:
+            self._client.set(key, value)
+        else:
+            self._client.set(key, value, px=int(ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        """Delete the key."""
+        self._client.delete(key)
+
+    def close(self) -> None:
+        """Close the client."""
+        self._client.close()
@@ -0,0 +1,93 @@
+"""Coalesce the concurrent model requests of the same cache key.
+
+Without it, the identical prompts which arrive before the first one is answered all
+miss the cache and all call the model. With it, the first request becomes the leader
+and calls the model, and the others wait for the leader and read its output from the
+cache. When the leader failed and cached nothing, one of them becomes the new leader.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from dbgpt.core.interface.cache import CacheKey
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Track the in-flight model requests by the hash of the cache key.
+
+    A leader which does not release its key in time, e.g. its process is stuck, is
+    treated as gone: the waiters stop waiting and the next request of the key becomes
+    the new leader.
+    """
+
+    def __init__(self, timeout: float = 300):
+        """Create a new SingleFlight.
+
+        Args:
+            timeout (float): The max seconds to wait for a leader.
+        """
+        self._timeout = timeout
+        self._flights: Dict[bytes, Tuple[asyncio.Event, float, Any]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of the in-flight requests."""
+        return len(self._flights)
+
+    def acquire(self, key: CacheKey, owner: Any = None) -> bool:
+        """Try to become the leader of the key.
+
+        Args:
+            key (CacheKey): The cache key.
+            owner (Any): The owner of the flight, pass it to :meth:`release` to
+                release only the flight of this leader.
+
+        Returns:
+            bool: True if the caller is the leader and should call the model, False if
+                another request of the key is in flight.
+        """
+        key_hash = key.get_hash_bytes()
+        now = time.monotonic()
+        flight = self._flights.get(key_hash)
+        if flight is not None:
+            if now - flight[1] < self._timeout:
+                return False
+            # Wake up the waiters of the stale leader
+            flight[0].set()
+        self._flights[key_hash] = (asyncio.Event(), now, owner)
+        return True
+
+    def release(self, key: CacheKey, owner: Optional[Any] = None) -> None:
+        """Release the key by its leader and wake up the waiters.
+
+        Args:
+            key (CacheKey): The cache key.
+            owner (Optional[Any]): Release the flight only if it is acquired by this
+                owner, it may be released already and acquired by a new leader.
+        """
+        key_hash = key.get_hash_bytes()
+        flight = self._flights.get(key_hash)
+        if flight is None or (owner is not None and flight[2] is not owner):
+            return
+        del self._flights[key_hash]
+        flight[0].set()
+
+    async def wait(self, key: CacheKey) -> bool:
+        """Wait for the in-flight request of the key.
+
+        Returns:
+            bool: Whether there was an in-flight request of the key.
+        """
+        flight = self._flights.get(key.get_hash_bytes())
+        if flight is None:
+            return False
+        event, started, _owner = flight
+        remaining = self._timeout - (time.monotonic() - started)
+        try:
+            await asyncio.wait_for(event.wait(), max(remaining, 0))
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout to wait for the in-flight request of key {key}")
+        return True
@@ -1,6 +1,7 @@
 """Base cache storage class."""
 
 import logging
+import threading
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 from dataclasses import dataclass
@@ -199,6 +200,7 @@ class MemoryCacheStorage(CacheStorage):
         self.cache: OrderedDict = OrderedDict()
         self.max_memory = max_memory_mb * 1024 * 1024
         self.current_memory_usage = 0
+        self._lock = threading.Lock()
 
     def check_config(
         self,
@@ -224,13 +226,14 @@ class MemoryCacheStorage(CacheStorage):
         self.check_config(cache_config, raise_error=True)
         # Exact match retrieval
         key_hash = hash(key)
-        item: Optional[StorageItem] = self.cache.get(key_hash)
+        with self._lock:
+            item: Optional[StorageItem] = self.cache.get(key_hash)
+            if not item:
+                return None
+            # Move the item to the end of the OrderedDict to signify recent use.
+            if not cache_config or cache_config.cache_policy != CachePolicy.FIFO:
+                self.cache.move_to_end(key_hash)
         logger.debug(f"MemoryCacheStorage get key {key}, hash {key_hash}, item: {item}")
-
-        if not item:
-            return None
-        # Move the item to the end of the OrderedDict to signify recent use.
-        self.cache.move_to_end(key_hash)
         return item
 
     def set(
@@ -242,15 +245,25 @@ class MemoryCacheStorage(CacheStorage):
         """Set a value in the cache for the provided key."""
         key_hash = hash(key)
         item = StorageItem.build_from_kv(key, value)
-        # Calculate memory size of the new entry
-        new_entry_size = _get_object_bytes(item)
-        # Evict entries if necessary
-        while self.current_memory_usage + new_entry_size > self.max_memory:
-            self._apply_cache_policy(cache_config)
-
-        # Store the item in the cache.
-        self.cache[key_hash] = item
-        self.current_memory_usage += new_entry_size
+        # The size of the serialized key and value is computed by the item
+        new_entry_size = item.length
+        if new_entry_size > self.max_memory:
+            logger.warning(
+                f"Cache entry of {new_entry_size} bytes is larger than the max memory, "
+                "skip caching it"
+            )
+            return
+        with self._lock:
+            old_item = self.cache.pop(key_hash, None)
+            if old_item is not None:
+                self.current_memory_usage -= old_item.length
+            # Evict entries if necessary
+            while self.current_memory_usage + new_entry_size > self.max_memory:
+                self._apply_cache_policy(cache_config)
+
+            # Store the item in the cache.
+            self.cache[key_hash] = item
+            self.current_memory_usage += new_entry_size
         logger.debug(f"MemoryCacheStorage set key {key}, hash {key_hash}, item: {item}")
 
     def exists(
@@ -260,8 +273,7 @@ class MemoryCacheStorage(CacheStorage):
         return self.get(key, cache_config) is not None
 
     def _apply_cache_policy(self, cache_config: Optional[CacheConfig] = None):
-        # Remove the oldest/newest item based on the cache policy.
-        if cache_config and cache_config.cache_policy == CachePolicy.FIFO:
-            self.cache.popitem(last=False)
-        else:  # Default is LRU
-            self.cache.popitem(last=True)
+        # The least recently used (LRU) or the oldest (FIFO) item is at the beginning,
+        # gets do not reorder the items for FIFO.
+        _key_hash, item = self.cache.popitem(last=False)
+        self.current_memory_usage -= item.length
@@ -0,0 +1 @@
+"""Sharded in-memory cache storage implementation."""
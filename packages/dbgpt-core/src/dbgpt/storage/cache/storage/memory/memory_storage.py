@@ -0,0 +1,278 @@
+"""Sharded in-memory cache storage.
+
+The entries are split into shards by the hash of the key, and each shard has its own
+lock, so the requests of different keys from the threads and the async tasks do not
+wait for each other. The size of an entry is the length of its serialized key and
+value, which is much cheaper than measuring the python objects.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from dbgpt.core.interface.cache import (
+    CacheConfig,
+    CacheKey,
+    CachePolicy,
+    CacheValue,
+    K,
+    RetrievalPolicy,
+    V,
+)
+
+from ..base import CacheStorage, StorageItem
+
+logger = logging.getLogger(__name__)
+
+# The estimated bytes of the bookkeeping of one entry
+_ENTRY_OVERHEAD = 128
+# The number of the least recently used entries compared by the LFU eviction
+_LFU_SAMPLES = 16
+
+
+class _Entry:
+    __slots__ = ("item", "size", "expire_at", "frequency")
+
+    def __init__(self, item: StorageItem, size: int, expire_at: Optional[float]):
+        self.item = item
+        self.size = size
+        self.expire_at = expire_at
+        self.frequency = 1
+
+    def expired(self, now: float) -> bool:
+        return self.expire_at is not None and self.expire_at <= now
+
+
+class _Shard:
+    """A part of the cache guarded by its own lock.
+
+    The entries are kept in the order of the last access (LRU, LFU) or of the
+    insertion (FIFO). The LFU eviction removes the least frequently used one of the
+    least recently used entries, like the approximated LFU of Redis.
+    """
+
+    def __init__(self, max_bytes: int, policy: CachePolicy):
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[bytes, _Entry]" = OrderedDict()
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key_hash: bytes, now: float) -> Optional[StorageItem]:
+        with self.lock:
+            entry = self.entries.get(key_hash)
+            if entry is not None and entry.expired(now):
+                self._remove(key_hash, entry)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry.frequency += 1
+            if self.policy != CachePolicy.FIFO:
+                self.entries.move_to_end(key_hash)
+            return entry.item
+
+    def set(self, key_hash: bytes, entry: _Entry, now: float) -> bool:
+        if entry.size > self.max_bytes:
+            return False
+        with self.lock:
+            old = self.entries.pop(key_hash, None)
+            if old is not None:
+                self.size_bytes -= old.size
+                entry.frequency = old.frequency
+            self._evict(self.max_bytes - entry.size, now)
+            self.entries[key_hash] = entry
+            self.size_bytes += entry.size
+        return True
+
+    def delete(self, key_hash: bytes) -> bool:
+        with self.lock:
+            entry = self.entries.get(key_hash)
+            if entry is None:
+                return False
+            self._remove(key_hash, entry)
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size_bytes = 0
+
+    def _remove(self, key_hash: bytes, entry: _Entry):
+        del self.entries[key_hash]
+        self.size_bytes -= entry.size
+
+    def _evict(self, limit: int, now: float):
+        while self.size_bytes > limit and self.entries:
+            key_hash, entry = self._victim(now)
+            self._remove(key_hash, entry)
+            if entry.expired(now):
+                self.expirations += 1
+            else:
+                self.evictions += 1
+
+    def _victim(self, now: float) -> Tuple[bytes, _Entry]:
+        candidates = iter(self.entries.items())
+        victim = next(candidates)
+        if self.policy != CachePolicy.LFU or victim[1].expired(now):
+            return victim
+        for num, candidate in enumerate(candidates, start=1):
+            if num >= _LFU_SAMPLES:
+                break
+            if candidate[1].expired(now):
+                return candidate
+            if candidate[1].frequency < victim[1].frequency:
+                victim = candidate
+        return victim
+
+
+class ShardedMemoryCacheStorage(CacheStorage):
+    """A thread-safe in-memory cache storage with expiration.
+
+    The memory limit is divided equally among the shards, an entry larger than the
+    limit of its shard is not cached. The eviction policy is decided by the storage,
+    the cache policy of the cache config is ignored.
+    """
+
+    def __init__(
+        self,
+        max_memory_mb: int = 256,
+        num_shards: int = 16,
+        ttl: Optional[float] = None,
+        cache_policy: Union[CachePolicy, str] = CachePolicy.LRU,
+    ):
+        """Create a new instance of ShardedMemoryCacheStorage.
+
+        Args:
+            max_memory_mb (int): The max memory of all the entries in MB.
+            num_shards (int): The number of the shards.
+            ttl (Optional[float]): The seconds an entry is cached, no expiration if
+                None.
+            cache_policy (Union[CachePolicy, str]): The eviction policy, lru, lfu or
+                fifo.
+        """
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        policy = CachePolicy(cache_policy)
+        shard_bytes = max(1, max_memory_mb * 1024 * 1024 // num_shards)
+        self._shards: List[_Shard] = [
+            _Shard(shard_bytes, policy) for _i in range(num_shards)
+        ]
+        self._ttl = ttl
+
+    def check_config(
+        self,
+        cache_config: Optional[CacheConfig] = None,
+        raise_error: Optional[bool] = True,
+    ) -> bool:
+        """Check whether the CacheConfig is legal."""
+        if (
+            cache_config
+            and cache_config.retrieval_policy != RetrievalPolicy.EXACT_MATCH
+        ):
+            if raise_error:
+                raise ValueError(
+                    "ShardedMemoryCacheStorage only supports 'EXACT_MATCH' retrieval "
+                    "policy"
+                )
+            return False
+        return True
+
+    def support_async(self) -> bool:
+        """Return True, the operations only hold a lock for a short time."""
+        return True
+
+    def _shard(self, key_hash: bytes) -> _Shard:
+        return self._shards[int.from_bytes(key_hash[:8], "little") % len(self._shards)]
+
+    def get(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> Optional[StorageItem]:
+        """Retrieve a storage item from the cache using the provided key."""
+        self.check_config(cache_config, raise_error=True)
+        key_hash = key.get_hash_bytes()
+        return self._shard(key_hash).get(key_hash, time.monotonic())
+
+    async def aget(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> Optional[StorageItem]:
+        """Retrieve a storage item from the cache using the provided key."""
+        return self.get(key, cache_config)
+
+    def set(
+        self,
+        key: CacheKey[K],
+        value: CacheValue[V],
+        cache_config: Optional[CacheConfig] = None,
+    ) -> None:
+        """Set a value in the cache for the provided key."""
+        self.check_config(cache_config, raise_error=True)
+        key_hash = key.get_hash_bytes()
+        key_data = key.serialize()
+        value_data = value.serialize()
+        size = len(key_hash) + len(key_data) + len(value_data) + _ENTRY_OVERHEAD
+        item = StorageItem(
+            length=size, key_hash=key_hash, key_data=key_data, value_data=value_data
+        )
+        now = time.monotonic()
+        expire_at = now + self._ttl if self._ttl is not None else None
+        if not self._shard(key_hash).set(key_hash, _Entry(item, size, expire_at), now):
+            logger.warning(
+                f"Cache entry of {size} bytes is larger than the limit of a shard, "
+                "skip caching it"
+            )
+
+    async def aset(
+        self,
+        key: CacheKey[K],
+        value: CacheValue[V],
+        cache_config: Optional[CacheConfig] = None,
+    ) -> None:
+        """Set a value in the cache for the provided key."""
+        self.set(key, value, cache_config)
+
+    def exists(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> bool:
+        """Check if the key exists in the cache."""
+        return self.get(key, cache_config) is not None
+
+    def delete(self, key: CacheKey[K]) -> bool:
+        """Delete the entry of the key, return whether it is cached."""
+        key_hash = key.get_hash_bytes()
+        return self._shard(key_hash).delete(key_hash)
+
+    def clear(self):
+        """Remove all the entries, the metrics are kept."""
+        for shard in self._shards:
+            shard.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return the metrics of the cache summed over the shards.
+
+        Returns:
+            Dict[str, Any]: The hits, misses, evictions, expirations and hit rate,
+                and the number and the bytes of the cached entries.
+        """
+        metrics = dict.fromkeys(
+            ["hits", "misses", "evictions", "expirations", "items", "size_bytes"], 0
+        )
+        for shard in self._shards:
+            with shard.lock:
+                metrics["hits"] += shard.hits
+                metrics["misses"] += shard.misses
+                metrics["evictions"] += shard.evictions
+                metrics["expirations"] += shard.expirations
+                metrics["items"] += len(shard.entries)
+                metrics["size_bytes"] += shard.size_bytes
+        total = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = metrics["hits"] / total if total else 0.0
+        return metrics
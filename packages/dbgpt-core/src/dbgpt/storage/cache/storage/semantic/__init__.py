@@ -0,0 +1 @@
+"""Semantic(similarity match) cache storage implementation."""
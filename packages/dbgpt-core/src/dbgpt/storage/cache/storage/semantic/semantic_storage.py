@@ -0,0 +1,307 @@
+"""Semantic cache storage.
+
+Serve the cache hits by the similarity of prompts, the paraphrased prompts can hit the
+cache of the original prompt.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dbgpt.component import SystemApp
+from dbgpt.core import Embeddings
+from dbgpt.core.interface.cache import (
+    CacheConfig,
+    CacheKey,
+    CachePolicy,
+    CacheValue,
+    K,
+    RetrievalPolicy,
+    V,
+)
+
+from ..base import CacheStorage, StorageItem
+
+logger = logging.getLogger(__name__)
+
+_PROMPT_FIELD = "prompt"
+
+
+class _VectorIndex:
+    """An in-process vector index of one cache scope.
+
+    The normalized embeddings are kept in a contiguous float32 matrix, so the cosine
+    similarity of a query to all entries is one matrix-vector product.
+    """
+
+    def __init__(self, dim: int, initial_capacity: int = 64):
+        self._dim = dim
+        self._vectors = np.zeros((initial_capacity, dim), dtype=np.float32)
+        self._keys: List[CacheKey] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, vector: np.ndarray, key: CacheKey) -> None:
+        size = len(self._keys)
+        if size == self._vectors.shape[0]:
+            # Grow the matrix by doubling the capacity
+            new_vectors = np.zeros((size * 2, self._dim), dtype=np.float32)
+            new_vectors[:size] = self._vectors
+            self._vectors = new_vectors
+        self._vectors[size] = vector
+        self._keys.append(key)
+
+    def search(self, vector: np.ndarray) -> Optional[Tuple[int, float]]:
+        size = len(self._keys)
+        if size == 0:
+            return None
+        scores = self._vectors[:size] @ vector
+        idx = int(np.argmax(scores))
+        return idx, float(scores[idx])
+
+    def get_key(self, idx: int) -> CacheKey:
+        return self._keys[idx]
+
+    def remove(self, idx: int) -> None:
+        # Shift the later entries to keep the insertion order
+        size = len(self._keys)
+        self._vectors[idx : size - 1] = self._vectors[idx + 1 : size]
+        self._keys.pop(idx)
+
+    def remove_oldest(self) -> None:
+        # The entries are in the insertion order, the oldest entry is the first one
+        self.remove(0)
+
+
+class SemanticCacheStorage(CacheStorage):
+    """Cache storage with similarity match retrieval.
+
+    The cache values are saved in the backend storage with the exact key, and the
+    embedding of the prompt is saved in an in-process vector index. When the exact key
+    misses, the prompt of the key is embedded and the most similar cached prompt is
+    served if its cosine similarity is not less than ``similarity_threshold``.
+
+    The entries are scoped by all the fields of the key except the prompt(e.g. model
+    name and sampling parameters), so a cache value is never served to a request with
+    different model or sampling parameters.
+
+    Examples:
+        .. code-block:: python
+
+            storage = SemanticCacheStorage(
+                MemoryCacheStorage(), embeddings=embeddings, similarity_threshold=0.95
+            )
+            system_app.register(
+                LocalCacheManager, serializer=JsonSerializer(), storage=storage
+            )
+    """
+
+    def __init__(
+        self,
+        storage: CacheStorage,
+        embeddings: Optional[Embeddings] = None,
+        similarity_threshold: float = 0.95,
+        max_entries_per_scope: int = 10000,
+        system_app: Optional[SystemApp] = None,
+    ):
+        """Create a new instance of SemanticCacheStorage.
+
+        Args:
+            storage (CacheStorage): The backend storage to save the cache values.
+            embeddings (Optional[Embeddings]): The embeddings to embed the prompts, if
+                not provided, the default embeddings of the ``EmbeddingFactory`` in
+                ``system_app`` is used.
+            similarity_threshold (float): The min cosine similarity of a cache hit.
+            max_entries_per_scope (int): The max number of prompts indexed for each
+                scope, the oldest entries are removed when exceeding.
+            system_app (Optional[SystemApp]): The system app.
+        """
+        if not 0 < similarity_threshold <= 1:
+            raise ValueError("similarity_threshold must be in (0, 1]")
+        self._storage = storage
+        self._embeddings = embeddings
+        self._system_app = system_app
+        self._similarity_threshold = similarity_threshold
+        self._max_entries_per_scope = max_entries_per_scope
+        self._indexes: Dict[Tuple, _VectorIndex] = {}
+        # Recent embeddings of the prompts, avoid embedding the same prompt twice in
+        # the get-then-set flow of the cache operators.
+        self._recent_embeddings: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._max_recent_embeddings = 256
+        self._lock = threading.Lock()
+        self._exact_hits = 0
+        self._similar_hits = 0
+        self._misses = 0
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """Return the embeddings to embed the prompts."""
+        if self._embeddings is None:
+            if not self._system_app:
+                raise ValueError("embeddings or system_app must be provided")
+            from dbgpt.rag.embedding.embedding_factory import EmbeddingFactory
+
+            self._embeddings = EmbeddingFactory.get_instance(self._system_app).create()
+        return self._embeddings
+
+    def check_config(
+        self,
+        cache_config: Optional[CacheConfig] = None,
+        raise_error: Optional[bool] = True,
+    ) -> bool:
+        """Check whether the CacheConfig is legal."""
+        return True
+
+    def get(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> Optional[StorageItem]:
+        """Retrieve a storage item from the cache using the provided key.
+
+        The exact match is tried first, then the similarity match unless the retrieval
+        policy of ``cache_config`` is ``EXACT_MATCH``.
+        """
+        item = self._storage.get(key, _to_exact_config(cache_config))
+        if item:
+            self._record(exact_hit=True)
+            return item
+        if (
+            cache_config
+            and cache_config.retrieval_policy == RetrievalPolicy.EXACT_MATCH
+        ):
+            self._record()
+            return None
+        parsed = _parse_key(key)
+        if not parsed:
+            self._record()
+            return None
+        prompt, scope = parsed
+        vector = self._embed(key, prompt)
+        while True:
+            with self._lock:
+                index = self._indexes.get(scope)
+                result = index.search(vector) if index else None
+                if not result or result[1] < self._similarity_threshold:
+                    break
+                idx, score = result
+                similar_key = index.get_key(idx)
+            item = self._storage.get(similar_key, _to_exact_config(cache_config))
+            if item:
+                logger.debug(
+                    f"Semantic cache hit, score: {score}, key: {key}, similar key: "
+                    f"{similar_key}"
+                )
+                self._record(similar_hit=True)
+                return item
+            # The value has been evicted from the backend storage
+            with self._lock:
+                if idx < len(index) and index.get_key(idx) is similar_key:
+                    index.remove(idx)
+        self._record()
+        return None
+
+    def set(
+        self,
+        key: CacheKey[K],
+        value: CacheValue[V],
+        cache_config: Optional[CacheConfig] = None,
+    ) -> None:
+        """Set a value in the cache for the provided key, and index its prompt."""
+        self._storage.set(key, value, _to_exact_config(cache_config))
+        parsed = _parse_key(key)
+        if not parsed:
+            return
+        prompt, scope = parsed
+        vector = self._embed(key, prompt)
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is None:
+                index = _VectorIndex(vector.shape[0])
+                self._indexes[scope] = index
+            result = index.search(vector)
+            if result and result[1] >= 1.0 - 1e-6 and index.get_key(result[0]) == key:
+                # Already indexed
+                return
+            if len(index) >= self._max_entries_per_scope:
+                index.remove_oldest()
+            index.add(vector, key)
+
+    def exists(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> bool:
+        """Check if the key exists in the cache."""
+        return self.get(key, cache_config) is not None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return the hit-rate metrics of the cache.
+
+        Returns:
+            Dict[str, Any]: The number of exact hits, similar hits, misses, the hit
+                rate and the number of indexed prompts.
+        """
+        with self._lock:
+            total = self._exact_hits + self._similar_hits + self._misses
+            hits = self._exact_hits + self._similar_hits
+            return {
+                "exact_hits": self._exact_hits,
+                "similar_hits": self._similar_hits,
+                "misses": self._misses,
+                "hit_rate": hits / total if total else 0.0,
+                "indexed_prompts": sum(len(i) for i in self._indexes.values()),
+            }
+
+    def _record(self, exact_hit: bool = False, similar_hit: bool = False) -> None:
+        with self._lock:
+            if exact_hit:
+                self._exact_hits += 1
+            elif similar_hit:
+                self._similar_hits += 1
+            else:
+                self._misses += 1
+
+    def _embed(self, key: CacheKey, prompt: str) -> np.ndarray:
+        key_hash = key.get_hash_bytes()
+        with self._lock:
+            vector = self._recent_embeddings.get(key_hash)
+            if vector is not None:
+                self._recent_embeddings.move_to_end(key_hash)
+                return vector
+        vector = np.asarray(self.embeddings.embed_query(prompt), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        with self._lock:
+            self._recent_embeddings[key_hash] = vector
+            if len(self._recent_embeddings) > self._max_recent_embeddings:
+                self._recent_embeddings.popitem(last=False)
+        return vector
+
+
+def _to_exact_config(cache_config: Optional[CacheConfig]) -> Optional[CacheConfig]:
+    """Return the cache config for the backend storage."""
+    if not cache_config:
+        return None
+    return CacheConfig(
+        retrieval_policy=RetrievalPolicy.EXACT_MATCH,
+        cache_policy=cache_config.cache_policy or CachePolicy.LRU,
+    )
+
+
+def _parse_key(key: CacheKey) -> Optional[Tuple[str, Tuple]]:
+    """Parse the prompt and the scope from the cache key.
+
+    Returns:
+        Optional[Tuple[str, Tuple]]: The prompt and the scope, None if the key has no
+            prompt.
+    """
+    key_dict = key.to_dict()
+    prompt = key_dict.get(_PROMPT_FIELD)
+    if not prompt or not isinstance(prompt, str):
+        return None
+    scope = tuple(
+        sorted((k, str(v)) for k, v in key_dict.items() if k != _PROMPT_FIELD)
+    )
+    return prompt, scope
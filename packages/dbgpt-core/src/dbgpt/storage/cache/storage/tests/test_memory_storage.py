@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from dbgpt.core.interface.cache import CacheConfig, CachePolicy, RetrievalPolicy
+from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+from ...llm_cache import LLMCacheKey, LLMCacheValue
+from ..base import MemoryCacheStorage
+from ..memory import memory_storage
+from ..memory.memory_storage import ShardedMemoryCacheStorage
+
+
+def _key(prompt: str):
+    key = LLMCacheKey(prompt=prompt, model_name="model")
+    key.set_serializer(JsonSerializer())
+    return key
+
+
+def _value(text: str):
+    value = LLMCacheValue(output={"text": text, "error_code": 0})
+    value.set_serializer(JsonSerializer())
+    return value
+
+
+def _storage(entries: int, **kwargs) -> ShardedMemoryCacheStorage:
+    """Create a storage of one shard which holds the number of entries."""
+    storage = ShardedMemoryCacheStorage(num_shards=1, **kwargs)
+    key = _key("p0")
+    entry_size = (
+        len(key.get_hash_bytes())
+        + len(key.serialize())
+        + len(_value("v0").serialize())
+        + memory_storage._ENTRY_OVERHEAD
+    )
+    storage._shards[0].max_bytes = entry_size * entries
+    return storage
+
+
+def test_get_set():
+    storage = ShardedMemoryCacheStorage(max_memory_mb=1)
+    assert storage.get(_key("p0")) is None
+    storage.set(_key("p0"), _value("v0"))
+    item = storage.get(_key("p0"))
+    assert item.value_data == _value("v0").serialize()
+    assert (
+        item.length
+        == len(item.key_hash)
+        + len(item.key_data)
+        + len(item.value_data)
+        + memory_storage._ENTRY_OVERHEAD
+    )
+    assert storage.exists(_key("p0"))
+    assert storage.delete(_key("p0"))
+    assert not storage.exists(_key("p0"))
+
+    metrics = storage.get_metrics()
+    assert metrics["hits"] == 2
+    assert metrics["misses"] == 2
+    assert metrics["items"] == 0
+    assert metrics["hit_rate"] == 0.5
+
+    with pytest.raises(ValueError):
+        storage.get(
+            _key("p0"),
+            CacheConfig(retrieval_policy=RetrievalPolicy.SIMILARITY_MATCH),
+        )
+
+
+@pytest.mark.parametrize(
+    "policy, evicted",
+    [
+        (CachePolicy.LRU, "p1"),
+        (CachePolicy.FIFO, "p0"),
+        (CachePolicy.LFU, "p2"),
+    ],
+)
+def test_eviction(policy, evicted):
+    storage = _storage(3, cache_policy=policy)
+    for i in range(3):
+        storage.set(_key(f"p{i}"), _value(f"v{i}"))
+    # p1 is the least recently used one and p2 the least frequently used one
+    for prompt in ["p1", "p1", "p0", "p0", "p2"]:
+        assert storage.get(_key(prompt)) is not None
+    storage.set(_key("p3"), _value("v3"))
+    entries = storage._shards[0].entries
+    cached = {f"p{i}" for i in range(4) if _key(f"p{i}").get_hash_bytes() in entries}
+    assert cached == {"p0", "p1", "p2", "p3"} - {evicted}
+    assert storage.get_metrics()["evictions"] == 1
+
+
+def test_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(memory_storage.time, "monotonic", lambda: now[0])
+    storage = ShardedMemoryCacheStorage(max_memory_mb=1, ttl=10)
+    storage.set(_key("p0"), _value("v0"))
+    now[0] += 5
+    assert storage.get(_key("p0")) is not None
+    now[0] += 5
+    assert storage.get(_key("p0")) is None
+    metrics = storage.get_metrics()
+    assert metrics["expirations"] == 1
+    assert metrics["items"] == 0
+    assert metrics["size_bytes"] == 0
+
+
+def test_oversized_entry():
+    storage = _storage(1)
+    storage.set(_key("p0"), _value("v" * 1000))
+    assert storage.get(_key("p0")) is None
+
+
+def test_concurrent_access():
+    storage = ShardedMemoryCacheStorage(max_memory_mb=1, num_shards=4)
+    errors = []
+
+    def worker(num: int):
+        try:
+            for i in range(200):
+                storage.set(_key(f"p{(num * 7 + i) % 50}"), _value(f"v{i}"))
+                storage.get(_key(f"p{i % 50}"))
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    metrics = storage.get_metrics()
+    assert metrics["items"] == 50
+    assert metrics["hits"] + metrics["misses"] == 1600
+    assert metrics["size_bytes"] == sum(
+        e.size for s in storage._shards for e in s.entries.values()
+    )
+
+
+def test_memory_storage_eviction():
+    storage = MemoryCacheStorage(max_memory_mb=1)
+    storage.set(_key("p0"), _value("v0"))
+    storage.set(_key("p1"), _value("v1"))
+    item_size = storage.cache[hash(_key("p0"))].length
+    storage.max_memory = storage.current_memory_usage + item_size // 2
+    storage.get(_key("p0"))
+    storage.set(_key("p2"), _value("v2"))
+    # The least recently used one is evicted
+    assert storage.get(_key("p1")) is None
+    assert storage.get(_key("p0")) is not None
+    assert storage.current_memory_usage == sum(i.length for i in storage.cache.values())
@@ -0,0 +1,130 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from dbgpt.core import Embeddings
+from dbgpt.core.interface.cache import CacheConfig, RetrievalPolicy
+from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+from ...llm_cache import LLMCacheKey, LLMCacheValue
+from ...manager import LocalCacheManager
+from ..base import MemoryCacheStorage
+from ..semantic.semantic_storage import SemanticCacheStorage, _VectorIndex
+
+_VOCAB = ["what", "is", "the", "weather", "today", "how", "python", "sort", "list"]
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        words = text.lower().replace("?", "").split()
+        return [float(words.count(w)) for w in _VOCAB] + [0.01]
+
+
+def _key(prompt: str, model_name: str = "model", temperature: float = 0.7):
+    key = LLMCacheKey(prompt=prompt, model_name=model_name, temperature=temperature)
+    key.set_serializer(JsonSerializer())
+    return key
+
+
+def _value(text: str):
+    value = LLMCacheValue(output={"text": text, "error_code": 0})
+    value.set_serializer(JsonSerializer())
+    return value
+
+
+@pytest.fixture
+def embeddings():
+    return BagOfWordsEmbeddings()
+
+
+@pytest.fixture
+def storage(embeddings):
+    return SemanticCacheStorage(
+        MemoryCacheStorage(), embeddings=embeddings, similarity_threshold=0.9
+    )
+
+
+def test_exact_hit(storage: SemanticCacheStorage):
+    key = _key("what is the weather today")
+    storage.set(key, _value("sunny"))
+    item = storage.get(_key("what is the weather today"))
+    assert item is not None
+    assert storage.get_metrics()["exact_hits"] == 1
+
+
+def test_similar_hit(storage: SemanticCacheStorage):
+    storage.set(_key("what is the weather today"), _value("sunny"))
+    item = storage.get(_key("what is the weather today?"))
+    assert item is not None
+    assert item.value_data == _value("sunny").serialize()
+    metrics = storage.get_metrics()
+    assert metrics["similar_hits"] == 1
+    assert metrics["hit_rate"] == 1.0
+
+
+def test_similar_miss(storage: SemanticCacheStorage):
+    storage.set(_key("what is the weather today"), _value("sunny"))
+    assert storage.get(_key("how to sort a python list")) is None
+    assert storage.get_metrics()["misses"] == 1
+
+
+def test_scope_by_model_and_params(storage: SemanticCacheStorage):
+    storage.set(_key("what is the weather today"), _value("sunny"))
+    assert storage.get(_key("what is the weather today?", model_name="other")) is None
+    assert storage.get(_key("what is the weather today?", temperature=0.1)) is None
+
+
+def test_exact_match_policy(storage: SemanticCacheStorage):
+    storage.set(_key("what is the weather today"), _value("sunny"))
+    config = CacheConfig(retrieval_policy=RetrievalPolicy.EXACT_MATCH)
+    assert storage.get(_key("what is the weather today?"), config) is None
+
+
+def test_reuse_recent_embedding(storage: SemanticCacheStorage, embeddings):
+    key = _key("what is the weather today")
+    assert storage.get(key) is None
+    storage.set(key, _value("sunny"))
+    assert embeddings.calls == 1
+
+
+def test_max_entries_per_scope(embeddings):
+    storage = SemanticCacheStorage(
+        MemoryCacheStorage(), embeddings=embeddings, max_entries_per_scope=1
+    )
+    storage.set(_key("what is the weather today"), _value("sunny"))
+    storage.set(_key("how to sort a python list"), _value("sorted"))
+    assert storage.get_metrics()["indexed_prompts"] == 1
+
+
+def test_remove_keeps_insertion_order():
+    index = _VectorIndex(dim=4, initial_capacity=2)
+    vectors = np.eye(4, dtype=np.float32)
+    for i, key in enumerate(["a", "b", "c", "d"]):
+        index.add(vectors[i], key)
+    index.remove(0)
+    # The oldest entry left is evicted, not the newest one
+    index.remove_oldest()
+    assert [index.get_key(i) for i in range(len(index))] == ["c", "d"]
+    assert index.search(vectors[3]) == (1, 1.0)
+    assert index.search(vectors[2]) == (0, 1.0)
+
+
+def test_cache_manager_metrics(storage: SemanticCacheStorage):
+    manager = LocalCacheManager(None, JsonSerializer(), storage)
+    storage.set(_key("what is the weather today"), _value("sunny"))
+    storage.get(_key("what is the weather today?"))
+    storage.get(_key("how to sort a python list"))
+    metrics = manager.get_metrics()
+    assert metrics["similar_hits"] == 1
+    assert metrics["misses"] == 1
+
+    memory_manager = LocalCacheManager(None, JsonSerializer(), MemoryCacheStorage())
+    assert memory_manager.get_metrics() == {}
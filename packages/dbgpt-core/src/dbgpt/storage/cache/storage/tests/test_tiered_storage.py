@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Optional
+
+from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+from ...llm_cache import LLMCacheKey, LLMCacheValue
+from ...protocol.kv_store import LocalKVStoreClient
+from ..base import MemoryCacheStorage
+from ..memory.memory_storage import ShardedMemoryCacheStorage
+from ..tiered.tiered_storage import (
+    RemoteCacheStorage,
+    TieredCacheStorage,
+    _RawCacheValue,
+)
+
+
+def _key(prompt: str):
+    key = LLMCacheKey(prompt=prompt, model_name="model")
+    key.set_serializer(JsonSerializer())
+    return key
+
+
+def _value(text: str):
+    value = LLMCacheValue(output={"text": text, "error_code": 0})
+    value.set_serializer(JsonSerializer())
+    return value
+
+
+class _BlockingKVStoreClient(LocalKVStoreClient):
+    """Block the writes until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.release.wait(5)
+        super().set(key, value, ttl)
+
+
+class _FailingKVStoreClient(LocalKVStoreClient):
+    def get(self, key: str) -> Optional[bytes]:
+        raise ConnectionError("remote cache is down")
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        raise ConnectionError("remote cache is down")
+
+
+def test_remote_tier_shared_by_replicas():
+    remote = LocalKVStoreClient()
+    replica1 = TieredCacheStorage(
+        [ShardedMemoryCacheStorage(), RemoteCacheStorage(remote)], write_behind=False
+    )
+    replica2 = TieredCacheStorage(
+        [ShardedMemoryCacheStorage(), MemoryCacheStorage(), RemoteCacheStorage(remote)],
+        write_behind=False,
+    )
+    replica1.set(_key("p0"), _value("v0"))
+    item = replica2.get(_key("p0"))
+    assert item.value_data == _value("v0").serialize()
+    # Read through to the faster tiers
+    assert replica2.get_metrics()["promotions"] == 1
+    assert replica2._tiers[0].get(_key("p0")) is not None
+    assert replica2._tiers[1].get(_key("p0")) is not None
+    assert replica2.get(_key("p0")) is not None
+    assert replica2.get_metrics()["promotions"] == 1
+    assert replica2.get(_key("p1")) is None
+
+
+def test_write_behind():
+    remote = _BlockingKVStoreClient()
+    storage = TieredCacheStorage(
+        [ShardedMemoryCacheStorage(), RemoteCacheStorage(remote)],
+        max_pending_writes=2,
+    )
+    remote_storage = RemoteCacheStorage(remote)
+    storage.set(_key("p0"), _value("v0"))
+    # Wait for the background writer to take the first write
+    while storage.get_metrics()["pending_writes"]:
+        time.sleep(0.01)
+    for i in range(1, 4):
+        storage.set(_key(f"p{i}"), _value(f"v{i}"))
+    # The first tier is written at once, the remote one is written later
+    assert all(storage.get(_key(f"p{i}")) for i in range(4))
+    assert remote_storage.get(_key("p0")) is None
+    remote.release.set()
+    storage.flush()
+    metrics = storage.get_metrics()
+    assert metrics["pending_writes"] == 0
+    # One write is running and two are pending, the last one is dropped
+    assert metrics["dropped_writes"] == 1
+    assert sum(remote_storage.get(_key(f"p{i}")) is not None for i in range(4)) == 3
+
+
+def test_remote_failure_is_a_miss():
+    storage = TieredCacheStorage(
+        [ShardedMemoryCacheStorage(), RemoteCacheStorage(_FailingKVStoreClient())],
+        write_behind=False,
+    )
+    assert storage.get(_key("p0")) is None
+    storage.set(_key("p0"), _value("v0"))
+    assert storage.get(_key("p0")) is not None
+
+
+def test_remote_ttl(monkeypatch):
+    from ...protocol import kv_store
+
+    now = [100.0]
+    monkeypatch.setattr(kv_store.time, "monotonic", lambda: now[0])
+    storage = RemoteCacheStorage(LocalKVStoreClient(), ttl=10)
+    storage.set(_key("p0"), _value("v0"))
+    assert storage.get(_key("p0")) is not None
+    now[0] += 10
+    assert storage.get(_key("p0")) is None
+
+
+def test_raw_cache_value():
+    value = _RawCacheValue(b"serialized")
+    assert value.get_value() == b"serialized"
+    assert value.serialize() == b"serialized"
+    assert value.to_dict() == {"value": b"serialized"}
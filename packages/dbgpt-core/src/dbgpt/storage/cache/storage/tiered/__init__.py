@@ -0,0 +1 @@
+"""Tiered cache storage implementation."""
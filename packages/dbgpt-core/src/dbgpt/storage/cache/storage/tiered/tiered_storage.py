@@ -0,0 +1,267 @@
+"""Tiered cache storage.
+
+A tiered cache looks up the tiers from the fastest to the slowest one, e.g. an
+in-process memory tier, a local disk tier and a remote tier shared by all the
+webserver replicas. An item found in a slower tier is copied to the faster ones
+(read-through). The writes go to the first tier at once, and to the other tiers at
+once (write-through) or in a background thread (write-behind).
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from dbgpt.core.interface.cache import (
+    CacheConfig,
+    CacheKey,
+    CacheValue,
+    K,
+    RetrievalPolicy,
+    V,
+)
+
+from ...protocol.kv_store import KVStoreClient
+from ..base import CacheStorage, StorageItem
+
+logger = logging.getLogger(__name__)
+
+_PendingWrite = Tuple[CacheStorage, CacheKey, CacheValue, Optional[CacheConfig]]
+
+
+class _RawCacheValue(CacheValue[bytes]):
+    """A cache value of the serialized bytes.
+
+    The value is serialized once and copied to all the tiers.
+    """
+
+    def __init__(self, value_data: bytes):
+        super().__init__()
+        self._value_data = value_data
+
+    def to_dict(self) -> Dict:
+        return {"value": self._value_data}
+
+    def get_value(self) -> bytes:
+        return self._value_data
+
+    def serialize(self) -> bytes:
+        return self._value_data
+
+
+class RemoteCacheStorage(CacheStorage):
+    """A cache storage over a key-value store shared by the replicas.
+
+    The errors of the key-value store are logged and treated as cache misses, so an
+    outage of the remote store does not break the model requests.
+    """
+
+    def __init__(
+        self,
+        client: KVStoreClient,
+        ttl: Optional[float] = None,
+        key_prefix: str = "dbgpt:model_cache:",
+    ):
+        """Create a new RemoteCacheStorage.
+
+        Args:
+            client (KVStoreClient): The client of the key-value store.
+            ttl (Optional[float]): The seconds an item is kept, forever if None.
+            key_prefix (str): The prefix of the keys in the key-value store.
+        """
+        self._client = client
+        self._ttl = ttl
+        self._key_prefix = key_prefix
+
+    def check_config(
+        self,
+        cache_config: Optional[CacheConfig] = None,
+        raise_error: Optional[bool] = True,
+    ) -> bool:
+        """Check whether the CacheConfig is legal."""
+        if (
+            cache_config
+            and cache_config.retrieval_policy != RetrievalPolicy.EXACT_MATCH
+        ):
+            if raise_error:
+                raise ValueError(
+                    "RemoteCacheStorage only supports 'EXACT_MATCH' retrieval policy"
+                )
+            return False
+        return True
+
+    def _store_key(self, key_hash: bytes) -> str:
+        return self._key_prefix + key_hash.hex()
+
+    def get(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> Optional[StorageItem]:
+        """Retrieve a storage item from the cache using the provided key."""
+        self.check_config(cache_config, raise_error=True)
+        try:
+            data = self._client.get(self._store_key(key.get_hash_bytes()))
+            return StorageItem.deserialize(data) if data else None
+        except Exception as e:
+            logger.warning(f"Failed to get from the remote cache: {e}")
+            return None
+
+    def set(
+        self,
+        key: CacheKey[K],
+        value: CacheValue[V],
+        cache_config: Optional[CacheConfig] = None,
+    ) -> None:
+        """Set a value in the cache for the provided key."""
+        key_hash = key.get_hash_bytes()
+        key_data = key.serialize()
+        value_data = value.serialize()
+        item = StorageItem(
+            length=len(key_hash) + len(key_data) + len(value_data),
+            key_hash=key_hash,
+            key_data=key_data,
+            value_data=value_data,
+        )
+        try:
+            self._client.set(self._store_key(key_hash), item.serialize(), self._ttl)
+        except Exception as e:
+            logger.warning(f"Failed to set to the remote cache: {e}")
+
+
+class TieredCacheStorage(CacheStorage):
+    """A cache storage of several tiers, from the fastest to the slowest one."""
+
+    def __init__(
+        self,
+        tiers: List[CacheStorage],
+        write_behind: bool = True,
+        max_pending_writes: int = 1024,
+    ):
+        """Create a new TieredCacheStorage.
+
+        Args:
+            tiers (List[CacheStorage]): The tiers, from the fastest to the slowest.
+            write_behind (bool): Whether to write the tiers except the first one in a
+                background thread. The writes are dropped when there are too many
+                pending writes.
+            max_pending_writes (int): The max number of the pending writes.
+        """
+        if not tiers:
+            raise ValueError("TieredCacheStorage needs at least one tier")
+        self._tiers = tiers
+        self._write_behind = write_behind
+        self._pending: "queue.Queue[_PendingWrite]" = queue.Queue(
+            maxsize=max_pending_writes
+        )
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._promotions = 0
+        self._dropped_writes = 0
+
+    def check_config(
+        self,
+        cache_config: Optional[CacheConfig] = None,
+        raise_error: Optional[bool] = True,
+    ) -> bool:
+        """Check whether the CacheConfig is legal for all the tiers."""
+        return all(tier.check_config(cache_config, raise_error) for tier in self._tiers)
+
+    def get(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> Optional[StorageItem]:
+        """Retrieve a storage item from the fastest tier which has it."""
+        for i, tier in enumerate(self._tiers):
+            item = tier.get(key, cache_config)
+            if item is None:
+                continue
+            if i > 0:
+                self._promotions += 1
+                value = _RawCacheValue(item.value_data)
+                self._write(self._tiers[0], key, value, cache_config, behind=False)
+                for upper in self._tiers[1:i]:
+                    self._write(upper, key, value, cache_config)
+            return item
+        return None
+
+    def set(
+        self,
+        key: CacheKey[K],
+        value: CacheValue[V],
+        cache_config: Optional[CacheConfig] = None,
+    ) -> None:
+        """Set a value to all the tiers."""
+        raw_value = _RawCacheValue(value.serialize())
+        self._write(self._tiers[0], key, raw_value, cache_config, behind=False)
+        for tier in self._tiers[1:]:
+            self._write(tier, key, raw_value, cache_config)
+
+    def exists(
+        self, key: CacheKey[K], cache_config: Optional[CacheConfig] = None
+    ) -> bool:
+        """Check if the key exists in the cache."""
+        return self.get(key, cache_config) is not None
+
+    def flush(self) -> None:
+        """Wait for all the pending writes."""
+        self._pending.join()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return the metrics of the tiers.
+
+        Returns:
+            Dict[str, Any]: The number of the items copied from the slower tiers, the
+                pending and the dropped writes, and the metrics of the tiers which
+                have them.
+        """
+        metrics: Dict[str, Any] = {
+            "promotions": self._promotions,
+            "pending_writes": self._pending.qsize(),
+            "dropped_writes": self._dropped_writes,
+        }
+        for i, tier in enumerate(self._tiers):
+            get_metrics = getattr(tier, "get_metrics", None)
+            if callable(get_metrics):
+                metrics[f"tier_{i}"] = get_metrics()
+        return metrics
+
+    def _write(
+        self,
+        tier: CacheStorage,
+        key: CacheKey,
+        value: CacheValue,
+        cache_config: Optional[CacheConfig],
+        behind: Optional[bool] = None,
+    ):
+        if behind is None:
+            behind = self._write_behind
+        if not behind:
+            try:
+                tier.set(key, value, cache_config)
+            except Exception as e:
+                logger.warning(f"Failed to write the cache tier {tier}: {e}")
+            return
+        self._ensure_worker()
+        try:
+            self._pending.put_nowait((tier, key, value, cache_config))
+        except queue.Full:
+            self._dropped_writes += 1
+            logger.debug("Too many pending cache writes, drop the write")
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run_worker, name="cache_write_behind", daemon=True
+                )
+                self._worker.start()
+
+    def _run_worker(self):
+        while True:
+            tier, key, value, cache_config = self._pending.get()
+            try:
+                tier.set(key, value, cache_config)
+            except Exception as e:
+                logger.warning(f"Failed to write the cache tier {tier}: {e}")
+            finally:
+                self._pending.task_done()
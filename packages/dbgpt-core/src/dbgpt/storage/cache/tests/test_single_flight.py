@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+
+from dbgpt.core import ModelOutput, ModelRequest, ModelRequestContext
+from dbgpt.core.awel import (
+    DAG,
+    BranchJoinOperator,
+    InputOperator,
+    MapOperator,
+    SimpleCallDataInputSource,
+)
+from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+from ..llm_cache import LLMCacheClient
+from ..manager import LocalCacheManager
+from ..operators import (
+    CachedModelOperator,
+    ModelCacheBranchOperator,
+    ModelSaveCacheOperator,
+    _parse_cache_key_dict,
+)
+from ..single_flight import SingleFlight
+from ..storage.memory.memory_storage import ShardedMemoryCacheStorage
+
+
+def _request(prompt: str = "hello") -> ModelRequest:
+    return ModelRequest.build_request(
+        "model",
+        [{"role": "human", "content": prompt}],
+        context=ModelRequestContext(cache_enable=True),
+    )
+
+
+def _cache_manager() -> LocalCacheManager:
+    return LocalCacheManager(
+        None, serializer=JsonSerializer(), storage=ShardedMemoryCacheStorage()
+    )
+
+
+class _ModelOperator(MapOperator[ModelRequest, ModelOutput]):
+    def __init__(self, failures: int = 0, error_outputs: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+        self._failures = failures
+        self._error_outputs = error_outputs
+
+    async def map(self, input_value: ModelRequest) -> ModelOutput:
+        self.calls += 1
+        num = self.calls
+        await asyncio.sleep(0.1)
+        if num <= self._failures:
+            raise ConnectionError("model is down")
+        if num <= self._failures + self._error_outputs:
+            return ModelOutput(text="model error", error_code=1)
+        return ModelOutput(text=f"answer {num}", error_code=0)
+
+
+def _build_dag(cache_manager: LocalCacheManager, **kwargs):
+    with DAG("test_single_flight"):
+        input_task = InputOperator(SimpleCallDataInputSource())
+        llm_task = _ModelOperator(task_name="llm_model_node", **kwargs)
+        cache_task = CachedModelOperator(
+            cache_manager, task_name="llm_model_cache_node"
+        )
+        branch_task = ModelCacheBranchOperator(
+            cache_manager,
+            model_task_name="llm_model_node",
+            cache_task_name="llm_model_cache_node",
+        )
+        join_task = BranchJoinOperator()
+        input_task >> branch_task
+        branch_task >> llm_task >> ModelSaveCacheOperator(cache_manager) >> join_task
+        branch_task >> cache_task >> join_task
+    return llm_task, join_task
+
+
+@pytest.mark.asyncio
+async def test_single_flight_wait():
+    flight = SingleFlight(timeout=1)
+    client = LLMCacheClient(_cache_manager())
+    key = client.new_key(**_parse_cache_key_dict(_request()))
+    assert not await flight.wait(key)
+    assert flight.acquire(key)
+    assert not flight.acquire(key)
+
+    async def release():
+        await asyncio.sleep(0.05)
+        flight.release(key)
+
+    asyncio.create_task(release())
+    assert await flight.wait(key)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_stale_leader():
+    flight = SingleFlight(timeout=0.05)
+    client = LLMCacheClient(_cache_manager())
+    key = client.new_key(**_parse_cache_key_dict(_request()))
+    assert flight.acquire(key)
+    # The leader never releases the key
+    assert await flight.wait(key)
+    assert flight.acquire(key)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_release_by_owner():
+    flight = SingleFlight()
+    client = LLMCacheClient(_cache_manager())
+    key = client.new_key(**_parse_cache_key_dict(_request()))
+    first, second = object(), object()
+    assert flight.acquire(key, first)
+    flight.release(key, first)
+    assert flight.acquire(key, second)
+    # A late release of the first leader keeps the flight of the second one
+    flight.release(key, first)
+    assert len(flight) == 1
+    flight.release(key, second)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_coalesce_identical_requests():
+    cache_manager = _cache_manager()
+    llm_task, join_task = _build_dag(cache_manager)
+
+    outputs = await asyncio.gather(
+        *[join_task.call(call_data=_request()) for _i in range(4)],
+        join_task.call(call_data=_request("other")),
+    )
+    # One model call for each prompt
+    assert llm_task.calls == 2
+    texts = [out.text for out in outputs]
+    assert len(set(texts[:4])) == 1
+    assert texts[4] != texts[0]
+    assert len(cache_manager.single_flight) == 0
+
+    output = await join_task.call(call_data=_request())
+    assert output.text == texts[0]
+    assert llm_task.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_leader_model_failed():
+    cache_manager = _cache_manager()
+    llm_task, join_task = _build_dag(cache_manager, failures=1)
+
+    outputs = await asyncio.gather(
+        *[join_task.call(call_data=_request()) for _i in range(4)],
+        return_exceptions=True,
+    )
+    # The leader failed, one of the waiters calls the model for the others
+    assert isinstance(outputs[0], ConnectionError)
+    assert [out.text for out in outputs[1:]] == ["answer 2"] * 3
+    assert llm_task.calls == 2
+    assert len(cache_manager.single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_leader_model_error_output():
+    cache_manager = _cache_manager()
+    llm_task, join_task = _build_dag(cache_manager, error_outputs=1)
+
+    outputs = await asyncio.gather(
+        *[join_task.call(call_data=_request()) for _i in range(4)]
+    )
+    # The error output is not cached, one of the waiters calls the model again
+    assert [out.text for out in outputs] == ["model error"] + ["answer 2"] * 3
+    assert llm_task.calls == 2
+    assert len(cache_manager.single_flight) == 0
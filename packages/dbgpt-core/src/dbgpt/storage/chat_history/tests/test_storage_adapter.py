@@ -164,6 +164,41 @@ def test_save_and_load(
     assert saved_conversation.messages[1].round_index == 1
 
 
+def test_load_messages_with_one_query(
+    conversation: StorageConversation, conv_storage, message_storage
+):
+    from sqlalchemy import event
+
+    for i in range(20):
+        conversation.start_new_round()
+        conversation.add_user_message(f"hello {i}")
+        conversation.add_ai_message(f"hi {i}")
+        conversation.end_current_round()
+
+    statements = []
+    engine = message_storage.db_manager.engine
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        saved_conversation = StorageConversation(
+            conv_uid=conversation.conv_uid,
+            conv_storage=conv_storage,
+            message_storage=message_storage,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+    assert [m.content for m in saved_conversation.messages[-2:]] == [
+        "hello 19",
+        "hi 19",
+    ]
+    assert len(saved_conversation.messages) == 40
+    # One query for the conversation and one for all its messages
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 2
+
+
 def test_query_message(
     conversation: StorageConversation, conv_storage, message_storage
 ):
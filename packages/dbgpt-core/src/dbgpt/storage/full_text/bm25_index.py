@@ -0,0 +1,466 @@
+"""Local BM25 index.
+
+An in-process inverted index scored by Okapi BM25, it gives the keyword recall of
+the vector stores which do not support the full text search, without an extra
+service like Elasticsearch.
+
+The index is kept in memory and persisted in an append-only log, which is rewritten
+when the deleted documents dominate it.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from heapq import nlargest
+from typing import Any, Callable, Dict, List, Optional
+
+from dbgpt.core import Chunk
+from dbgpt.storage.vector_store.base import VectorStoreBase, VectorStoreConfig
+from dbgpt.storage.vector_store.filters import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+)
+
+logger = logging.getLogger(__name__)
+
+Tokenizer = Callable[[str], List[str]]
+
+_WORD_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+_CJK_PATTERN = re.compile(
+    r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+"
+)
+_LOG_FILE_NAME = "bm25_index.jsonl"
+# Rewrite the log when it has so many more records than the documents
+_LOG_REWRITE_RATIO = 2
+
+
+def default_tokenizer(text: str) -> List[str]:
+    """Split the text into the lowercase words.
+
+    The CJK texts have no spaces between the words, they are split into the
+    characters and the bigrams of the characters.
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        last = 0
+        for match in _CJK_PATTERN.finditer(word):
+            if match.start() > last:
+                tokens.append(word[last : match.start()])
+            chars = match.group()
+            tokens.extend(chars)
+            tokens.extend(chars[i : i + 2] for i in range(len(chars) - 1))
+            last = match.end()
+        if last < len(word):
+            tokens.append(word[last:])
+    return tokens
+
+
+def jieba_tokenizer(text: str) -> List[str]:
+    """Split the text into the words by jieba."""
+    try:
+        import jieba
+    except ImportError:
+        raise ImportError("Please install jieba first: `pip install jieba`")
+    return [
+        token.lower()
+        for token in jieba.lcut_for_search(text)
+        if _WORD_PATTERN.search(token)
+    ]
+
+
+_TOKENIZERS: Dict[str, Tokenizer] = {
+    "default": default_tokenizer,
+    "jieba": jieba_tokenizer,
+}
+
+
+def get_tokenizer(name: str) -> Tokenizer:
+    """Return the tokenizer by name."""
+    if name not in _TOKENIZERS:
+        raise ValueError(
+            f"Unsupported tokenizer {name}, supported: {list(_TOKENIZERS.keys())}"
+        )
+    return _TOKENIZERS[name]
+
+
+@dataclass
+class _Document:
+    content: str
+    metadata: Dict[str, Any]
+    term_freqs: Dict[str, int]
+    length: int
+
+
+class BM25Index:
+    """Local inverted index scored by Okapi BM25."""
+
+    def __init__(
+        self,
+        persist_dir: Optional[str] = None,
+        tokenizer: Optional[Tokenizer] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        """Create a BM25Index.
+
+        Args:
+            persist_dir (Optional[str]): The directory to persist the index, the
+                index is only kept in memory if not set.
+            tokenizer (Optional[Tokenizer]): The tokenizer of the documents and the
+                queries, default_tokenizer if not set.
+            k1 (float): Controls the term frequency saturation.
+            b (float): Controls to what degree the document length normalizes the
+                term frequency.
+        """
+        self._persist_dir = persist_dir
+        self._tokenizer = tokenizer or default_tokenizer
+        self._k1 = k1
+        self._b = b
+        self._docs: Dict[str, _Document] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._log_records = 0
+        self._lock = threading.RLock()
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+            self._load()
+
+    @property
+    def _log_path(self) -> str:
+        return os.path.join(self._persist_dir, _LOG_FILE_NAME)
+
+    def __len__(self) -> int:
+        """Return the number of the documents."""
+        return len(self._docs)
+
+    def _load(self):
+        if not os.path.exists(self._log_path):
+            return
+        with open(self._log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last record may be partially written
+                    logger.warning(f"Skip the broken record of {self._log_path}")
+                    break
+                if record["op"] == "add":
+                    self._add(
+                        record["id"],
+                        _Document(
+                            content=record["content"],
+                            metadata=record["metadata"],
+                            term_freqs=record["term_freqs"],
+                            length=record["length"],
+                        ),
+                    )
+                else:
+                    self._delete(record["id"])
+                self._log_records += 1
+
+    def _append_log(self, records: List[Dict[str, Any]]):
+        if not self._persist_dir or not records:
+            return
+        with open(self._log_path, "a", encoding="utf-8") as f:
+            f.writelines(
+                json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records
+            )
+        self._log_records += len(records)
+        if self._log_records > max(len(self._docs), 1000) * _LOG_REWRITE_RATIO:
+            self._rewrite_log()
+
+    def _rewrite_log(self):
+        tmp_path = self._log_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for doc_id, doc in self._docs.items():
+                f.write(
+                    json.dumps(
+                        _add_record(doc_id, doc), ensure_ascii=False, default=str
+                    )
+                )
+                f.write("\n")
+        os.replace(tmp_path, self._log_path)
+        self._log_records = len(self._docs)
+
+    def _add(self, doc_id: str, doc: _Document):
+        self._delete(doc_id)
+        self._docs[doc_id] = doc
+        self._total_length += doc.length
+        for term, freq in doc.term_freqs.items():
+            self._postings.setdefault(term, {})[doc_id] = freq
+
+    def _delete(self, doc_id: str) -> bool:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        self._total_length -= doc.length
+        for term in doc.term_freqs:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        return True
+
+    def add(self, chunks: List[Chunk], ids: Optional[List[str]] = None):
+        """Add the chunks, the chunks of the same ids are replaced.
+
+        Args:
+            chunks (List[Chunk]): The chunks to add.
+            ids (Optional[List[str]]): The ids of the chunks, the chunk ids if not
+                set.
+        """
+        ids = ids or [chunk.chunk_id for chunk in chunks]
+        docs = []
+        for chunk in chunks:
+            tokens = self._tokenizer(chunk.content)
+            docs.append(
+                _Document(
+                    content=chunk.content,
+                    metadata=dict(chunk.metadata or {}),
+                    term_freqs=dict(Counter(tokens)),
+                    length=len(tokens),
+                )
+            )
+        with self._lock:
+            for doc_id, doc in zip(ids, docs):
+                self._add(doc_id, doc)
+            self._append_log(
+                [_add_record(doc_id, doc) for doc_id, doc in zip(ids, docs)]
+            )
+
+    def delete(self, ids: List[str]) -> List[str]:
+        """Delete the documents, return the deleted ids."""
+        with self._lock:
+            deleted = [doc_id for doc_id in ids if self._delete(doc_id)]
+            self._append_log([{"op": "delete", "id": doc_id} for doc_id in deleted])
+            return deleted
+
+    def clear(self):
+        """Delete all the documents."""
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            self._total_length = 0
+            if self._persist_dir and os.path.exists(self._log_path):
+                os.remove(self._log_path)
+            self._log_records = 0
+
+    def search(
+        self,
+        query: str,
+        topk: int,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        """Return the top k documents of the query, scored by BM25."""
+        terms = set(self._tokenizer(query))
+        with self._lock:
+            num_docs = len(self._docs)
+            if not terms or num_docs == 0:
+                return []
+            avg_length = self._total_length / num_docs or 1.0
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(
+                    1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for doc_id, freq in postings.items():
+                    norm = self._k1 * (
+                        1 - self._b + self._b * self._docs[doc_id].length / avg_length
+                    )
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                        freq * (self._k1 + 1) / (freq + norm)
+                    )
+            if filters and filters.filters:
+                scores = {
+                    doc_id: score
+                    for doc_id, score in scores.items()
+                    if match_metadata_filters(self._docs[doc_id].metadata, filters)
+                }
+            top = nlargest(topk, scores.items(), key=lambda item: item[1])
+            return [
+                Chunk(
+                    content=self._docs[doc_id].content,
+                    metadata=dict(self._docs[doc_id].metadata),
+                    score=score,
+                    chunk_id=doc_id,
+                )
+                for doc_id, score in top
+            ]
+
+
+def _add_record(doc_id: str, doc: _Document) -> Dict[str, Any]:
+    return {
+        "op": "add",
+        "id": doc_id,
+        "content": doc.content,
+        "metadata": doc.metadata,
+        "term_freqs": doc.term_freqs,
+        "length": doc.length,
+    }
+
+
+def match_metadata_filters(
+    metadata: Dict[str, Any], filters: Optional[MetadataFilters]
+) -> bool:
+    """Whether the metadata matches the filters."""
+    if not filters or not filters.filters:
+        return True
+    matches = (_match_filter(metadata, f) for f in filters.filters)
+    if filters.condition == FilterCondition.OR:
+        return any(matches)
+    return all(matches)
+
+
+def _match_filter(metadata: Dict[str, Any], metadata_filter: MetadataFilter) -> bool:
+    operator = metadata_filter.operator
+    expected = metadata_filter.value
+    exists = metadata.get(metadata_filter.key) is not None
+    if operator == FilterOperator.EXISTS:
+        return exists == bool(expected)
+    if not exists:
+        return False
+    value = metadata[metadata_filter.key]
+    try:
+        if operator == FilterOperator.EQ:
+            return value == expected
+        if operator == FilterOperator.NE:
+            return value != expected
+        if operator == FilterOperator.GT:
+            return value > expected
+        if operator == FilterOperator.LT:
+            return value < expected
+        if operator == FilterOperator.GTE:
+            return value >= expected
+        if operator == FilterOperator.LTE:
+            return value <= expected
+        if operator == FilterOperator.IN:
+            return value in expected
+        if operator == FilterOperator.NIN:
+            return value not in expected
+    except TypeError:
+        return False
+    raise ValueError(f"Filter operator {operator} not supported")
+
+
+class BM25IndexedVectorStore(VectorStoreBase):
+    """Vector store with a local BM25 index for the full text search.
+
+    The chunks loaded to the vector store are also added to the BM25 index, the
+    other operations are delegated to the vector store.
+    """
+
+    def __init__(self, vector_store: VectorStoreBase, index: BM25Index):
+        """Create a BM25IndexedVectorStore.
+
+        Args:
+            vector_store (VectorStoreBase): The vector store.
+            index (BM25Index): The BM25 index of the chunks.
+        """
+        self._vector_store = vector_store
+        self._index = index
+        super().__init__(
+            executor=vector_store._executor,
+            max_chunks_once_load=vector_store._max_chunks_once_load,
+            max_threads=vector_store._max_threads,
+        )
+
+    @property
+    def vector_store(self) -> VectorStoreBase:
+        """Return the wrapped vector store."""
+        return self._vector_store
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate the other attributes to the vector store."""
+        if name in ("_vector_store", "_index"):
+            raise AttributeError(name)
+        return getattr(self._vector_store, name)
+
+    def get_config(self) -> VectorStoreConfig:
+        """Get the vector store config."""
+        return self._vector_store.get_config()
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        """Load document in the vector store and the BM25 index."""
+        ids = self._vector_store.load_document(chunks)
+        if len(ids) != len(chunks):
+            ids = [chunk.chunk_id for chunk in chunks]
+        self._index.add(chunks, ids)
+        return ids
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:  # type: ignore
+        """Async load document in the vector store and the BM25 index."""
+        ids = await self._vector_store.aload_document(chunks)
+        if len(ids) != len(chunks):
+            ids = [chunk.chunk_id for chunk in chunks]
+        self._index.add(chunks, ids)
+        return ids
+
+    def similar_search(
+        self, text: str, topk: int, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Similar search in the vector store."""
+        return self._vector_store.similar_search(text, topk, filters)
+
+    def similar_search_with_scores(
+        self,
+        text,
+        topk,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        """Similar search with scores in the vector store."""
+        return self._vector_store.similar_search_with_scores(
+            text, topk, score_threshold, filters
+        )
+
+    async def asimilar_search_with_scores(
+        self,
+        query,
+        topk,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        """Async similar search with scores in the vector store."""
+        return await self._vector_store.asimilar_search_with_scores(
+            query, topk, score_threshold, filters
+        )
+
+    def full_text_search(
+        self, text: str, topk: int, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Full text search in the BM25 index."""
+        return self._index.search(text, topk, filters)
+
+    def is_support_full_text_search(self) -> bool:
+        """Support full text search."""
+        return True
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        """Delete the chunks by ids, separated by comma."""
+        self._index.delete([i for i in ids.split(",") if i])
+        return self._vector_store.delete_by_ids(ids)
+
+    def truncate(self) -> List[str]:
+        """Truncate the collection."""
+        self._index.clear()
+        return self._vector_store.truncate()
+
+    def delete_vector_name(self, index_name: str):
+        """Delete the collection."""
+        self._index.clear()
+        return self._vector_store.delete_vector_name(index_name)
+
+    def vector_name_exists(self) -> bool:
+        """Whether vector name exists."""
+        return self._vector_store.vector_name_exists()
@@ -40,13 +40,21 @@ class SQLAlchemyStorage(StorageInterface[T, BaseModel]):
         engine_args: Optional[Dict] = None,
         base: Optional[DeclarativeMeta] = None,
         query_class=BaseQuery,
+        load_batch_size: int = 500,
     ):
-        """Create a SQLAlchemyStorage instance."""
+        """Create a SQLAlchemyStorage instance.
+
+        Args:
+            load_batch_size (int): The max number of the identifiers loaded with one
+                query by ``load_list``, some databases limit the number of the
+                parameters of a query.
+        """
         super().__init__(serializer=serializer, adapter=adapter)
         self.db_manager = DatabaseManager.build_from(
             db_url_or_db, engine_args, base, query_class
         )
         self._model_class = model_class
+        self._load_batch_size = load_batch_size
 
     @contextmanager
     def session(self) -> Iterator[Session]:
@@ -88,6 +96,39 @@ class SQLAlchemyStorage(StorageInterface[T, BaseModel]):
                 return
         self.save(data)
 
+    def save_or_update_list(self, data: List[T]) -> None:
+        """Save or update data in the storage with one transaction.
+
+        The existing data are loaded with one query for each ``load_batch_size``
+        items if the adapter supports it, otherwise one by one.
+        """
+        if not data:
+            return
+        with self.session() as session:
+            for i in range(0, len(data), self._load_batch_size):
+                batch = data[i : i + self._load_batch_size]
+                query = self.adapter.get_query_for_identifiers(
+                    self._model_class, [d.identifier for d in batch], session=session
+                )
+                if query is None:
+                    break
+                existing = {}
+                for model_instance in query.with_session(session).all():
+                    item = self.adapter.from_storage_format(model_instance)
+                    existing[item.identifier.str_identifier] = model_instance
+                for d in batch:
+                    new_instance = self.adapter.to_storage_format(d)
+                    model_instance = existing.get(d.identifier.str_identifier)
+                    if model_instance is None:
+                        session.add(new_instance)
+                        # The same identifier may be saved twice in a batch
+                        existing[d.identifier.str_identifier] = new_instance
+                    else:
+                        _copy_public_properties(new_instance, model_instance)
+            else:
+                return
+        super().save_or_update_list(data)
+
     def load(self, resource_id: ResourceIdentifier, cls: Type[T]) -> Optional[T]:
         """Load data by identifier from the storage."""
         with self.session() as session:
@@ -99,6 +140,37 @@ class SQLAlchemyStorage(StorageInterface[T, BaseModel]):
                 return self.adapter.from_storage_format(model_instance)
             return None
 
+    def load_list(self, resource_id: List[ResourceIdentifier], cls: Type[T]) -> List[T]:
+        """Load data by identifiers from the storage.
+
+        The data are loaded with one query for each ``load_batch_size`` identifiers
+        if the adapter supports it, otherwise one by one.
+
+        Returns:
+            List[T]: The loaded data, in the order of the identifiers
+        """
+        if not resource_id:
+            return []
+        items: Dict[str, T] = {}
+        with self.session() as session:
+            for i in range(0, len(resource_id), self._load_batch_size):
+                batch = resource_id[i : i + self._load_batch_size]
+                query = self.adapter.get_query_for_identifiers(
+                    self._model_class, batch, session=session
+                )
+                if query is None:
+                    break
+                for model_instance in query.with_session(session).all():
+                    item = self.adapter.from_storage_format(model_instance)
+                    items[item.identifier.str_identifier] = item
+            else:
+                return [
+                    items[r.str_identifier]
+                    for r in resource_id
+                    if r.str_identifier in items
+                ]
+        return super().load_list(resource_id, cls)
+
     def delete(self, resource_id: ResourceIdentifier) -> None:
         """Delete data by identifier from the storage."""
         with self.session() as session:
@@ -117,10 +189,12 @@ class SQLAlchemyStorage(StorageInterface[T, BaseModel]):
             cls (Type[T]): The type of the data
         """
         with self.session() as session:
-            query = session.query(self._model_class)
-            for key, value in spec.conditions.items():
-                if value is not None:
-                    query = query.filter(getattr(self._model_class, key) == value)
+            query = self._filter_query(session, spec)
+            for field_name in spec.order_by:
+                column = getattr(self._model_class, field_name.lstrip("-"))
+                query = query.order_by(
+                    column.desc() if field_name.startswith("-") else column.asc()
+                )
             if spec.limit is not None:
                 query = query.limit(spec.limit)
             if spec.offset is not None:
@@ -139,8 +213,17 @@ class SQLAlchemyStorage(StorageInterface[T, BaseModel]):
             cls (Type[T]): The type of the data
         """
         with self.session() as session:
-            query = session.query(self._model_class)
-            for key, value in spec.conditions.items():
-                if value is not None:
-                    query = query.filter(getattr(self._model_class, key) == value)
-            return query.count()
+            return self._filter_query(session, spec).count()
+
+    def _filter_query(self, session: Session, spec: QuerySpec):
+        """Return the query with the conditions of the spec."""
+        query = session.query(self._model_class)
+        for key, value in spec.conditions.items():
+            if value is None:
+                continue
+            column = getattr(self._model_class, key)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                query = query.filter(column.in_(list(value)))
+            else:
+                query = query.filter(column == value)
+        return query
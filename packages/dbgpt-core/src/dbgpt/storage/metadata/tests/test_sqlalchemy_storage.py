@@ -1,4 +1,4 @@
-from typing import Dict, Type
+from typing import Dict, List, Type
 
 import pytest
 from sqlalchemy import Column, Integer, String
@@ -51,6 +51,10 @@ class MockStorageItem(StorageItem):
 class MockStorageItemAdapter(StorageItemAdapter[MockStorageItem, MockModel]):
     """The adapter for the mock storage item."""
 
+    def __init__(self):
+        # The sizes of the batches loaded by identifiers
+        self.batches = []
+
     def to_storage_format(self, item: MockStorageItem) -> MockModel:
         return MockModel(id=int(item.identifier.str_identifier), data=item.data)
 
@@ -70,6 +74,18 @@ class MockStorageItemAdapter(StorageItemAdapter[MockStorageItem, MockModel]):
             storage_format.id == int(resource_id.str_identifier)
         )
 
+    def get_query_for_identifiers(
+        self,
+        storage_format: Type[MockModel],
+        resource_ids: List[ResourceIdentifier],
+        **kwargs,
+    ):
+        session: Session = kwargs.get("session")
+        self.batches.append(len(resource_ids))
+        return session.query(storage_format).filter(
+            storage_format.id.in_([int(r.str_identifier) for r in resource_ids])
+        )
+
 
 @pytest.fixture
 def serializer():
@@ -85,7 +101,9 @@ def db_url():
 @pytest.fixture
 def sqlalchemy_storage(db_url, serializer):
     adapter = MockStorageItemAdapter()
-    storage = SQLAlchemyStorage(db_url, MockModel, adapter, serializer, base=Base)
+    storage = SQLAlchemyStorage(
+        db_url, MockModel, adapter, serializer, base=Base, load_batch_size=3
+    )
     Base.metadata.create_all(storage.db_manager.engine)
     return storage
 
@@ -169,3 +187,48 @@ def test_paginate_query(sqlalchemy_storage):
     assert page_result.page == page_number
     assert page_result.total_pages == 4
     assert page_result.total_count == 10
+
+
+def test_load_list_in_batches(sqlalchemy_storage):
+    for i in range(10):
+        item = MockStorageItem(MockResourceIdentifier(str(i)), f"test_data_{i}")
+        sqlalchemy_storage.save(item)
+
+    ids = [MockResourceIdentifier(str(i)) for i in [7, 2, 100, 5, 0, 9, 3]]
+    items = sqlalchemy_storage.load_list(ids, MockStorageItem)
+    # In the order of the identifiers, the missing ones are skipped
+    assert [item.data for item in items] == [
+        f"test_data_{i}" for i in [7, 2, 5, 0, 9, 3]
+    ]
+    assert sqlalchemy_storage.adapter.batches == [3, 3, 1]
+    assert sqlalchemy_storage.load_list([], MockStorageItem) == []
+
+
+def test_query_in_and_order_by(sqlalchemy_storage):
+    for i in range(10):
+        item = MockStorageItem(MockResourceIdentifier(str(i)), f"test_data_{i % 3}")
+        sqlalchemy_storage.save(item)
+
+    query_spec = QuerySpec(
+        conditions={"data": ["test_data_0", "test_data_2"]},
+        order_by=["-id"],
+        limit=3,
+        offset=1,
+    )
+    results = sqlalchemy_storage.query(query_spec, MockStorageItem)
+    assert [r.identifier.str_identifier for r in results] == ["8", "6", "5"]
+    assert sqlalchemy_storage.count(query_spec, MockStorageItem) == 7
+
+
+def test_save_or_update_list(sqlalchemy_storage):
+    sqlalchemy_storage.save(MockStorageItem(MockResourceIdentifier("1"), "old_1"))
+    items = [
+        MockStorageItem(MockResourceIdentifier(str(i)), f"new_{i}") for i in range(5)
+    ]
+    sqlalchemy_storage.save_or_update_list(items)
+    loaded = sqlalchemy_storage.load_list(
+        [MockResourceIdentifier(str(i)) for i in range(5)], MockStorageItem
+    )
+    assert [item.data for item in loaded] == [f"new_{i}" for i in range(5)]
+    # The existing items of each batch are loaded with one query
+    assert sqlalchemy_storage.adapter.batches[:2] == [3, 2]
@@ -0,0 +1,104 @@
+import pytest
+
+from dbgpt.core.interface.storage import InMemoryStorage, QuerySpec
+from dbgpt.core.interface.tests.test_storage import (
+    MockResourceIdentifier,
+    MockStorageItem,
+)
+from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+from ..write_behind_storage import StorageFlusher, WriteBehindStorage
+
+
+class _RecordingStorage(InMemoryStorage):
+    """Record the written batches, and fail the first ``fail_times`` writes."""
+
+    def __init__(self):
+        super().__init__(JsonSerializer())
+        self.batches = []
+        self.fail_times = 0
+
+    def save_or_update_list(self, data):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise ConnectionError("database is down")
+        self.batches.append([d.identifier.str_identifier for d in data])
+        super().save_or_update_list(data)
+
+
+@pytest.fixture
+def flusher():
+    flusher = StorageFlusher(flush_interval=0.01)
+    yield flusher
+    flusher.close()
+
+
+def test_coalesce_and_batch():
+    # Flush only when asked
+    flusher = StorageFlusher(flush_interval=60)
+    conv_storage = _RecordingStorage()
+    message_storage = _RecordingStorage()
+    convs = WriteBehindStorage(conv_storage, flusher)
+    messages = WriteBehindStorage(message_storage, flusher)
+    for i in range(1, 4):
+        convs.save_or_update(MockStorageItem(f"c{i % 2}", f"v{i}"))
+        messages.save_list([MockStorageItem(f"m{i}", f"v{i}")])
+    flusher.flush()
+
+    # Only the latest version of an item is written, one batch for each storage
+    assert conv_storage.batches == [["c1", "c0"]]
+    assert message_storage.batches == [["m1", "m2", "m3"]]
+    assert convs.load(MockResourceIdentifier("c1"), MockStorageItem).data == "v3"
+    metrics = flusher.get_metrics()
+    assert metrics["writes"] == 6
+    assert metrics["coalesced_writes"] == 1
+    assert metrics["flushed_writes"] == 5
+    assert metrics["batches"] == 2
+    assert metrics["pending_writes"] == 0
+    flusher.close()
+
+
+def test_read_your_writes():
+    # Flush only when asked
+    flusher = StorageFlusher(flush_interval=60)
+    storage = WriteBehindStorage(_RecordingStorage(), flusher)
+    storage.save(MockStorageItem("1", "v1"))
+    storage.save(MockStorageItem("2", "v2"))
+    assert storage.load(MockResourceIdentifier("1"), MockStorageItem).data == "v1"
+    items = storage.load_list(
+        [MockResourceIdentifier("2"), MockResourceIdentifier("1")], MockStorageItem
+    )
+    assert [item.data for item in items] == ["v2", "v1"]
+    storage.save(MockStorageItem("3", "v3"))
+    assert storage.count(QuerySpec(conditions={}), MockStorageItem) == 3
+    storage.delete(MockResourceIdentifier("3"))
+    assert storage.load(MockResourceIdentifier("3"), MockStorageItem) is None
+    flusher.close()
+
+
+def test_retry_failed_writes(flusher):
+    inner = _RecordingStorage()
+    inner.fail_times = 2
+    storage = WriteBehindStorage(inner, flusher)
+    storage.save(MockStorageItem("1", "v1"))
+    flusher.flush()
+    assert inner.load(MockResourceIdentifier("1"), MockStorageItem).data == "v1"
+    assert flusher.get_metrics()["failed_batches"] == 2
+
+    inner.fail_times = 10
+    storage.save(MockStorageItem("2", "v2"))
+    flusher.flush()
+    assert inner.load(MockResourceIdentifier("2"), MockStorageItem) is None
+    assert flusher.get_metrics()["dropped_writes"] == 1
+
+
+def test_close_flushes_pending_writes():
+    flusher = StorageFlusher(flush_interval=60)
+    inner = _RecordingStorage()
+    storage = WriteBehindStorage(inner, flusher)
+    for i in range(10):
+        storage.save(MockStorageItem(str(i), f"v{i}"))
+    flusher.close()
+    assert inner.batches == [[str(i) for i in range(10)]]
+    with pytest.raises(RuntimeError):
+        storage.save(MockStorageItem("10", "v10"))
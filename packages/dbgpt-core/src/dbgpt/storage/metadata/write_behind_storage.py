@@ -0,0 +1,297 @@
+"""Write-behind storage.
+
+The writes to a write-behind storage return at once and are written to the wrapped
+storage by a background flusher. The flusher coalesces the writes of the same item,
+only its latest version is written, and writes the items of all the conversations
+saved since the last flush with one ``save_or_update_list`` call, which is one
+transaction for a :class:`~dbgpt.storage.metadata.db_storage.SQLAlchemyStorage`.
+
+The reads wait for the pending writes of the items they read, so a process always
+reads its own writes. The writes not flushed yet are lost if the process crashes,
+call :meth:`StorageFlusher.close` to flush them on shutdown.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from dbgpt.core.interface.storage import (
+    QuerySpec,
+    ResourceIdentifier,
+    StorageInterface,
+    T,
+)
+
+logger = logging.getLogger(__name__)
+
+# The pending write of an item: (storage, identifier)
+_WriteKey = Tuple[int, str]
+
+
+class StorageFlusher:
+    """Write the items saved to the write-behind storages in a background thread."""
+
+    def __init__(
+        self,
+        flush_interval: float = 0.1,
+        max_pending_writes: int = 10000,
+        max_retries: int = 3,
+    ):
+        """Create a new StorageFlusher.
+
+        Args:
+            flush_interval (float): The max seconds a write waits before it is
+                written to the storage.
+            max_pending_writes (int): The max number of the pending writes, the
+                writers wait for the flusher when there are more pending writes.
+            max_retries (int): The max times a failed write is retried, it is
+                dropped after that.
+        """
+        self._flush_interval = flush_interval
+        self._max_pending_writes = max_pending_writes
+        self._max_retries = max_retries
+        self._storages: Dict[int, StorageInterface] = {}
+        self._pending: Dict[_WriteKey, Any] = {}
+        self._retries: Dict[_WriteKey, int] = {}
+        self._flushing: Dict[_WriteKey, Any] = {}
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._closed = False
+        self._worker: Optional[threading.Thread] = None
+        self._metrics = {
+            "writes": 0,
+            "coalesced_writes": 0,
+            "flushed_writes": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "dropped_writes": 0,
+        }
+
+    def submit(self, storage: StorageInterface, items: List[Any]) -> None:
+        """Submit the items to write to the storage.
+
+        The items must not be changed after they are submitted.
+        """
+        if not items:
+            return
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The storage flusher is closed")
+            self._ensure_worker()
+            while len(self._pending) >= self._max_pending_writes:
+                self._flush_requested = True
+                self._cond.notify_all()
+                self._cond.wait()
+            self._storages[id(storage)] = storage
+            for item in items:
+                key = (id(storage), item.identifier.str_identifier)
+                if key in self._pending:
+                    self._metrics["coalesced_writes"] += 1
+                self._pending[key] = item
+                self._retries.pop(key, None)
+            self._metrics["writes"] += len(items)
+
+    def wait_for(
+        self, storage: StorageInterface, identifiers: Optional[List[str]] = None
+    ) -> None:
+        """Wait for the pending writes of the storage.
+
+        Args:
+            storage (StorageInterface): The storage.
+            identifiers (Optional[List[str]]): Only wait for the writes of these
+                items, all the writes of the storage if None.
+        """
+        storage_id = id(storage)
+        if identifiers is None:
+
+            def _is_pending(key: _WriteKey) -> bool:
+                return key[0] == storage_id
+
+        else:
+            keys = {(storage_id, identifier) for identifier in identifiers}
+
+            def _is_pending(key: _WriteKey) -> bool:
+                return key in keys
+
+        with self._cond:
+            while any(map(_is_pending, self._pending)) or any(
+                map(_is_pending, self._flushing)
+            ):
+                if self._worker is None:
+                    # Flushed by the caller thread when the flusher is closed
+                    break
+                self._flush_requested = True
+                self._cond.notify_all()
+                self._cond.wait()
+
+    def flush(self) -> None:
+        """Wait for all the pending writes."""
+        with self._cond:
+            while (self._pending or self._flushing) and self._worker is not None:
+                self._flush_requested = True
+                self._cond.notify_all()
+                self._cond.wait()
+
+    def close(self) -> None:
+        """Flush the pending writes and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return the metrics of the flusher.
+
+        Returns:
+            Dict[str, Any]: The number of the writes submitted, coalesced with a
+                later write of the same item, written and dropped, the number of the
+                batches written and failed, and the pending writes.
+        """
+        with self._cond:
+            metrics: Dict[str, Any] = dict(self._metrics)
+            metrics["pending_writes"] = len(self._pending) + len(self._flushing)
+        return metrics
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run_worker, name="storage_flusher", daemon=True
+            )
+            self._worker.start()
+
+    def _run_worker(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self._flush_interval
+                while not (self._flush_requested or self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._flush_requested = False
+                if not self._pending and self._closed:
+                    self._worker = None
+                    self._cond.notify_all()
+                    return
+                self._flushing, self._pending = self._pending, {}
+                flushing = self._flushing
+                self._cond.notify_all()
+            if flushing:
+                self._write(flushing)
+            with self._cond:
+                self._flushing = {}
+                self._cond.notify_all()
+
+    def _write(self, flushing: Dict[_WriteKey, Any]):
+        batches: Dict[int, List[Tuple[_WriteKey, Any]]] = {}
+        for key, item in flushing.items():
+            batches.setdefault(key[0], []).append((key, item))
+        for storage_id, batch in batches.items():
+            storage = self._storages[storage_id]
+            try:
+                storage.save_or_update_list([item for _key, item in batch])
+            except Exception as e:
+                logger.warning(f"Failed to write {len(batch)} items to {storage}: {e}")
+                self._retry(batch)
+                continue
+            with self._cond:
+                self._metrics["batches"] += 1
+                self._metrics["flushed_writes"] += len(batch)
+                for key, _item in batch:
+                    self._retries.pop(key, None)
+
+    def _retry(self, batch: List[Tuple[_WriteKey, Any]]):
+        with self._cond:
+            self._metrics["failed_batches"] += 1
+            for key, item in batch:
+                retries = self._retries.get(key, 0) + 1
+                if key in self._pending:
+                    # Superseded by a later write
+                    continue
+                if retries > self._max_retries:
+                    self._metrics["dropped_writes"] += 1
+                    self._retries.pop(key, None)
+                    logger.error(f"Drop the write of {key[1]} after {retries} tries")
+                    continue
+                self._retries[key] = retries
+                self._pending[key] = item
+
+
+class WriteBehindStorage(StorageInterface[T, Any]):
+    """A storage which writes to the wrapped storage in the background.
+
+    The saves are upserts, a save of an existing item updates it.
+    """
+
+    def __init__(self, storage: StorageInterface[T, Any], flusher: StorageFlusher):
+        """Create a new WriteBehindStorage.
+
+        Args:
+            storage (StorageInterface[T, Any]): The wrapped storage.
+            flusher (StorageFlusher): The flusher, it can be shared by several
+                storages.
+        """
+        super().__init__(serializer=storage.serializer, adapter=storage.adapter)
+        self._storage = storage
+        self._flusher = flusher
+
+    @property
+    def storage(self) -> StorageInterface[T, Any]:
+        """Return the wrapped storage."""
+        return self._storage
+
+    def save(self, data: T) -> None:
+        """Save the data to the storage in the background."""
+        self._flusher.submit(self._storage, [data])
+
+    def update(self, data: T) -> None:
+        """Update the data in the storage in the background."""
+        self._flusher.submit(self._storage, [data])
+
+    def save_or_update(self, data: T) -> None:
+        """Save or update the data in the storage in the background."""
+        self._flusher.submit(self._storage, [data])
+
+    def save_list(self, data: List[T]) -> None:
+        """Save the data list to the storage in the background."""
+        self._flusher.submit(self._storage, data)
+
+    def save_or_update_list(self, data: List[T]) -> None:
+        """Save or update the data list in the storage in the background."""
+        self._flusher.submit(self._storage, data)
+
+    def load(self, resource_id: ResourceIdentifier, cls: Type[T]) -> Optional[T]:
+        """Load the data, after its pending write."""
+        self._flusher.wait_for(self._storage, [resource_id.str_identifier])
+        return self._storage.load(resource_id, cls)
+
+    def load_list(self, resource_id: List[ResourceIdentifier], cls: Type[T]) -> List[T]:
+        """Load the data list, after their pending writes."""
+        self._flusher.wait_for(self._storage, [r.str_identifier for r in resource_id])
+        return self._storage.load_list(resource_id, cls)
+
+    def delete(self, resource_id: ResourceIdentifier) -> None:
+        """Delete the data, after its pending write."""
+        self._flusher.wait_for(self._storage, [resource_id.str_identifier])
+        self._storage.delete(resource_id)
+
+    def delete_list(self, resource_id: List[ResourceIdentifier]) -> None:
+        """Delete the data list, after their pending writes."""
+        self._flusher.wait_for(self._storage, [r.str_identifier for r in resource_id])
+        self._storage.delete_list(resource_id)
+
+    def query(self, spec: QuerySpec, cls: Type[T]) -> List[T]:
+        """Query the data, after all the pending writes of the storage."""
+        self._flusher.wait_for(self._storage)
+        return self._storage.query(spec, cls)
+
+    def count(self, spec: QuerySpec, cls: Type[T]) -> int:
+        """Count the data, after all the pending writes of the storage."""
+        self._flusher.wait_for(self._storage)
+        return self._storage.count(spec, cls)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._storage, name)
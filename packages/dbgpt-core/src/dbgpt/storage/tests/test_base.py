@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+from typing import List, Optional
+
+import pytest
+
+from dbgpt.core import Chunk
+from dbgpt.storage.base import IndexStoreBase, IndexStoreConfig, LoadProgress
+from dbgpt.storage.vector_store.filters import MetadataFilters
+
+
+class _MockIndexStore(IndexStoreBase):
+    def __init__(self, delays=None, failures=None, **kwargs):
+        super().__init__(**kwargs)
+        self._delays = delays or {}
+        # The number of times each group fails before succeeding
+        self._failures = dict(failures or {})
+        self._lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.calls = 0
+        # The groups in the order they finish
+        self.finished: List[int] = []
+
+    def get_config(self) -> IndexStoreConfig:
+        return IndexStoreConfig()
+
+    def _enter(self, chunks: List[Chunk]) -> int:
+        idx = int(chunks[0].chunk_id) // 2
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        return idx
+
+    def _exit(self, idx: int) -> None:
+        with self._lock:
+            self.running -= 1
+            if self._failures.get(idx, 0) > 0:
+                self._failures[idx] -= 1
+                raise ConnectionError(f"embedding service unavailable {idx}")
+            self.finished.append(idx)
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        idx = self._enter(chunks)
+        time.sleep(self._delays.get(idx, 0.01))
+        self._exit(idx)
+        return [c.chunk_id for c in chunks]
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:
+        idx = self._enter(chunks)
+        await asyncio.sleep(self._delays.get(idx, 0.01))
+        self._exit(idx)
+        return [c.chunk_id for c in chunks]
+
+    def similar_search_with_scores(
+        self,
+        text,
+        topk,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        return []
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        return []
+
+    def truncate(self) -> List[str]:
+        return []
+
+    def delete_vector_name(self, index_name: str):
+        pass
+
+    def vector_name_exists(self) -> bool:
+        return True
+
+
+def _chunks(n: int) -> List[Chunk]:
+    return [Chunk(content=f"chunk {i}", chunk_id=str(i)) for i in range(n)]
+
+
+class _BlockingIndexStore(_MockIndexStore):
+    """Group 0 finishes only after all the other groups are finished."""
+
+    def __init__(self, num_groups: int, **kwargs):
+        super().__init__(**kwargs)
+        self._num_groups = num_groups
+        self._others_done = asyncio.Event()
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:
+        idx = self._enter(chunks)
+        if idx == 0:
+            # With fixed batches the other groups wait for group 0, it never ends
+            await asyncio.wait_for(self._others_done.wait(), timeout=5)
+        else:
+            await asyncio.sleep(0)
+        self._exit(idx)
+        if len(self.finished) == self._num_groups - 1:
+            self._others_done.set()
+        return [c.chunk_id for c in chunks]
+
+
+@pytest.mark.asyncio
+async def test_aload_keeps_window_full():
+    # Group 0 is slow, the other groups should not wait for it
+    store = _BlockingIndexStore(num_groups=10)
+    ids = await store.aload_document_with_limit(
+        _chunks(20), max_chunks_once_load=2, max_threads=3
+    )
+    assert ids == [str(i) for i in range(20)]
+    assert store.max_running == 3
+    assert store.finished[-1] == 0
+    assert sorted(store.finished) == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_aload_retry_and_progress():
+    store = _MockIndexStore(delays={0: 0.05}, failures={0: 1, 3: 2})
+    progresses: List[LoadProgress] = []
+
+    async def _callback(progress: LoadProgress):
+        progresses.append(progress)
+
+    ids = await store.aload_document_with_limit(
+        _chunks(10),
+        max_chunks_once_load=2,
+        max_threads=2,
+        max_retries=2,
+        retry_backoff=0.001,
+        progress_callback=_callback,
+    )
+    assert ids == [str(i) for i in range(10)]
+    assert store.calls == 5 + 3
+    assert len(progresses) == 5
+    assert progresses[-1].finished
+    assert progresses[-1].checkpoint == 10
+    # Group 0 is the last to finish, the checkpoint stays at 0 until then
+    assert progresses[0].group_index != 0
+    assert progresses[0].checkpoint == 0
+    assert [p.loaded_chunks for p in progresses] == [2, 4, 6, 8, 10]
+
+
+@pytest.mark.asyncio
+async def test_aload_fail_after_retries():
+    store = _MockIndexStore(failures={1: 3})
+    with pytest.raises(RuntimeError, match="Failed to load chunk group 2"):
+        await store.aload_document_with_limit(
+            _chunks(6),
+            max_chunks_once_load=2,
+            max_threads=2,
+            max_retries=1,
+            retry_backoff=0.001,
+        )
+
+
+def test_load_retry_and_progress():
+    store = _MockIndexStore(delays={0: 0.2}, failures={2: 1})
+    progresses: List[LoadProgress] = []
+    ids = store.load_document_with_limit(
+        _chunks(10),
+        max_chunks_once_load=2,
+        max_threads=3,
+        max_retries=1,
+        retry_backoff=0.001,
+        progress_callback=progresses.append,
+    )
+    assert ids == [str(i) for i in range(10)]
+    assert store.max_running == 3
+    # The progress is reported as soon as each group finishes
+    assert progresses[0].group_index != 0
+    assert progresses[-1].checkpoint == 10
+
+
+def test_load_rejects_async_callback():
+    store = _MockIndexStore()
+
+    async def _callback(progress: LoadProgress):
+        pass
+
+    with pytest.raises(ValueError, match="aload_document_with_limit"):
+        store.load_document_with_limit(_chunks(4), progress_callback=_callback)
+    assert store.calls == 0
+    with pytest.raises(TypeError, match="aload_document_with_limit"):
+        store.load_document_with_limit(
+            _chunks(4), max_chunks_once_load=2, progress_callback=lambda p: _callback(p)
+        )
+
+
+def test_load_fail_without_retry():
+    store = _MockIndexStore(failures={0: 1})
+    with pytest.raises(RuntimeError, match="Failed to load chunk group 1"):
+        store.load_document_with_limit(_chunks(4), max_chunks_once_load=2)
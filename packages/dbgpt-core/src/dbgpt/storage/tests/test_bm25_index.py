@@ -0,0 +1,147 @@
+from typing import List, Optional
+
+from dbgpt.core import Chunk
+from dbgpt.storage.full_text.bm25_index import (
+    BM25Index,
+    BM25IndexedVectorStore,
+    default_tokenizer,
+)
+from dbgpt.storage.vector_store.base import VectorStoreBase, VectorStoreConfig
+from dbgpt.storage.vector_store.filters import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+)
+
+
+def _chunks() -> List[Chunk]:
+    return [
+        Chunk(
+            content="The quick brown fox jumps over the lazy dog",
+            chunk_id="1",
+            metadata={"source": "a", "page": 1},
+        ),
+        Chunk(
+            content="A fast brown fox and a quick red fox",
+            chunk_id="2",
+            metadata={"source": "b", "page": 2},
+        ),
+        Chunk(content="数据库连接池的配置方法", chunk_id="3", metadata={"page": 3}),
+        Chunk(content="向量数据库和全文检索", chunk_id="4", metadata={"page": 4}),
+    ]
+
+
+def test_default_tokenizer():
+    assert default_tokenizer("Hello, World_2!") == ["hello", "world", "2"]
+    assert default_tokenizer("DB-GPT数据库") == [
+        "db",
+        "gpt",
+        "数",
+        "据",
+        "库",
+        "数据",
+        "据库",
+    ]
+
+
+def test_search_and_filters():
+    index = BM25Index()
+    index.add(_chunks())
+    chunks = index.search("quick fox", 10)
+    # "2" has more occurrences of fox
+    assert [c.chunk_id for c in chunks] == ["2", "1"]
+    assert chunks[0].score > chunks[1].score > 0
+    assert {c.chunk_id for c in index.search("数据库", 10)} == {"3", "4"}
+    assert [c.chunk_id for c in index.search("连接池", 10)] == ["3"]
+    assert index.search("nothing", 10) == []
+
+    filters = MetadataFilters(
+        filters=[MetadataFilter(key="source", operator=FilterOperator.EQ, value="a")]
+    )
+    assert [c.chunk_id for c in index.search("fox", 10, filters)] == ["1"]
+    filters = MetadataFilters(
+        filters=[
+            MetadataFilter(key="page", operator=FilterOperator.GTE, value=4),
+            MetadataFilter(key="source", operator=FilterOperator.IN, value=["b"]),
+        ],
+        condition=FilterCondition.OR,
+    )
+    assert {c.chunk_id for c in index.search("fox 数据库", 10, filters)} == {"2", "4"}
+
+
+def test_incremental_and_persist(tmp_path):
+    index = BM25Index(persist_dir=str(tmp_path))
+    index.add(_chunks())
+    index.delete(["1", "unknown"])
+    index.add([Chunk(content="a lazy cat", chunk_id="2", metadata={})])
+    assert len(index) == 3
+    assert index.search("fox", 10) == []
+    assert [c.chunk_id for c in index.search("lazy", 10)] == ["2"]
+
+    reopened = BM25Index(persist_dir=str(tmp_path))
+    assert len(reopened) == 3
+    assert [c.chunk_id for c in reopened.search("lazy", 10)] == ["2"]
+    assert [c.chunk_id for c in reopened.search("连接池", 10)] == ["3"]
+
+    reopened.clear()
+    assert len(BM25Index(persist_dir=str(tmp_path))) == 0
+
+
+class _MockVectorStore(VectorStoreBase):
+    def __init__(self):
+        super().__init__()
+        self.chunks = {}
+        self.collection = "test"
+
+    def get_config(self) -> VectorStoreConfig:
+        return VectorStoreConfig()
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        for chunk in chunks:
+            self.chunks[chunk.chunk_id] = chunk
+        return [chunk.chunk_id for chunk in chunks]
+
+    def similar_search_with_scores(
+        self,
+        text,
+        topk,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        return list(self.chunks.values())[:topk]
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        for i in ids.split(","):
+            self.chunks.pop(i, None)
+        return ids.split(",")
+
+    def truncate(self) -> List[str]:
+        ids = list(self.chunks.keys())
+        self.chunks.clear()
+        return ids
+
+    def delete_vector_name(self, index_name: str):
+        self.chunks.clear()
+
+    def vector_name_exists(self) -> bool:
+        return bool(self.chunks)
+
+
+def test_indexed_vector_store():
+    vector_store = _MockVectorStore()
+    store = BM25IndexedVectorStore(vector_store, BM25Index())
+    assert store.is_support_full_text_search()
+    assert store.load_document_with_limit(_chunks(), 2) == ["1", "2", "3", "4"]
+    assert len(vector_store.chunks) == 4
+    assert [c.chunk_id for c in store.full_text_search("lazy dog", 10)] == ["1"]
+
+    store.delete_by_ids("1")
+    assert "1" not in vector_store.chunks
+    assert store.full_text_search("lazy dog", 10) == []
+    # The other attributes are delegated to the vector store
+    assert store.collection == "test"
+
+    store.truncate()
+    assert store.full_text_search("fox", 10) == []
+    assert not store.vector_name_exists()
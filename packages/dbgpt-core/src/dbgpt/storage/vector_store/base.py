@@ -106,6 +106,25 @@ class VectorStoreConfig(IndexStoreConfig, RegisterParameters):
             ),
         },
     )
+    enable_bm25_index: bool = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to keep a local BM25 index of the chunks for the full text "
+                "search, used when the vector store does not support it."
+            ),
+        },
+    )
+    bm25_tokenizer: str = field(
+        default="default",
+        metadata={
+            "help": _(
+                "The tokenizer of the local BM25 index, default or jieba, the "
+                "default tokenizer splits the CJK texts into the characters and the "
+                "bigrams."
+            ),
+        },
+    )
 
     def create_store(self, **kwargs) -> "VectorStoreBase":
         """Create a new index store from the config."""
@@ -0,0 +1,107 @@
+"""Benchmark the sharded memory cache storage against the memory cache storage.
+
+The values are model outputs of the given size. It reports the throughput of the
+sets and the gets from several threads, and the hit rate when the cache is smaller
+than the working set.
+
+Usage:
+
+    python cache_storage_benchmarks.py --num_keys 20000 --value_size 4096
+"""
+
+import argparse
+import random
+import threading
+import time
+from typing import Callable, List
+
+from dbgpt.storage.cache.llm_cache import LLMCacheKey, LLMCacheValue
+from dbgpt.storage.cache.storage.base import CacheStorage, MemoryCacheStorage
+from dbgpt.storage.cache.storage.memory.memory_storage import (
+    ShardedMemoryCacheStorage,
+)
+from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+
+def _make_data(num_keys: int, value_size: int):
+    serializer = JsonSerializer()
+    keys, values = [], []
+    for i in range(num_keys):
+        key = LLMCacheKey(prompt=f"prompt {i}", model_name="benchmark")
+        key.set_serializer(serializer)
+        value = LLMCacheValue(
+            output={"text": f"{i}".ljust(value_size, "x"), "error_code": 0}
+        )
+        value.set_serializer(serializer)
+        keys.append(key)
+        values.append(value)
+    return keys, values
+
+
+def _run_threads(num_threads: int, func: Callable[[int], None]) -> float:
+    threads = [threading.Thread(target=func, args=(n,)) for n in range(num_threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def _benchmark(name: str, storage: CacheStorage, keys: List, values: List, args):
+    num_keys = len(keys)
+    per_thread = num_keys // args.num_threads
+
+    def set_worker(num: int):
+        for i in range(num * per_thread, (num + 1) * per_thread):
+            storage.set(keys[i], values[i])
+
+    hits = [0] * args.num_threads
+
+    def get_worker(num: int):
+        rng = random.Random(num)
+        # Zipf like access, the small indexes are much more popular
+        for _i in range(args.num_gets // args.num_threads):
+            index = min(int(rng.paretovariate(1.2)) - 1, num_keys - 1)
+            if storage.get(keys[index]) is not None:
+                hits[num] += 1
+
+    set_seconds = _run_threads(args.num_threads, set_worker)
+    get_seconds = _run_threads(args.num_threads, get_worker)
+    num_gets = args.num_gets // args.num_threads * args.num_threads
+    print(
+        f"{name:>10}: set {num_keys / set_seconds:10.0f} ops/s, "
+        f"get {num_gets / get_seconds:10.0f} ops/s, "
+        f"hit rate {sum(hits) / num_gets:.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_keys", type=int, default=20000)
+    parser.add_argument("--value_size", type=int, default=4096)
+    parser.add_argument("--num_gets", type=int, default=200000)
+    parser.add_argument("--num_threads", type=int, default=8)
+    parser.add_argument("--max_memory_mb", type=int, default=32)
+    parser.add_argument("--num_shards", type=int, default=16)
+    args = parser.parse_args()
+
+    keys, values = _make_data(args.num_keys, args.value_size)
+    _benchmark(
+        "memory",
+        MemoryCacheStorage(max_memory_mb=args.max_memory_mb),
+        keys,
+        values,
+        args,
+    )
+    for policy in ["lru", "lfu"]:
+        storage = ShardedMemoryCacheStorage(
+            max_memory_mb=args.max_memory_mb,
+            num_shards=args.num_shards,
+            cache_policy=policy,
+        )
+        _benchmark(f"sharded_{policy}", storage, keys, values, args)
+
+
+if __name__ == "__main__":
+    main()
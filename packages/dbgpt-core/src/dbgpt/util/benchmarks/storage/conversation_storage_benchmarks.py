@@ -0,0 +1,101 @@
+"""Benchmark loading a long conversation from the SQLAlchemy storage.
+
+It compares loading the messages of the conversation one query per message with
+loading them in batches, on a SQLite database file.
+
+Usage:
+
+    python conversation_storage_benchmarks.py --num_messages 1000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from dbgpt.core.interface.message import StorageConversation
+from dbgpt.core.interface.storage import StorageInterface
+from dbgpt.storage.chat_history.chat_history_db import (
+    ChatHistoryEntity,
+    ChatHistoryMessageEntity,
+)
+from dbgpt.storage.chat_history.storage_adapter import (
+    DBMessageStorageItemAdapter,
+    DBStorageConversationItemAdapter,
+)
+from dbgpt.storage.metadata import db
+from dbgpt.storage.metadata.db_storage import SQLAlchemyStorage
+from dbgpt.util.serialization.json_serialization import JsonSerializer
+
+
+def _create_storages(load_batch_size: int):
+    serializer = JsonSerializer()
+    conv_storage = SQLAlchemyStorage(
+        db, ChatHistoryEntity, DBStorageConversationItemAdapter(), serializer
+    )
+    message_storage = SQLAlchemyStorage(
+        db,
+        ChatHistoryMessageEntity,
+        DBMessageStorageItemAdapter(),
+        serializer,
+        load_batch_size=load_batch_size,
+    )
+    return conv_storage, message_storage
+
+
+def _benchmark(name: str, conv_uid: str, message_storage, conv_storage, args):
+    start = time.perf_counter()
+    for _i in range(args.num_loads):
+        conversation = StorageConversation(
+            conv_uid, conv_storage=conv_storage, message_storage=message_storage
+        )
+    seconds = (time.perf_counter() - start) / args.num_loads
+    print(
+        f"{name:>12}: {len(conversation.messages)} messages loaded in "
+        f"{seconds * 1000:8.2f} ms"
+    )
+
+
+class _OneByOneStorage(SQLAlchemyStorage):
+    """Load the data one query per identifier."""
+
+    def load_list(self, resource_id, cls):
+        return StorageInterface.load_list(self, resource_id, cls)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_messages", type=int, default=1000)
+    parser.add_argument("--num_loads", type=int, default=5)
+    parser.add_argument("--load_batch_size", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db.init_db(f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}")
+        db.create_all()
+        conv_storage, message_storage = _create_storages(args.load_batch_size)
+        conversation = StorageConversation(
+            "benchmark",
+            chat_mode="chat_normal",
+            user_name="benchmark",
+            conv_storage=conv_storage,
+            message_storage=message_storage,
+        )
+        for i in range(args.num_messages // 2):
+            conversation.start_new_round()
+            conversation.add_user_message(f"question {i}")
+            conversation.add_ai_message(f"answer {i}")
+            conversation.end_current_round()
+
+        one_by_one = _OneByOneStorage(
+            db,
+            ChatHistoryMessageEntity,
+            DBMessageStorageItemAdapter(),
+            JsonSerializer(),
+        )
+        _benchmark("one_by_one", "benchmark", one_by_one, conv_storage, args)
+        _benchmark("batched", "benchmark", message_storage, conv_storage, args)
+
+
+if __name__ == "__main__":
+    main()
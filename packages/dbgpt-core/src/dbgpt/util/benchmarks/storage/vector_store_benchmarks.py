@@ -0,0 +1,160 @@
+"""Benchmark the in-process mmap vector store against Chroma.
+
+The embeddings are synthetic clustered vectors, so the benchmark needs no embedding
+model. It reports the load time, the latency of the single queries, the throughput
+of the batch queries and the recall against the exact search.
+
+Usage:
+
+    python vector_store_benchmarks.py --num_vectors 100000 --dim 768
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from dbgpt.core import Chunk, Embeddings
+
+
+class _LookupEmbeddings(Embeddings):
+    """Return the precomputed embeddings of the texts."""
+
+    def __init__(self, vectors: Dict[str, np.ndarray]):
+        self._vectors = vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vectors[text].tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vectors[text].tolist()
+
+
+def _make_dataset(num_vectors: int, num_queries: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    num_clusters = max(1, num_vectors // 1000)
+    centers = rng.normal(size=(num_clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(num_clusters, size=num_vectors)]
+    vectors += rng.normal(scale=0.5, size=vectors.shape).astype(np.float32)
+    queries = centers[rng.integers(num_clusters, size=num_queries)]
+    queries += rng.normal(scale=0.5, size=queries.shape).astype(np.float32)
+    return vectors, queries
+
+
+def _exact_topk(vectors: np.ndarray, queries: np.ndarray, topk: int) -> np.ndarray:
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ vectors.T
+    return np.argsort(-scores, axis=1)[:, :topk]
+
+
+def _create_store(store_type: str, path: str, embeddings: Embeddings, args):
+    if store_type == "mmap":
+        from dbgpt_ext.storage.vector_store.mmap_store import MmapVectorConfig
+
+        config = MmapVectorConfig(
+            persist_path=path,
+            dtype=args.dtype,
+            ivf_min_size=args.ivf_min_size,
+            nprobe=args.nprobe,
+        )
+    elif store_type == "chroma":
+        from dbgpt_ext.storage.vector_store.chroma_store import ChromaVectorConfig
+
+        config = ChromaVectorConfig(persist_path=path)
+    else:
+        raise ValueError(f"Unknown store type {store_type}")
+    return config.create_store(name="benchmark", embedding_fn=embeddings)
+
+
+def run_benchmark(store_type: str, args) -> Dict[str, float]:
+    vectors, queries = _make_dataset(args.num_vectors, args.num_queries, args.dim)
+    texts = [f"doc-{i}" for i in range(len(vectors))]
+    query_texts = [f"query-{i}" for i in range(len(queries))]
+    embeddings = _LookupEmbeddings(
+        {
+            **dict(zip(texts, vectors)),
+            **dict(zip(query_texts, queries)),
+        }
+    )
+    expected = _exact_topk(vectors, queries, args.topk)
+    path = tempfile.mkdtemp(prefix=f"{store_type}_benchmark_")
+    try:
+        store = _create_store(store_type, path, embeddings, args)
+        chunks = [
+            Chunk(content=text, chunk_id=str(i), metadata={"doc": i % 10})
+            for i, text in enumerate(texts)
+        ]
+        start = time.perf_counter()
+        for i in range(0, len(chunks), args.batch_size):
+            store.load_document(chunks[i : i + args.batch_size])
+        load_seconds = time.perf_counter() - start
+
+        latencies = []
+        results = []
+        for text in query_texts:
+            start = time.perf_counter()
+            results.append(store.similar_search_with_scores(text, args.topk, -1.0))
+            latencies.append(time.perf_counter() - start)
+
+        batch_qps = 0.0
+        if hasattr(store, "similar_search_batch"):
+            start = time.perf_counter()
+            store.similar_search_batch(query_texts, args.topk, -1.0)
+            batch_qps = len(query_texts) / (time.perf_counter() - start)
+
+        hits = sum(
+            len({int(c.chunk_id) for c in result} & set(expected_rows.tolist()))
+            for result, expected_rows in zip(results, expected)
+        )
+        latencies_ms = np.array(latencies) * 1000
+        return {
+            "load_seconds": load_seconds,
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p99_ms": float(np.percentile(latencies_ms, 99)),
+            "qps": len(query_texts) / sum(latencies),
+            "batch_qps": batch_qps,
+            "recall": hits / (len(query_texts) * args.topk),
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_vectors", type=int, default=100000)
+    parser.add_argument("--num_queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--topk", type=int, default=10)
+    parser.add_argument("--batch_size", type=int, default=5000)
+    parser.add_argument("--dtype", type=str, default="float32")
+    parser.add_argument("--ivf_min_size", type=int, default=10000)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--stores", type=str, default="mmap,chroma")
+    args = parser.parse_args()
+
+    print(
+        f"vectors: {args.num_vectors}, dim: {args.dim}, queries: {args.num_queries}, "
+        f"topk: {args.topk}"
+    )
+    for store_type in args.stores.split(","):
+        try:
+            result = run_benchmark(store_type, args)
+        except ImportError as e:
+            print(f"{store_type}: skipped, {e}")
+            continue
+        print(
+            f"{store_type}: load {result['load_seconds']:.2f}s, "
+            f"p50 {result['p50_ms']:.2f}ms, p99 {result['p99_ms']:.2f}ms, "
+            f"qps {result['qps']:.1f}, batch qps {result['batch_qps']:.1f}, "
+            f"recall@{args.topk} {result['recall']:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+    main()
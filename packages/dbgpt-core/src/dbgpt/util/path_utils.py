@@ -1,6 +1,21 @@
+import hashlib
 import os
+import re
+
+_SAFE_DIR_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9_][-a-zA-Z0-9_.]{0,127}$")
 
 
 def has_path(filename):
     directory = os.path.dirname(filename)
     return bool(directory)
+
+
+def safe_dir_name(name: str) -> str:
+    """Return a directory name of the name which is safe to join to a path.
+
+    The name is kept if it is a plain file name, otherwise its sha256 hex digest is
+    returned, e.g. for the names with path separators, ".." or too long names.
+    """
+    if _SAFE_DIR_NAME_PATTERN.match(name) and ".." not in name:
+        return name
+    return hashlib.sha256(name.encode("utf-8")).hexdigest()
@@ -0,0 +1,15 @@
+import hashlib
+
+import pytest
+
+from dbgpt.util.path_utils import safe_dir_name
+
+
+@pytest.mark.parametrize("name", ["space_1", "my-space.v2", "_private"])
+def test_safe_dir_name_keeps_plain_names(name):
+    assert safe_dir_name(name) == name
+
+
+@pytest.mark.parametrize("name", ["../etc", "a/b", "a..b", ".hidden", "x" * 129, ""])
+def test_safe_dir_name_hashes_unsafe_names(name):
+    assert safe_dir_name(name) == hashlib.sha256(name.encode("utf-8")).hexdigest()
@@ -8,6 +8,10 @@ from dbgpt.util.tracer.base import (
     Tracer,
     TracerContext,
 )
+from dbgpt.util.tracer.columnar_span_storage import (
+    ColumnarSpanStorage,
+    ColumnarSpanStore,
+)
 from dbgpt.util.tracer.span_storage import (
     FileSpanStorage,
     MemorySpanStorage,
@@ -34,6 +38,8 @@ __all__ = [
     "MemorySpanStorage",
     "FileSpanStorage",
     "SpanStorageContainer",
+    "ColumnarSpanStorage",
+    "ColumnarSpanStore",
     "root_tracer",
     "trace",
     "initialize_tracer",
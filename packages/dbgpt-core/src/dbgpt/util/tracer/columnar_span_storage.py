@@ -0,0 +1,577 @@
+"""Columnar span storage.
+
+The spans are written to compressed columnar segments, and the segments are indexed
+by the trace id, the span type, the operation name and the time range in a sqlite
+database. A query reads only the segments which may have the spans it wants, and
+only the columns it needs, e.g. the latency percentiles of the operations only read
+the operation names and the timestamps.
+
+Segment layout::
+
+    MAGIC | header length (uint32) | header (json) | column blobs (zlib)
+
+The string columns are dictionary encoded, the timestamps are float64 arrays and the
+metadata column is a json list.
+"""
+
+import datetime
+import json
+import logging
+import math
+import os
+import sqlite3
+import struct
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from dbgpt.util.tracer.base import Span, SpanStorage
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"DBGPTSPN1"
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+_INDEX_FILE = "index.db"
+_SEGMENT_SUFFIX = ".spn"
+
+# The string columns, dictionary encoded
+_DICT_COLUMNS = ["trace_id", "span_id", "parent_span_id", "span_type", "operation_name"]
+# The timestamp columns, seconds since the epoch, NaN for None
+_TIME_COLUMNS = ["start_time", "end_time"]
+_JSON_COLUMNS = ["metadata"]
+_COLUMNS = _DICT_COLUMNS + _TIME_COLUMNS + _JSON_COLUMNS
+# The columns indexed by their values
+_INDEXED_COLUMNS = ["trace_id", "span_type", "operation_name"]
+
+
+def _to_timestamp(value: Optional[str]) -> float:
+    if not value:
+        return math.nan
+    return datetime.datetime.strptime(value, _TIME_FORMAT).timestamp()
+
+
+def _from_timestamp(value: float) -> Optional[str]:
+    if math.isnan(value):
+        return None
+    return datetime.datetime.fromtimestamp(value).strftime(_TIME_FORMAT)[:-3]
+
+
+def _encode_dict_column(values: List[Optional[str]]) -> bytes:
+    codes_by_value: Dict[Optional[str], int] = {}
+    codes = array(
+        "i", (codes_by_value.setdefault(v, len(codes_by_value)) for v in values)
+    )
+    dictionary = json.dumps(list(codes_by_value), ensure_ascii=False).encode("utf-8")
+    return struct.pack("<I", len(dictionary)) + dictionary + codes.tobytes()
+
+
+def _decode_dict_column(data: bytes) -> List[Optional[str]]:
+    (dict_len,) = struct.unpack_from("<I", data)
+    dictionary = json.loads(data[4 : 4 + dict_len].decode("utf-8"))
+    codes = array("i")
+    codes.frombytes(data[4 + dict_len :])
+    return [dictionary[code] for code in codes]
+
+
+def _encode_column(name: str, values: List[Any]) -> bytes:
+    if name in _DICT_COLUMNS:
+        data = _encode_dict_column(values)
+    elif name in _TIME_COLUMNS:
+        data = array("d", values).tobytes()
+    else:
+        data = json.dumps(values, ensure_ascii=False).encode("utf-8")
+    return zlib.compress(data)
+
+
+def _decode_column(name: str, blob: bytes) -> List[Any]:
+    data = zlib.decompress(blob)
+    if name in _DICT_COLUMNS:
+        return _decode_dict_column(data)
+    if name in _TIME_COLUMNS:
+        values = array("d")
+        values.frombytes(data)
+        return values.tolist()
+    return json.loads(data.decode("utf-8"))
+
+
+def _percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """Return the percentile with the linear interpolation, like numpy."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * percent / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        rank - low
+    )
+
+
+@dataclass
+class OperationLatency:
+    """The latency statistics of an operation, in milliseconds."""
+
+    operation_name: str
+    count: int
+    mean: float
+    max: float
+    percentiles: Dict[float, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a dict."""
+        return {
+            "operation_name": self.operation_name,
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            **{f"p{p:g}": v for p, v in self.percentiles.items()},
+        }
+
+
+def compute_latency_percentiles(
+    spans: Iterable[Dict],
+    percentiles: Sequence[float] = (50, 95, 99),
+) -> List[OperationLatency]:
+    """Compute the latency percentiles of each operation from the span dicts.
+
+    Only the ended spans are counted, the result is sorted by the total time spent
+    in the operation, descending.
+    """
+    durations: Dict[str, List[float]] = {}
+    for span in spans:
+        if not span.get("end_time") or not span.get("start_time"):
+            continue
+        duration = _to_timestamp(span["end_time"]) - _to_timestamp(span["start_time"])
+        durations.setdefault(span.get("operation_name") or "", []).append(
+            duration * 1000
+        )
+    return _latency_from_durations(durations, percentiles)
+
+
+def _latency_from_durations(
+    durations: Dict[str, List[float]], percentiles: Sequence[float]
+) -> List[OperationLatency]:
+    result = []
+    for operation_name, values in durations.items():
+        values.sort()
+        result.append(
+            OperationLatency(
+                operation_name=operation_name,
+                count=len(values),
+                mean=sum(values) / len(values),
+                max=values[-1],
+                percentiles={p: _percentile(values, p) for p in percentiles},
+            )
+        )
+    result.sort(key=lambda item: item.mean * item.count, reverse=True)
+    return result
+
+
+class _Segment:
+    """A segment file, the columns are read on demand."""
+
+    def __init__(self, path: str):
+        self._path = path
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"Not a span segment file: {path}")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+        self._data_offset = len(_MAGIC) + 4 + header_len
+        self._columns: Dict[str, List[Any]] = {}
+
+    @property
+    def count(self) -> int:
+        return self.header["count"]
+
+    def column(self, name: str) -> List[Any]:
+        if name not in self._columns:
+            offset, length = self.header["columns"][name]
+            with open(self._path, "rb") as f:
+                f.seek(self._data_offset + offset)
+                self._columns[name] = _decode_column(name, f.read(length))
+        return self._columns[name]
+
+    def spans(self, rows: Iterable[int]) -> List[Dict]:
+        """Return the span dicts of the rows."""
+        columns = {name: self.column(name) for name in _COLUMNS}
+        spans = []
+        for i in rows:
+            span = {name: columns[name][i] for name in _DICT_COLUMNS}
+            for name in _TIME_COLUMNS:
+                span[name] = _from_timestamp(columns[name][i])
+            span["metadata"] = columns["metadata"][i]
+            spans.append(span)
+        return spans
+
+    @staticmethod
+    def write(path: str, spans: List[Dict]) -> Dict[str, Any]:
+        """Write the span dicts to a segment file, return the header."""
+        columns: Dict[str, List[Any]] = {name: [] for name in _COLUMNS}
+        for span in spans:
+            for name in _DICT_COLUMNS:
+                columns[name].append(span.get(name))
+            for name in _TIME_COLUMNS:
+                columns[name].append(_to_timestamp(span.get(name)))
+            columns["metadata"].append(span.get("metadata"))
+        blobs = []
+        header: Dict[str, Any] = {"count": len(spans), "columns": {}}
+        offset = 0
+        for name in _COLUMNS:
+            blob = _encode_column(name, columns[name])
+            header["columns"][name] = [offset, len(blob)]
+            offset += len(blob)
+            blobs.append(blob)
+        start_times = [t for t in columns["start_time"] if not math.isnan(t)]
+        header["min_start"] = min(start_times) if start_times else None
+        header["max_start"] = max(start_times) if start_times else None
+        header_data = json.dumps(header).encode("utf-8")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(struct.pack("<I", len(header_data)))
+            f.write(header_data)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+        return header
+
+
+class ColumnarSpanStore:
+    """The segments of a directory and their index.
+
+    It can be shared by several processes, each segment is written to a new file
+    and indexed in one transaction.
+    """
+
+    def __init__(self, path: str):
+        """Create a new ColumnarSpanStore.
+
+        Args:
+            path (str): The directory of the segments and the index.
+        """
+        os.makedirs(path, exist_ok=True)
+        self._path = path
+        self._conn = sqlite3.connect(
+            os.path.join(path, _INDEX_FILE), check_same_thread=False, timeout=30
+        )
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, file TEXT NOT NULL, "
+            "min_start REAL, max_start REAL, span_count INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS segment_terms ("
+            "field TEXT NOT NULL, value TEXT NOT NULL, segment_id INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_segment_terms "
+            "ON segment_terms (field, value);"
+            "CREATE INDEX IF NOT EXISTS idx_segments_time "
+            "ON segments (min_start, max_start);"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Whether there is a store in the directory."""
+        return os.path.exists(os.path.join(path, _INDEX_FILE))
+
+    def close(self):
+        """Close the index."""
+        with self._lock:
+            self._conn.close()
+
+    def write_segment(self, spans: List[Dict]) -> Optional[str]:
+        """Write the span dicts to a new segment.
+
+        Returns:
+            Optional[str]: The file name of the segment, None if no spans.
+        """
+        if not spans:
+            return None
+        file_name = (
+            f"seg_{datetime.datetime.now():%Y%m%d%H%M%S}_{uuid.uuid4().hex[:8]}"
+            f"{_SEGMENT_SUFFIX}"
+        )
+        header = _Segment.write(os.path.join(self._path, file_name), spans)
+        terms = {
+            (name, span[name])
+            for span in spans
+            for name in _INDEXED_COLUMNS
+            if span.get(name) is not None
+        }
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO segments (file, min_start, max_start, span_count) "
+                    "VALUES (?, ?, ?, ?)",
+                    (file_name, header["min_start"], header["max_start"], len(spans)),
+                )
+                segment_id = cursor.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO segment_terms (field, value, segment_id) "
+                    "VALUES (?, ?, ?)",
+                    [(name, value, segment_id) for name, value in terms],
+                )
+        return file_name
+
+    def _find_segments(
+        self,
+        terms: Dict[str, Optional[str]],
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        sql = "SELECT id, file FROM segments WHERE 1 = 1"
+        params: List[Any] = []
+        for name, value in terms.items():
+            if value is None:
+                continue
+            sql += (
+                " AND id IN (SELECT segment_id FROM segment_terms "
+                "WHERE field = ? AND value = ?)"
+            )
+            params.extend([name, value])
+        if start_time:
+            sql += " AND max_start >= ?"
+            params.append(start_time.timestamp())
+        if end_time:
+            sql += " AND min_start <= ?"
+            params.append(end_time.timestamp())
+        sql += " ORDER BY min_start"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{"id": row[0], "file": row[1]} for row in rows]
+
+    def _open_segments(self, segments: List[Dict[str, Any]]) -> Iterable[_Segment]:
+        for segment in segments:
+            path = os.path.join(self._path, segment["file"])
+            try:
+                yield _Segment(path)
+            except FileNotFoundError:
+                # Removed by a compaction of another process
+                logger.debug(f"Span segment {path} not found")
+
+    @staticmethod
+    def _match_rows(
+        segment: _Segment,
+        terms: Dict[str, Optional[str]],
+        start_ts: Optional[float],
+        end_ts: Optional[float],
+    ) -> List[int]:
+        rows = range(segment.count)
+        for name, value in terms.items():
+            if value is not None:
+                column = segment.column(name)
+                rows = [i for i in rows if column[i] == value]
+        if start_ts is not None or end_ts is not None:
+            start_times = segment.column("start_time")
+            rows = [
+                i
+                for i in rows
+                if (start_ts is None or start_times[i] >= start_ts)
+                and (end_ts is None or start_times[i] <= end_ts)
+            ]
+        return list(rows)
+
+    def query(
+        self,
+        trace_id: Optional[str] = None,
+        span_type: Optional[str] = None,
+        operation_name: Optional[str] = None,
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+    ) -> List[Dict]:
+        """Return the span dicts matched, in the order they are written.
+
+        Args:
+            trace_id (Optional[str]): The trace id.
+            span_type (Optional[str]): The span type.
+            operation_name (Optional[str]): The operation name.
+            start_time (Optional[datetime.datetime]): The min start time.
+            end_time (Optional[datetime.datetime]): The max start time.
+        """
+        terms = {
+            "trace_id": trace_id,
+            "span_type": span_type,
+            "operation_name": operation_name,
+        }
+        start_ts = start_time.timestamp() if start_time else None
+        end_ts = end_time.timestamp() if end_time else None
+        spans = []
+        segments = self._find_segments(terms, start_time, end_time)
+        for segment in self._open_segments(segments):
+            rows = self._match_rows(segment, terms, start_ts, end_ts)
+            if not rows:
+                continue
+            spans.extend(segment.spans(rows))
+        return spans
+
+    def latency_percentiles(
+        self,
+        percentiles: Sequence[float] = (50, 95, 99),
+        span_type: Optional[str] = None,
+        operation_name: Optional[str] = None,
+        start_time: Optional[datetime.datetime] = None,
+        end_time: Optional[datetime.datetime] = None,
+    ) -> List[OperationLatency]:
+        """Return the latency percentiles of each operation, in milliseconds.
+
+        Only the operation name, the span type and the timestamps are read.
+        """
+        terms = {"span_type": span_type, "operation_name": operation_name}
+        start_ts = start_time.timestamp() if start_time else None
+        end_ts = end_time.timestamp() if end_time else None
+        durations: Dict[str, List[float]] = {}
+        segments = self._find_segments(terms, start_time, end_time)
+        for segment in self._open_segments(segments):
+            rows = self._match_rows(segment, terms, start_ts, end_ts)
+            if not rows:
+                continue
+            operations = segment.column("operation_name")
+            start_times = segment.column("start_time")
+            end_times = segment.column("end_time")
+            for i in rows:
+                end = end_times[i]
+                if math.isnan(end):
+                    continue
+                durations.setdefault(operations[i] or "", []).append(
+                    (end - start_times[i]) * 1000
+                )
+        return _latency_from_durations(durations, percentiles)
+
+    def compact(self, min_spans: int = 10000) -> int:
+        """Merge the segments smaller than ``min_spans`` spans.
+
+        Returns:
+            int: The number of the segments merged.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, file FROM segments WHERE span_count < ? ORDER BY min_start",
+                (min_spans,),
+            ).fetchall()
+        if len(rows) < 2:
+            return 0
+        merged: List[Dict] = []
+        merged_ids = []
+        for segment_id, file_name in rows:
+            merged_ids.append(segment_id)
+            segment = next(self._open_segments([{"file": file_name}]), None)
+            if segment is None:
+                continue
+            merged.extend(segment.spans(range(segment.count)))
+            if len(merged) >= min_spans:
+                self._replace_segments(merged_ids, merged)
+                merged, merged_ids = [], []
+        if len(merged_ids) > 1:
+            self._replace_segments(merged_ids, merged)
+        return len(rows)
+
+    def _replace_segments(self, segment_ids: List[int], spans: List[Dict]):
+        self.write_segment(spans)
+        placeholders = ",".join("?" * len(segment_ids))
+        with self._lock:
+            files = [
+                row[0]
+                for row in self._conn.execute(
+                    f"SELECT file FROM segments WHERE id IN ({placeholders})",
+                    segment_ids,
+                )
+            ]
+            with self._conn:
+                self._conn.execute(
+                    f"DELETE FROM segment_terms WHERE segment_id IN ({placeholders})",
+                    segment_ids,
+                )
+                self._conn.execute(
+                    f"DELETE FROM segments WHERE id IN ({placeholders})", segment_ids
+                )
+        for file_name in files:
+            try:
+                os.remove(os.path.join(self._path, file_name))
+            except FileNotFoundError:
+                pass
+
+
+class ColumnarSpanStorage(SpanStorage):
+    """Store the spans in the columnar segments of a directory.
+
+    The spans are buffered in memory and written to a new segment when there are
+    ``segment_size`` spans or the oldest span is buffered for ``flush_interval``
+    seconds, so the segments are not too small to be scanned fast. A background
+    thread writes the buffered spans in time when no more spans are appended.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        segment_size: int = 10000,
+        flush_interval: float = 300,
+    ):
+        """Create a new ColumnarSpanStorage.
+
+        Args:
+            path (str): The directory of the segments.
+            segment_size (int): The max number of the spans of a segment.
+            flush_interval (float): The max seconds a span is buffered.
+        """
+        super().__init__()
+        self.store = ColumnarSpanStore(path)
+        self._segment_size = segment_size
+        self._flush_interval = flush_interval
+        self._buffer: List[Dict] = []
+        self._buffer_since = 0.0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically, name="columnar_span_flush", daemon=True
+        )
+        self._flush_thread.start()
+
+    def append_span(self, span: Span):
+        self.append_span_batch([span])
+
+    def append_span_batch(self, spans: List[Span]):
+        to_write = None
+        with self._lock:
+            if not self._buffer:
+                self._buffer_since = time.time()
+            self._buffer.extend(span.to_dict() for span in spans)
+            if (
+                len(self._buffer) >= self._segment_size
+                or time.time() - self._buffer_since >= self._flush_interval
+            ):
+                to_write, self._buffer = self._buffer, []
+        if to_write:
+            self.store.write_segment(to_write)
+
+    def flush(self):
+        """Write the buffered spans."""
+        with self._lock:
+            to_write, self._buffer = self._buffer, []
+        if to_write:
+            self.store.write_segment(to_write)
+
+    def _next_flush_delay(self) -> float:
+        with self._lock:
+            if not self._buffer:
+                return self._flush_interval
+            return self._buffer_since + self._flush_interval - time.time()
+
+    def _flush_periodically(self):
+        while not self._stop_event.wait(max(self._next_flush_delay(), 0.01)):
+            if self._next_flush_delay() > 0:
+                continue
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Flush the buffered spans failed: {e}")
+
+    def before_stop(self):
+        self._stop_event.set()
+        self._flush_thread.join()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"Flush the buffered spans failed: {e}")
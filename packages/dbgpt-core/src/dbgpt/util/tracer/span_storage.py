@@ -111,6 +111,12 @@ class SpanStorageContainer(SpanStorage):
             self.flush_thread.join()
         except Exception:
             pass
+        # Some storages buffer the spans
+        for s in self.storages:
+            try:
+                s.before_stop()
+            except Exception as e:
+                logger.warning(f"Stop storage {str(s)} failed: {str(e)}")
 
 
 class FileSpanStorage(SpanStorage):
@@ -0,0 +1,161 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from click.testing import CliRunner
+
+from dbgpt.util.tracer import (
+    ColumnarSpanStorage,
+    ColumnarSpanStore,
+    Span,
+    SpanType,
+    tracer_cli,
+)
+from dbgpt.util.tracer.columnar_span_storage import compute_latency_percentiles
+from dbgpt.util.tracer.tracer_cli import trace_cli_group
+
+_BASE_TIME = datetime(2024, 1, 1, 10, 0, 0)
+
+
+def _span_dicts(trace_id: str, operation_name: str, start: datetime, ms: int):
+    span = Span(trace_id, f"{trace_id}:{operation_name}", SpanType.CHAT, None)
+    span.operation_name = operation_name
+    span.metadata = {"conv_uid": trace_id}
+    span.start_time = start
+    start_dict = span.to_dict()
+    span.end_time = start + timedelta(milliseconds=ms)
+    return [start_dict, span.to_dict()]
+
+
+@pytest.fixture
+def spans():
+    spans = []
+    for i in range(100):
+        start = _BASE_TIME + timedelta(minutes=i)
+        spans.extend(_span_dicts(f"trace_{i}", "chat", start, i + 1))
+        spans.extend(_span_dicts(f"trace_{i}", "retrieve", start, 10))
+    return spans
+
+
+@pytest.fixture
+def store(tmp_path, spans):
+    store = ColumnarSpanStore(str(tmp_path / "store"))
+    for i in range(0, len(spans), 50):
+        store.write_segment(spans[i : i + 50])
+    yield store
+    store.close()
+
+
+def test_query_by_trace_id(store, spans):
+    result = store.query(trace_id="trace_42")
+    assert result == [span for span in spans if span["trace_id"] == "trace_42"]
+    # Only the segment of the trace is read
+    assert len(store._find_segments({"trace_id": "trace_42"})) == 1
+    assert store.query(trace_id="not_exist") == []
+
+
+def test_query_by_time(store):
+    result = store.query(
+        start_time=_BASE_TIME + timedelta(minutes=10),
+        end_time=_BASE_TIME + timedelta(minutes=19),
+    )
+    assert {span["trace_id"] for span in result} == {
+        f"trace_{i}" for i in range(10, 20)
+    }
+
+
+def test_latency_percentiles(store, spans):
+    stats = {item.operation_name: item for item in store.latency_percentiles()}
+    assert stats["chat"].count == 100
+    assert stats["chat"].percentiles[50] == pytest.approx(50.5, abs=0.01)
+    assert stats["chat"].percentiles[99] == pytest.approx(99.01, abs=0.01)
+    assert stats["chat"].max == pytest.approx(100, abs=0.01)
+    assert stats["retrieve"].percentiles[95] == pytest.approx(10, abs=0.01)
+    # The same as computed from the span dicts
+    expected = compute_latency_percentiles(spans)
+    assert [item.to_dict() for item in store.latency_percentiles()] == [
+        item.to_dict() for item in expected
+    ]
+    only_chat = store.latency_percentiles(operation_name="chat")
+    assert [item.operation_name for item in only_chat] == ["chat"]
+
+
+def test_compact(store, spans):
+    assert store.compact(min_spans=1000) == 8
+    assert len(store._find_segments({})) == 1
+    assert len(os.listdir(store._path)) == 2
+    assert store.query() == spans
+
+
+def test_storage_buffers_spans(tmp_path):
+    storage = ColumnarSpanStorage(str(tmp_path), segment_size=3)
+    span = Span("t1", "s1", SpanType.BASE, None, "op")
+    storage.append_span_batch([span, span])
+    assert storage.store.query(trace_id="t1") == []
+    storage.append_span(span)
+    assert len(storage.store.query(trace_id="t1")) == 3
+    storage.append_span(span)
+    storage.before_stop()
+    assert len(storage.store.query(trace_id="t1")) == 4
+
+
+def test_storage_flush_when_idle(tmp_path):
+    storage = ColumnarSpanStorage(str(tmp_path), flush_interval=0.05)
+    storage.append_span(Span("t1", "s1", SpanType.BASE, None, "op"))
+    # Written by the background thread, no more spans are appended
+    for _ in range(200):
+        if storage.store.query(trace_id="t1"):
+            break
+        time.sleep(0.05)
+    assert len(storage.store.query(trace_id="t1")) == 1
+    storage.before_stop()
+
+
+def test_cli(tmp_path, spans):
+    log_file = tmp_path / "dbgpt_webserver_tracer.jsonl"
+    log_file.write_text("\n".join(json.dumps(span) for span in spans))
+    store_dir = str(tmp_path / "store")
+    runner = CliRunner()
+    result = runner.invoke(
+        trace_cli_group, ["index", "--store", store_dir, str(log_file)]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Imported 400 spans" in result.output
+
+    from_store = runner.invoke(
+        trace_cli_group, ["tree", "--trace_id", "trace_7", "--store", store_dir]
+    )
+    from_file = runner.invoke(
+        trace_cli_group, ["tree", "--trace_id", "trace_7", str(log_file)]
+    )
+    assert from_store.exit_code == 0, from_store.output
+    assert from_store.output == from_file.output
+    assert "Operation: retrieve" in from_store.output
+
+    from_store = runner.invoke(
+        trace_cli_group, ["latency", "--store", store_dir, "--output", "json"]
+    )
+    from_file = runner.invoke(
+        trace_cli_group, ["latency", "--output", "json", str(log_file)]
+    )
+    assert from_store.exit_code == 0, from_store.output
+    assert from_store.output == from_file.output
+    assert "P99" in from_store.output
+
+
+def test_cli_reads_files_without_store_option(tmp_path, spans, monkeypatch):
+    log_file = tmp_path / "dbgpt_webserver_tracer.jsonl"
+    log_file.write_text("\n".join(json.dumps(span) for span in spans))
+    # The default store only has the spans of another trace
+    store_dir = tmp_path / "trace_store"
+    store = ColumnarSpanStore(str(store_dir))
+    store.write_segment([span for span in spans if span["trace_id"] == "trace_1"])
+    store.close()
+    monkeypatch.setattr(tracer_cli, "_DEFAULT_FILE_PATTERN", str(log_file))
+    monkeypatch.setattr(tracer_cli, "_DEFAULT_STORE_DIR", str(store_dir))
+
+    result = CliRunner().invoke(trace_cli_group, ["tree", "--trace_id", "trace_7"])
+    assert result.exit_code == 0, result.output
+    assert "Operation: retrieve" in result.output
@@ -3,7 +3,7 @@ import json
 import logging
 import os
 from datetime import datetime
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Optional
 
 import click
 
@@ -14,6 +14,20 @@ logger = logging.getLogger("dbgpt_cli")
 
 
 _DEFAULT_FILE_PATTERN = os.path.join(LOGDIR, "dbgpt*.jsonl")
+_DEFAULT_STORE_DIR = os.path.join(LOGDIR, "trace_store")
+
+_store_option = click.option(
+    "--store",
+    required=False,
+    type=str,
+    default=None,
+    help=(
+        "Read the spans from the columnar span store in this directory instead of "
+        "the tracer files, e.g. the store written by the `index` command or the "
+        f"`columnar_store_dir` of the tracer, such as {_DEFAULT_STORE_DIR}. The "
+        "store only has the spans indexed or written since it was enabled"
+    ),
+)
 
 
 @click.group("trace")
@@ -132,6 +146,7 @@ def trace_cli_group():
     is_flag=True,
     help="Just show the value after extracting the JSON path",
 )
+@_store_option
 @click.argument("files", nargs=-1, type=click.Path(exists=True, readable=True))
 def list(
     trace_id: str,
@@ -148,13 +163,24 @@ def list(
     search_json_path: str,
     json_path_match: str,
     value: bool = False,
+    store: str = None,
     files=None,
 ):
     """List your trace spans"""
     from prettytable import PrettyTable
 
-    # If no files are explicitly specified, use the default pattern to get them
-    spans = read_spans_from_files(files)
+    span_store = _open_store(store, files)
+    if span_store:
+        # Only read the segments which may have the spans
+        spans = span_store.query(
+            trace_id=trace_id,
+            span_type=span_type,
+            start_time=_parse_datetime(start_time) if start_time else None,
+            end_time=_parse_datetime(end_time) if end_time else None,
+        )
+    else:
+        # If no files are explicitly specified, use the default pattern to get them
+        spans = read_spans_from_files(files)
 
     if trace_id:
         spans = filter(lambda s: s["trace_id"] == trace_id, spans)
@@ -291,16 +317,160 @@ def list(
     type=str,
     help="Specify the trace ID to list",
 )
+@_store_option
 @click.argument("files", nargs=-1, type=click.Path(exists=True, readable=True))
-def tree(trace_id: str, files):
+def tree(trace_id: str, store: str, files):
     """Display trace links as a tree"""
-    hierarchy = _view_trace_hierarchy(trace_id, files)
+    hierarchy = _view_trace_hierarchy(trace_id, files, store)
     if not hierarchy:
         _print_empty_message(files)
         return
     _print_trace_hierarchy(hierarchy)
 
 
+@trace_cli_group.command()
+@click.option(
+    "--span_type",
+    required=False,
+    type=str,
+    default=None,
+    help="Specify the Span Type to analyze.",
+)
+@click.option(
+    "--operation",
+    required=False,
+    type=str,
+    default=None,
+    help="Specify the operation name to analyze.",
+)
+@click.option(
+    "--start_time",
+    type=str,
+    help='Filter by start time. Format: "YYYY-MM-DD HH:MM:SS.mmm"',
+)
+@click.option(
+    "--end_time", type=str, help='Filter by end time. Format: "YYYY-MM-DD HH:MM:SS.mmm"'
+)
+@click.option(
+    "--percentiles",
+    type=str,
+    default="50,95,99",
+    show_default=True,
+    help="The percentiles to report, split by `,`",
+)
+@click.option(
+    "-l",
+    "--limit",
+    type=int,
+    default=20,
+    help="Limit the number of operations displayed, sorted by the total time.",
+)
+@click.option(
+    "--output",
+    required=False,
+    type=click.Choice(["text", "html", "csv", "latex", "json"]),
+    default="text",
+    help="The output format",
+)
+@_store_option
+@click.argument("files", nargs=-1, type=click.Path(exists=True, readable=True))
+def latency(
+    span_type: str,
+    operation: str,
+    start_time: str,
+    end_time: str,
+    percentiles: str,
+    limit: int,
+    output: str,
+    store: str,
+    files,
+):
+    """Show the latency percentiles of each operation, in milliseconds"""
+    from prettytable import PrettyTable
+
+    from dbgpt.util.tracer.columnar_span_storage import compute_latency_percentiles
+
+    percent_values = [float(p) for p in percentiles.split(",") if p.strip()]
+    start_dt = _parse_datetime(start_time) if start_time else None
+    end_dt = _parse_datetime(end_time) if end_time else None
+    span_store = _open_store(store, files)
+    if span_store:
+        stats = span_store.latency_percentiles(
+            percent_values,
+            span_type=span_type,
+            operation_name=operation,
+            start_time=start_dt,
+            end_time=end_dt,
+        )
+    else:
+        spans = read_spans_from_files(files)
+        if span_type:
+            spans = filter(lambda s: s["span_type"] == span_type, spans)
+        if operation:
+            spans = filter(lambda s: s["operation_name"] == operation, spans)
+        if start_dt:
+            spans = filter(
+                lambda s: _parse_datetime(s["start_time"]) >= start_dt, spans
+            )
+        if end_dt:
+            spans = filter(lambda s: _parse_datetime(s["start_time"]) <= end_dt, spans)
+        stats = compute_latency_percentiles(spans, percent_values)
+    if not stats:
+        _print_empty_message(files)
+        return
+    table = PrettyTable(
+        ["Operation Name", "Count", "Mean"]
+        + [f"P{p:g}" for p in percent_values]
+        + ["Max"]
+    )
+    for item in stats[:limit]:
+        table.add_row(
+            [item.operation_name, item.count, round(item.mean, 2)]
+            + [round(item.percentiles[p], 2) for p in percent_values]
+            + [round(item.max, 2)]
+        )
+    out_kwargs = {"ensure_ascii": False} if output == "json" else {}
+    print(table.get_formatted_string(out_format=output, **out_kwargs))
+
+
+@trace_cli_group.command()
+@click.option(
+    "--store",
+    required=False,
+    type=str,
+    default=_DEFAULT_STORE_DIR,
+    show_default=True,
+    help="The directory of the columnar span store.",
+)
+@click.option(
+    "--batch_size",
+    type=int,
+    default=10000,
+    show_default=True,
+    help="The max number of the spans of a segment.",
+)
+@click.argument("files", nargs=-1, type=click.Path(exists=True, readable=True))
+def index(store: str, batch_size: int, files):
+    """Import the spans of the tracer files to the columnar span store"""
+    from dbgpt.util.tracer.columnar_span_storage import ColumnarSpanStore
+
+    span_store = ColumnarSpanStore(store)
+    count = 0
+    batch = []
+    for span in read_spans_from_files(files):
+        batch.append(span)
+        if len(batch) >= batch_size:
+            span_store.write_segment(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        span_store.write_segment(batch)
+        count += len(batch)
+    merged = span_store.compact(batch_size)
+    span_store.close()
+    print(f"Imported {count} spans to {store}, merged {merged} small segments")
+
+
 @trace_cli_group.command()
 @click.option(
     "--trace_id",
@@ -546,6 +716,21 @@ def read_spans_from_files(files=None) -> Iterable[Dict]:
                     yield json.loads(line)
 
 
+def _open_store(store: Optional[str] = None, files=None):
+    """Return the columnar span store, None if files are given or no store given.
+
+    The store is only used when it is given explicitly, it may not have all the spans
+    of the tracer files.
+    """
+    from dbgpt.util.tracer.columnar_span_storage import ColumnarSpanStore
+
+    if files or not store:
+        return None
+    if not ColumnarSpanStore.exists(store):
+        raise click.BadParameter(f"No span store in {store}", param_hint="--store")
+    return ColumnarSpanStore(store)
+
+
 def _print_empty_message(files=None):
     if not files:
         files = [_DEFAULT_FILE_PATTERN]
@@ -624,10 +809,14 @@ def _build_trace_hierarchy(spans, parent_span_id=None, indent=0):
     return hierarchy
 
 
-def _view_trace_hierarchy(trace_id, files=None):
+def _view_trace_hierarchy(trace_id, files=None, store=None):
     """Find and display the calls of the entire link based on the given trace_id"""
-    spans = read_spans_from_files(files)
-    trace_spans = [span for span in spans if span["trace_id"] == trace_id]
+    span_store = _open_store(store, files)
+    if span_store:
+        trace_spans = span_store.query(trace_id=trace_id)
+    else:
+        spans = read_spans_from_files(files)
+        trace_spans = [span for span in spans if span["trace_id"] == trace_id]
     if not trace_spans:
         return None
     hierarchy = _build_trace_hierarchy(trace_spans)
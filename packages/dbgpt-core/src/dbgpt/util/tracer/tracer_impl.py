@@ -382,6 +382,16 @@ class TracerParameters(BaseParameters):
             "help": _("The class of the tracer storage"),
         },
     )
+    columnar_store_dir: Optional[str] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The directory to store the spans in the indexed columnar segments "
+                "as well, the trace cli queries them much faster than the tracer "
+                "files, e.g. logs/trace_store"
+            ),
+        },
+    )
 
     def __post_init__(self):
         use_telemetry = os.getenv("TRACER_TO_OPEN_TELEMETRY", "false").lower() == "true"
@@ -433,6 +443,13 @@ def initialize_tracer(
             )
         )
 
+    if tracer_parameters and tracer_parameters.columnar_store_dir:
+        from dbgpt.util.tracer.columnar_span_storage import ColumnarSpanStorage
+
+        storage_container.append_storage(
+            ColumnarSpanStorage(resolve_root_path(tracer_parameters.columnar_store_dir))
+        )
+
     if tracer_parameters and tracer_parameters.tracer_storage_cls:
         tracer_storage_cls = tracer_parameters.tracer_storage_cls
         logger.info(f"Begin parse storage class {tracer_storage_cls}")
@@ -92,6 +92,10 @@ class PostgreSQLConnector(RDBMSConnector):
             engine_args=parameters.engine_args(),
         )
 
+    def _reflect_schema(self) -> Optional[str]:
+        """Return the schema used to reflect table metadata."""
+        return self._schema or "public"
+
     def _sync_tables_from_db(self) -> Iterable[str]:
         """Read table information from database with schema support."""
         schema = self._schema or "public"
@@ -125,8 +129,6 @@ class PostgreSQLConnector(RDBMSConnector):
             view_results = set(row[0] for row in view_results)
             self._all_tables = table_results.union(view_results)
 
-            # Reflect with schema
-            self._metadata.reflect(bind=self._engine, schema=schema)
             return self._all_tables
 
     def get_grants(self):
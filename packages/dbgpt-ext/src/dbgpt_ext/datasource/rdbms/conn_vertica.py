@@ -107,7 +107,6 @@ table name should keep its schema name in "
                 )
             )
             self._all_tables = {row[0] for row in table_results}
-            self._metadata.reflect(bind=self._engine)
             return self._all_tables
 
     def get_grants(self):
@@ -139,3 +139,14 @@ def test_db_dir_exist_dir():
         db = SQLiteConnector.from_file_path(file_path)
         assert os.path.exists(existing_dir) is True
         assert list(db.get_table_names()) == []
+
+
+def test_reflect_tables_lazily(db):
+    db.run("CREATE TABLE test_a (id INTEGER);")
+    db.run("CREATE TABLE test_b (id INTEGER);")
+    db._sync_tables_from_db()
+    assert len(db._metadata.tables) == 0
+    table_info = db.get_table_info(["test_a"])
+    assert "CREATE TABLE test_a" in table_info
+    assert "test_b" not in table_info
+    assert set(db._metadata.tables.keys()) == {"test_a"}
@@ -1,7 +1,7 @@
 """Embedding Assembler."""
 
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 from dbgpt.core import Chunk, Embeddings
 from dbgpt.rag.knowledge.base import Knowledge
@@ -128,13 +128,15 @@ class EmbeddingAssembler(BaseAssembler):
     def persist(self, **kwargs) -> List[str]:
         """Persist chunks into store.
 
+        The keyword arguments ``max_chunks_once_load``, ``max_threads``,
+        ``max_retries``, ``retry_backoff`` and ``progress_callback`` are passed to
+        the index store.
+
         Returns:
             List[str]: List of chunk ids.
         """
-        max_chunks_once_load = kwargs.get("max_chunks_once_load")
-        max_threads = kwargs.get("max_threads")
         return self._index_store.load_document_with_limit(
-            self._chunks, max_chunks_once_load, max_threads
+            self._chunks, **self._load_kwargs(kwargs)
         )
 
     async def apersist(self, **kwargs) -> List[str]:
@@ -144,12 +146,22 @@ class EmbeddingAssembler(BaseAssembler):
             List[str]: List of chunk ids.
         """
         # persist chunks into vector store
-        max_chunks_once_load = kwargs.get("max_chunks_once_load")
-        max_threads = kwargs.get("max_threads")
         return await self._index_store.aload_document_with_limit(
-            self._chunks, max_chunks_once_load, max_threads
+            self._chunks, **self._load_kwargs(kwargs)
         )
 
+    @staticmethod
+    def _load_kwargs(kwargs) -> Dict[str, Any]:
+        load_kwargs = {
+            "max_chunks_once_load": kwargs.get("max_chunks_once_load"),
+            "max_threads": kwargs.get("max_threads"),
+            "max_retries": kwargs.get("max_retries"),
+            "progress_callback": kwargs.get("progress_callback"),
+        }
+        if kwargs.get("retry_backoff") is not None:
+            load_kwargs["retry_backoff"] = kwargs["retry_backoff"]
+        return load_kwargs
+
     def _extract_info(self, chunks) -> List[Chunk]:
         """Extract info from chunks."""
         return []
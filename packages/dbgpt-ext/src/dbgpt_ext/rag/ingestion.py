@@ -0,0 +1,276 @@
+"""Streaming knowledge ingestion pipeline.
+
+The knowledge is loaded, split and persisted into the index store as a pipeline of
+stages, the chunks flow through a bounded queue, so only a limited number of chunks
+are kept in memory no matter how large the knowledge is.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Union
+
+from dbgpt.core import Chunk, Document
+from dbgpt.rag.knowledge.base import Knowledge
+from dbgpt.storage.base import IndexStoreBase
+from dbgpt.util.executor_utils import blocking_func_to_async_no_executor
+from dbgpt.util.tracer import root_tracer
+
+from .chunk_manager import ChunkManager, ChunkParameters
+
+logger = logging.getLogger(__name__)
+
+# Called with the chunks persisted and their ids, after each batch is persisted
+ChunksCallback = Callable[[List[Chunk], List[str]], Union[None, Awaitable[None]]]
+
+_STAGE_LOAD = "load"
+_STAGE_SPLIT = "split"
+_STAGE_PERSIST = "persist"
+
+
+class _PipelineStopped(Exception):
+    """The pipeline is stopped by the failure of another stage."""
+
+
+@dataclass
+class StageMetrics:
+    """The metrics of one stage of the pipeline."""
+
+    name: str
+    items: int = 0
+    seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Return the items processed per second."""
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dict."""
+        return {
+            "name": self.name,
+            "items": self.items,
+            "seconds": self.seconds,
+            "throughput": self.throughput,
+        }
+
+
+@dataclass
+class IngestionResult:
+    """The result of the ingestion."""
+
+    vector_ids: List[str] = field(default_factory=list)
+    document_count: int = 0
+    chunk_count: int = 0
+    max_inflight_chunks: int = 0
+    stages: Dict[str, StageMetrics] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dict, without the vector ids."""
+        return {
+            "document_count": self.document_count,
+            "chunk_count": self.chunk_count,
+            "max_inflight_chunks": self.max_inflight_chunks,
+            "stages": {k: v.to_dict() for k, v in self.stages.items()},
+        }
+
+
+class StreamingIngestionPipeline:
+    """Load, split and persist the knowledge with bounded memory.
+
+    The documents are loaded lazily and split one after another in a background
+    thread, the chunks are grouped into batches of ``max_chunks_once_load`` and
+    persisted by ``max_threads`` concurrent consumers. The producer waits when the
+    number of chunks in flight reaches ``max_inflight_chunks``.
+
+    The embedding is done by the index store when loading the chunks, so embedding and
+    writing are reported as one ``persist`` stage.
+
+    Examples:
+        .. code-block:: python
+
+            pipeline = StreamingIngestionPipeline(
+                knowledge=KnowledgeFactory.from_file_path("path/to/large.csv"),
+                index_store=vector_store,
+                max_chunks_once_load=10,
+                max_threads=4,
+                max_inflight_chunks=1000,
+            )
+            result = await pipeline.arun()
+            print(result.to_dict())
+    """
+
+    def __init__(
+        self,
+        knowledge: Knowledge,
+        index_store: IndexStoreBase,
+        chunk_parameters: Optional[ChunkParameters] = None,
+        max_chunks_once_load: Optional[int] = None,
+        max_threads: Optional[int] = None,
+        max_inflight_chunks: Optional[int] = None,
+    ):
+        """Create a new StreamingIngestionPipeline.
+
+        Args:
+            knowledge (Knowledge): The knowledge datasource.
+            index_store (IndexStoreBase): The index store to persist the chunks.
+            chunk_parameters (Optional[ChunkParameters]): The chunk parameters.
+            max_chunks_once_load (Optional[int]): The number of chunks persisted in one
+                call of the index store, default 10.
+            max_threads (Optional[int]): The number of concurrent persist calls,
+                default 1.
+            max_inflight_chunks (Optional[int]): The approximate max number of chunks
+                split but not persisted yet, default 1000.
+        """
+        if knowledge is None:
+            raise ValueError("knowledge datasource must be provided.")
+        self._knowledge = knowledge
+        self._index_store = index_store
+        self._chunk_manager = ChunkManager(
+            knowledge=knowledge, chunk_parameter=chunk_parameters or ChunkParameters()
+        )
+        self._batch_size = max(1, max_chunks_once_load or 10)
+        self._max_threads = max(1, max_threads or 1)
+        self._max_inflight_chunks = max(1, max_inflight_chunks or 1000)
+        # The chunks of the batches persisting and the batch being built are also in
+        # flight, so the queue keeps the rest.
+        self._queue_size = max(
+            1, self._max_inflight_chunks // self._batch_size - self._max_threads - 1
+        )
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+
+    async def arun(self, on_chunks: Optional[ChunksCallback] = None) -> IngestionResult:
+        """Run the pipeline.
+
+        Args:
+            on_chunks (Optional[ChunksCallback]): Called with the chunks and their ids
+                after each batch is persisted, e.g. to save the chunk details.
+
+        Returns:
+            IngestionResult: The vector ids of all the chunks and the metrics.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        stop_event = threading.Event()
+        result = IngestionResult(
+            stages={
+                name: StageMetrics(name)
+                for name in [_STAGE_LOAD, _STAGE_SPLIT, _STAGE_PERSIST]
+            }
+        )
+        batch_ids: Dict[int, List[str]] = {}
+
+        async def _consume():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                seq, batch = item
+                start = time.perf_counter()
+                ids = await self._index_store.aload_document(batch)
+                stage = result.stages[_STAGE_PERSIST]
+                stage.items += len(batch)
+                stage.seconds += time.perf_counter() - start
+                batch_ids[seq] = ids
+                if on_chunks:
+                    ret = on_chunks(batch, ids)
+                    if asyncio.iscoroutine(ret):
+                        await ret
+                self._update_inflight(-len(batch))
+
+        with root_tracer.start_span(
+            "StreamingIngestionPipeline.arun",
+            metadata={
+                "knowledge_cls": self._knowledge.__class__.__name__,
+                "max_inflight_chunks": self._max_inflight_chunks,
+            },
+        ):
+            producer = asyncio.ensure_future(
+                blocking_func_to_async_no_executor(
+                    self._produce, loop, queue, stop_event, result
+                )
+            )
+            consumers = [
+                asyncio.ensure_future(_consume()) for _ in range(self._max_threads)
+            ]
+            try:
+                await asyncio.gather(producer, *consumers)
+            except BaseException:
+                stop_event.set()
+                for task in consumers:
+                    task.cancel()
+                await asyncio.gather(producer, *consumers, return_exceptions=True)
+                raise
+        for seq in sorted(batch_ids.keys()):
+            result.vector_ids.extend(batch_ids[seq])
+        logger.info(f"Streaming ingestion finished: {result.to_dict()}")
+        return result
+
+    def _update_inflight(self, delta: int, result: Optional[IngestionResult] = None):
+        with self._inflight_lock:
+            self._inflight += delta
+            if result:
+                result.max_inflight_chunks = max(
+                    result.max_inflight_chunks, self._inflight
+                )
+
+    def _produce(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue,
+        stop_event: threading.Event,
+        result: IngestionResult,
+    ):
+        """Load and split the documents, put the batches into the queue."""
+
+        def _put(item):
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    return future.result(timeout=0.1)
+                except concurrent.futures.TimeoutError:
+                    if stop_event.is_set():
+                        future.cancel()
+                        raise _PipelineStopped()
+
+        load_stage = result.stages[_STAGE_LOAD]
+        split_stage = result.stages[_STAGE_SPLIT]
+        seq = 0
+        batch: List[Chunk] = []
+        try:
+            documents: Iterator[Document] = self._knowledge.lazy_load()
+            while True:
+                start = time.perf_counter()
+                doc = next(documents, None)
+                load_stage.seconds += time.perf_counter() - start
+                if doc is None:
+                    break
+                load_stage.items += 1
+                start = time.perf_counter()
+                chunks = self._chunk_manager.split([doc])
+                split_stage.seconds += time.perf_counter() - start
+                split_stage.items += len(chunks)
+                result.document_count += 1
+                result.chunk_count += len(chunks)
+                self._update_inflight(len(chunks), result)
+                for chunk in chunks:
+                    batch.append(chunk)
+                    if len(batch) >= self._batch_size:
+                        _put((seq, batch))
+                        seq += 1
+                        batch = []
+            if batch:
+                _put((seq, batch))
+        except _PipelineStopped:
+            return
+        finally:
+            if not stop_event.is_set():
+                for _ in range(self._max_threads):
+                    try:
+                        _put(None)
+                    except _PipelineStopped:
+                        break
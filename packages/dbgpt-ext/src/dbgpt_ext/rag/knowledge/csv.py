@@ -1,7 +1,7 @@
 """CSV Knowledge."""
 
 import csv
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from dbgpt.core import Document
 from dbgpt.rag.knowledge.base import (
@@ -49,37 +49,44 @@ class CSVKnowledge(Knowledge):
         if self._loader:
             documents = self._loader.load()
         else:
-            docs = []
-            if not self._path:
-                raise ValueError("file path is required")
-            with open(self._path, newline="", encoding=self._encoding) as csvfile:
-                csv_reader = csv.DictReader(csvfile)
-                for i, row in enumerate(csv_reader):
-                    strs = []
-                    for k, v in row.items():
-                        if k is None or v is None:
-                            continue
-                        strs.append(f"{k.strip()}: {v.strip()}")
-                    content = "\n".join(strs)
-                    try:
-                        source = (
-                            row[self._source_column]
-                            if self._source_column is not None
-                            else self._path
-                        )
-                    except KeyError:
-                        raise ValueError(
-                            f"Source column '{self._source_column}' not in CSV file."
-                        )
-                    metadata = {"source": source, "row": i}
-                    if self._metadata:
-                        metadata.update(self._metadata)  # type: ignore
-                    doc = Document(content=content, metadata=metadata)
-                    docs.append(doc)
-
-            return docs
+            return list(self._iter_rows())
         return [Document.langchain2doc(lc_document) for lc_document in documents]
 
+    def lazy_load(self) -> Iterator[Document]:
+        """Load csv document row by row, the file is not read into memory."""
+        if self._loader:
+            yield from self.load()
+            return
+        for doc in self._iter_rows():
+            yield from self._postprocess([doc])
+
+    def _iter_rows(self) -> Iterator[Document]:
+        if not self._path:
+            raise ValueError("file path is required")
+        with open(self._path, newline="", encoding=self._encoding) as csvfile:
+            csv_reader = csv.DictReader(csvfile)
+            for i, row in enumerate(csv_reader):
+                strs = []
+                for k, v in row.items():
+                    if k is None or v is None:
+                        continue
+                    strs.append(f"{k.strip()}: {v.strip()}")
+                content = "\n".join(strs)
+                try:
+                    source = (
+                        row[self._source_column]
+                        if self._source_column is not None
+                        else self._path
+                    )
+                except KeyError:
+                    raise ValueError(
+                        f"Source column '{self._source_column}' not in CSV file."
+                    )
+                metadata = {"source": source, "row": i}
+                if self._metadata:
+                    metadata.update(self._metadata)  # type: ignore
+                yield Document(content=content, metadata=metadata)
+
     @classmethod
     def support_chunk_strategy(cls) -> List[ChunkStrategy]:
         """Return support chunk strategy."""
@@ -4,7 +4,7 @@ import json
 import os
 import re
 from collections import defaultdict
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 from dbgpt.component import logger
 from dbgpt.core import Document
@@ -133,127 +133,123 @@ class PDFKnowledge(Knowledge):
             documents = self._loader.load()
         else:
             self._pdf_processor.pdf_to_json()
-            file_title = self.file_path.rsplit("/", 1)[-1].replace(".pdf", "")
             self.all_text = list(self._pdf_processor.all_text.values())
             self.process_text_data()
-            temp_table = []
-            temp_title = None
-            page_documents = []
-            merged_data = {}  # type: ignore # noqa
-            for i, data in enumerate(self.all_text):
-                content_type = data.get("type")
-                inside_content = data.get("inside")
-                page = data.get("page")
-
-                if content_type == "excel":
-                    temp_table.append(inside_content)
-                    if temp_title is None:
-                        for j in range(i - 1, -1, -1):
-                            if self.all_text[j]["type"] == "excel":
-                                break
-                            if self.all_text[j]["type"] == "text":
-                                content = self.all_text[j]["inside"]
-                                if re.match(
-                                    r"^\d+\.\d+", content
-                                ) or content.startswith("§"):
-                                    temp_title = content.strip()
-                                    break
-                                else:
-                                    temp_title = content.strip()
-                                    break
-                elif content_type == "text":
-                    if page in merged_data:
-                        # page merge
-                        merged_data[page]["inside_content"] += " " + inside_content
-                    else:
-                        merged_data[page] = {
-                            "inside_content": inside_content,
-                            "type": "text",
-                        }
+            return list(self._iter_page_documents(self.all_text))
+        return [Document.langchain2doc(lc_document) for lc_document in documents]
 
-                    # merge excel table
-                    if temp_table:
-                        table_meta = {
-                            "title": temp_title or temp_table[0],
-                            "type": "excel",
-                        }
-                        self.all_title.append(table_meta)
-
-                        # markdown format
-                        markdown_tables = []
-                        if temp_table:
-                            header = eval(temp_table[0])
-                            markdown_tables.append(header)
-                            for entry in temp_table[1:]:
-                                row = eval(entry)
-                                markdown_tables.append(row)
-                            markdown_output = "| " + " | ".join(header) + " |\n"
-                            markdown_output += (
-                                "| " + " | ".join(["---"] * len(header)) + " |\n"
-                            )
-                            for row in markdown_tables[1:]:
-                                markdown_output += "| " + " | ".join(row) + " |\n"
-
-                            #  merged content
-                            merged_data[page]["excel_content"] = temp_table
-                            merged_data[page]["markdown_output"] = markdown_output
-
-                        temp_title = None
-                        temp_table = []
-
-            # deal last excel
-            if temp_table:
-                table_meta = {
-                    "title": temp_title or temp_table[0],
-                    "table": temp_table,
-                    "type": "excel",
-                }
-                self.all_title.append(table_meta)
-                # markdown format
-                markdown_tables = []
-                if temp_table:
-                    header = eval(temp_table[0])
-                    markdown_tables.append(header)
-                    for entry in temp_table[1:]:
-                        row = eval(entry)
-                        markdown_tables.append(row)
-                    markdown_output = "| " + " | ".join(header) + " |\n"
-                    markdown_output += "| " + " | ".join(["---"] * len(header)) + " |\n"
-                    for row in markdown_tables[1:]:
-                        markdown_output += "| " + " | ".join(row) + " |\n"
-                    #  merged content
-                    merged_data[page]["excel_content"] = temp_table
-                    merged_data[page]["markdown_output"] = markdown_output
-
-            for page, content in merged_data.items():
-                inside_content = content["inside_content"]
-                if "markdown_output" in content:
-                    markdown_content = content["markdown_output"]
-                    content_metadata = {
-                        "page": page,
-                        "type": "excel",
-                        "title": file_title,
-                        "source": self.file_path,
-                    }
-                    page_documents.append(
-                        Document(
-                            content=inside_content + "\n" + markdown_content,
-                            metadata=content_metadata,
-                        )
+    def lazy_load(self) -> Iterator[Document]:
+        """Load pdf document page by page, a page is extracted when it is needed.
+
+        The titles of the text are not collected into ``all_title``, they need all
+        the text of the document.
+        """
+        if self._loader:
+            yield from self.load()
+            return
+        for doc in self._iter_page_documents(self._pdf_processor.iter_rows()):
+            yield from self._postprocess([doc])
+
+    def _iter_page_documents(self, rows: Iterable[dict]) -> Iterator[Document]:
+        """Merge the rows extracted into a document of each page.
+
+        A table is merged into the page of the first text row after it, so a page
+        is yielded once a text row of a later page is read.
+        """
+        file_title = self.file_path.rsplit("/", 1)[-1].replace(".pdf", "")
+        temp_table: List[str] = []
+        temp_title = None
+        # The title of the next table, the last text row if no table row after it
+        last_text = None
+        page = None
+        merged_data: Dict[Any, dict] = {}
+        for data in rows:
+            content_type = data.get("type")
+            inside_content = data.get("inside")
+            page = data.get("page")
+
+            if content_type == "excel":
+                temp_table.append(inside_content)
+                if temp_title is None:
+                    temp_title = last_text
+                last_text = None
+            elif content_type == "text":
+                last_text = inside_content.strip()
+                for done_page in [p for p in merged_data if p != page]:
+                    yield self._page_document(
+                        file_title, done_page, merged_data.pop(done_page)
                     )
+                if page in merged_data:
+                    # page merge
+                    merged_data[page]["inside_content"] += " " + inside_content
                 else:
-                    content_metadata = {
-                        "page": page,
+                    merged_data[page] = {
+                        "inside_content": inside_content,
                         "type": "text",
-                        "title": file_title,
-                        "source": self.file_path,
                     }
-                    page_documents.append(
-                        Document(content=inside_content, metadata=content_metadata)
-                    )
 
-            return page_documents
-        return [Document.langchain2doc(lc_document) for lc_document in documents]
+                # merge excel table
+                if temp_table:
+                    table_meta = {
+                        "title": temp_title or temp_table[0],
+                        "type": "excel",
+                    }
+                    self.all_title.append(table_meta)
+                    self._merge_table(merged_data[page], temp_table)
+                    temp_title = None
+                    temp_table = []
+
+        # deal last excel
+        if temp_table:
+            table_meta = {
+                "title": temp_title or temp_table[0],
+                "table": temp_table,
+                "type": "excel",
+            }
+            self.all_title.append(table_meta)
+            self._merge_table(merged_data[page], temp_table)
+
+        for page, content in merged_data.items():
+            yield self._page_document(file_title, page, content)
+
+    @staticmethod
+    def _merge_table(content: dict, temp_table: List[str]) -> None:
+        """Merge the table rows into the page content in markdown format."""
+        markdown_tables = []
+        header = eval(temp_table[0])
+        markdown_tables.append(header)
+        for entry in temp_table[1:]:
+            row = eval(entry)
+            markdown_tables.append(row)
+        markdown_output = "| " + " | ".join(header) + " |\n"
+        markdown_output += "| " + " | ".join(["---"] * len(header)) + " |\n"
+        for row in markdown_tables[1:]:
+            markdown_output += "| " + " | ".join(row) + " |\n"
+        #  merged content
+        content["excel_content"] = temp_table
+        content["markdown_output"] = markdown_output
+
+    def _page_document(self, file_title: str, page: Any, content: dict) -> Document:
+        inside_content = content["inside_content"]
+        if "markdown_output" in content:
+            markdown_content = content["markdown_output"]
+            content_metadata = {
+                "page": page,
+                "type": "excel",
+                "title": file_title,
+                "source": self.file_path,
+            }
+            return Document(
+                content=inside_content + "\n" + markdown_content,
+                metadata=content_metadata,
+            )
+        content_metadata = {
+            "page": page,
+            "type": "text",
+            "title": file_title,
+            "source": self.file_path,
+        }
+        return Document(content=inside_content, metadata=content_metadata)
 
     @classmethod
     def support_chunk_strategy(cls) -> List[ChunkStrategy]:
@@ -503,6 +499,20 @@ class PDFProcessor:
             self.extract_text_and_tables(self.pdf.pages[i])
             logger.info(f"{self.filepath} page {i} extract text success")
 
+    def iter_rows(self) -> Iterator[dict]:
+        """Process pdf page by page, yield the rows of a page once it is extracted.
+
+        The cache of a page is released after it is extracted.
+        """
+        for i, page in enumerate(self.pdf.pages):
+            start = self.allrow
+            self.extract_text_and_tables(page)
+            logger.info(f"{self.filepath} page {i} extract text success")
+            if hasattr(page, "close"):
+                page.close()
+            for row in range(start, self.allrow):
+                yield self.all_text[row]
+
     def save_all_text(self, path):
         """Save all text."""
         directory = os.path.dirname(path)
@@ -35,3 +35,51 @@ def test_load_from_pdf(mock_pdf_open_and_reader):
         assert document.metadata["type"] == "text"
 
     #
+
+
+MOCK_PDF_ROWS = [
+    {"page": 1, "type": "text", "inside": "Report"},
+    {"page": 1, "type": "text", "inside": "Revenue"},
+    {"page": 1, "type": "excel", "inside": "['year', 'amount']"},
+    {"page": 2, "type": "页眉", "inside": "header"},
+    {"page": 2, "type": "excel", "inside": "['2024', '100']"},
+    {"page": 2, "type": "text", "inside": "Cost"},
+    {"page": 3, "type": "text", "inside": "Summary"},
+]
+
+
+class _MockPDFProcessor:
+    def __init__(self, filepath):
+        self.all_text = dict(enumerate(MOCK_PDF_ROWS))
+        self.read_rows = 0
+
+    def pdf_to_json(self):
+        pass
+
+    def iter_rows(self):
+        for row in MOCK_PDF_ROWS:
+            self.read_rows += 1
+            yield row
+
+
+def test_lazy_load_from_pdf():
+    with patch(f"{PDFKnowledge.__module__}.PDFProcessor", _MockPDFProcessor):
+        knowledge = PDFKnowledge(file_path="report.pdf")
+        documents = knowledge._load()
+        lazy_knowledge = PDFKnowledge(file_path="report.pdf")
+        lazy_documents = lazy_knowledge.lazy_load()
+        first = next(lazy_documents)
+        # The first page is yielded before the last page is read
+        assert lazy_knowledge._pdf_processor.read_rows == 6
+        lazy_documents = [first] + list(lazy_documents)
+
+    assert [d.metadata["page"] for d in documents] == [1, 2, 3]
+    assert documents[0].content == "Report Revenue"
+    assert documents[1].metadata["type"] == "excel"
+    assert documents[1].content == (
+        "Cost\n| year | amount |\n| --- | --- |\n| 2024 | 100 |\n"
+    )
+    assert [(d.content, d.metadata) for d in lazy_documents] == [
+        (d.content, d.metadata) for d in documents
+    ]
+    assert lazy_knowledge.all_title == [{"title": "Revenue", "type": "excel"}]
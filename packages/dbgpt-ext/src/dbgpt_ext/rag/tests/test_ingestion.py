@@ -0,0 +1,109 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from dbgpt.core import Chunk
+from dbgpt.storage.base import IndexStoreBase
+from dbgpt_ext.rag.chunk_manager import ChunkParameters
+from dbgpt_ext.rag.ingestion import StreamingIngestionPipeline
+from dbgpt_ext.rag.knowledge.csv import CSVKnowledge
+
+
+class _MemoryIndexStore(IndexStoreBase):
+    def __init__(self, fail_at: int = -1):
+        super().__init__()
+        self.batches: List[List[Chunk]] = []
+        self.running = 0
+        self.max_running = 0
+        self._fail_at = fail_at
+
+    def get_config(self):
+        raise NotImplementedError
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        raise NotImplementedError
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:
+        if len(self.batches) == self._fail_at:
+            raise ValueError("embedding failed")
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.001)
+        self.running -= 1
+        self.batches.append(chunks)
+        return [chunk.chunk_id for chunk in chunks]
+
+    def similar_search_with_scores(self, text, topk, score_threshold, filters=None):
+        return []
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        return []
+
+    def truncate(self) -> List[str]:
+        return []
+
+    def delete_vector_name(self, index_name: str):
+        pass
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "data.csv"
+    rows = ["id,name"] + [f"{i},name-{i}" for i in range(200)]
+    path.write_text("\n".join(rows), encoding="utf-8")
+    return str(path)
+
+
+def _pipeline(csv_file, store, **kwargs):
+    return StreamingIngestionPipeline(
+        knowledge=CSVKnowledge(file_path=csv_file),
+        index_store=store,
+        chunk_parameters=ChunkParameters(chunk_strategy="CHUNK_BY_SIZE"),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_streaming_ingestion(csv_file):
+    store = _MemoryIndexStore()
+    saved = []
+    pipeline = _pipeline(
+        csv_file,
+        store,
+        max_chunks_once_load=10,
+        max_threads=3,
+        max_inflight_chunks=50,
+    )
+    result = await pipeline.arun(on_chunks=lambda chunks, ids: saved.extend(ids))
+    assert result.document_count == 200
+    assert result.chunk_count == 200
+    assert len(result.vector_ids) == 200
+    assert sorted(saved) == sorted(result.vector_ids)
+    assert all(len(b) <= 10 for b in store.batches)
+    assert store.max_running <= 3
+    assert result.max_inflight_chunks <= 50
+    stages = result.to_dict()["stages"]
+    assert stages["load"]["items"] == 200
+    assert stages["persist"]["items"] == 200
+
+
+@pytest.mark.asyncio
+async def test_streaming_ingestion_keeps_order(csv_file):
+    store = _MemoryIndexStore()
+    rows = {}
+
+    def _on_chunks(chunks, ids):
+        rows.update({i: c.metadata["row"] for c, i in zip(chunks, ids)})
+
+    result = await _pipeline(csv_file, store, max_threads=4).arun(_on_chunks)
+    # The vector ids are in the order of the documents, not of the completion
+    assert [rows[i] for i in result.vector_ids] == list(range(200))
+
+
+@pytest.mark.asyncio
+async def test_streaming_ingestion_failed(csv_file):
+    store = _MemoryIndexStore(fail_at=3)
+    pipeline = _pipeline(csv_file, store, max_inflight_chunks=20)
+    with pytest.raises(ValueError, match="embedding failed"):
+        await pipeline.arun()
@@ -30,6 +30,15 @@ def _import_chroma() -> Tuple[Type, Type]:
     return ChromaStore, ChromaVectorConfig
 
 
+def _import_mmap() -> Tuple[Type, Type]:
+    from dbgpt_ext.storage.vector_store.mmap_store import (
+        MmapVectorConfig,
+        MmapVectorStore,
+    )
+
+    return MmapVectorStore, MmapVectorConfig
+
+
 def _import_weaviate() -> Tuple[Type, Type]:
     from dbgpt_ext.storage.vector_store.weaviate_store import (
         WeaviateStore,
@@ -93,6 +102,8 @@ def _select_rag_storage(name: str) -> Tuple[Type, Type]:
         return _import_chroma()
     elif name == "Milvus":
         return _import_milvus()
+    elif name == "Mmap":
+        return _import_mmap()
     elif name == "Weaviate":
         return _import_weaviate()
     elif name == "PGVector":
@@ -145,6 +156,7 @@ def scan_storage_configs():
 __vector_store__ = [
     "Chroma",
     "Milvus",
+    "Mmap",
     "Weaviate",
     "OceanBase",
     "PGVector",
@@ -0,0 +1,1041 @@
+"""In-process vector store backed by memory-mapped arrays.
+
+The embeddings are kept in a memory-mapped float32 or float16 matrix and searched in
+the process, so there is no client or server overhead of an external engine. It is
+designed for the single-node deployments.
+
+The files of a collection:
+
+- ``manifest.json``: the dimension, the data type and the current files.
+- ``vectors.<generation>.bin``: the embeddings, one row per chunk, rewritten by the
+  compactions only.
+- ``segment.<generation>.json``: the snapshot of the ids, the contents, the
+  metadata columns and the deleted rows.
+- ``wal.<generation>.jsonl``: the appends and the deletes after the snapshot.
+- ``ivf.<generation>.npz``: the IVF index of the snapshot.
+
+The appends and the deletes are written to the write-ahead log, a snapshot rewrites
+the segment and empties the log, and a compaction also drops the deleted rows from
+the matrix. The manifest is replaced atomically, so a crash in the middle of a
+snapshot or a compaction keeps the previous generation.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from dbgpt.configs.model_config import PILOT_PATH, resolve_root_path
+from dbgpt.core import Chunk, Embeddings
+from dbgpt.core.awel.flow import Parameter, ResourceCategory, register_resource
+from dbgpt.storage.vector_store.base import (
+    _VECTOR_STORE_COMMON_PARAMETERS,
+    VectorStoreBase,
+    VectorStoreConfig,
+)
+from dbgpt.storage.vector_store.filters import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+)
+from dbgpt.util.i18n_utils import _
+from dbgpt.util.path_utils import safe_dir_name
+
+logger = logging.getLogger(__name__)
+
+_DTYPES = {"float32": np.float32, "float16": np.float16}
+_MIN_CAPACITY = 1024
+# The rows scored at once in the exact search
+_SEARCH_BLOCK_ROWS = 65536
+# Snapshot the segment when the log has so many records
+_MAX_WAL_RECORDS = 1000
+# Rebuild the IVF index when the rows grow so many times since it is built
+_IVF_REBUILD_GROWTH = 4
+
+
+@register_resource(
+    _("Mmap Vector Config"),
+    "mmap_vector_config",
+    category=ResourceCategory.VECTOR_STORE,
+    description=_("In-process vector store config."),
+    parameters=[
+        Parameter.build_from(
+            _("Persist Path"),
+            "persist_path",
+            str,
+            description=_("the persist path of vector store."),
+            optional=True,
+            default=None,
+        ),
+        Parameter.build_from(
+            _("Data Type"),
+            "dtype",
+            str,
+            description=_("the data type of the embeddings, float32 or float16."),
+            optional=True,
+            default="float32",
+        ),
+    ],
+)
+@dataclass
+class MmapVectorConfig(VectorStoreConfig):
+    """In-process vector store config."""
+
+    __type__ = "mmap"
+
+    persist_path: Optional[str] = field(
+        default=os.getenv("MMAP_VECTOR_PERSIST_PATH", None),
+        metadata={
+            "help": _("The persist path of vector store."),
+        },
+    )
+    dtype: str = field(
+        default="float32",
+        metadata={
+            "help": _(
+                "The data type of the embeddings, float32 or float16, float16 halves "
+                "the memory with a little loss of precision."
+            ),
+        },
+    )
+    index_type: str = field(
+        default="ivf",
+        metadata={
+            "help": _(
+                "The index type, ivf or flat, flat always searches all the embeddings."
+            ),
+        },
+    )
+    ivf_min_size: int = field(
+        default=10000,
+        metadata={
+            "help": _(
+                "The min number of the embeddings to build the IVF index, the "
+                "smaller collections are searched exactly."
+            ),
+        },
+    )
+    nlist: Optional[int] = field(
+        default=None,
+        metadata={
+            "help": _(
+                "The number of the IVF lists, the square root of the number of the "
+                "embeddings if not set."
+            ),
+        },
+    )
+    nprobe: int = field(
+        default=8,
+        metadata={
+            "help": _("The number of the IVF lists searched for each query."),
+        },
+    )
+    compact_ratio: float = field(
+        default=0.3,
+        metadata={
+            "help": _(
+                "Compact the collection when the ratio of the deleted embeddings "
+                "exceeds it."
+            ),
+        },
+    )
+
+    def create_store(self, **kwargs) -> "MmapVectorStore":
+        """Create index store."""
+        return MmapVectorStore(vector_store_config=self, **kwargs)
+
+
+class _MetadataColumns:
+    """The ids, the contents and the metadata of the rows, stored by column."""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.contents: List[str] = []
+        self.columns: Dict[str, List[Any]] = {}
+        self.deleted = np.zeros(_MIN_CAPACITY, dtype=bool)
+        self.id_to_row: Dict[str, int] = {}
+        self.deleted_count = 0
+        # The numpy arrays of the columns, rebuilt when the rows change
+        self._arrays: Dict[str, Tuple[int, np.ndarray, np.ndarray]] = {}
+
+    @property
+    def rows(self) -> int:
+        return len(self.ids)
+
+    @property
+    def live_count(self) -> int:
+        return self.rows - self.deleted_count
+
+    def append(
+        self, ids: List[str], contents: List[str], metadatas: List[Dict[str, Any]]
+    ):
+        start = self.rows
+        for key in {k for m in metadatas for k in m.keys()}:
+            if key not in self.columns:
+                self.columns[key] = [None] * start
+        for offset, (chunk_id, content, metadata) in enumerate(
+            zip(ids, contents, metadatas)
+        ):
+            self.ids.append(chunk_id)
+            self.contents.append(content)
+            self.id_to_row[chunk_id] = start + offset
+        for key, column in self.columns.items():
+            column.extend(m.get(key) for m in metadatas)
+        if self.rows > len(self.deleted):
+            deleted = np.zeros(max(self.rows, len(self.deleted) * 2), dtype=bool)
+            deleted[: len(self.deleted)] = self.deleted
+            self.deleted = deleted
+
+    def delete(self, rows: Sequence[int]) -> List[int]:
+        """Mark the rows deleted, return the rows not deleted before."""
+        deleted = []
+        for row in rows:
+            if 0 <= row < self.rows and not self.deleted[row]:
+                self.deleted[row] = True
+                self.id_to_row.pop(self.ids[row], None)
+                deleted.append(row)
+        self.deleted_count += len(deleted)
+        return deleted
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        return {
+            key: column[row]
+            for key, column in self.columns.items()
+            if column[row] is not None
+        }
+
+    def live_mask(self) -> np.ndarray:
+        return ~self.deleted[: self.rows]
+
+    def _column_arrays(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the column as an object array and a float array(nan if not
+        numeric)."""
+        cached = self._arrays.get(key)
+        if cached and cached[0] == self.rows:
+            return cached[1], cached[2]
+        column = self.columns.get(key) or [None] * self.rows
+        objects = np.empty(self.rows, dtype=object)
+        objects[:] = column
+        numbers = np.array(
+            [
+                float(v)
+                if isinstance(v, (int, float)) and not isinstance(v, bool)
+                else np.nan
+                for v in column
+            ],
+            dtype=np.float64,
+        )
+        self._arrays[key] = (self.rows, objects, numbers)
+        return objects, numbers
+
+    def mask(self, filters: MetadataFilters) -> np.ndarray:
+        """Return the rows matching the filters."""
+        masks = [self._filter_mask(f) for f in filters.filters]
+        if not masks:
+            return np.ones(self.rows, dtype=bool)
+        if filters.condition == FilterCondition.OR:
+            return np.logical_or.reduce(masks)
+        return np.logical_and.reduce(masks)
+
+    def _filter_mask(self, metadata_filter: MetadataFilter) -> np.ndarray:
+        objects, numbers = self._column_arrays(metadata_filter.key)
+        exists = np.not_equal(objects, None)
+        value = metadata_filter.value
+        operator = metadata_filter.operator
+        if operator == FilterOperator.EXISTS:
+            return exists if value else ~exists
+        if operator in (FilterOperator.IN, FilterOperator.NIN):
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            matched = _membership(objects, values)
+            return matched if operator == FilterOperator.IN else exists & ~matched
+        if operator == FilterOperator.EQ:
+            return exists & (objects == value)
+        if operator == FilterOperator.NE:
+            return exists & (objects != value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            with np.errstate(invalid="ignore"):
+                if operator == FilterOperator.GT:
+                    return numbers > value
+                if operator == FilterOperator.LT:
+                    return numbers < value
+                if operator == FilterOperator.GTE:
+                    return numbers >= value
+                if operator == FilterOperator.LTE:
+                    return numbers <= value
+        elif operator in (
+            FilterOperator.GT,
+            FilterOperator.LT,
+            FilterOperator.GTE,
+            FilterOperator.LTE,
+        ):
+            return np.fromiter(
+                (_compare(v, operator, value) for v in objects),
+                dtype=bool,
+                count=self.rows,
+            )
+        raise ValueError(f"Mmap vector store filter operator {operator} not supported")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ids": self.ids,
+            "contents": self.contents,
+            "columns": self.columns,
+            "deleted": np.flatnonzero(self.deleted[: self.rows]).tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_MetadataColumns":
+        columns = cls()
+        columns.ids = data["ids"]
+        columns.contents = data["contents"]
+        columns.columns = data["columns"]
+        columns.deleted = np.zeros(max(columns.rows, _MIN_CAPACITY), dtype=bool)
+        columns.deleted[data["deleted"]] = True
+        columns.deleted_count = len(data["deleted"])
+        columns.id_to_row = {
+            chunk_id: row
+            for row, chunk_id in enumerate(columns.ids)
+            if not columns.deleted[row]
+        }
+        return columns
+
+
+def _membership(objects: np.ndarray, values: Sequence[Any]) -> np.ndarray:
+    try:
+        value_set = set(values)
+        return np.fromiter(
+            (v is not None and v in value_set for v in objects),
+            dtype=bool,
+            count=len(objects),
+        )
+    except TypeError:
+        return np.fromiter(
+            (v is not None and v in values for v in objects),
+            dtype=bool,
+            count=len(objects),
+        )
+
+
+def _compare(v: Any, operator: FilterOperator, value: Any) -> bool:
+    if v is None:
+        return False
+    try:
+        if operator == FilterOperator.GT:
+            return v > value
+        if operator == FilterOperator.LT:
+            return v < value
+        if operator == FilterOperator.GTE:
+            return v >= value
+        return v <= value
+    except TypeError:
+        return False
+
+
+class _IVFIndex:
+    """Inverted file index with spherical k-means centroids.
+
+    The embeddings are assigned to the nearest centroid, a query only scores the
+    embeddings of its ``nprobe`` nearest centroids.
+    """
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray):
+        self.centroids = centroids.astype(np.float32)
+        self.assignments = assignments.astype(np.int32)
+        self.built_rows = len(assignments)
+        self._lists: Optional[List[np.ndarray]] = None
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        nlist: int,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> "_IVFIndex":
+        rows = vectors.shape[0]
+        nlist = max(1, min(nlist, rows))
+        rng = np.random.default_rng(seed)
+        sample_size = min(rows, nlist * 64)
+        sample = np.asarray(
+            vectors[np.sort(rng.choice(rows, sample_size, replace=False))],
+            dtype=np.float32,
+        )
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _iteration in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members) == 0:
+                    # Re-seed the empty list
+                    centroids[c] = sample[rng.integers(sample_size)]
+                    continue
+                centroid = members.sum(axis=0)
+                norm = np.linalg.norm(centroid)
+                centroids[c] = centroid / norm if norm > 0 else centroid
+        index = cls(centroids, np.zeros(0, dtype=np.int32))
+        index.add(vectors)
+        index.built_rows = rows
+        return index
+
+    def add(self, vectors: np.ndarray):
+        """Assign the appended rows to the lists."""
+        assigned = [self.assignments]
+        for start in range(0, vectors.shape[0], _SEARCH_BLOCK_ROWS):
+            block = np.asarray(
+                vectors[start : start + _SEARCH_BLOCK_ROWS], dtype=np.float32
+            )
+            assigned.append(np.argmax(block @ self.centroids.T, axis=1))
+        self.assignments = np.concatenate(assigned).astype(np.int32)
+        self._lists = None
+
+    @property
+    def rows(self) -> int:
+        return len(self.assignments)
+
+    def _get_lists(self) -> List[np.ndarray]:
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind="stable")
+            bounds = np.searchsorted(
+                self.assignments[order], np.arange(len(self.centroids) + 1)
+            )
+            self._lists = [
+                order[bounds[c] : bounds[c + 1]] for c in range(len(self.centroids))
+            ]
+        return self._lists
+
+    def candidates(self, queries: np.ndarray, nprobe: int) -> List[np.ndarray]:
+        """Return the candidate rows of each query."""
+        nprobe = max(1, min(nprobe, len(self.centroids)))
+        scores = queries @ self.centroids.T
+        probes = np.argpartition(-scores, nprobe - 1, axis=1)[:, :nprobe]
+        lists = self._get_lists()
+        return [np.concatenate([lists[c] for c in probe]) for probe in probes]
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            np.savez(f, centroids=self.centroids, assignments=self.assignments)
+
+    @classmethod
+    def load(cls, path: str) -> "_IVFIndex":
+        with np.load(path) as data:
+            return cls(data["centroids"], data["assignments"])
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _merge_topk(
+    best_scores: np.ndarray,
+    best_rows: np.ndarray,
+    scores: np.ndarray,
+    rows: np.ndarray,
+    topk: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge the scores of a block into the current top k of each query."""
+    all_scores = np.concatenate([best_scores, scores], axis=1)
+    all_rows = np.concatenate([best_rows, np.broadcast_to(rows, scores.shape)], axis=1)
+    if all_scores.shape[1] > topk:
+        top = np.argpartition(-all_scores, topk - 1, axis=1)[:, :topk]
+        all_scores = np.take_along_axis(all_scores, top, axis=1)
+        all_rows = np.take_along_axis(all_rows, top, axis=1)
+    return all_scores, all_rows
+
+
+@register_resource(
+    _("Mmap Vector Store"),
+    "mmap_vector_store",
+    category=ResourceCategory.VECTOR_STORE,
+    description=_("In-process vector store backed by memory-mapped arrays."),
+    parameters=[
+        Parameter.build_from(
+            _("Mmap Config"),
+            "vector_store_config",
+            MmapVectorConfig,
+            description=_("the mmap config of vector store."),
+            optional=True,
+            default=None,
+        ),
+        *_VECTOR_STORE_COMMON_PARAMETERS,
+    ],
+)
+class MmapVectorStore(VectorStoreBase):
+    """In-process vector store backed by memory-mapped arrays.
+
+    The embeddings are normalized, the score is the cosine similarity. The small
+    collections and the searches with selective filters are exact, the large
+    collections are searched by the IVF index.
+
+    A collection should be opened by only one process at a time.
+    """
+
+    def __init__(
+        self,
+        vector_store_config: MmapVectorConfig,
+        name: Optional[str],
+        embedding_fn: Optional[Embeddings] = None,
+        max_chunks_once_load: Optional[int] = None,
+        max_threads: Optional[int] = None,
+    ) -> None:
+        """Create a MmapVectorStore instance.
+
+        Args:
+            vector_store_config(MmapVectorConfig): vector store config.
+            name(str): collection name.
+            embedding_fn(Embeddings): embedding function.
+            max_chunks_once_load(int): max chunks once load.
+            max_threads(int): max threads.
+        """
+        super().__init__(
+            max_chunks_once_load=max_chunks_once_load, max_threads=max_threads
+        )
+        if vector_store_config.dtype not in _DTYPES:
+            raise ValueError(
+                f"Unsupported dtype {vector_store_config.dtype}, "
+                f"supported: {list(_DTYPES.keys())}"
+            )
+        self._vector_store_config = vector_store_config
+        self.embeddings = embedding_fn
+        if not self.embeddings:
+            raise ValueError("Embeddings is None")
+        self._collection_name = name or "dbgpt_collection"
+        persist_path = vector_store_config.persist_path or os.path.join(
+            PILOT_PATH, "data"
+        )
+        self.persist_dir = os.path.join(
+            resolve_root_path(persist_path),
+            "mmap_vector_store",
+            safe_dir_name(self._collection_name),
+        )
+        self._lock = threading.RLock()
+        self._reset()
+        self._open()
+
+    def _reset(self):
+        self._dim: Optional[int] = None
+        self._dtype = _DTYPES[self._vector_store_config.dtype]
+        self._generation = 0
+        self._files = self._file_names(0)
+        self._vectors: Optional[np.memmap] = None
+        self._columns = _MetadataColumns()
+        self._index: Optional[_IVFIndex] = None
+        self._wal_records = 0
+
+    def get_config(self) -> MmapVectorConfig:
+        """Get the vector store config."""
+        return self._vector_store_config
+
+    # ---------------------------------------------------------------- files
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.persist_dir, name)
+
+    def _file_names(self, generation: int) -> Dict[str, str]:
+        return {
+            "vectors": f"vectors.{generation}.bin",
+            "segment": f"segment.{generation}.json",
+            "wal": f"wal.{generation}.jsonl",
+            "index": f"ivf.{generation}.npz",
+        }
+
+    def _open(self):
+        """Open the collection from the files."""
+        manifest_path = self._path("manifest.json")
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self._dim = manifest["dim"]
+        self._dtype = _DTYPES[manifest["dtype"]]
+        self._generation = manifest["generation"]
+        self._files = files = manifest["files"]
+        segment_path = self._path(files["segment"])
+        if os.path.exists(segment_path):
+            with open(segment_path, "r", encoding="utf-8") as f:
+                self._columns = _MetadataColumns.from_dict(json.load(f))
+        self._vectors = self._map_vectors(files["vectors"])
+        index_path = self._path(files["index"])
+        if os.path.exists(index_path):
+            self._index = _IVFIndex.load(index_path)
+        self._replay_wal(files["wal"])
+        if self._index is not None and self._index.rows < self._columns.rows:
+            self._index.add(self._vectors[self._index.rows : self._columns.rows])
+        logger.info(
+            f"Opened mmap vector store {self._collection_name}, "
+            f"{self._columns.live_count} chunks"
+        )
+
+    def _replay_wal(self, wal_name: str):
+        wal_path = self._path(wal_name)
+        if not os.path.exists(wal_path):
+            return
+        with open(wal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last record may be partially written
+                    logger.warning(f"Skip the broken record of {wal_path}")
+                    break
+                if record["op"] == "add":
+                    if record["start"] != self._columns.rows:
+                        logger.warning(f"Skip the out-of-order record of {wal_path}")
+                        continue
+                    self._columns.append(
+                        record["ids"], record["contents"], record["metadatas"]
+                    )
+                elif record["op"] == "delete":
+                    self._columns.delete(record["rows"])
+                self._wal_records += 1
+
+    def _map_vectors(self, name: str, capacity: Optional[int] = None) -> np.memmap:
+        """Map the vector file, extend it to the capacity if it is smaller."""
+        path = self._path(name)
+        row_bytes = self._dim * np.dtype(self._dtype).itemsize
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if capacity is not None and size < capacity * row_bytes:
+            with open(path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+            size = capacity * row_bytes
+        return np.memmap(
+            path, dtype=self._dtype, mode="r+", shape=(size // row_bytes, self._dim)
+        )
+
+    def _write_manifest(self, generation: int, files: Dict[str, str]):
+        manifest = {
+            "version": 1,
+            "dim": self._dim,
+            "dtype": np.dtype(self._dtype).name,
+            "generation": generation,
+            "files": files,
+        }
+        tmp_path = self._path("manifest.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path("manifest.json"))
+
+    def _append_wal(self, record: Dict[str, Any]):
+        wal_path = self._path(self._files["wal"])
+        with open(wal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._wal_records += 1
+
+    def _create(self, dim: int):
+        os.makedirs(self.persist_dir, exist_ok=True)
+        self._dim = dim
+        self._vectors = self._map_vectors(self._files["vectors"], _MIN_CAPACITY)
+        self._write_segment(self._files["segment"])
+        self._write_manifest(self._generation, self._files)
+
+    def _write_segment(self, name: str):
+        tmp_path = self._path(name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._columns.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(name))
+
+    def _remove_files(self, files: Dict[str, str], keep: Dict[str, str]):
+        for name in set(files.values()) - set(keep.values()):
+            path = self._path(name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    # ------------------------------------------------------------ lifecycle
+
+    def snapshot(self):
+        """Write the snapshot of the metadata and the index, empty the log."""
+        with self._lock:
+            if self._vectors is None:
+                return
+            self._vectors.flush()
+            new = self._generation + 1
+            # The vector file is shared by the generations
+            new_files = dict(self._file_names(new), vectors=self._files["vectors"])
+            try:
+                self._write_segment(new_files["segment"])
+                if self._index is not None:
+                    self._index.save(self._path(new_files["index"]))
+                self._write_manifest(new, new_files)
+            except BaseException:
+                self._remove_files(new_files, keep=self._files)
+                raise
+            old_files = self._files
+            self._generation, self._files = new, new_files
+            self._wal_records = 0
+            self._remove_files(old_files, keep=new_files)
+
+    def compact(self):
+        """Drop the deleted rows from the matrix and rebuild the index."""
+        with self._lock:
+            if self._vectors is None:
+                return
+            live_rows = np.flatnonzero(self._columns.live_mask())
+            new = self._generation + 1
+            new_files = self._file_names(new)
+            vectors = self._map_vectors(
+                new_files["vectors"], max(len(live_rows), _MIN_CAPACITY)
+            )
+            for start in range(0, len(live_rows), _SEARCH_BLOCK_ROWS):
+                block = live_rows[start : start + _SEARCH_BLOCK_ROWS]
+                vectors[start : start + len(block)] = self._vectors[block]
+            vectors.flush()
+            columns = _MetadataColumns()
+            columns.append(
+                [self._columns.ids[r] for r in live_rows],
+                [self._columns.contents[r] for r in live_rows],
+                [self._columns.metadata(r) for r in live_rows],
+            )
+            old_columns, old_vectors, old_index = (
+                self._columns,
+                self._vectors,
+                self._index,
+            )
+            self._columns, self._vectors, self._index = columns, vectors, None
+            try:
+                self._maybe_build_index()
+                self._write_segment(new_files["segment"])
+                if self._index is not None:
+                    self._index.save(self._path(new_files["index"]))
+                self._write_manifest(new, new_files)
+            except BaseException:
+                self._columns, self._vectors, self._index = (
+                    old_columns,
+                    old_vectors,
+                    old_index,
+                )
+                self._remove_files(new_files, keep=self._files)
+                raise
+            del old_vectors
+            old_files = self._files
+            self._generation, self._files = new, new_files
+            self._wal_records = 0
+            self._remove_files(old_files, keep=new_files)
+            logger.info(
+                f"Compacted mmap vector store {self._collection_name}, "
+                f"{len(live_rows)} chunks"
+            )
+
+    def _maybe_build_index(self):
+        config = self._vector_store_config
+        rows = self._columns.rows
+        if config.index_type != "ivf" or self._columns.live_count < config.ivf_min_size:
+            return
+        if self._index is not None and rows < self._index.built_rows * (
+            _IVF_REBUILD_GROWTH
+        ):
+            return
+        nlist = config.nlist or int(np.sqrt(rows))
+        self._index = _IVFIndex.build(self._vectors[:rows], nlist)
+
+    def _maintain(self):
+        """Snapshot or compact the collection if needed."""
+        rows = self._columns.rows
+        if (
+            rows >= _MIN_CAPACITY
+            and self._columns.deleted_count
+            > rows * self._vector_store_config.compact_ratio
+        ):
+            self.compact()
+        elif self._wal_records >= _MAX_WAL_RECORDS:
+            self.snapshot()
+
+    # ---------------------------------------------------------------- write
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        """Load document to vector store."""
+        if not chunks:
+            return []
+        texts = [chunk.content for chunk in chunks]
+        embeddings = np.asarray(self.embeddings.embed_documents(texts), np.float32)
+        return self.add_vectors(chunks, embeddings)
+
+    def add_vectors(self, chunks: List[Chunk], embeddings: np.ndarray) -> List[str]:
+        """Add the chunks with their embeddings, the chunks of the same ids are
+        replaced."""
+        embeddings = _normalize(np.asarray(embeddings, dtype=np.float32))
+        ids = [chunk.chunk_id for chunk in chunks]
+        metadatas = [_transform_metadata(chunk.metadata) for chunk in chunks]
+        with self._lock:
+            if self._dim is None:
+                self._create(embeddings.shape[1])
+            elif embeddings.shape[1] != self._dim:
+                raise ValueError(
+                    f"Embedding dimension {embeddings.shape[1]} does not match the "
+                    f"dimension {self._dim} of collection {self._collection_name}"
+                )
+            replaced = [
+                self._columns.id_to_row[i] for i in ids if i in self._columns.id_to_row
+            ]
+            if replaced:
+                self._delete_rows(replaced)
+            start = self._columns.rows
+            end = start + len(chunks)
+            if end > self._vectors.shape[0]:
+                self._vectors.flush()
+                self._vectors = self._map_vectors(
+                    self._files["vectors"],
+                    max(end, self._vectors.shape[0] * 2),
+                )
+            self._vectors[start:end] = embeddings
+            self._vectors.flush()
+            self._append_wal(
+                {
+                    "op": "add",
+                    "start": start,
+                    "ids": ids,
+                    "contents": [chunk.content for chunk in chunks],
+                    "metadatas": metadatas,
+                }
+            )
+            self._columns.append(ids, [chunk.content for chunk in chunks], metadatas)
+            if self._index is not None:
+                self._index.add(self._vectors[start:end])
+            self._maybe_build_index()
+            self._maintain()
+        return ids
+
+    def _delete_rows(self, rows: List[int]) -> List[int]:
+        deleted = self._columns.delete(rows)
+        if deleted:
+            self._append_wal({"op": "delete", "rows": deleted})
+        return deleted
+
+    def delete_by_ids(self, ids: str):
+        """Delete vector by ids.
+
+        Args:
+            ids (str): Comma-separated string of IDs to delete.
+        """
+        id_list = [i for i in ids.split(",") if i]
+        with self._lock:
+            rows = [
+                self._columns.id_to_row[i]
+                for i in id_list
+                if i in self._columns.id_to_row
+            ]
+            if rows:
+                self._delete_rows(rows)
+                self._maintain()
+        return id_list
+
+    def truncate(self) -> List[str]:
+        """Truncate the collection."""
+        with self._lock:
+            ids = list(self._columns.id_to_row.keys())
+            if ids:
+                self._delete_rows(list(self._columns.id_to_row.values()))
+                self.compact()
+            logger.info(
+                f"truncate mmap collection {self._collection_name} "
+                f"{len(ids)} chunks success"
+            )
+            return ids
+
+    def delete_vector_name(self, vector_name: str):
+        """Delete the collection and its files."""
+        logger.info(f"mmap vector_name:{vector_name} begin delete...")
+        with self._lock:
+            self._vectors = None
+            if os.path.exists(self.persist_dir):
+                shutil.rmtree(self.persist_dir)
+            self._reset()
+        return True
+
+    def vector_name_exists(self) -> bool:
+        """Whether vector name exists."""
+        return self._columns.live_count > 0
+
+    # --------------------------------------------------------------- search
+
+    def similar_search(
+        self, text, topk, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Search similar documents."""
+        chunks = self.similar_search_with_scores(text, topk, 0.0, filters)
+        for chunk in chunks:
+            chunk.score = 0.0
+        return chunks
+
+    def similar_search_with_scores(
+        self, text, topk, score_threshold, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        """Search similar documents with scores.
+
+        Args:
+            text(str): query text
+            topk(int): return docs nums.
+            score_threshold(float): the min cosine similarity of the docs.
+            filters(MetadataFilters): metadata filters, defaults to None
+        """
+        if not text:
+            return []
+        query = np.asarray([self.embeddings.embed_query(text)], dtype=np.float32)
+        return self.search_by_vectors(query, topk, score_threshold, filters)[0]
+
+    def similar_search_batch(
+        self,
+        texts: List[str],
+        topk: int,
+        score_threshold: float = 0.0,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[List[Chunk]]:
+        """Search similar documents of many queries at once.
+
+        The queries are embedded with one ``embed_documents`` call.
+
+        Args:
+            texts(List[str]): The query texts.
+            topk(int): return docs nums of each query.
+            score_threshold(float): the min cosine similarity of the docs.
+            filters(MetadataFilters): metadata filters, defaults to None
+        Return:
+            List[List[Chunk]]: The similar documents of each query.
+        """
+        if not texts:
+            return []
+        # One embedding call for all the queries
+        queries = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        return self.search_by_vectors(queries, topk, score_threshold, filters)
+
+    def search_by_vectors(
+        self,
+        queries: np.ndarray,
+        topk: int,
+        score_threshold: float = 0.0,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[List[Chunk]]:
+        """Search the similar documents of the query embeddings."""
+        queries = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        with self._lock:
+            results = self._search(queries, topk, filters)
+            return [
+                self.filter_by_score_threshold(
+                    [
+                        Chunk(
+                            content=self._columns.contents[row],
+                            metadata=self._columns.metadata(row),
+                            score=float(score),
+                            chunk_id=self._columns.ids[row],
+                        )
+                        for row, score in result
+                    ],
+                    score_threshold,
+                )
+                for result in results
+            ]
+
+    def _search(
+        self, queries: np.ndarray, topk: int, filters: Optional[MetadataFilters]
+    ) -> List[List[Tuple[int, float]]]:
+        rows = self._columns.rows
+        if rows == 0 or topk <= 0 or self._vectors is None:
+            return [[] for _ in range(len(queries))]
+        mask = self._columns.live_mask()
+        if filters and filters.filters:
+            mask &= self._columns.mask(filters)
+        allowed = int(mask.sum())
+        if allowed == 0:
+            return [[] for _ in range(len(queries))]
+        # The IVF index is skipped when the filters are selective, the candidates
+        # of the probed lists may not have enough matched rows
+        if self._index is not None and allowed >= rows // 2:
+            results = self._search_ivf(queries, topk, mask)
+            if all(len(r) >= min(topk, allowed) for r in results):
+                return results
+        if allowed < rows // 2:
+            return self._search_rows(queries, topk, np.flatnonzero(mask))
+        return self._search_all(queries, topk, mask)
+
+    def _search_all(
+        self, queries: np.ndarray, topk: int, mask: np.ndarray
+    ) -> List[List[Tuple[int, float]]]:
+        """Score all the rows block by block."""
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(mask), _SEARCH_BLOCK_ROWS):
+            end = min(start + _SEARCH_BLOCK_ROWS, len(mask))
+            block = np.asarray(self._vectors[start:end], dtype=np.float32)
+            scores = queries @ block.T
+            scores[:, ~mask[start:end]] = -np.inf
+            best_scores, best_rows = _merge_topk(
+                best_scores, best_rows, scores, np.arange(start, end), topk
+            )
+        return _sorted_results(best_scores, best_rows)
+
+    def _search_rows(
+        self, queries: np.ndarray, topk: int, rows: np.ndarray
+    ) -> List[List[Tuple[int, float]]]:
+        """Score the given rows."""
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(rows), _SEARCH_BLOCK_ROWS):
+            block_rows = rows[start : start + _SEARCH_BLOCK_ROWS]
+            block = np.asarray(self._vectors[block_rows], dtype=np.float32)
+            best_scores, best_rows = _merge_topk(
+                best_scores, best_rows, queries @ block.T, block_rows, topk
+            )
+        return _sorted_results(best_scores, best_rows)
+
+    def _search_ivf(
+        self, queries: np.ndarray, topk: int, mask: np.ndarray
+    ) -> List[List[Tuple[int, float]]]:
+        results = []
+        candidates = self._index.candidates(queries, self._vector_store_config.nprobe)
+        for query, rows in zip(queries, candidates):
+            rows = rows[mask[rows]]
+            if len(rows) == 0:
+                results.append([])
+                continue
+            scores = np.asarray(self._vectors[rows], dtype=np.float32) @ query
+            results.extend(
+                _sorted_results(
+                    *_merge_topk(
+                        np.empty((1, 0), dtype=np.float32),
+                        np.empty((1, 0), dtype=np.int64),
+                        scores[None, :],
+                        rows,
+                        topk,
+                    )
+                )
+            )
+        return results
+
+    def close(self):
+        """Flush the embeddings and write the snapshot."""
+        with self._lock:
+            if self._vectors is not None and self._wal_records:
+                self.snapshot()
+
+
+def _sorted_results(
+    scores: np.ndarray, rows: np.ndarray
+) -> List[List[Tuple[int, float]]]:
+    results = []
+    for query_scores, query_rows in zip(scores, rows):
+        order = np.argsort(-query_scores, kind="stable")
+        results.append(
+            [
+                (int(query_rows[i]), float(query_scores[i]))
+                for i in order
+                if np.isfinite(query_scores[i])
+            ]
+        )
+    return results
+
+
+def _transform_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the metadata values which can be filtered."""
+    return {
+        key: value
+        for key, value in (metadata or {}).items()
+        if isinstance(value, (str, int, float, bool))
+    }
@@ -0,0 +1,171 @@
+import hashlib
+from typing import List
+
+import numpy as np
+import pytest
+
+from dbgpt.core import Chunk, Embeddings
+from dbgpt.storage.vector_store.filters import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+)
+from dbgpt_ext.storage.vector_store.mmap_store import MmapVectorConfig, MmapVectorStore
+
+
+class _HashEmbeddings(Embeddings):
+    """Deterministic random embeddings of the texts."""
+
+    def __init__(self, dim: int = 16):
+        self._dim = dim
+        self.document_calls = 0
+
+    def _embed(self, text: str) -> List[float]:
+        seed = int.from_bytes(
+            hashlib.sha256(text.encode("utf-8")).digest()[:8], "little"
+        )
+        return np.random.default_rng(seed).normal(size=self._dim).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.document_calls += 1
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def _store(path, name="test", **kwargs) -> MmapVectorStore:
+    config = MmapVectorConfig(persist_path=str(path), **kwargs)
+    return MmapVectorStore(config, name=name, embedding_fn=_HashEmbeddings())
+
+
+def _chunks(n: int) -> List[Chunk]:
+    return [
+        Chunk(
+            content=f"doc-{i:05d}",
+            chunk_id=f"id-{i}",
+            metadata={"doc": i % 3, "source": f"s{i % 2}"},
+        )
+        for i in range(n)
+    ]
+
+
+def test_load_search_and_reopen(tmp_path):
+    store = _store(tmp_path)
+    assert not store.vector_name_exists()
+    store.load_document(_chunks(20))
+    assert store.vector_name_exists()
+    chunks = store.similar_search_with_scores("doc-00007", 3, 0.0)
+    assert chunks[0].chunk_id == "id-7"
+    assert chunks[0].score == pytest.approx(1.0, abs=1e-5)
+    assert chunks[0].metadata == {"doc": 1, "source": "s1"}
+    assert chunks[0].score >= chunks[1].score >= chunks[2].score
+
+    # The appends are replayed from the log
+    reopened = _store(tmp_path)
+    assert reopened.similar_search_with_scores("doc-00007", 1, 0.0)[0].chunk_id == (
+        "id-7"
+    )
+
+
+def test_upsert_delete_and_compact(tmp_path):
+    store = _store(tmp_path)
+    store.load_document(_chunks(10))
+    store.load_document(
+        [Chunk(content="doc-00003", chunk_id="id-3", metadata={"doc": 9})]
+    )
+    result = store.similar_search_with_scores("doc-00003", 10, 0.0)
+    assert [c.chunk_id for c in result].count("id-3") == 1
+    assert result[0].metadata == {"doc": 9}
+
+    store.delete_by_ids("id-1,id-2,unknown")
+    ids = {c.chunk_id for c in store.similar_search_with_scores("doc-00001", 20, -1)}
+    assert ids == {f"id-{i}" for i in range(10)} - {"id-1", "id-2"}
+
+    store.compact()
+    assert store._columns.rows == 8
+    reopened = _store(tmp_path)
+    ids = {c.chunk_id for c in reopened.similar_search_with_scores("doc-1", 20, -1)}
+    assert len(ids) == 8 and "id-1" not in ids
+
+    reopened.truncate()
+    assert not reopened.vector_name_exists()
+    assert reopened.similar_search_with_scores("doc-00001", 3, 0.0) == []
+
+
+def test_snapshot_and_log(tmp_path):
+    store = _store(tmp_path)
+    store.load_document(_chunks(5))
+    store.snapshot()
+    store.load_document(_chunks(8)[5:])
+    store.delete_by_ids("id-0")
+    reopened = _store(tmp_path)
+    assert reopened._columns.live_count == 7
+    assert "id-0" not in reopened._columns.id_to_row
+
+
+def test_filters(tmp_path):
+    store = _store(tmp_path)
+    store.load_document(_chunks(30))
+    filters = MetadataFilters(
+        filters=[
+            MetadataFilter(key="doc", operator=FilterOperator.EQ, value=1),
+            MetadataFilter(key="source", operator=FilterOperator.EQ, value="s0"),
+        ]
+    )
+    chunks = store.similar_search_with_scores("doc-00004", 30, -1, filters)
+    assert chunks
+    assert all(c.metadata == {"doc": 1, "source": "s0"} for c in chunks)
+
+    filters = MetadataFilters(
+        filters=[
+            MetadataFilter(key="doc", operator=FilterOperator.GTE, value=2),
+            MetadataFilter(key="source", operator=FilterOperator.IN, value=["s1"]),
+        ],
+        condition=FilterCondition.OR,
+    )
+    chunks = store.similar_search_with_scores("doc-00004", 30, -1, filters)
+    assert len(chunks) == 20
+    assert all(c.metadata["doc"] == 2 or c.metadata["source"] == "s1" for c in chunks)
+
+    filters = MetadataFilters(
+        filters=[MetadataFilter(key="missing", operator=FilterOperator.EXISTS, value=1)]
+    )
+    assert store.similar_search_with_scores("doc-00004", 30, -1, filters) == []
+
+
+def test_ivf_index_and_batch_search(tmp_path):
+    store = _store(tmp_path, name="ivf", ivf_min_size=500, nprobe=64, dtype="float16")
+    chunks = _chunks(1000)
+    store.load_document(chunks)
+    assert store._index is not None
+    queries = [f"doc-{i:05d}" for i in (3, 500, 999)]
+    document_calls = store.embeddings.document_calls
+    results = store.similar_search_batch(queries, 5)
+    assert [r[0].chunk_id for r in results] == ["id-3", "id-500", "id-999"]
+    # All the queries are embedded with one call
+    assert store.embeddings.document_calls == document_calls + 1
+    assert all(len(r) <= 5 for r in results)
+
+    store.snapshot()
+    reopened = _store(
+        tmp_path, name="ivf", ivf_min_size=500, nprobe=64, dtype="float16"
+    )
+    assert reopened._index is not None
+    assert reopened.similar_search("doc-00500", 1)[0].chunk_id == "id-500"
+
+
+def test_dimension_mismatch(tmp_path):
+    store = _store(tmp_path)
+    store.load_document(_chunks(2))
+    with pytest.raises(ValueError):
+        store.add_vectors([Chunk(content="x", chunk_id="x")], np.ones((1, 4)))
+
+
+def test_delete_vector_name(tmp_path):
+    store = _store(tmp_path)
+    store.load_document(_chunks(3))
+    store.delete_vector_name("test")
+    assert not store.vector_name_exists()
+    assert not _store(tmp_path).vector_name_exists()
@@ -35,3 +35,34 @@ class ServeConfig(BaseServeConfig):
         default=None,
         metadata={"help": _("Default model for the conversation")},
     )
+    durability_mode: Optional[str] = field(
+        default="sync",
+        metadata={
+            "help": _(
+                "How the conversations are saved. 'sync' saves them before the chat "
+                "request returns. 'async' saves them in a background thread, which "
+                "batches the writes of all the conversations, the writes not flushed "
+                "yet are lost if the process crashes."
+            ),
+            "valid_values": ["sync", "async"],
+        },
+    )
+    flush_interval: Optional[float] = field(
+        default=0.1,
+        metadata={
+            "help": _(
+                "The max seconds a conversation waits to be saved in the async "
+                "durability mode"
+            )
+        },
+    )
+    max_pending_writes: Optional[int] = field(
+        default=10000,
+        metadata={
+            "help": _(
+                "The max number of the conversations and messages waiting to be "
+                "saved in the async durability mode, the chats wait when there are "
+                "more"
+            )
+        },
+    )
@@ -6,6 +6,10 @@ from sqlalchemy import URL
 from dbgpt.component import SystemApp
 from dbgpt.core import StorageInterface
 from dbgpt.storage.metadata import DatabaseManager
+from dbgpt.storage.metadata.write_behind_storage import (
+    StorageFlusher,
+    WriteBehindStorage,
+)
 from dbgpt_serve.core import BaseServe
 
 from .api.endpoints import init_endpoints, router
@@ -47,6 +51,7 @@ class Serve(BaseServe):
         self._db_manager: Optional[DatabaseManager] = None
         self._conv_storage = None
         self._message_storage = None
+        self._flusher: Optional[StorageFlusher] = None
         self._config = config
 
     @property
@@ -114,3 +119,17 @@ class Serve(BaseServe):
             DBMessageStorageItemAdapter(),
             JsonSerializer(),
         )
+        if self._config and self._config.durability_mode == "async":
+            self._flusher = StorageFlusher(
+                flush_interval=self._config.flush_interval,
+                max_pending_writes=self._config.max_pending_writes,
+            )
+            self._conv_storage = WriteBehindStorage(self._conv_storage, self._flusher)
+            self._message_storage = WriteBehindStorage(
+                self._message_storage, self._flusher
+            )
+
+    def before_stop(self):
+        """Called before the application stops, save the pending conversations."""
+        if self._flusher is not None:
+            self._flusher.close()
@@ -1,5 +1,5 @@
 from functools import cache
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.security.http import HTTPAuthorizationCredentials, HTTPBearer
@@ -216,6 +216,19 @@ async def get_datasource_types(
     return Result.succ(res)
 
 
+@router.get(
+    "/datasource-pool-stats",
+    dependencies=[Depends(check_api_key)],
+    response_model=Result[Dict[str, Dict[str, Any]]],
+)
+async def get_datasource_pool_stats(
+    service: Service = Depends(get_service),
+) -> Result[Dict[str, Dict[str, Any]]]:
+    """Get the stats of the cached connectors and their connection pools."""
+    res = await blocking_func_to_async(global_system_app, service.pool_stats)
+    return Result.succ(res)
+
+
 @router.post(
     "/datasources/test-connection",
     dependencies=[Depends(check_api_key)],
@@ -2,7 +2,9 @@
 
 import json
 import logging
-from typing import TYPE_CHECKING, Dict, List, Optional, Type
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
 
 from dbgpt.component import BaseComponent, ComponentType, SystemApp
 from dbgpt.core.awel.flow import ResourceMetadata
@@ -24,16 +26,80 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+class _CachedConnector:
+    """A connector cached by the ConnectorManager."""
+
+    def __init__(self, connector: BaseConnector, fingerprint: Tuple):
+        self.connector = connector
+        self.fingerprint = fingerprint
+        self.created_at = time.time()
+        self.last_used_at = self.created_at
+        self.hits = 0
+
+    def touch(self):
+        self.last_used_at = time.time()
+        self.hits += 1
+
+    @property
+    def is_closed(self) -> bool:
+        return getattr(self.connector, "_is_closed", False)
+
+
+def _config_fingerprint(db_config: Dict[str, Any]) -> Tuple:
+    """Return the fingerprint of the db config, used to detect config changes."""
+    return tuple(sorted((k, str(v)) for k, v in db_config.items()))
+
+
+def _pool_stats(connector: BaseConnector) -> Dict[str, Any]:
+    """Return the connection pool stats of the connector."""
+    engine = getattr(connector, "_engine", None)
+    pool = getattr(engine, "pool", None)
+    if pool is None:
+        return {}
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        func = getattr(pool, name, None)
+        if callable(func):
+            try:
+                stats[name] = func()
+            except Exception:
+                pass
+    return stats
+
+
 class ConnectorManager(BaseComponent):
-    """Connector manager."""
+    """Connector manager.
+
+    The connectors created by :meth:`get_connector` are cached, so that one pooled
+    engine is kept per datasource. The cached connector is invalidated when the
+    datasource is edited or deleted, and evicted after being idle for
+    ``max_idle_seconds``.
+    """
 
     name = ComponentType.CONNECTOR_MANAGER
 
-    def __init__(self, system_app: SystemApp):
-        """Create a new ConnectorManager."""
+    def __init__(
+        self,
+        system_app: SystemApp,
+        cache_connectors: bool = True,
+        max_idle_seconds: int = 1800,
+    ):
+        """Create a new ConnectorManager.
+
+        Args:
+            system_app (SystemApp): The system app.
+            cache_connectors (bool): Whether to cache the connectors, default True.
+            max_idle_seconds (int): The max idle seconds of a cached connector, the
+                connector will be closed and evicted after that, default 1800.
+        """
         self.storage = ConnectConfigDao()
         self.system_app = system_app
         self._db_summary_client: Optional["DBSummaryClient"] = None
+        self._cache_connectors = cache_connectors
+        self._max_idle_seconds = max_idle_seconds
+        self._connectors: Dict[str, _CachedConnector] = {}
+        self._connectors_lock = threading.RLock()
+        self._creating_locks: Dict[str, threading.Lock] = {}
         super().__init__(system_app)
 
     def init_app(self, system_app: SystemApp):
@@ -87,6 +153,10 @@ class ConnectorManager(BaseComponent):
 
         self._db_summary_client = DBSummaryClient(self.system_app)
 
+    def before_stop(self):
+        """Execute before stop, close all cached connectors."""
+        self.clear_connectors()
+
     @property
     def db_summary_client(self) -> "DBSummaryClient":
         """Get DBSummaryClient."""
@@ -169,12 +239,100 @@ class ConnectorManager(BaseComponent):
         return result
 
     def get_connector(self, db_name: str):
-        """Create a new connection instance.
+        """Get the connector of the database.
+
+        The connector is cached and shared between callers, a new one is created
+        only when there is no cached connector or the database config changed.
 
         Args:
             db_name (str): database name
         """
         db_config = self.storage.get_db_config(db_name)
+        if not self._cache_connectors:
+            return self._create_connector(db_name, db_config)
+
+        self._evict_idle_connectors()
+        fingerprint = _config_fingerprint(db_config)
+        with self._connectors_lock:
+            creating_lock = self._creating_locks.setdefault(db_name, threading.Lock())
+        # Avoid creating multiple connectors for the same database concurrently
+        with creating_lock:
+            with self._connectors_lock:
+                cached = self._connectors.get(db_name)
+                if (
+                    cached
+                    and cached.fingerprint == fingerprint
+                    and not cached.is_closed
+                ):
+                    cached.touch()
+                    return cached.connector
+            if cached:
+                logger.info(f"Database config of {db_name} changed, recreate connector")
+                self.invalidate_connector(db_name)
+            connector = self._create_connector(db_name, db_config)
+            with self._connectors_lock:
+                self._connectors[db_name] = _CachedConnector(connector, fingerprint)
+            return connector
+
+    def invalidate_connector(self, db_name: str) -> None:
+        """Remove the cached connector of the database and close it.
+
+        Args:
+            db_name (str): database name
+        """
+        with self._connectors_lock:
+            cached = self._connectors.pop(db_name, None)
+        if cached:
+            _close_connector(db_name, cached.connector)
+
+    def clear_connectors(self) -> None:
+        """Remove all cached connectors and close them."""
+        with self._connectors_lock:
+            cached_connectors = self._connectors
+            self._connectors = {}
+        for db_name, cached in cached_connectors.items():
+            _close_connector(db_name, cached.connector)
+
+    def _evict_idle_connectors(self) -> None:
+        """Close the connectors which are idle for more than max_idle_seconds."""
+        now = time.time()
+        with self._connectors_lock:
+            idle_names = [
+                db_name
+                for db_name, cached in self._connectors.items()
+                if now - cached.last_used_at > self._max_idle_seconds
+            ]
+        for db_name in idle_names:
+            logger.info(f"Evict idle connector of {db_name}")
+            self.invalidate_connector(db_name)
+
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the stats of the cached connectors and their connection pools.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The stats of each database.
+        """
+        now = time.time()
+        with self._connectors_lock:
+            cached_connectors = list(self._connectors.items())
+        return {
+            db_name: {
+                "db_type": cached.connector.db_type,
+                "hits": cached.hits,
+                "age_seconds": int(now - cached.created_at),
+                "idle_seconds": int(now - cached.last_used_at),
+                "pool": _pool_stats(cached.connector),
+            }
+            for db_name, cached in cached_connectors
+        }
+
+    def _create_connector(self, db_name: str, db_config: Dict[str, Any]):
+        """Create a new connection instance.
+
+        Args:
+            db_name (str): database name
+            db_config (Dict[str, Any]): database config
+        """
         db_type = DBType.of_db_type(db_config.get("db_type"))
         if not db_type:
             raise ValueError("Unsupported Db Type！" + db_config.get("db_type"))
@@ -316,6 +474,7 @@ class ConnectorManager(BaseComponent):
     )
     def delete_db(self, db_name: str):
         """Delete db connect info."""
+        self.invalidate_connector(db_name)
         return self.storage.delete_db(db_name)
 
     @Deprecated(
@@ -324,6 +483,7 @@ class ConnectorManager(BaseComponent):
     )
     def edit_db(self, db_info: DBConfig):
         """Edit db connect info."""
+        self.invalidate_connector(db_info.db_name)
         return self.storage.update_db_info(
             db_info.db_name,
             db_info.db_type,
@@ -390,3 +550,10 @@ class ConnectorManager(BaseComponent):
             raise ValueError("Add db connect info error!" + str(e))
 
         return True
+
+
+def _close_connector(db_name: str, connector: BaseConnector) -> None:
+    try:
+        connector.close()
+    except Exception as e:
+        logger.warning(f"Close connector of {db_name} error: {e}")
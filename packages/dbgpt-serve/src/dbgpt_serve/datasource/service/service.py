@@ -1,6 +1,6 @@
 import json
 import logging
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 from fastapi import HTTPException
 
@@ -207,6 +207,7 @@ class Service(
                 detail=f"there is no datasource name:{db_name} exists",
             )
         res = self._dao.update({"id": datasources.id}, persisted_state)
+        self.datasource_manager.invalidate_connector(db_name)
         return self._to_query_response(res)
 
     def get(self, datasource_id: str) -> Optional[DatasourceQueryResponse]:
@@ -236,6 +237,7 @@ class Service(
         if db_config:
             self._db_summary_client.delete_db_profile(db_config.db_name)
             self._dao.delete({"id": datasource_id})
+            self.datasource_manager.invalidate_connector(db_config.db_name)
         return db_config
 
     def get_list(self, db_type: Optional[str] = None) -> List[DatasourceQueryResponse]:
@@ -276,6 +278,14 @@ class Service(
         """
         return self.datasource_manager.get_supported_types()
 
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the stats of the cached connectors and their connection pools.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The stats of each datasource
+        """
+        return self.datasource_manager.get_pool_stats()
+
     def test_connection(self, request: DatasourceCreateRequest) -> bool:
         """Test the connection of the datasource.
 
@@ -301,6 +311,8 @@ class Service(
             raise HTTPException(status_code=404, detail="datasource not found")
 
         self._db_summary_client.delete_db_profile(db_config.db_name)
+        # The tables may be changed, recreate the connector to sync the tables
+        self.datasource_manager.invalidate_connector(db_config.db_name)
 
         # async embedding
         executor = self._system_app.get_component(
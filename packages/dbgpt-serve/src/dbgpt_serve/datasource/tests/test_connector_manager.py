@@ -0,0 +1,77 @@
+import pytest
+
+from dbgpt.component import SystemApp
+from dbgpt.storage.metadata import db
+from dbgpt_serve.core.tests.conftest import system_app  # noqa: F401
+
+from ..manages.connect_config_db import ConnectConfigEntity  # noqa: F401
+from ..manages.connector_manager import ConnectorManager
+
+
+@pytest.fixture(autouse=True)
+def setup_and_teardown():
+    db.init_db("sqlite:///:memory:")
+    db.create_all()
+    yield
+
+
+@pytest.fixture
+def manager(system_app: SystemApp, tmp_path):
+    cm = ConnectorManager(system_app)
+    cm.on_init()
+    db_path = str(tmp_path / "test.db")
+    cm.storage.add_file_db("test_db", "sqlite", db_path, "test")
+    yield cm
+    cm.clear_connectors()
+
+
+def test_get_connector_cached(manager: ConnectorManager):
+    conn1 = manager.get_connector("test_db")
+    conn2 = manager.get_connector("test_db")
+    assert conn1 is conn2
+    stats = manager.get_pool_stats()
+    assert stats["test_db"]["hits"] == 1
+    assert stats["test_db"]["db_type"] == "sqlite"
+
+
+def test_get_connector_closed(manager: ConnectorManager):
+    conn1 = manager.get_connector("test_db")
+    conn1.close()
+    conn2 = manager.get_connector("test_db")
+    assert conn1 is not conn2
+
+
+def test_invalidate_connector(manager: ConnectorManager):
+    conn1 = manager.get_connector("test_db")
+    manager.invalidate_connector("test_db")
+    assert conn1._is_closed
+    assert "test_db" not in manager.get_pool_stats()
+    conn2 = manager.get_connector("test_db")
+    assert conn1 is not conn2
+
+
+def test_config_changed(manager: ConnectorManager, tmp_path):
+    conn1 = manager.get_connector("test_db")
+    manager.storage.update_db_info(
+        "test_db", "sqlite", str(tmp_path / "test2.db"), comment="changed"
+    )
+    conn2 = manager.get_connector("test_db")
+    assert conn1 is not conn2
+    assert conn1._is_closed
+
+
+def test_evict_idle_connectors(system_app: SystemApp, tmp_path):
+    cm = ConnectorManager(system_app, max_idle_seconds=-1)
+    cm.storage.add_file_db("test_db", "sqlite", str(tmp_path / "test.db"), "test")
+    conn1 = cm.get_connector("test_db")
+    conn2 = cm.get_connector("test_db")
+    assert conn1 is not conn2
+    assert conn1._is_closed
+    cm.clear_connectors()
+
+
+def test_disable_cache(system_app: SystemApp, tmp_path):
+    cm = ConnectorManager(system_app, cache_connectors=False)
+    cm.storage.add_file_db("test_db", "sqlite", str(tmp_path / "test.db"), "test")
+    assert cm.get_connector("test_db") is not cm.get_connector("test_db")
+    assert cm.get_pool_stats() == {}
@@ -358,6 +358,24 @@ async def sync_document(
     return Result.succ(service.sync_document([request]))
 
 
+@router.post(
+    "/documents/{document_id}/cancel_sync", dependencies=[Depends(check_api_key)]
+)
+async def cancel_document_sync(
+    document_id: int,
+    service: Service = Depends(get_service),
+) -> Result:
+    """Cancel the sync of a document
+
+    Args:
+        document_id (int): The document id
+        service (Service): The service
+    Returns:
+        ServerResponse: The number of the sync jobs canceled
+    """
+    return Result.succ(await service.cancel_document_sync(document_id))
+
+
 @router.delete(
     "/documents/{document_id}",
     dependencies=[Depends(check_api_key)],
@@ -375,9 +393,7 @@ async def delete_document(
         ServerResponse: The response
     """
     # TODO: Delete the files of the document
-    res = await blocking_func_to_async(
-        global_system_app, service.delete_document, document_id
-    )
+    res = await service.adelete_document(document_id)
     return Result.succ(res)
 
 
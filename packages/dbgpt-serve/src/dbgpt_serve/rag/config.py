@@ -70,6 +70,70 @@ class ServeConfig(BaseServeConfig):
         default=1,
         metadata={"help": _("knowledge max load thread")},
     )
+    load_max_retries: Optional[int] = field(
+        default=2,
+        metadata={
+            "help": _(
+                "The max number of retries when loading a group of chunks into the "
+                "index store failed, e.g. the embedding service is temporarily "
+                "unavailable"
+            )
+        },
+    )
+    streaming_ingestion: Optional[bool] = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to load, split and embed the knowledge as a streaming "
+                "pipeline, it bounds the memory usage of large documents"
+            )
+        },
+    )
+    max_inflight_chunks: Optional[int] = field(
+        default=1000,
+        metadata={
+            "help": _(
+                "The max number of chunks split but not embedded yet in the streaming "
+                "ingestion"
+            )
+        },
+    )
+    sync_job_queue: Optional[bool] = field(
+        default=False,
+        metadata={
+            "help": _(
+                "Whether to sync the documents by the persistent job queue, the jobs "
+                "are run in parallel, retried, and resumed after restart"
+            )
+        },
+    )
+    sync_max_workers: Optional[int] = field(
+        default=4,
+        metadata={"help": _("The max number of documents synced at once")},
+    )
+    sync_space_concurrency: Optional[int] = field(
+        default=2,
+        metadata={
+            "help": _(
+                "The max number of documents of a knowledge space synced at once, it "
+                "can be overridden by the sync_concurrency of the space embedding "
+                "arguments"
+            )
+        },
+    )
+    sync_max_retries: Optional[int] = field(
+        default=2,
+        metadata={"help": _("The max number of retries of a failed document sync")},
+    )
+    sync_lease_timeout: Optional[int] = field(
+        default=60,
+        metadata={
+            "help": _(
+                "The seconds without heartbeat after which a running sync job is "
+                "considered abandoned and run again"
+            )
+        },
+    )
     rerank_top_k: Optional[int] = field(
         default=3,
         metadata={"help": _("knowledge rerank top k")},
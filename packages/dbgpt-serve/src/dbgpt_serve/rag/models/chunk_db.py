@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Any, Dict, List, Union
 
-from sqlalchemy import Column, DateTime, Integer, String, Text, func, not_
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
 
 from dbgpt._private.pydantic import model_to_dict
 from dbgpt.storage.metadata import BaseDao, Model
@@ -18,6 +18,8 @@ class DocumentChunkEntity(Model):
     content = Column(Text)
     questions = Column(Text)
     meta_info = Column(String(500))
+    content_hash = Column(String(64), index=True)
+    vector_id = Column(String(255))
     gmt_created = Column(DateTime)
     gmt_modified = Column(DateTime)
 
@@ -27,6 +29,7 @@ class DocumentChunkEntity(Model):
             f"doc_type='{self.doc_type}', "
             f"document_id='{self.document_id}', content='{self.content}', "
             f"questions='{self.questions}', meta_info='{self.meta_info}', "
+            f"content_hash='{self.content_hash}', vector_id='{self.vector_id}', "
             f"gmt_created='{self.gmt_created}', gmt_modified='{self.gmt_modified}')"
         )
 
@@ -39,6 +42,8 @@ class DocumentChunkEntity(Model):
             "content": self.content,
             "questions": self.questions,
             "meta_info": self.meta_info,
+            "content_hash": self.content_hash,
+            "vector_id": self.vector_id,
             "gmt_created": self.gmt_created,
             "gmt_modified": self.gmt_modified,
         }
@@ -54,6 +59,9 @@ class DocumentChunkDao(BaseDao):
                 document_id=document.document_id,
                 content=document.content or "",
                 meta_info=document.meta_info or "",
+                questions=document.questions,
+                content_hash=document.content_hash,
+                vector_id=document.vector_id,
                 gmt_created=datetime.now(),
                 gmt_modified=datetime.now(),
             )
@@ -63,6 +71,36 @@ class DocumentChunkDao(BaseDao):
         session.commit()
         session.close()
 
+    def get_all_document_chunks(self, document_id: int) -> List[DocumentChunkEntity]:
+        """Return all the chunks of the document."""
+        session = self.get_raw_session()
+        try:
+            return (
+                session.query(DocumentChunkEntity)
+                .filter(DocumentChunkEntity.document_id == document_id)
+                .order_by(DocumentChunkEntity.id.asc())
+                .all()
+            )
+        finally:
+            session.close()
+
+    def replace_document_chunks(
+        self, document_id: int, chunks: List[DocumentChunkEntity]
+    ):
+        """Replace all the chunks of the document in one transaction."""
+        session = self.get_raw_session()
+        try:
+            session.query(DocumentChunkEntity).filter(
+                DocumentChunkEntity.document_id == document_id
+            ).delete()
+            session.add_all(chunks)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     def get_document_chunks(
         self, query: DocumentChunkEntity, page=1, page_size=20, document_ids=None
     ):
@@ -115,7 +153,8 @@ class DocumentChunkDao(BaseDao):
                 DocumentChunkEntity.meta_info == query.meta_info
             )
         document_chunks = document_chunks.filter(
-            not_(DocumentChunkEntity.questions is None)
+            DocumentChunkEntity.questions.isnot(None),
+            DocumentChunkEntity.questions != "",
         )
         if document_ids is not None:
             document_chunks = document_chunks.filter(
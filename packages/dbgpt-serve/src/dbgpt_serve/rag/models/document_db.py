@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from typing import Any, Dict, List, Union
 
 from sqlalchemy import Column, DateTime, Integer, String, Text, func
@@ -17,6 +18,14 @@ from dbgpt_serve.rag.api.schemas import (
 CFG = Config()
 
 
+class SyncStatus(Enum):
+    TODO = "TODO"
+    FAILED = "FAILED"
+    RUNNING = "RUNNING"
+    FINISHED = "FINISHED"
+    CANCELED = "CANCELED"
+
+
 class KnowledgeDocumentEntity(Model):
     __tablename__ = "knowledge_document"
     id = Column(Integer, primary_key=True)
@@ -0,0 +1,393 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func
+
+from dbgpt.storage.metadata import BaseDao, Model
+
+from .document_db import SyncStatus
+
+
+class DocumentSyncJobEntity(Model):
+    """The job to sync a knowledge document into the index store.
+
+    The job is claimed by a sync worker with the ``RUNNING`` status, the worker keeps
+    updating ``gmt_modified`` as the heartbeat, so the jobs of a dead worker can be
+    found and run again. The ids of the vectors loaded by the running job are saved
+    in ``loaded_vector_ids`` with the ``checkpoint``, the number of the leading chunks
+    which are all loaded, so the job of a dead worker is resumed from the checkpoint
+    and the other vectors loaded are deleted.
+    """
+
+    __tablename__ = "document_sync_job"
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, nullable=False)
+    space_id = Column(Integer, nullable=False)
+    status = Column(String(50), nullable=False)
+    chunk_parameters = Column(Text)
+    retry_count = Column(Integer, default=0)
+    max_retries = Column(Integer, default=0)
+    worker_id = Column(String(255))
+    error = Column(Text)
+    loaded_vector_ids = Column(Text)
+    checkpoint = Column(Integer, default=0)
+    next_run_at = Column(DateTime)
+    gmt_created = Column(DateTime)
+    gmt_modified = Column(DateTime)
+
+    __table_args__ = (
+        Index("idx_sync_job_status", "status", "next_run_at"),
+        Index("idx_sync_job_document_id", "document_id"),
+    )
+
+    def __repr__(self):
+        return (
+            f"DocumentSyncJobEntity(id={self.id}, document_id={self.document_id}, "
+            f"space_id={self.space_id}, status='{self.status}', "
+            f"retry_count={self.retry_count}, worker_id='{self.worker_id}')"
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "document_id": self.document_id,
+            "space_id": self.space_id,
+            "status": self.status,
+            "chunk_parameters": self.chunk_parameters,
+            "retry_count": self.retry_count,
+            "max_retries": self.max_retries,
+            "worker_id": self.worker_id,
+            "error": self.error,
+            "loaded_vector_ids": self.loaded_vector_ids,
+            "checkpoint": self.checkpoint,
+            "next_run_at": self.next_run_at,
+            "gmt_created": self.gmt_created,
+            "gmt_modified": self.gmt_modified,
+        }
+
+
+_ACTIVE_STATUS = [SyncStatus.TODO.name, SyncStatus.RUNNING.name]
+
+
+class DocumentSyncJobDao(BaseDao):
+    """The dao of the document sync jobs.
+
+    The jobs are claimed with a conditional update on the status, so the workers in
+    different processes never run the same job.
+    """
+
+    def create_job(
+        self,
+        document_id: int,
+        space_id: int,
+        chunk_parameters: Optional[str] = None,
+        max_retries: int = 0,
+    ) -> int:
+        """Create a job, the active jobs of the document are canceled."""
+        now = datetime.now()
+        with self.session() as session:
+            session.query(DocumentSyncJobEntity).filter(
+                DocumentSyncJobEntity.document_id == document_id,
+                DocumentSyncJobEntity.status.in_(_ACTIVE_STATUS),
+            ).update(
+                {
+                    DocumentSyncJobEntity.status: SyncStatus.CANCELED.name,
+                    DocumentSyncJobEntity.gmt_modified: now,
+                },
+                synchronize_session=False,
+            )
+            job = DocumentSyncJobEntity(
+                document_id=document_id,
+                space_id=space_id,
+                status=SyncStatus.TODO.name,
+                chunk_parameters=chunk_parameters,
+                retry_count=0,
+                max_retries=max_retries,
+                next_run_at=now,
+                gmt_created=now,
+                gmt_modified=now,
+            )
+            session.add(job)
+            session.flush()
+            return job.id
+
+    def get_job(self, job_id: int) -> Optional[DocumentSyncJobEntity]:
+        session = self.get_raw_session()
+        try:
+            return (
+                session.query(DocumentSyncJobEntity)
+                .filter(DocumentSyncJobEntity.id == job_id)
+                .first()
+            )
+        finally:
+            session.close()
+
+    def get_jobs_by_document(self, document_id: int) -> List[DocumentSyncJobEntity]:
+        session = self.get_raw_session()
+        try:
+            return (
+                session.query(DocumentSyncJobEntity)
+                .filter(DocumentSyncJobEntity.document_id == document_id)
+                .order_by(DocumentSyncJobEntity.id.desc())
+                .all()
+            )
+        finally:
+            session.close()
+
+    def running_job_counts(self) -> Dict[int, int]:
+        """Return the number of the running jobs of each space."""
+        session = self.get_raw_session()
+        try:
+            rows = (
+                session.query(
+                    DocumentSyncJobEntity.space_id, func.count(DocumentSyncJobEntity.id)
+                )
+                .filter(DocumentSyncJobEntity.status == SyncStatus.RUNNING.name)
+                .group_by(DocumentSyncJobEntity.space_id)
+                .all()
+            )
+            return {space_id: count for space_id, count in rows}
+        finally:
+            session.close()
+
+    def claim_next_job(
+        self,
+        worker_id: str,
+        exclude_space_ids: Optional[List[int]] = None,
+        candidates: int = 10,
+    ) -> Optional[DocumentSyncJobEntity]:
+        """Claim the oldest runnable job.
+
+        Args:
+            worker_id (str): The id of the worker claiming the job.
+            exclude_space_ids (Optional[List[int]]): Skip the jobs of these spaces,
+                e.g. the spaces reaching their concurrency.
+            candidates (int): The number of jobs tried, another worker may claim the
+                same job at the same time.
+
+        Returns:
+            Optional[DocumentSyncJobEntity]: The job claimed, None if no job.
+        """
+        now = datetime.now()
+        session = self.get_raw_session()
+        try:
+            query = session.query(DocumentSyncJobEntity.id).filter(
+                DocumentSyncJobEntity.status == SyncStatus.TODO.name,
+                DocumentSyncJobEntity.next_run_at <= now,
+            )
+            if exclude_space_ids:
+                query = query.filter(
+                    DocumentSyncJobEntity.space_id.notin_(exclude_space_ids)
+                )
+            job_ids = [
+                row[0]
+                for row in query.order_by(DocumentSyncJobEntity.id.asc())
+                .limit(candidates)
+                .all()
+            ]
+            for job_id in job_ids:
+                updated = (
+                    session.query(DocumentSyncJobEntity)
+                    .filter(
+                        DocumentSyncJobEntity.id == job_id,
+                        DocumentSyncJobEntity.status == SyncStatus.TODO.name,
+                    )
+                    .update(
+                        {
+                            DocumentSyncJobEntity.status: SyncStatus.RUNNING.name,
+                            DocumentSyncJobEntity.worker_id: worker_id,
+                            DocumentSyncJobEntity.gmt_modified: now,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                session.commit()
+                if updated == 1:
+                    return (
+                        session.query(DocumentSyncJobEntity)
+                        .filter(DocumentSyncJobEntity.id == job_id)
+                        .first()
+                    )
+            return None
+        finally:
+            session.close()
+
+    def _update_running_job(self, job_id: int, worker_id: str, values: Dict) -> bool:
+        """Update the job only if it is still running by the worker."""
+        values[DocumentSyncJobEntity.gmt_modified] = datetime.now()
+        with self.session() as session:
+            updated = (
+                session.query(DocumentSyncJobEntity)
+                .filter(
+                    DocumentSyncJobEntity.id == job_id,
+                    DocumentSyncJobEntity.status == SyncStatus.RUNNING.name,
+                    DocumentSyncJobEntity.worker_id == worker_id,
+                )
+                .update(values, synchronize_session=False)
+            )
+            return updated == 1
+
+    def heartbeat(self, job_ids: List[int], worker_id: str) -> List[int]:
+        """Refresh the running jobs of the worker.
+
+        Returns:
+            List[int]: The ids of the jobs no longer running by the worker, e.g.
+                canceled or claimed by another worker.
+        """
+        if not job_ids:
+            return []
+        with self.session() as session:
+            session.query(DocumentSyncJobEntity).filter(
+                DocumentSyncJobEntity.id.in_(job_ids),
+                DocumentSyncJobEntity.status == SyncStatus.RUNNING.name,
+                DocumentSyncJobEntity.worker_id == worker_id,
+            ).update(
+                {DocumentSyncJobEntity.gmt_modified: datetime.now()},
+                synchronize_session=False,
+            )
+            alive = {
+                row[0]
+                for row in session.query(DocumentSyncJobEntity.id)
+                .filter(
+                    DocumentSyncJobEntity.id.in_(job_ids),
+                    DocumentSyncJobEntity.status == SyncStatus.RUNNING.name,
+                    DocumentSyncJobEntity.worker_id == worker_id,
+                )
+                .all()
+            }
+        return [job_id for job_id in job_ids if job_id not in alive]
+
+    def save_loaded_vector_ids(
+        self,
+        job_id: int,
+        worker_id: str,
+        loaded_vector_ids: Optional[str],
+        checkpoint: int = 0,
+    ) -> bool:
+        """Save the comma separated ids of the vectors loaded by the running job.
+
+        The first ``checkpoint`` ids are the ids of the leading chunks loaded.
+        """
+        return self._update_running_job(
+            job_id,
+            worker_id,
+            {
+                DocumentSyncJobEntity.loaded_vector_ids: loaded_vector_ids,
+                DocumentSyncJobEntity.checkpoint: checkpoint,
+            },
+        )
+
+    def finish_job(self, job_id: int, worker_id: str) -> bool:
+        return self._update_running_job(
+            job_id,
+            worker_id,
+            {
+                DocumentSyncJobEntity.status: SyncStatus.FINISHED.name,
+                DocumentSyncJobEntity.error: None,
+                DocumentSyncJobEntity.loaded_vector_ids: None,
+                DocumentSyncJobEntity.checkpoint: 0,
+            },
+        )
+
+    def fail_job(
+        self, job_id: int, worker_id: str, error: str, retry_delay: float = 0
+    ) -> bool:
+        """Mark the job failed, or put it back to the queue if it can be retried.
+
+        The vectors loaded by the failed run are deleted by the caller.
+
+        Returns:
+            bool: True if the job will be retried.
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            return False
+        if job.retry_count < (job.max_retries or 0):
+            values = {
+                DocumentSyncJobEntity.status: SyncStatus.TODO.name,
+                DocumentSyncJobEntity.retry_count: job.retry_count + 1,
+                DocumentSyncJobEntity.worker_id: None,
+                DocumentSyncJobEntity.error: error,
+                DocumentSyncJobEntity.loaded_vector_ids: None,
+                DocumentSyncJobEntity.checkpoint: 0,
+                DocumentSyncJobEntity.next_run_at: datetime.now()
+                + timedelta(seconds=retry_delay),
+            }
+            return self._update_running_job(job_id, worker_id, values)
+        self._update_running_job(
+            job_id,
+            worker_id,
+            {
+                DocumentSyncJobEntity.status: SyncStatus.FAILED.name,
+                DocumentSyncJobEntity.error: error,
+                DocumentSyncJobEntity.loaded_vector_ids: None,
+                DocumentSyncJobEntity.checkpoint: 0,
+            },
+        )
+        return False
+
+    def release_job(self, job_id: int, worker_id: str) -> bool:
+        """Put the running job back into the queue without counting a retry.
+
+        The vectors loaded by the released run are deleted by the caller.
+        """
+        return self._update_running_job(
+            job_id,
+            worker_id,
+            {
+                DocumentSyncJobEntity.status: SyncStatus.TODO.name,
+                DocumentSyncJobEntity.worker_id: None,
+                DocumentSyncJobEntity.loaded_vector_ids: None,
+                DocumentSyncJobEntity.checkpoint: 0,
+                DocumentSyncJobEntity.next_run_at: datetime.now(),
+            },
+        )
+
+    def cancel_jobs(self, document_id: int) -> int:
+        """Cancel the active jobs of the document.
+
+        Returns:
+            int: The number of the jobs canceled.
+        """
+        with self.session() as session:
+            return (
+                session.query(DocumentSyncJobEntity)
+                .filter(
+                    DocumentSyncJobEntity.document_id == document_id,
+                    DocumentSyncJobEntity.status.in_(_ACTIVE_STATUS),
+                )
+                .update(
+                    {
+                        DocumentSyncJobEntity.status: SyncStatus.CANCELED.name,
+                        DocumentSyncJobEntity.gmt_modified: datetime.now(),
+                    },
+                    synchronize_session=False,
+                )
+            )
+
+    def requeue_stale_jobs(self, stale_before: datetime) -> int:
+        """Put the running jobs without heartbeat since ``stale_before`` back.
+
+        The workers of these jobs are considered dead, e.g. the webserver restarted.
+        The ``loaded_vector_ids`` are kept, the next run resumes from the checkpoint.
+
+        Returns:
+            int: The number of the jobs put back.
+        """
+        with self.session() as session:
+            return (
+                session.query(DocumentSyncJobEntity)
+                .filter(
+                    DocumentSyncJobEntity.status == SyncStatus.RUNNING.name,
+                    DocumentSyncJobEntity.gmt_modified < stale_before,
+                )
+                .update(
+                    {
+                        DocumentSyncJobEntity.status: SyncStatus.TODO.name,
+                        DocumentSyncJobEntity.worker_id: None,
+                        DocumentSyncJobEntity.next_run_at: datetime.now(),
+                        DocumentSyncJobEntity.gmt_modified: datetime.now(),
+                    },
+                    synchronize_session=False,
+                )
+            )
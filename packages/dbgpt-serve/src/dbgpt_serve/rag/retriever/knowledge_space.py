@@ -1,4 +1,5 @@
 import ast
+import asyncio
 import json
 import logging
 from typing import Any, List, Optional
@@ -8,7 +9,13 @@ from dbgpt.core import Chunk, Document, LLMClient
 from dbgpt.model import DefaultLLMClient
 from dbgpt.model.cluster import WorkerManagerFactory
 from dbgpt.rag.embedding.embedding_factory import EmbeddingFactory
-from dbgpt.rag.retriever import EmbeddingRetriever, QueryRewrite, Ranker
+from dbgpt.rag.retriever import (
+    EmbeddingRetriever,
+    HybridRetriever,
+    QueryRewrite,
+    Ranker,
+    RRFRanker,
+)
 from dbgpt.rag.retriever.base import BaseRetriever, RetrieverStrategy
 from dbgpt.rag.transformer.keyword_extractor import KeywordExtractor
 from dbgpt.storage.vector_store.filters import MetadataFilters
@@ -17,6 +24,10 @@ from dbgpt_ext.rag.retriever.doc_tree import TreeNode
 from dbgpt_serve.rag.models.models import KnowledgeSpaceDao
 from dbgpt_serve.rag.retriever.qa_retriever import QARetriever
 from dbgpt_serve.rag.retriever.retriever_chain import RetrieverChain
+from dbgpt_serve.rag.retriever.space_cache import (
+    SpaceResources,
+    space_resources_cache,
+)
 from dbgpt_serve.rag.storage_manager import StorageManager
 
 logger = logging.getLogger(__name__)
@@ -58,33 +69,30 @@ class KnowledgeSpaceRetriever(BaseRetriever):
         )
         embedding_fn = embedding_factory.create()
 
-        space_dao = KnowledgeSpaceDao()
-        self._space = space_dao.get_one({"id": space_id})
-        if self._space is None:
-            self._space = space_dao.get_one({"name": space_id})
-        if self._space is None:
-            raise ValueError(f"Knowledge space {space_id} not found")
-        self._storage_connector = self.storage_manager.get_storage_connector(
-            self._space.name,
-            self._space.vector_type,
-            self._llm_model,
+        # The space and its storage connector are resolved once and shared by the
+        # retrievers of the space
+        resources = space_resources_cache.get(
+            space_id, self._llm_model, self._load_space_resources
         )
-        context_retrieve_mode = self._extract_space_retrieve_mode(self._space)
+        self._space = resources.space
+        self._storage_connector = resources.storage_connector
         self._retrieve_mode = (
-            retrieve_mode or context_retrieve_mode or RetrieverStrategy.SEMANTIC.value
+            retrieve_mode or resources.retrieve_mode or RetrieverStrategy.SEMANTIC.value
         )
         self._executor = self._system_app.get_component(
             ComponentType.EXECUTOR_DEFAULT, ExecutorFactory
         ).create()
 
+        qa_retriever = QARetriever(
+            space_id=space_id,
+            top_k=self._top_k,
+            embedding_fn=embedding_fn,
+            system_app=system_app,
+            space=self._space,
+        )
         self._retriever_chain = RetrieverChain(
             retrievers=[
-                QARetriever(
-                    space_id=space_id,
-                    top_k=self._top_k,
-                    embedding_fn=embedding_fn,
-                    system_app=system_app,
-                ),
+                qa_retriever,
                 EmbeddingRetriever(
                     index_store=self._storage_connector,
                     top_k=self._top_k,
@@ -93,6 +101,42 @@ class KnowledgeSpaceRetriever(BaseRetriever):
                 ),
             ],
             executor=self._executor,
+            top_k=self._top_k,
+        )
+        self._hybrid_retriever_chain: Optional[RetrieverChain] = None
+        if self._retrieve_mode == RetrieverStrategy.HYBRID.value:
+            # The vector search and the keyword search of the storage connector,
+            # e.g. its BM25 index, fused together
+            self._hybrid_retriever_chain = RetrieverChain(
+                retrievers=[
+                    qa_retriever,
+                    HybridRetriever(
+                        index_store=self._storage_connector,
+                        top_k=self._top_k,
+                        rerank=self._rerank,
+                    ),
+                ],
+                executor=self._executor,
+                top_k=self._top_k,
+            )
+
+    def _load_space_resources(self) -> SpaceResources:
+        """Resolve the space and its storage connector."""
+        space_dao = KnowledgeSpaceDao()
+        space = space_dao.get_one({"id": self._space_id})
+        if space is None:
+            space = space_dao.get_one({"name": self._space_id})
+        if space is None:
+            raise ValueError(f"Knowledge space {self._space_id} not found")
+        storage_connector = self.storage_manager.get_storage_connector(
+            space.name,
+            space.vector_type,
+            self._llm_model,
+        )
+        return SpaceResources(
+            space=space,
+            storage_connector=storage_connector,
+            retrieve_mode=self._extract_space_retrieve_mode(space),
         )
 
     @property
@@ -190,26 +234,19 @@ class KnowledgeSpaceRetriever(BaseRetriever):
             return await self.tree_index_retrieve(query, self._top_k, filters)
         elif self._retrieve_mode == RetrieverStrategy.HYBRID.value:
             logger.info("Starting Hybrid retrieval")
-            tasks = []
-            import asyncio
-
-            tasks.append(self.semantic_retrieve(query, score_threshold, filters))
-            tasks.append(self.full_text_retrieve(query, self._top_k, filters))
-            tasks.append(self.tree_index_retrieve(query, self._top_k, filters))
-            results = await asyncio.gather(*tasks)
-            semantic_candidates = results[0]
-            full_text_candidates = results[1]
-            tree_candidates = results[2]
+            hybrid_candidates, tree_candidates = await asyncio.gather(
+                self.hybrid_retrieve(query, score_threshold, filters),
+                self.tree_index_retrieve(query, self._top_k, filters),
+            )
             logger.info(
                 f"Hybrid retrieval completed. "
-                f"Found {len(semantic_candidates)} semantic candidates "
-                f"and Found {len(full_text_candidates)} full text candidates."
+                f"Found {len(hybrid_candidates)} semantic and full text candidates "
                 f"and Found {len(tree_candidates)} tree candidates."
             )
-            candidates = semantic_candidates + full_text_candidates + tree_candidates
-            # Remove duplicates
-            unique_candidates = {chunk.content: chunk for chunk in candidates}
-            return list(unique_candidates.values())
+            # Fuse the ranks of the results, the scores of them are not comparable
+            return RRFRanker(topk=self._top_k).fuse(
+                [hybrid_candidates, tree_candidates]
+            )
 
     async def semantic_retrieve(
         self,
@@ -231,6 +268,28 @@ class KnowledgeSpaceRetriever(BaseRetriever):
             query, score_threshold, filters
         )
 
+    async def hybrid_retrieve(
+        self,
+        query: str,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        """Retrieve knowledge chunks with the vector and the full text search.
+
+        Args:
+            query (str): query text.
+            score_threshold (float): score threshold of the vector search.
+            filters: (Optional[MetadataFilters]) metadata filters.
+
+        Return:
+            List[Chunk]: list of chunks with the fused score.
+        """
+        if self._hybrid_retriever_chain is None:
+            raise ValueError("The retrieve mode of the space is not hybrid")
+        return await self._hybrid_retriever_chain.aretrieve_with_scores(
+            query, score_threshold, filters
+        )
+
     async def full_text_retrieve(
         self,
         query: str,
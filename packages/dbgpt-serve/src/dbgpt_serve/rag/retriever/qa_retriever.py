@@ -1,5 +1,4 @@
 import ast
-import json
 import logging
 from typing import Any, List, Optional
 
@@ -14,6 +13,12 @@ from dbgpt_serve.rag.models.models import KnowledgeSpaceDao
 
 from ..models.chunk_db import DocumentChunkDao, DocumentChunkEntity
 from ..models.document_db import KnowledgeDocumentDao
+from .question_index import (
+    QuestionChunk,
+    QuestionIndex,
+    parse_questions,
+    question_index_manager,
+)
 
 CHUNK_PAGE_SIZE = 1000
 logger = logging.getLogger(__name__)
@@ -29,11 +34,14 @@ class QARetriever(BaseRetriever):
         embedding_fn: Optional[Any] = 4,
         lambda_value: Optional[float] = 1e-5,
         system_app: SystemApp = None,
+        space: Optional[Any] = None,
     ):
         """
         Args:
             space_id (str): knowledge space name
             top_k (Optional[int]): top k
+            space (Optional[Any]): the resolved knowledge space, looked up by
+                space_id if not provided
         """
         if space_id is None:
             raise ValueError("space_id is required")
@@ -45,16 +53,57 @@ class QARetriever(BaseRetriever):
         self._chunk_dao = DocumentChunkDao()
         self._embedding_fn = embedding_fn
 
-        space = self._space_dao.get_one({"id": space_id})
+        if not space:
+            space = self._space_dao.get_one({"id": space_id})
         if not space:
             space = self._space_dao.get_one({"name": space_id})
         if not space:
             raise ValueError("space not found")
-        self.documents = self._document_dao.get_list({"space": space.name})
+        self._space_name = space.name
         self._executor = self._system_app.get_component(
             ComponentType.EXECUTOR_DEFAULT, ExecutorFactory
         ).create()
 
+    def _question_index(self) -> QuestionIndex:
+        return question_index_manager.get_index(
+            self._space_name, self._load_question_index
+        )
+
+    def _load_question_index(self) -> QuestionIndex:
+        """Build the question index of the space from the database."""
+        index = QuestionIndex()
+        documents = self._document_dao.get_list({"space": self._space_name})
+        for doc in documents:
+            index.add_document(doc.id, parse_questions(doc.questions))
+        doc_ids = [doc.id for doc in documents]
+        if doc_ids:
+            chunks = self._chunk_dao.get_chunks_with_questions(
+                query=DocumentChunkEntity(), document_ids=doc_ids
+            )
+            for chunk in chunks:
+                index.add_chunk(
+                    QuestionChunk(
+                        id=chunk.id,
+                        document_id=chunk.document_id,
+                        content=chunk.content,
+                        meta_info=chunk.meta_info,
+                    ),
+                    parse_questions(chunk.questions),
+                )
+        logger.info(
+            f"Loaded question index of space {self._space_name}, "
+            f"{len(index.chunks)} chunk questions, "
+            f"{len(index.document_ids)} document questions"
+        )
+        return index
+
+    def _document_chunks(self, document_id: int) -> List[DocumentChunkEntity]:
+        # At most CHUNK_PAGE_SIZE chunks of each hit document
+        return self._chunk_dao.get_document_chunks(
+            DocumentChunkEntity(document_id=document_id),
+            page_size=CHUNK_PAGE_SIZE,
+        )
+
     def _retrieve(
         self, query: str, filters: Optional[MetadataFilters] = None
     ) -> List[Chunk]:
@@ -67,26 +116,17 @@ class QARetriever(BaseRetriever):
         """
         query = remove_trailing_punctuation(query)
         candidate_results = []
-        for doc in self.documents:
-            if doc.questions:
-                questions = json.loads(doc.questions)
-                if query in questions:
-                    chunks = self._chunk_dao.get_document_chunks(
-                        DocumentChunkEntity(document_id=doc.id),
-                        page_size=CHUNK_PAGE_SIZE,
-                    )
-                    candidates = [
-                        Chunk(
-                            content=chunk.content,
-                            metadata=ast.literal_eval(chunk.meta_info),
-                            retriever=self.name(),
-                            score=0.0,
-                        )
-                        for chunk in chunks
-                    ]
-                    candidate_results.extend(
-                        self._cosine_similarity_rerank(candidates, query)
-                    )
+        for document_id in self._question_index().lookup_documents(query):
+            candidates = [
+                Chunk(
+                    content=chunk.content,
+                    metadata=ast.literal_eval(chunk.meta_info),
+                    retriever=self.name(),
+                    score=0.0,
+                )
+                for chunk in self._document_chunks(document_id)
+            ]
+            candidate_results.extend(self._cosine_similarity_rerank(candidates, query))
         return candidate_results
 
     def _retrieve_with_score(
@@ -105,51 +145,37 @@ class QARetriever(BaseRetriever):
             List[Chunk]: list of chunks with score
         """
         query = remove_trailing_punctuation(query)
+        index = self._question_index()
         candidate_results = []
-        doc_ids = [doc.id for doc in self.documents]
-        query_param = DocumentChunkEntity()
-        chunks = self._chunk_dao.get_chunks_with_questions(
-            query=query_param, document_ids=doc_ids
-        )
-        for chunk in chunks:
-            if chunk.questions:
-                questions = json.loads(chunk.questions)
-                if query in questions:
-                    logger.info(f"qa chunk hit:{chunk}, question:{query}")
-                    candidate_results.append(
-                        Chunk(
-                            content=chunk.content,
-                            chunk_id=str(chunk.id),
-                            metadata={"prop_field": ast.literal_eval(chunk.meta_info)},
-                            retriever=self.name(),
-                            score=1.0,
-                        )
-                    )
+        for chunk in index.lookup_chunks(query):
+            logger.info(f"qa chunk hit:{chunk.id}, question:{query}")
+            candidate_results.append(
+                Chunk(
+                    content=chunk.content,
+                    chunk_id=str(chunk.id),
+                    metadata={"prop_field": ast.literal_eval(chunk.meta_info)},
+                    retriever=self.name(),
+                    score=1.0,
+                )
+            )
         if len(candidate_results) > 0:
             return self._cosine_similarity_rerank(candidate_results, query)
 
-        for doc in self.documents:
-            if doc.questions:
-                questions = json.loads(doc.questions)
-                if query in questions:
-                    logger.info(f"qa document hit:{doc}, question:{query}")
-                    chunks = self._chunk_dao.get_document_chunks(
-                        DocumentChunkEntity(document_id=doc.id),
-                        page_size=CHUNK_PAGE_SIZE,
-                    )
-                    candidates_with_scores = [
-                        Chunk(
-                            content=chunk.content,
-                            chunk_id=str(chunk.id),
-                            metadata={"prop_field": ast.literal_eval(chunk.meta_info)},
-                            retriever=self.name(),
-                            score=1.0,
-                        )
-                        for chunk in chunks
-                    ]
-                    candidate_results.extend(
-                        self._cosine_similarity_rerank(candidates_with_scores, query)
-                    )
+        for document_id in index.lookup_documents(query):
+            logger.info(f"qa document hit:{document_id}, question:{query}")
+            candidates_with_scores = [
+                Chunk(
+                    content=chunk.content,
+                    chunk_id=str(chunk.id),
+                    metadata={"prop_field": ast.literal_eval(chunk.meta_info)},
+                    retriever=self.name(),
+                    score=1.0,
+                )
+                for chunk in self._document_chunks(document_id)
+            ]
+            candidate_results.extend(
+                self._cosine_similarity_rerank(candidates_with_scores, query)
+            )
         return candidate_results
 
     async def _aretrieve(
@@ -191,14 +217,14 @@ class QARetriever(BaseRetriever):
     ) -> List[Chunk]:
         """Rerank candidates using cosine similarity."""
         if len(candidates_with_scores) > self._top_k:
-            for candidate in candidates_with_scores:
-                similarity = calculate_cosine_similarity(
-                    embeddings=self._embedding_fn,
-                    prediction=query,
-                    contexts=[candidate.content],
-                )
-                score = float(similarity.mean())
-                candidate.score = score
+            # Embed the query once and all the candidates in one batch
+            similarities = calculate_cosine_similarity(
+                embeddings=self._embedding_fn,
+                prediction=query,
+                contexts=[candidate.content for candidate in candidates_with_scores],
+            )
+            for candidate, similarity in zip(candidates_with_scores, similarities):
+                candidate.score = float(similarity)
             candidates_with_scores.sort(key=lambda x: x.score, reverse=True)
             candidates_with_scores = candidates_with_scores[: self._top_k]
             candidates_with_scores = [
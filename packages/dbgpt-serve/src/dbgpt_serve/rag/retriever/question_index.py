@@ -0,0 +1,143 @@
+"""The in-memory index of the questions of a knowledge space.
+
+The questions of the chunks and the documents are normalized and indexed by the
+question, so a QA lookup is a dict lookup instead of loading and parsing all the
+questions of the space on each query.
+
+The index of a space is built lazily from the database and dropped when the chunks or
+the documents of the space are updated, the ``ttl`` bounds the staleness when they are
+updated by another process.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dbgpt.util.string_utils import remove_trailing_punctuation
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question for lookup.
+
+    The trailing punctuation is removed, the whitespaces are collapsed and the letters
+    are lower-cased, so "What is DB-GPT?" and "what is  db-gpt" are the same question.
+    """
+    question = remove_trailing_punctuation(question or "")
+    return _WHITESPACE.sub(" ", question).strip().lower()
+
+
+def parse_questions(questions: Optional[str]) -> List[str]:
+    """Parse the questions column, a JSON list of questions."""
+    if not questions:
+        return []
+    try:
+        parsed = json.loads(questions)
+    except (TypeError, ValueError):
+        return []
+    if isinstance(parsed, str):
+        parsed = [parsed]
+    if not isinstance(parsed, list):
+        return []
+    return [q for q in parsed if isinstance(q, str)]
+
+
+@dataclass
+class QuestionChunk:
+    """A chunk with questions."""
+
+    id: int
+    document_id: int
+    content: str
+    meta_info: str
+
+
+@dataclass
+class QuestionIndex:
+    """The questions of a knowledge space."""
+
+    chunks: Dict[str, List[QuestionChunk]] = field(default_factory=dict)
+    document_ids: Dict[str, List[int]] = field(default_factory=dict)
+
+    def add_chunk(self, chunk: QuestionChunk, questions: List[str]):
+        """Index the questions of a chunk."""
+        for question in {normalize_question(q) for q in questions}:
+            if question:
+                self.chunks.setdefault(question, []).append(chunk)
+
+    def add_document(self, document_id: int, questions: List[str]):
+        """Index the questions of a document."""
+        for question in {normalize_question(q) for q in questions}:
+            if question:
+                self.document_ids.setdefault(question, []).append(document_id)
+
+    def lookup_chunks(self, query: str) -> List[QuestionChunk]:
+        """Return the chunks having the question."""
+        return self.chunks.get(normalize_question(query), [])
+
+    def lookup_documents(self, query: str) -> List[int]:
+        """Return the ids of the documents having the question."""
+        return self.document_ids.get(normalize_question(query), [])
+
+
+class QuestionIndexManager:
+    """Keep the question index of each knowledge space."""
+
+    def __init__(self, ttl: Optional[float] = 300):
+        """Create a new QuestionIndexManager.
+
+        Args:
+            ttl (Optional[float]): The seconds an index is used before rebuilt, None
+                means until invalidated.
+        """
+        self._ttl = ttl
+        self._indexes: Dict[str, Tuple[float, int, QuestionIndex]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get_index(
+        self, space_name: str, loader: Callable[[], QuestionIndex]
+    ) -> QuestionIndex:
+        """Return the index of the space, build it by the loader if not cached.
+
+        Args:
+            space_name (str): The name of the knowledge space.
+            loader (Callable[[], QuestionIndex]): Build the index from the database.
+        """
+        with self._lock:
+            version = self._versions.setdefault(space_name, 0)
+            cached = self._indexes.get(space_name)
+            if cached:
+                created_at, cached_version, index = cached
+                if cached_version == version and (
+                    self._ttl is None or time.time() - created_at < self._ttl
+                ):
+                    return index
+        index = loader()
+        with self._lock:
+            # Not cached if invalidated while loading
+            if self._versions.get(space_name, 0) == version:
+                self._indexes[space_name] = (time.time(), version, index)
+        return index
+
+    def invalidate(self, space_name: Optional[str] = None):
+        """Drop the index of the space, or all the indexes if no space provided."""
+        with self._lock:
+            space_names = (
+                [space_name]
+                if space_name
+                else list(set(self._indexes.keys()) | set(self._versions.keys()))
+            )
+            for name in space_names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+                self._indexes.pop(name, None)
+
+
+question_index_manager = QuestionIndexManager()
@@ -1,22 +1,59 @@
-from concurrent.futures import Executor, ThreadPoolExecutor
-from typing import List, Optional
+import asyncio
+import logging
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Awaitable, Callable, List, Optional, Union
 
 from dbgpt.core import Chunk
 from dbgpt.rag.retriever.base import BaseRetriever
+from dbgpt.rag.retriever.rerank import Ranker, RRFRanker
 from dbgpt.storage.vector_store.filters import MetadataFilters
 
+logger = logging.getLogger(__name__)
+
+
+class RetrieverChainMode(str, Enum):
+    """The mode to combine the results of the retrievers.
+
+    Args:
+        - FIRST: the first non-empty result by the priority(the order of the
+            retrievers) wins, the retrievers with lower priority are canceled.
+        - MERGE: the results of all the retrievers are fused by the ranker.
+    """
+
+    FIRST = "first"
+    MERGE = "merge"
+
 
 class RetrieverChain(BaseRetriever):
-    """Retriever chain class."""
+    """Retriever chain class.
+
+    The retrievers run concurrently, their results are combined by the mode.
+    """
 
     def __init__(
         self,
         retrievers: Optional[List[BaseRetriever]] = None,
         executor: Optional[Executor] = None,
+        mode: Union[str, RetrieverChainMode] = RetrieverChainMode.FIRST,
+        ranker: Optional[Ranker] = None,
+        top_k: int = 4,
     ):
-        """Create retriever chain instance."""
+        """Create retriever chain instance.
+
+        Args:
+            retrievers (Optional[List[BaseRetriever]]): The retrievers, ordered by
+                the priority.
+            executor (Optional[Executor]): The executor to run the sync retrievers.
+            mode (Union[str, RetrieverChainMode]): The mode to combine the results.
+            ranker (Optional[Ranker]): The ranker to fuse the results in the merge
+                mode, reciprocal rank fusion by default.
+            top_k (int): The number of the chunks of the default ranker.
+        """
         self._retrievers = retrievers or []
         self._executor = executor or ThreadPoolExecutor()
+        self._mode = RetrieverChainMode(mode)
+        self._ranker = ranker or RRFRanker(top_k)
 
     def _retrieve(
         self, query: str, filters: Optional[MetadataFilters] = None
@@ -28,11 +65,7 @@ class RetrieverChain(BaseRetriever):
         Return:
             List[Chunk]: list of chunks
         """
-        for retriever in self._retrievers:
-            candidates = retriever.retrieve(query, filters)
-            if candidates:
-                return candidates
-        return []
+        return self._run(lambda retriever: retriever.retrieve(query, filters), query)
 
     async def _aretrieve(
         self, query: str, filters: Optional[MetadataFilters] = None
@@ -44,11 +77,9 @@ class RetrieverChain(BaseRetriever):
         Return:
             List[Chunk]: list of chunks
         """
-        for retriever in self._retrievers:
-            candidates = await retriever.aretrieve(query=query, filters=filters)
-            if candidates:
-                return candidates
-        return []
+        return await self._arun(
+            lambda retriever: retriever.aretrieve(query=query, filters=filters), query
+        )
 
     def _retrieve_with_score(
         self,
@@ -63,13 +94,12 @@ class RetrieverChain(BaseRetriever):
         Return:
             List[Chunk]: list of chunks
         """
-        for retriever in self._retrievers:
-            candidates_with_scores = retriever.retrieve_with_scores(
+        return self._run(
+            lambda retriever: retriever.retrieve_with_scores(
                 query=query, score_threshold=score_threshold, filters=filters
-            )
-            if candidates_with_scores:
-                return candidates_with_scores
-        return []
+            ),
+            query,
+        )
 
     async def _aretrieve_with_score(
         self,
@@ -85,10 +115,94 @@ class RetrieverChain(BaseRetriever):
         Return:
             List[Chunk]: list of chunks with score
         """
-        for retriever in self._retrievers:
-            candidates_with_scores = await retriever.aretrieve_with_scores(
+        return await self._arun(
+            lambda retriever: retriever.aretrieve_with_scores(
                 query=query, score_threshold=score_threshold, filters=filters
-            )
-            if candidates_with_scores:
-                return candidates_with_scores
+            ),
+            query,
+        )
+
+    def _run(
+        self, call: Callable[[BaseRetriever], List[Chunk]], query: str
+    ) -> List[Chunk]:
+        """Run the retrievers in the executor and combine their results."""
+        if len(self._retrievers) == 1:
+            return call(self._retrievers[0])
+        futures: List[Future] = [
+            self._executor.submit(call, retriever) for retriever in self._retrievers
+        ]
+        try:
+            if self._mode == RetrieverChainMode.MERGE:
+                results = []
+                for future in futures:
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        results.append(e)
+                return self._merge(results, query)
+            errors = []
+            # Wait by the priority, all the retrievers are running meanwhile
+            for future in futures:
+                try:
+                    candidates = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                if candidates:
+                    return candidates
+            return self._empty_or_raise(errors)
+        finally:
+            for future in futures:
+                # The running retrievers can't be interrupted, just not waited
+                future.cancel()
+
+    async def _arun(
+        self, call: Callable[[BaseRetriever], Awaitable[List[Chunk]]], query: str
+    ) -> List[Chunk]:
+        """Run the retrievers concurrently and combine their results."""
+        if len(self._retrievers) == 1:
+            return await call(self._retrievers[0])
+        tasks = [asyncio.ensure_future(call(r)) for r in self._retrievers]
+        try:
+            if self._mode == RetrieverChainMode.MERGE:
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                return self._merge(results, query)
+            errors = []
+            # Wait by the priority, all the retrievers are running meanwhile
+            for task in tasks:
+                try:
+                    candidates = await task
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                if candidates:
+                    return candidates
+            return self._empty_or_raise(errors)
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            # Consume the results of the canceled and the failed tasks
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _merge(
+        self, results: List[Union[List[Chunk], BaseException]], query: str
+    ) -> List[Chunk]:
+        """Fuse the results of the retrievers, the failed retrievers are skipped."""
+        errors = [r for r in results if isinstance(r, BaseException)]
+        succeeded = [r for r in results if not isinstance(r, BaseException)]
+        if not succeeded:
+            return self._empty_or_raise(errors)
+        for error in errors:
+            logger.warning(f"Retriever failed, skipped in the merged result: {error}")
+        if isinstance(self._ranker, RRFRanker):
+            return self._ranker.fuse(succeeded)
+        return self._ranker.rank([c for r in succeeded for c in r], query)
+
+    def _empty_or_raise(self, errors: List[BaseException]) -> List[Chunk]:
+        """Return empty if some retrievers succeeded, or raise the first error."""
+        if errors and len(errors) == len(self._retrievers):
+            raise errors[0]
+        for error in errors:
+            logger.warning(f"Retriever failed: {error}")
         return []
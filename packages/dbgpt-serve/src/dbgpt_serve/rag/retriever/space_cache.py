@@ -0,0 +1,104 @@
+"""The cache of the resolved dependencies of the knowledge space retrievers.
+
+A knowledge space retriever resolves the space from the database, the storage
+connector of the space and the retrieve mode in the space context. They only change
+when the space is updated, so they are resolved once per space and shared by the
+retrievers of the following queries.
+
+The resources of a space are dropped when the space is updated or deleted, the
+``ttl`` bounds the staleness when the space is updated by another process.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from dbgpt.storage.base import IndexStoreBase
+
+from ..api.schemas import SpaceServeResponse
+
+
+@dataclass
+class SpaceResources:
+    """The resolved dependencies of a knowledge space retriever."""
+
+    space: SpaceServeResponse
+    storage_connector: IndexStoreBase
+    retrieve_mode: Optional[str] = None
+
+
+# The space id or name, and the llm model
+_CacheKey = Tuple[str, Optional[str]]
+
+
+class SpaceResourcesCache:
+    """Keep the resolved dependencies of the knowledge spaces.
+
+    The resources are cached by the space id or name used to look up the space and
+    the llm model. Each invalidation bumps the version of the cache, the resources
+    resolved before are not cached anymore.
+    """
+
+    def __init__(self, ttl: Optional[float] = 300, max_size: int = 256):
+        """Create a new SpaceResourcesCache.
+
+        Args:
+            ttl (Optional[float]): The seconds the resources are used before resolved
+                again, None means until invalidated.
+            max_size (int): The max number of the cached resources, the least
+                recently used are dropped.
+        """
+        self._ttl = ttl
+        self._max_size = max(1, max_size)
+        self._resources: "OrderedDict[_CacheKey, Tuple[float, SpaceResources]]" = (
+            OrderedDict()
+        )
+        # Bumped on each invalidation, the space name is unknown before resolved
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        space_id: str,
+        llm_model: Optional[str],
+        loader: Callable[[], SpaceResources],
+    ) -> SpaceResources:
+        """Return the resources of the space, resolve them by the loader if missed.
+
+        Args:
+            space_id (str): The id or the name of the knowledge space.
+            llm_model (Optional[str]): The llm model of the storage connector.
+            loader (Callable[[], SpaceResources]): Resolve the resources.
+        """
+        key = (str(space_id), llm_model)
+        with self._lock:
+            cached = self._resources.get(key)
+            if cached:
+                created_at, resources = cached
+                if self._ttl is None or time.time() - created_at < self._ttl:
+                    self._resources.move_to_end(key)
+                    return resources
+                del self._resources[key]
+            version = self._version
+        resources = loader()
+        with self._lock:
+            # Not cached if invalidated while loading
+            if version == self._version:
+                self._resources[key] = (time.time(), resources)
+                self._resources.move_to_end(key)
+                while len(self._resources) > self._max_size:
+                    self._resources.popitem(last=False)
+        return resources
+
+    def invalidate(self, space_name: Optional[str] = None):
+        """Drop the resources of the space, or all the resources if no space."""
+        with self._lock:
+            self._version += 1
+            for key, (_, resources) in list(self._resources.items()):
+                if not space_name or resources.space.name == space_name:
+                    del self._resources[key]
+
+
+space_resources_cache = SpaceResourcesCache()
@@ -62,6 +62,7 @@ class Serve(BaseServe):
         # import your own module here to ensure the module is loaded before the
         # application starts
         from .models.models import KnowledgeSpaceEntity as _  # noqa: F401
+        from .models.sync_job_db import DocumentSyncJobEntity as _  # noqa: F401, F811
 
     def before_start(self):
         """Called before the start of the application."""
@@ -0,0 +1,104 @@
+"""Diff the chunks of a document against the chunks saved by its last sync.
+
+A chunk is identified by the hash of its content and metadata, so when a document
+is synced again only the chunks whose content or metadata changed are embedded,
+the vectors of the unchanged chunks are kept and the vectors of the chunks gone
+are deleted.
+"""
+
+import ast
+import hashlib
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from dbgpt.core import Chunk
+
+from ..models.chunk_db import DocumentChunkEntity
+
+
+def chunk_content_hash(
+    content: Optional[str], metadata: Optional[Dict[str, Any]] = None
+) -> str:
+    """Return the hash of the chunk content and metadata.
+
+    The metadata is stored in the vector store with the vector, so a chunk whose
+    metadata changed must be loaded again.
+    """
+    meta = json.dumps(metadata or {}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{content or ''}\0{meta}".encode("utf-8")).hexdigest()
+
+
+def _saved_chunk_hash(entity: DocumentChunkEntity) -> Optional[str]:
+    """Return the hash of a saved chunk, None if it can not be computed."""
+    if entity.content_hash:
+        return entity.content_hash
+    # Saved without the hash, the metadata is saved as the repr of a dict
+    try:
+        metadata = ast.literal_eval(entity.meta_info) if entity.meta_info else {}
+    except (ValueError, SyntaxError):
+        return None
+    if not isinstance(metadata, dict):
+        return None
+    return chunk_content_hash(entity.content, metadata)
+
+
+@dataclass
+class ChunkDiff:
+    """The difference between the new chunks and the saved chunks of a document."""
+
+    reused: List[Chunk] = field(default_factory=list)
+    added: List[Chunk] = field(default_factory=list)
+    removed_vector_ids: List[str] = field(default_factory=list)
+    # The saved chunk of each reused chunk, by the vector id
+    reused_entities: Dict[str, DocumentChunkEntity] = field(default_factory=dict)
+
+
+def diff_chunks(
+    saved: List[DocumentChunkEntity],
+    chunks: List[Chunk],
+    vector_ids: Optional[str] = None,
+) -> ChunkDiff:
+    """Diff the new chunks of a document against its saved chunks.
+
+    The ``chunk_id`` of a reused chunk is set to the vector id of the saved chunk.
+    The saved chunks without a vector id, e.g. saved before the vector ids are
+    recorded, can not be reused and their vectors are deleted, so are the chunks
+    whose metadata changed.
+
+    Args:
+        saved (List[DocumentChunkEntity]): The chunks saved by the last sync.
+        chunks (List[Chunk]): The new chunks of the document.
+        vector_ids (Optional[str]): The comma separated vector ids of the document.
+
+    Returns:
+        ChunkDiff: The difference.
+    """
+    saved_by_hash: Dict[str, List[DocumentChunkEntity]] = defaultdict(list)
+    for entity in saved:
+        content_hash = _saved_chunk_hash(entity) if entity.vector_id else None
+        if content_hash:
+            saved_by_hash[content_hash].append(entity)
+
+    diff = ChunkDiff()
+    for chunk in chunks:
+        candidates = saved_by_hash.get(
+            chunk_content_hash(chunk.content, chunk.metadata)
+        )
+        if candidates:
+            entity = candidates.pop(0)
+            chunk.chunk_id = entity.vector_id
+            diff.reused.append(chunk)
+            diff.reused_entities[entity.vector_id] = entity
+        else:
+            diff.added.append(chunk)
+
+    old_ids = [i for i in (vector_ids or "").split(",") if i]
+    old_ids.extend(entity.vector_id for entity in saved if entity.vector_id)
+    seen = set(diff.reused_entities)
+    for vector_id in old_ids:
+        if vector_id not in seen:
+            seen.add(vector_id)
+            diff.removed_vector_ids.append(vector_id)
+    return diff
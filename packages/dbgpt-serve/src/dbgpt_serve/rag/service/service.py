@@ -2,12 +2,13 @@ import asyncio
 import json
 import logging
 import os
+import time
 from datetime import datetime
-from enum import Enum
-from typing import List, Optional, cast
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, cast
 
 from fastapi import HTTPException
 
+from dbgpt._private.pydantic import model_to_json
 from dbgpt.component import ComponentType, SystemApp
 from dbgpt.configs import TAG_KEY_KNOWLEDGE_FACTORY_DOMAIN_TYPE
 from dbgpt.configs.model_config import (
@@ -20,6 +21,7 @@ from dbgpt.model.cluster import WorkerManagerFactory
 from dbgpt.rag.embedding.embedding_factory import RerankEmbeddingFactory
 from dbgpt.rag.knowledge import ChunkStrategy, KnowledgeType
 from dbgpt.rag.retriever.rerank import RerankEmbeddingsRanker
+from dbgpt.storage.base import LoadProgress
 from dbgpt.storage.metadata import BaseDao
 from dbgpt.storage.metadata._base_dao import QUERY_SPEC
 from dbgpt.util.pagination_utils import PaginationResult
@@ -28,6 +30,7 @@ from dbgpt.util.tracer import root_tracer, trace
 from dbgpt_app.knowledge.request.request import BusinessFieldType
 from dbgpt_ext.rag.assembler import EmbeddingAssembler
 from dbgpt_ext.rag.chunk_manager import ChunkParameters
+from dbgpt_ext.rag.ingestion import StreamingIngestionPipeline
 from dbgpt_ext.rag.knowledge import KnowledgeFactory
 from dbgpt_serve.core import BaseService, blocking_func_to_async
 
@@ -45,19 +48,72 @@ from ..models.chunk_db import DocumentChunkDao, DocumentChunkEntity
 from ..models.document_db import (
     KnowledgeDocumentDao,
     KnowledgeDocumentEntity,
+    SyncStatus,
 )
 from ..models.models import KnowledgeSpaceDao, KnowledgeSpaceEntity
+from ..models.sync_job_db import DocumentSyncJobDao, DocumentSyncJobEntity
 from ..retriever.knowledge_space import KnowledgeSpaceRetriever
+from ..retriever.question_index import question_index_manager
+from ..retriever.space_cache import space_resources_cache
 from ..storage_manager import StorageManager
+from .chunk_diff import chunk_content_hash, diff_chunks
+from .sync_worker import DocumentSyncWorker
 
 logger = logging.getLogger(__name__)
 
 
-class SyncStatus(Enum):
-    TODO = "TODO"
-    FAILED = "FAILED"
-    RUNNING = "RUNNING"
-    FINISHED = "FINISHED"
+class _LoadedVectorIds:
+    """The ids of the vectors loaded by a document sync job.
+
+    The ids are saved on the job with the checkpoint as the loading goes on, the
+    first ``checkpoint`` ids are the ids of the leading chunks which are all loaded,
+    in the order of the chunks. When a run never finished, e.g. the webserver
+    crashed, the next run keeps the vectors up to the checkpoint and resumes the
+    loading from there, the other vectors are deleted.
+    """
+
+    def __init__(
+        self, save_func: Optional[Callable[[List[str], int], Awaitable[None]]] = None
+    ):
+        self._save_func = save_func
+        self.resumed: List[str] = []
+        self._groups: Dict[int, List[str]] = {}
+        self._others: List[str] = []
+        self.checkpoint = 0
+
+    @property
+    def ids(self) -> List[str]:
+        """Return the ids of all the vectors loaded, including the resumed ones."""
+        group_ids = [i for idx in sorted(self._groups) for i in self._groups[idx]]
+        return self.resumed + group_ids + self._others
+
+    async def resume(self, ids: List[str]):
+        """Resume from the vectors loaded by the unfinished run."""
+        self.resumed = list(ids)
+        self.checkpoint = len(self.resumed)
+        await self._save()
+
+    async def add_group(self, progress: LoadProgress):
+        """Add the ids of a group loaded, the checkpoint moves forward."""
+        self._groups[progress.group_index] = progress.group_ids
+        leading, idx = 0, 0
+        while idx in self._groups:
+            leading += len(self._groups[idx])
+            idx += 1
+        # The ids can not be matched to the chunks if the index store does not
+        # return an id for each chunk
+        if leading == progress.checkpoint:
+            self.checkpoint = len(self.resumed) + progress.checkpoint
+        await self._save()
+
+    async def extend(self, ids: List[str]):
+        """Add the ids loaded without a checkpoint, e.g. the streaming ingestion."""
+        self._others.extend(ids)
+        await self._save()
+
+    async def _save(self):
+        if self._save_func:
+            await self._save_func(self.ids, self.checkpoint)
 
 
 class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeResponse]):
@@ -72,11 +128,14 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
         dao: Optional[KnowledgeSpaceDao] = None,
         document_dao: Optional[KnowledgeDocumentDao] = None,
         chunk_dao: Optional[DocumentChunkDao] = None,
+        sync_job_dao: Optional[DocumentSyncJobDao] = None,
     ):
         self._system_app = system_app
         self._dao: KnowledgeSpaceDao = dao
         self._document_dao: KnowledgeDocumentDao = document_dao
         self._chunk_dao: DocumentChunkDao = chunk_dao
+        self._sync_job_dao: DocumentSyncJobDao = sync_job_dao
+        self._sync_worker: Optional[DocumentSyncWorker] = None
         self._serve_config = config
 
         super().__init__(system_app)
@@ -91,8 +150,28 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
         self._dao = self._dao or KnowledgeSpaceDao()
         self._document_dao = self._document_dao or KnowledgeDocumentDao()
         self._chunk_dao = self._chunk_dao or DocumentChunkDao()
+        self._sync_job_dao = self._sync_job_dao or DocumentSyncJobDao()
         self._system_app = system_app
 
+    async def async_after_start(self):
+        """Start the document sync workers if the job queue is enabled."""
+        if not self.config.sync_job_queue:
+            return
+        self._sync_worker = DocumentSyncWorker(
+            self._system_app,
+            self._sync_job_dao,
+            self._run_sync_job,
+            max_workers=self.config.sync_max_workers,
+            space_concurrency=self._space_sync_concurrency,
+            lease_timeout=self.config.sync_lease_timeout,
+        )
+        await self._sync_worker.start()
+
+    async def async_before_stop(self):
+        """Stop the document sync workers, the running jobs are run again later."""
+        if self._sync_worker:
+            await self._sync_worker.stop()
+
     @property
     def storage_manager(self):
         return StorageManager.get_instance(self._system_app)
@@ -156,6 +235,7 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
                 detail=f"no space name named {request.name}",
             )
         update_obj = self._dao.update_knowledge_space(self._dao.from_request(request))
+        space_resources_cache.invalidate(spaces[0].name)
         return update_obj
 
     def create_document(self, request: DocumentServeRequest) -> str:
@@ -223,10 +303,9 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
                     f"there are document called, doc_id: {sync_request.doc_id}"
                 )
             doc = docs[0]
-            if (
-                doc.status == SyncStatus.RUNNING.name
-                or doc.status == SyncStatus.FINISHED.name
-            ):
+            # A finished document can be synced again, only the chunks changed
+            # are embedded
+            if doc.status == SyncStatus.RUNNING.name:
                 raise Exception(
                     f" doc:{doc.doc_name} status is {doc.status}, can not sync"
                 )
@@ -303,6 +382,8 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
         self._document_dao.raw_delete(document_query)
         # delete space
         self._dao.delete(query_request)
+        question_index_manager.invalidate(space.name)
+        space_resources_cache.invalidate(space.name)
         return space
 
     def update_document(self, request: DocumentServeRequest):
@@ -332,6 +413,28 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
         self._document_dao.update(
             {"id": entity.id}, self._document_dao.to_request(entity)
         )
+        question_index_manager.invalidate(entity.space)
+
+    async def adelete_document(
+        self, document_id: str
+    ) -> Optional[DocumentServeResponse]:
+        """Cancel the sync jobs of the document and delete it.
+
+        The sync job of the document running in this process is canceled before the
+        document is deleted, so it stops writing the vectors and the chunks of the
+        deleted document.
+
+        Args:
+            document_id (str): The document id
+
+        Returns:
+            DocumentServeResponse: The data after deletion
+        """
+        if self._sync_worker:
+            await self._sync_worker.cancel(int(document_id))
+        return await blocking_func_to_async(
+            self.system_app, self.delete_document, document_id
+        )
 
     def delete_document(self, document_id: str) -> Optional[DocumentServeResponse]:
         """Delete a Flow entity
@@ -356,6 +459,10 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
             raise Exception(f"invalid space name: {docuemnt.space}")
         space = spaces[0]
 
+        if self._sync_worker:
+            # Canceled by the heartbeat of the worker running the job, call
+            # adelete_document to cancel the job running in this process at once
+            self._sync_job_dao.cancel_jobs(docuemnt.id)
         vector_ids = docuemnt.vector_ids
         if vector_ids is not None:
             vector_store_connector = self.create_vector_store(space.name)
@@ -365,6 +472,7 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
         self._chunk_dao.raw_delete(docuemnt.id)
         # delete document
         self._document_dao.raw_delete(docuemnt)
+        question_index_manager.invalidate(space.name)
         return docuemnt
 
     def get_list(self, request: SpaceServeRequest) -> List[SpaceServeResponse]:
@@ -454,6 +562,8 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
             ]
             entity.questions = json.dumps(questions, ensure_ascii=False)
         self._chunk_dao.update_chunk(entity)
+        document = self._document_dao.get_one({"id": entity.document_id})
+        question_index_manager.invalidate(document.space if document else None)
 
     async def _batch_document_sync(
         self, space_id, sync_requests: List[KnowledgeSyncRequest]
@@ -473,10 +583,9 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
                     f"there are document called, doc_id: {sync_request.doc_id}"
                 )
             doc = docs[0]
-            if (
-                doc.status == SyncStatus.RUNNING.name
-                or doc.status == SyncStatus.FINISHED.name
-            ):
+            # A finished document can be synced again, only the chunks changed
+            # are embedded
+            if doc.status == SyncStatus.RUNNING.name:
                 raise Exception(
                     f" doc:{doc.doc_name} status is {doc.status}, can not sync"
                 )
@@ -505,6 +614,34 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
     ) -> None:
         """sync knowledge document chunk into vector store"""
         space = self.get({"id": space_id})
+        if self._sync_worker:
+            await self._enqueue_sync_job(space, doc, chunk_parameters)
+            return
+        (
+            storage_connector,
+            knowledge,
+            knowledge_content,
+        ) = await self._prepare_knowledge(space, doc)
+        doc.status = SyncStatus.RUNNING.name
+
+        doc.gmt_modified = datetime.now()
+        await blocking_func_to_async(
+            self.system_app, self._document_dao.update_knowledge_document, doc
+        )
+        asyncio.create_task(
+            self.async_doc_process(
+                knowledge,
+                chunk_parameters,
+                storage_connector,
+                doc,
+                space,
+                knowledge_content,
+            )
+        )
+        logger.info(f"begin save document chunks, doc:{doc.doc_name}")
+
+    async def _prepare_knowledge(self, space, doc: KnowledgeDocumentEntity):
+        """Return the storage connector, the knowledge and the knowledge content."""
         storage_connector = self.storage_manager.get_storage_connector(
             space.name, space.vector_type
         )
@@ -533,23 +670,201 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
                 datasource=knowledge_content,
                 knowledge_type=KnowledgeType.get_by_value(doc.doc_type),
             )
-        doc.status = SyncStatus.RUNNING.name
+        return storage_connector, knowledge, knowledge_content
 
+    async def _enqueue_sync_job(
+        self, space, doc: KnowledgeDocumentEntity, chunk_parameters: ChunkParameters
+    ):
+        """Persist a sync job of the document, it is run by the sync workers."""
+        doc.status = SyncStatus.RUNNING.name
+        doc.result = "waiting for sync"
         doc.gmt_modified = datetime.now()
         await blocking_func_to_async(
             self.system_app, self._document_dao.update_knowledge_document, doc
         )
-        asyncio.create_task(
-            self.async_doc_process(
+        job_id = await blocking_func_to_async(
+            self.system_app,
+            self._sync_job_dao.create_job,
+            doc.id,
+            space.id,
+            model_to_json(
+                chunk_parameters, exclude={"text_splitter"}, exclude_none=True
+            ),
+            self.config.sync_max_retries,
+        )
+        self._sync_worker.notify()
+        logger.info(f"Created sync job {job_id} of document {doc.doc_name}")
+
+    async def _run_sync_job(self, job: DocumentSyncJobEntity):
+        """Run a document sync job claimed by the sync workers.
+
+        The vectors loaded by a failed run are deleted, so the job can be retried.
+        A run which never finished is resumed from its checkpoint.
+        """
+        docs = await blocking_func_to_async(
+            self.system_app, self._document_dao.documents_by_ids, [job.document_id]
+        )
+        if not docs:
+            logger.warning(f"Document {job.document_id} of sync job {job.id} not found")
+            return
+        doc = docs[0]
+        space = self.get({"id": job.space_id})
+        if space is None:
+            raise Exception(f"space id:{job.space_id} not found")
+        chunk_parameters = ChunkParameters(**json.loads(job.chunk_parameters or "{}"))
+        loaded_ids = _LoadedVectorIds(
+            lambda ids, checkpoint: self._save_job_loaded_ids(
+                job, ",".join(ids), checkpoint
+            )
+        )
+        storage_connector = None
+        try:
+            (
+                storage_connector,
+                knowledge,
+                knowledge_content,
+            ) = await self._prepare_knowledge(space, doc)
+            if job.loaded_vector_ids:
+                await loaded_ids.resume(
+                    await self._delete_unfinished_run_vectors(
+                        storage_connector, job, doc
+                    )
+                )
+            doc.status = SyncStatus.RUNNING.name
+            doc.gmt_modified = datetime.now()
+            await self._persist_document(
                 knowledge,
                 chunk_parameters,
                 storage_connector,
                 doc,
                 space,
                 knowledge_content,
+                loaded_ids=loaded_ids,
             )
+        except asyncio.CancelledError:
+            # Canceled by the user or the worker is stopping, the document status
+            # is updated by the caller
+            await self._delete_loaded_vectors(storage_connector, loaded_ids.ids)
+            raise
+        except Exception as e:
+            await self._delete_loaded_vectors(storage_connector, loaded_ids.ids)
+            if job.retry_count < (job.max_retries or 0):
+                doc.result = (
+                    f"document embedding failed, retry {job.retry_count + 1}/"
+                    f"{job.max_retries}: {str(e)}"
+                )
+            else:
+                doc.status = SyncStatus.FAILED.name
+                doc.result = "document embedding failed" + str(e)
+            logger.error(f"document embedding, failed:{doc.doc_name}, {str(e)}")
+            await blocking_func_to_async(
+                self.system_app, self._document_dao.update_knowledge_document, doc
+            )
+            raise
+        await blocking_func_to_async(
+            self.system_app, self._document_dao.update_knowledge_document, doc
         )
-        logger.info(f"begin save document chunks, doc:{doc.doc_name}")
+
+    async def _delete_unfinished_run_vectors(
+        self, storage_connector, job: DocumentSyncJobEntity, doc
+    ) -> List[str]:
+        """Delete the vectors loaded by a run of the job which never finished.
+
+        The vectors up to the checkpoint are kept to resume the loading. The run may
+        have saved the document before it died, so the vectors of the document are
+        kept and nothing is resumed.
+
+        Returns:
+            List[str]: The ids of the vectors to resume from.
+        """
+        saved = await blocking_func_to_async(
+            self.system_app, self._chunk_dao.get_all_document_chunks, doc.id
+        )
+        kept = set((doc.vector_ids or "").split(","))
+        kept.update(entity.vector_id for entity in saved if entity.vector_id)
+        ids = [i for i in job.loaded_vector_ids.split(",") if i]
+        resume_ids = ids[: job.checkpoint or 0]
+        if any(i in kept for i in resume_ids):
+            resume_ids = []
+        resumed = set(resume_ids)
+        orphan_ids = [i for i in ids if i not in kept and i not in resumed]
+        if orphan_ids:
+            logger.info(
+                f"Delete {len(orphan_ids)} vectors loaded by the unfinished run of "
+                f"sync job {job.id}"
+            )
+            await blocking_func_to_async(
+                self.system_app, storage_connector.delete_by_ids, ",".join(orphan_ids)
+            )
+        return resume_ids
+
+    async def _save_job_loaded_ids(
+        self,
+        job: DocumentSyncJobEntity,
+        loaded_vector_ids: Optional[str],
+        checkpoint: int = 0,
+    ):
+        try:
+            await blocking_func_to_async(
+                self.system_app,
+                self._sync_job_dao.save_loaded_vector_ids,
+                job.id,
+                job.worker_id,
+                loaded_vector_ids,
+                checkpoint,
+            )
+        except Exception as e:
+            logger.warning(f"Save the loaded vectors of sync job {job.id} failed: {e}")
+
+    async def _delete_loaded_vectors(self, storage_connector, loaded_ids: List[str]):
+        if not storage_connector or not loaded_ids:
+            return
+        try:
+            await blocking_func_to_async(
+                self.system_app, storage_connector.delete_by_ids, ",".join(loaded_ids)
+            )
+        except Exception as e:
+            logger.warning(f"Delete the vectors of the failed sync failed: {e}")
+
+    def _space_sync_concurrency(self, space_id: int) -> int:
+        """Return the max number of the documents of a space synced at once.
+
+        It can be set by ``sync_concurrency`` of the embedding arguments of the space.
+        """
+        try:
+            space_context = self.get_space_context(space_id)
+            if space_context and space_context.get("embedding", {}).get(
+                "sync_concurrency"
+            ):
+                return int(space_context["embedding"]["sync_concurrency"])
+        except Exception as e:
+            logger.warning(f"Get sync concurrency of space {space_id} failed: {e}")
+        return self.config.sync_space_concurrency
+
+    async def cancel_document_sync(self, document_id: int) -> int:
+        """Cancel the sync jobs of the document.
+
+        Args:
+            document_id (int): The document id.
+
+        Returns:
+            int: The number of the jobs canceled.
+        """
+        if not self._sync_worker:
+            raise Exception("the document sync job queue is not enabled")
+        docs = self._document_dao.documents_by_ids([document_id])
+        if len(docs) == 0:
+            raise Exception(f"there are document called, doc_id: {document_id}")
+        count = await self._sync_worker.cancel(document_id)
+        if count:
+            doc = docs[0]
+            doc.status = SyncStatus.CANCELED.name
+            doc.result = "document sync canceled"
+            doc.gmt_modified = datetime.now()
+            await blocking_func_to_async(
+                self.system_app, self._document_dao.update_knowledge_document, doc
+            )
+        return count
 
     @trace("async_doc_process")
     async def async_doc_process(
@@ -571,66 +886,293 @@ class Service(BaseService[KnowledgeSpaceEntity, SpaceServeRequest, SpaceServeRes
 
         logger.info(f"async doc persist sync, doc:{doc.doc_name}")
         try:
-            with root_tracer.start_span(
-                "app.knowledge.assembler.persist",
-                metadata={"doc": doc.doc_name},
-            ):
-                from dbgpt.core.awel import BaseOperator
-
-                dags = self.dag_manager.get_dags_by_tag(
-                    TAG_KEY_KNOWLEDGE_FACTORY_DOMAIN_TYPE, space.domain_type
-                )
-                if dags and dags[0].leaf_nodes:
-                    end_task = cast(BaseOperator, dags[0].leaf_nodes[0])
-                    logger.info(
-                        f"Found dag by tag key: {TAG_KEY_KNOWLEDGE_FACTORY_DOMAIN_TYPE}"
-                        f" and value: {space.domain_type}, dag: {dags[0]}"
-                    )
-                    db_name, chunk_docs = await end_task.call(
-                        {"file_path": knowledge_content, "space": doc.space}
-                    )
-                    doc.chunk_size = len(chunk_docs)
-                    vector_ids = [chunk.chunk_id for chunk in chunk_docs]
-                else:
-                    max_chunks_once_load = self.config.max_chunks_once_load
-                    max_threads = self.config.max_threads
-                    assembler = await EmbeddingAssembler.aload_from_knowledge(
-                        knowledge=knowledge,
-                        index_store=storage_connector,
-                        chunk_parameters=chunk_parameters,
-                    )
-
-                    chunk_docs = assembler.get_chunks()
-                    doc.chunk_size = len(chunk_docs)
-                    vector_ids = await assembler.apersist(
-                        max_chunks_once_load=max_chunks_once_load,
-                        max_threads=max_threads,
-                    )
-            doc.status = SyncStatus.FINISHED.name
-            doc.result = "document persist into index store success"
-            if vector_ids is not None:
-                doc.vector_ids = ",".join(vector_ids)
-            logger.info(f"async document persist index store success:{doc.doc_name}")
-            # save chunk details
-            chunk_entities = [
-                DocumentChunkEntity(
-                    doc_name=doc.doc_name,
-                    doc_type=doc.doc_type,
-                    document_id=doc.id,
-                    content=chunk_doc.content,
-                    meta_info=str(chunk_doc.metadata),
-                    gmt_created=datetime.now(),
-                    gmt_modified=datetime.now(),
-                )
-                for chunk_doc in chunk_docs
-            ]
-            self._chunk_dao.create_documents_chunks(chunk_entities)
+            await self._persist_document(
+                knowledge,
+                chunk_parameters,
+                storage_connector,
+                doc,
+                space,
+                knowledge_content,
+            )
         except Exception as e:
             doc.status = SyncStatus.FAILED.name
             doc.result = "document embedding failed" + str(e)
             logger.error(f"document embedding, failed:{doc.doc_name}, {str(e)}")
         return self._document_dao.update_knowledge_document(doc)
 
+    async def _persist_document(
+        self,
+        knowledge,
+        chunk_parameters,
+        storage_connector,
+        doc,
+        space,
+        knowledge_content: str,
+        loaded_ids: Optional[_LoadedVectorIds] = None,
+    ):
+        """Persist the document into the storage, raise the error if failed.
+
+        The ids of the vectors loaded are added to ``loaded_ids`` as the loading
+        goes on, the chunks up to its checkpoint are not loaded again.
+        """
+        with root_tracer.start_span(
+            "app.knowledge.assembler.persist",
+            metadata={"doc": doc.doc_name},
+        ):
+            from dbgpt.core.awel import BaseOperator
+
+            dags = self.dag_manager.get_dags_by_tag(
+                TAG_KEY_KNOWLEDGE_FACTORY_DOMAIN_TYPE, space.domain_type
+            )
+            if dags and dags[0].leaf_nodes:
+                end_task = cast(BaseOperator, dags[0].leaf_nodes[0])
+                logger.info(
+                    f"Found dag by tag key: {TAG_KEY_KNOWLEDGE_FACTORY_DOMAIN_TYPE}"
+                    f" and value: {space.domain_type}, dag: {dags[0]}"
+                )
+                await self._drop_resumed_vectors(storage_connector, loaded_ids)
+                await self._clear_document_index(storage_connector, doc)
+                db_name, chunk_docs = await end_task.call(
+                    {"file_path": knowledge_content, "space": doc.space}
+                )
+                doc.chunk_size = len(chunk_docs)
+                vector_ids = [chunk.chunk_id for chunk in chunk_docs]
+                chunk_entities = self._build_chunk_entities(doc, chunk_docs)
+            elif self.config.streaming_ingestion:
+                # The chunk details are saved batch by batch, it can not be resumed
+                await self._drop_resumed_vectors(storage_connector, loaded_ids)
+                await self._clear_document_index(storage_connector, doc)
+                chunk_entities = None
+                doc.chunk_size, vector_ids = await self._stream_doc_process(
+                    knowledge, chunk_parameters, storage_connector, doc, loaded_ids
+                )
+            else:
+                assembler = await EmbeddingAssembler.aload_from_knowledge(
+                    knowledge=knowledge,
+                    index_store=storage_connector,
+                    chunk_parameters=chunk_parameters,
+                )
+                chunk_docs = assembler.get_chunks()
+                doc.chunk_size = len(chunk_docs)
+                vector_ids, chunk_entities = await self._incremental_persist(
+                    storage_connector, doc, chunk_docs, loaded_ids
+                )
+        doc.status = SyncStatus.FINISHED.name
+        doc.result = "document persist into index store success"
+        if vector_ids is not None:
+            doc.vector_ids = ",".join(vector_ids)
+        logger.info(f"async document persist index store success:{doc.doc_name}")
+        # save chunk details
+        if chunk_entities is not None:
+            await blocking_func_to_async(
+                self.system_app,
+                self._chunk_dao.replace_document_chunks,
+                doc.id,
+                chunk_entities,
+            )
+        # The chunks of the document are recreated
+        question_index_manager.invalidate(doc.space)
+
+    async def _incremental_persist(
+        self,
+        storage_connector,
+        doc: KnowledgeDocumentEntity,
+        chunk_docs: List[Chunk],
+        loaded_ids: Optional[_LoadedVectorIds] = None,
+    ) -> Tuple[List[str], List[DocumentChunkEntity]]:
+        """Load the chunks changed since the last sync of the document.
+
+        The chunks are diffed by the hash of their content and metadata against the
+        chunks saved by the last sync, only the new chunks are embedded and loaded,
+        and the vectors of the chunks gone are deleted after the new chunks are
+        loaded. The new chunks up to the checkpoint of ``loaded_ids`` are loaded by
+        the unfinished run and not loaded again.
+
+        Returns:
+            Tuple[List[str], List[DocumentChunkEntity]]: The vector ids of all the
+                chunks and the chunk details to save.
+        """
+        saved = await blocking_func_to_async(
+            self.system_app, self._chunk_dao.get_all_document_chunks, doc.id
+        )
+        diff = diff_chunks(saved, chunk_docs, doc.vector_ids)
+        logger.info(
+            f"Sync doc {doc.doc_name}: {len(diff.reused)} chunks unchanged, "
+            f"{len(diff.added)} chunks to load, {len(diff.removed_vector_ids)} "
+            "vectors to delete"
+        )
+        resumed: List[str] = loaded_ids.resumed if loaded_ids else []
+        if len(resumed) > len(diff.added):
+            # The chunks changed since the unfinished run
+            await self._drop_resumed_vectors(storage_connector, loaded_ids)
+            resumed = []
+        elif resumed:
+            logger.info(
+                f"Sync doc {doc.doc_name}: resume from the checkpoint {len(resumed)}"
+            )
+        new_ids: List[str] = list(resumed)
+        if len(diff.added) > len(resumed):
+            new_ids += await storage_connector.aload_document_with_limit(
+                diff.added[len(resumed) :],
+                max_chunks_once_load=self.config.max_chunks_once_load,
+                max_threads=self.config.max_threads,
+                max_retries=self.config.load_max_retries,
+                progress_callback=self._load_progress_callback(doc, loaded_ids),
+            )
+        if diff.added:
+            # The ids can not be matched to the chunks if the index store does
+            # not return an id for each chunk, these chunks are not reused later
+            matched = len(new_ids) == len(diff.added)
+            for i, chunk in enumerate(diff.added):
+                chunk.chunk_id = new_ids[i] if matched else ""
+        if diff.removed_vector_ids:
+            await blocking_func_to_async(
+                self.system_app,
+                storage_connector.delete_by_ids,
+                ",".join(diff.removed_vector_ids),
+            )
+        entities = self._build_chunk_entities(doc, chunk_docs)
+        for entity in entities:
+            reused = diff.reused_entities.get(entity.vector_id)
+            if reused is not None:
+                # Keep the questions edited by the user
+                entity.questions = reused.questions
+        vector_ids = [chunk.chunk_id for chunk in diff.reused] + new_ids
+        return vector_ids, entities
+
+    async def _drop_resumed_vectors(
+        self, storage_connector, loaded_ids: Optional[_LoadedVectorIds]
+    ):
+        """Delete the vectors to resume from, the loading starts over."""
+        if loaded_ids and loaded_ids.resumed:
+            await blocking_func_to_async(
+                self.system_app,
+                storage_connector.delete_by_ids,
+                ",".join(loaded_ids.resumed),
+            )
+            await loaded_ids.resume([])
+
+    async def _clear_document_index(self, storage_connector, doc):
+        """Delete the vectors and the chunk details of the last sync.
+
+        The chunk details are saved batch by batch by the streaming ingestion, so
+        the vectors of the chunks saved by a run which never finished are deleted
+        too.
+        """
+        vector_ids = [i for i in (doc.vector_ids or "").split(",") if i]
+        saved = await blocking_func_to_async(
+            self.system_app, self._chunk_dao.get_all_document_chunks, doc.id
+        )
+        seen = set(vector_ids)
+        for entity in saved:
+            if entity.vector_id and entity.vector_id not in seen:
+                seen.add(entity.vector_id)
+                vector_ids.append(entity.vector_id)
+        if vector_ids:
+            await blocking_func_to_async(
+                self.system_app, storage_connector.delete_by_ids, ",".join(vector_ids)
+            )
+        doc.vector_ids = None
+        await blocking_func_to_async(
+            self.system_app, self._chunk_dao.raw_delete, doc.id
+        )
+
+    def _load_progress_callback(
+        self,
+        doc: KnowledgeDocumentEntity,
+        loaded_ids: Optional[_LoadedVectorIds] = None,
+        min_interval: float = 2.0,
+    ):
+        """Return the callback to save the loading progress to the document.
+
+        The progress is saved at most once every ``min_interval`` seconds, the
+        ``checkpoint`` is the number of the leading chunks which are all loaded.
+        """
+        last_saved = 0.0
+
+        async def _callback(progress: LoadProgress):
+            nonlocal last_saved
+            resumed = 0
+            if loaded_ids is not None:
+                await loaded_ids.add_group(progress)
+                resumed = len(loaded_ids.resumed)
+            now = time.time()
+            if progress.finished or now - last_saved < min_interval:
+                return
+            last_saved = now
+            doc.result = (
+                f"loaded {resumed + progress.loaded_chunks}/"
+                f"{resumed + progress.total_chunks} chunks, "
+                f"checkpoint {resumed + progress.checkpoint}"
+            )
+            doc.gmt_modified = datetime.now()
+            try:
+                await blocking_func_to_async(
+                    self.system_app, self._document_dao.update_knowledge_document, doc
+                )
+            except Exception as e:
+                logger.warning(f"Save loading progress of {doc.doc_name} failed: {e}")
+
+        return _callback
+
+    async def _stream_doc_process(
+        self,
+        knowledge,
+        chunk_parameters: ChunkParameters,
+        storage_connector,
+        doc: KnowledgeDocumentEntity,
+        loaded_ids: Optional[_LoadedVectorIds] = None,
+    ) -> Tuple[int, List[str]]:
+        """Persist the document with the streaming ingestion pipeline.
+
+        Returns:
+            Tuple[int, List[str]]: The number of chunks and the vector ids.
+        """
+        pipeline = StreamingIngestionPipeline(
+            knowledge=knowledge,
+            index_store=storage_connector,
+            chunk_parameters=chunk_parameters,
+            max_chunks_once_load=self.config.max_chunks_once_load,
+            max_threads=self.config.max_threads,
+            max_inflight_chunks=self.config.max_inflight_chunks,
+        )
+
+        async def _save_chunks(chunks: List[Chunk], ids: List[str]):
+            if loaded_ids is not None:
+                await loaded_ids.extend(ids)
+            if len(ids) == len(chunks):
+                for chunk, vector_id in zip(chunks, ids):
+                    chunk.chunk_id = vector_id
+            await blocking_func_to_async(
+                self.system_app,
+                self._chunk_dao.create_documents_chunks,
+                self._build_chunk_entities(doc, chunks),
+            )
+
+        result = await pipeline.arun(on_chunks=_save_chunks)
+        logger.info(
+            f"Streaming ingestion of doc {doc.doc_name} finished: {result.to_dict()}"
+        )
+        return result.chunk_count, result.vector_ids
+
+    def _build_chunk_entities(
+        self, doc: KnowledgeDocumentEntity, chunks: List[Chunk]
+    ) -> List[DocumentChunkEntity]:
+        return [
+            DocumentChunkEntity(
+                doc_name=doc.doc_name,
+                doc_type=doc.doc_type,
+                document_id=doc.id,
+                content=chunk_doc.content,
+                meta_info=str(chunk_doc.metadata),
+                content_hash=chunk_content_hash(chunk_doc.content, chunk_doc.metadata),
+                vector_id=chunk_doc.chunk_id or None,
+                gmt_created=datetime.now(),
+                gmt_modified=datetime.now(),
+            )
+            for chunk_doc in chunks
+        ]
+
     def get_space_context(self, space_id):
         """get space contect
         Args:
@@ -0,0 +1,265 @@
+"""The workers to run the document sync jobs in the background.
+
+The sync jobs are persisted in the ``document_sync_job`` table, the workers claim
+the jobs and run them concurrently, so the jobs survive the restart of the webserver
+and a batch of documents is synced in parallel.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from dbgpt.component import SystemApp
+from dbgpt_serve.core import blocking_func_to_async
+
+from ..models.sync_job_db import DocumentSyncJobDao, DocumentSyncJobEntity
+
+logger = logging.getLogger(__name__)
+
+# Run a claimed job, raise an exception to fail the job
+JobProcessFunc = Callable[[DocumentSyncJobEntity], Awaitable[None]]
+# Return the max number of the running jobs of a space
+SpaceConcurrencyFunc = Callable[[int], int]
+
+
+class DocumentSyncWorker:
+    """Claim the document sync jobs and run them with bounded concurrency.
+
+    At most ``max_workers`` jobs run in this process, and at most the concurrency of
+    a space jobs of the space run in all the processes sharing the job table.
+
+    The running jobs are refreshed by heartbeats, the running jobs without heartbeat
+    for ``lease_timeout`` seconds(e.g. the webserver restarted) are put back into the
+    queue and run again. A failed job is retried with exponential backoff until it
+    reaches its max retries.
+    """
+
+    def __init__(
+        self,
+        system_app: SystemApp,
+        job_dao: DocumentSyncJobDao,
+        process_func: JobProcessFunc,
+        max_workers: int = 4,
+        space_concurrency: Optional[SpaceConcurrencyFunc] = None,
+        poll_interval: float = 2.0,
+        heartbeat_interval: float = 10.0,
+        lease_timeout: float = 60.0,
+        retry_backoff: float = 5.0,
+        worker_id: Optional[str] = None,
+    ):
+        """Create a new DocumentSyncWorker.
+
+        Args:
+            system_app (SystemApp): The system app.
+            job_dao (DocumentSyncJobDao): The dao of the jobs.
+            process_func (JobProcessFunc): Run a claimed job, the job fails if it
+                raises an exception.
+            max_workers (int): The max number of the jobs running in this process.
+            space_concurrency (Optional[SpaceConcurrencyFunc]): Return the max number
+                of the running jobs of a space, no limit if not provided.
+            poll_interval (float): The seconds to wait before checking the job table
+                again when there is no runnable job.
+            heartbeat_interval (float): The seconds between the heartbeats.
+            lease_timeout (float): The seconds without heartbeat after which a
+                running job is considered abandoned.
+            retry_backoff (float): The seconds to wait before the first retry,
+                doubled for each retry.
+            worker_id (Optional[str]): The unique id of this worker.
+        """
+        self._system_app = system_app
+        self._job_dao = job_dao
+        self._process_func = process_func
+        self._max_workers = max(1, max_workers)
+        self._space_concurrency = space_concurrency
+        self._poll_interval = poll_interval
+        self._heartbeat_interval = heartbeat_interval
+        self._lease_timeout = lease_timeout
+        self._retry_backoff = retry_backoff
+        self._worker_id = (
+            worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
+        self._running: Dict[int, asyncio.Future] = {}
+        self._running_jobs: Dict[int, DocumentSyncJobEntity] = {}
+        self._canceled: Set[int] = set()
+        self._claim_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._stopped = True
+
+    @property
+    def worker_id(self) -> str:
+        """Return the id of this worker."""
+        return self._worker_id
+
+    def running_job_ids(self) -> List[int]:
+        """Return the ids of the jobs running in this process."""
+        return list(self._running.keys())
+
+    async def start(self):
+        """Start the workers and the heartbeat."""
+        if not self._stopped:
+            return
+        self._stopped = False
+        self._tasks = [
+            asyncio.create_task(self._worker_loop()) for _ in range(self._max_workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._heartbeat_loop()))
+        logger.info(
+            f"Document sync worker {self._worker_id} started with "
+            f"{self._max_workers} workers"
+        )
+
+    async def stop(self):
+        """Stop the workers, the running jobs are put back into the queue."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Notify the workers that new jobs are created."""
+        self._wakeup.set()
+
+    async def cancel(self, document_id: int) -> int:
+        """Cancel the jobs of the document.
+
+        The job running in this process is canceled immediately, the job running in
+        other processes is canceled on their next heartbeat.
+
+        Returns:
+            int: The number of the jobs canceled.
+        """
+        count = await blocking_func_to_async(
+            self._system_app, self._job_dao.cancel_jobs, document_id
+        )
+        for job_id, job in list(self._running_jobs.items()):
+            if job.document_id == document_id:
+                self._cancel_local(job_id)
+        return count
+
+    def _cancel_local(self, job_id: int):
+        future = self._running.get(job_id)
+        if future and not future.done():
+            self._canceled.add(job_id)
+            future.cancel()
+
+    async def _worker_loop(self):
+        while not self._stopped:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.warning(f"Claim document sync job failed: {e}")
+                job = None
+            if job is None:
+                await self._wait()
+                continue
+            await self._run_job(job)
+
+    async def _wait(self):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _claim(self) -> Optional[DocumentSyncJobEntity]:
+        # Claim one by one in this process, so the space concurrency is respected
+        async with self._claim_lock:
+            exclude_space_ids = []
+            if self._space_concurrency:
+                counts = await blocking_func_to_async(
+                    self._system_app, self._job_dao.running_job_counts
+                )
+                exclude_space_ids = [
+                    space_id
+                    for space_id, count in counts.items()
+                    if count >= self._space_concurrency(space_id)
+                ]
+            return await blocking_func_to_async(
+                self._system_app,
+                self._job_dao.claim_next_job,
+                self._worker_id,
+                exclude_space_ids,
+            )
+
+    async def _run_job(self, job: DocumentSyncJobEntity):
+        logger.info(
+            f"Run document sync job {job.id} of document {job.document_id}, "
+            f"retry {job.retry_count}/{job.max_retries}"
+        )
+        future = asyncio.ensure_future(self._process_func(job))
+        self._running[job.id] = future
+        self._running_jobs[job.id] = job
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if job.id in self._canceled:
+                logger.info(f"Document sync job {job.id} is canceled")
+            else:
+                # The worker is stopping, run the job again later
+                future.cancel()
+                await asyncio.gather(future, return_exceptions=True)
+                await blocking_func_to_async(
+                    self._system_app,
+                    self._job_dao.release_job,
+                    job.id,
+                    self._worker_id,
+                )
+                raise
+        except Exception as e:
+            delay = self._retry_backoff * (2 ** (job.retry_count or 0))
+            retried = await blocking_func_to_async(
+                self._system_app,
+                self._job_dao.fail_job,
+                job.id,
+                self._worker_id,
+                str(e),
+                delay,
+            )
+            logger.warning(
+                f"Document sync job {job.id} failed, "
+                f"{'retry after ' + str(delay) + ' seconds' if retried else 'give up'}"
+                f": {e}"
+            )
+        else:
+            await blocking_func_to_async(
+                self._system_app, self._job_dao.finish_job, job.id, self._worker_id
+            )
+        finally:
+            self._running.pop(job.id, None)
+            self._running_jobs.pop(job.id, None)
+            self._canceled.discard(job.id)
+
+    async def _heartbeat_loop(self):
+        while not self._stopped:
+            try:
+                await self._heartbeat()
+            except Exception as e:
+                logger.warning(f"Document sync worker heartbeat failed: {e}")
+            await asyncio.sleep(self._heartbeat_interval)
+
+    async def _heartbeat(self):
+        lost = await blocking_func_to_async(
+            self._system_app,
+            self._job_dao.heartbeat,
+            self.running_job_ids(),
+            self._worker_id,
+        )
+        for job_id in lost:
+            # Canceled or taken over by another worker
+            self._cancel_local(job_id)
+        stale_before = datetime.now() - timedelta(seconds=self._lease_timeout)
+        requeued = await blocking_func_to_async(
+            self._system_app, self._job_dao.requeue_stale_jobs, stale_before
+        )
+        if requeued:
+            logger.info(f"Requeued {requeued} abandoned document sync jobs")
+            self.notify()
@@ -1,16 +1,24 @@
 """RAG STORAGE MANAGER manager."""
 
+import os
 import threading
 from typing import List, Optional, Type
 
 from dbgpt import BaseComponent
 from dbgpt.component import ComponentType, SystemApp
+from dbgpt.configs.model_config import PILOT_PATH, resolve_root_path
 from dbgpt.model import DefaultLLMClient
 from dbgpt.model.cluster import WorkerManagerFactory
 from dbgpt.rag.embedding import EmbeddingFactory
 from dbgpt.storage.base import IndexStoreBase
 from dbgpt.storage.full_text.base import FullTextStoreBase
+from dbgpt.storage.full_text.bm25_index import (
+    BM25Index,
+    BM25IndexedVectorStore,
+    get_tokenizer,
+)
 from dbgpt.storage.vector_store.base import VectorStoreBase, VectorStoreConfig
+from dbgpt.util.path_utils import safe_dir_name
 from dbgpt_ext.storage.full_text.elasticsearch import ElasticDocumentStore
 from dbgpt_ext.storage.knowledge_graph.knowledge_graph import BuiltinKnowledgeGraph
 
@@ -79,9 +87,36 @@ class StorageManager(BaseComponent):
                 max_chunks_once_load=vector_store_config.max_chunks_once_load,
                 max_threads=vector_store_config.max_threads,
             )
+            if vector_store_config.enable_bm25_index:
+                new_store = self._with_bm25_index(
+                    new_store, index_name, vector_store_config, app_config.rag
+                )
             self._store_cache[index_name] = new_store
             return new_store
 
+    def _with_bm25_index(
+        self,
+        store: VectorStoreBase,
+        index_name: str,
+        vector_store_config: VectorStoreConfig,
+        rag_config,
+    ) -> VectorStoreBase:
+        """Keep a local BM25 index of the chunks beside the vector store."""
+        if store.is_support_full_text_search():
+            return store
+        persist_path = getattr(vector_store_config, "persist_path", None) or (
+            os.path.join(PILOT_PATH, "data")
+        )
+        index = BM25Index(
+            persist_dir=os.path.join(
+                resolve_root_path(persist_path), "bm25_index", safe_dir_name(index_name)
+            ),
+            tokenizer=get_tokenizer(vector_store_config.bm25_tokenizer),
+            k1=rag_config.bm25_k1 or 1.2,
+            b=rag_config.bm25_b if rag_config.bm25_b is not None else 0.75,
+        )
+        return BM25IndexedVectorStore(store, index)
+
     def create_kg_store(
         self, index_name, llm_model: Optional[str] = None
     ) -> BuiltinKnowledgeGraph:
@@ -0,0 +1,217 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from dbgpt.component import SystemApp
+from dbgpt.core import Chunk
+from dbgpt.storage.metadata import db
+from dbgpt.util.executor_utils import DefaultExecutorFactory
+
+from ..config import ServeConfig
+from ..models.chunk_db import DocumentChunkDao, DocumentChunkEntity
+from ..models.document_db import KnowledgeDocumentDao, KnowledgeDocumentEntity
+from ..models.sync_job_db import DocumentSyncJobDao
+from ..service import service as service_module
+from ..service.chunk_diff import chunk_content_hash, diff_chunks
+from ..service.service import Service
+
+
+@pytest.fixture(autouse=True)
+def setup_and_teardown(tmp_path):
+    # The chunks are accessed from the executor threads, so not an in-memory database
+    db.init_db(f"sqlite:///{tmp_path}/chunk.db")
+    db.create_all()
+
+    yield
+
+
+class _Crash(BaseException):
+    """The webserver dies, no cleanup runs."""
+
+
+class _FakeIndexStore:
+    def __init__(self, crash_after_groups: int = -1):
+        self.vectors = {}
+        self.loaded: List[str] = []
+        self.crash_after_groups = crash_after_groups
+
+    async def aload_document_with_limit(
+        self, chunks: List[Chunk], progress_callback=None, **kwargs
+    ):
+        ids = []
+        for idx in range(0, len(chunks), 2):
+            if idx // 2 == self.crash_after_groups:
+                raise _Crash()
+            group = chunks[idx : idx + 2]
+            for chunk in group:
+                self.vectors[chunk.chunk_id] = chunk.content
+                self.loaded.append(chunk.content)
+            ids.extend(chunk.chunk_id for chunk in group)
+            if progress_callback:
+                await progress_callback(
+                    SimpleNamespace(
+                        group_index=idx // 2,
+                        group_ids=[chunk.chunk_id for chunk in group],
+                        finished=idx + 2 >= len(chunks),
+                        loaded_chunks=len(ids),
+                        total_chunks=len(chunks),
+                        checkpoint=len(ids),
+                    )
+                )
+        return ids
+
+    def delete_by_ids(self, ids: str):
+        for vector_id in ids.split(","):
+            del self.vectors[vector_id]
+
+
+@pytest.fixture
+def service():
+    system_app = SystemApp()
+    system_app.register(DefaultExecutorFactory)
+    service = Service(system_app, ServeConfig(), chunk_dao=DocumentChunkDao())
+    return service
+
+
+def _doc():
+    return SimpleNamespace(id=1, doc_name="doc", doc_type="TEXT", vector_ids=None)
+
+
+def _chunks(*contents: str, **metadata) -> List[Chunk]:
+    metadata = {"source": "doc", **metadata}
+    return [Chunk(content=content, metadata=dict(metadata)) for content in contents]
+
+
+def test_diff_chunks():
+    saved = [
+        DocumentChunkEntity(
+            content="a",
+            content_hash=chunk_content_hash("a", {"source": "doc"}),
+            vector_id="1",
+        ),
+        # Saved without the hash
+        DocumentChunkEntity(content="b", meta_info="{'source': 'doc'}", vector_id="2"),
+        DocumentChunkEntity(content="b", meta_info="{'source': 'doc'}", vector_id="3"),
+        # Saved without the vector id
+        DocumentChunkEntity(content="c", meta_info="{'source': 'doc'}"),
+        # The metadata changed
+        DocumentChunkEntity(
+            content="e",
+            content_hash=chunk_content_hash("e", {"source": "old"}),
+            vector_id="5",
+        ),
+    ]
+    diff = diff_chunks(saved, _chunks("b", "c", "a", "d", "e"), "1,2,3,4")
+    assert [chunk.chunk_id for chunk in diff.reused] == ["2", "1"]
+    assert [chunk.content for chunk in diff.added] == ["c", "d", "e"]
+    assert diff.removed_vector_ids == ["3", "4", "5"]
+
+
+@pytest.mark.asyncio
+async def test_incremental_persist(service):
+    store = _FakeIndexStore()
+    doc = _doc()
+
+    async def _sync(*contents: str, **metadata):
+        vector_ids, entities = await service._incremental_persist(
+            store, doc, _chunks(*contents, **metadata)
+        )
+        doc.vector_ids = ",".join(vector_ids)
+        service._chunk_dao.replace_document_chunks(doc.id, entities)
+        return vector_ids
+
+    first_ids = await _sync("p1", "p2", "p3")
+    assert store.loaded == ["p1", "p2", "p3"]
+    chunk = service._chunk_dao.get_all_document_chunks(doc.id)[1]
+    chunk.questions = '["what is p2"]'
+    service._chunk_dao.update_chunk(chunk)
+
+    # Only the changed paragraph is embedded
+    store.loaded.clear()
+    second_ids = await _sync("p1", "p2", "p3 edited")
+    assert store.loaded == ["p3 edited"]
+    assert second_ids[:2] == first_ids[:2]
+    assert set(store.vectors) == set(second_ids)
+    chunks = service._chunk_dao.get_all_document_chunks(doc.id)
+    assert [c.content for c in chunks] == ["p1", "p2", "p3 edited"]
+    assert [c.vector_id for c in chunks] == second_ids
+    assert chunks[1].questions == '["what is p2"]'
+
+    store.loaded.clear()
+    await _sync("p2", "p3 edited")
+    assert store.loaded == []
+    assert sorted(store.vectors.values()) == ["p2", "p3 edited"]
+
+    # The vectors are loaded again with the new metadata
+    store.loaded.clear()
+    third_ids = await _sync("p2", "p3 edited", title="new title")
+    assert store.loaded == ["p2", "p3 edited"]
+    assert set(store.vectors) == set(third_ids)
+    assert sorted(store.vectors.values()) == ["p2", "p3 edited"]
+
+
+@pytest.mark.asyncio
+async def test_requeued_job_resumes_from_checkpoint(service, monkeypatch):
+    document_dao = KnowledgeDocumentDao()
+    job_dao = DocumentSyncJobDao()
+    service._document_dao = document_dao
+    service._sync_job_dao = job_dao
+    service._dag_manager = Mock(get_dags_by_tag=Mock(return_value=[]))
+    service.get = Mock(return_value=SimpleNamespace(id=1, domain_type=None))
+    doc_id = document_dao.create_knowledge_document(
+        KnowledgeDocumentEntity(doc_name="doc", doc_type="TEXT", space="space")
+    )
+    contents = [f"p{i}" for i in range(6)]
+    monkeypatch.setattr(
+        service_module.EmbeddingAssembler,
+        "aload_from_knowledge",
+        AsyncMock(
+            side_effect=lambda **kwargs: Mock(get_chunks=lambda: _chunks(*contents))
+        ),
+    )
+    store = _FakeIndexStore(crash_after_groups=2)
+    service._prepare_knowledge = AsyncMock(return_value=(store, None, "text"))
+
+    job_id = job_dao.create_job(doc_id, 1, "{}")
+    with pytest.raises(_Crash):
+        await service._run_sync_job(job_dao.claim_next_job("worker1"))
+    assert len(store.vectors) == 4
+    job = job_dao.get_job(job_id)
+    assert job.checkpoint == 4
+    # A group after the checkpoint is loaded too
+    store.vectors["orphan"] = "p5"
+    job_dao.save_loaded_vector_ids(
+        job_id, "worker1", job.loaded_vector_ids + ",orphan", 4
+    )
+
+    # The webserver restarted, the job is run again by another worker
+    assert job_dao.requeue_stale_jobs(datetime.now() + timedelta(seconds=1)) == 1
+    store.crash_after_groups = -1
+    store.loaded.clear()
+    await service._run_sync_job(job_dao.claim_next_job("worker2"))
+    doc = document_dao.documents_by_ids([doc_id])[0]
+    assert store.loaded == ["p4", "p5"]
+    assert sorted(store.vectors.values()) == contents
+    assert set(store.vectors) == set(doc.vector_ids.split(","))
+    assert len(service._chunk_dao.get_all_document_chunks(doc_id)) == len(contents)
+    assert job_dao.finish_job(job_id, "worker2")
+    assert job_dao.get_job(job_id).loaded_vector_ids is None
+    assert job_dao.get_job(job_id).checkpoint == 0
+
+
+@pytest.mark.asyncio
+async def test_clear_document_index_deletes_saved_chunk_vectors(service):
+    store = _FakeIndexStore()
+    doc = _doc()
+    chunks = _chunks("p1", "p2")
+    await store.aload_document_with_limit(chunks)
+    # Saved batch by batch by a streaming run which never finished
+    service._chunk_dao.create_documents_chunks(
+        service._build_chunk_entities(doc, chunks)
+    )
+    await service._clear_document_index(store, doc)
+    assert store.vectors == {}
+    assert service._chunk_dao.get_all_document_chunks(doc.id) == []
@@ -0,0 +1,124 @@
+from typing import List, Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from dbgpt.core import Chunk
+from dbgpt.rag.retriever.base import RetrieverStrategy
+from dbgpt.storage.base import IndexStoreBase
+from dbgpt.storage.vector_store.base import IndexStoreConfig
+from dbgpt.storage.vector_store.filters import MetadataFilters
+from dbgpt.util.executor_utils import DefaultExecutorFactory, ExecutorFactory
+
+from ..api.schemas import SpaceServeResponse
+from ..retriever.knowledge_space import KnowledgeSpaceRetriever
+from ..retriever.space_cache import SpaceResources, space_resources_cache
+
+
+class _MockStore(IndexStoreBase):
+    """Return the fixed results of the vector search and the full text search."""
+
+    def __init__(self, vector_results: List[Chunk], full_text_results: List[Chunk]):
+        super().__init__()
+        self._vector_results = vector_results
+        self._full_text_results = full_text_results
+
+    def get_config(self) -> IndexStoreConfig:
+        return IndexStoreConfig()
+
+    def load_document(self, chunks: List[Chunk]) -> List[str]:
+        return []
+
+    async def aload_document(self, chunks: List[Chunk]) -> List[str]:
+        return []
+
+    def similar_search_with_scores(
+        self,
+        text,
+        topk,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        return self._vector_results[:topk]
+
+    def full_text_search(
+        self, text: str, topk: int, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        return self._full_text_results[:topk]
+
+    def is_support_full_text_search(self) -> bool:
+        return True
+
+    def delete_by_ids(self, ids: str) -> List[str]:
+        return []
+
+    def truncate(self) -> List[str]:
+        return []
+
+    def delete_vector_name(self, index_name: str):
+        pass
+
+    def vector_name_exists(self) -> bool:
+        return True
+
+
+async def _no_qa_hit(self, query, score_threshold, filters=None):
+    return []
+
+
+@pytest.fixture
+def system_app():
+    executor_factory = DefaultExecutorFactory()
+    system_app = MagicMock()
+
+    def _get_component(name, component_type, *args, **kwargs):
+        if component_type is ExecutorFactory:
+            return executor_factory
+        return MagicMock()
+
+    system_app.get_component.side_effect = _get_component
+    yield system_app
+    space_resources_cache.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_hybrid_retrieve(system_app, monkeypatch):
+    store = _MockStore(
+        [Chunk(content=f"vector {i}", score=1.0 - i * 0.1) for i in range(4)],
+        [
+            Chunk(content="vector 3", score=10.0),
+            Chunk(content="keyword", score=8.0),
+            Chunk(content="vector 2", score=5.0),
+        ],
+    )
+
+    def _load_space_resources(self):
+        return SpaceResources(
+            space=SpaceServeResponse(id=1, name="space1", vector_type="Chroma"),
+            storage_connector=store,
+        )
+
+    async def _tree_index_retrieve(self, query, top_k, filters=None):
+        return [Chunk(content="tree", score=1.0)]
+
+    monkeypatch.setattr(
+        KnowledgeSpaceRetriever, "_load_space_resources", _load_space_resources
+    )
+    monkeypatch.setattr(
+        KnowledgeSpaceRetriever, "tree_index_retrieve", _tree_index_retrieve
+    )
+    # No question of the space matches
+    monkeypatch.setattr(
+        "dbgpt_serve.rag.retriever.qa_retriever.QARetriever._aretrieve_with_score",
+        _no_qa_hit,
+    )
+    retriever = KnowledgeSpaceRetriever(
+        space_id="1",
+        top_k=3,
+        retrieve_mode=RetrieverStrategy.HYBRID.value,
+        system_app=system_app,
+    )
+    chunks = await retriever.aretrieve_with_scores("query", 0.0)
+    # The chunks found by both the vector and the keyword search are ranked first,
+    # fused with the tree results, at most top k chunks
+    assert {c.content for c in chunks} == {"vector 3", "vector 2", "tree"}
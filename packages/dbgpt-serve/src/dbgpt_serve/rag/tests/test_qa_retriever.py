@@ -0,0 +1,162 @@
+import json
+from typing import List
+
+import pytest
+
+from dbgpt.component import SystemApp
+from dbgpt.core import Embeddings
+from dbgpt.storage.metadata import db
+from dbgpt.util.executor_utils import DefaultExecutorFactory
+
+from ..models.chunk_db import DocumentChunkEntity
+from ..models.document_db import KnowledgeDocumentEntity
+from ..models.models import KnowledgeSpaceEntity
+from ..retriever import qa_retriever
+from ..retriever.qa_retriever import QARetriever
+from ..retriever.question_index import (
+    QuestionIndex,
+    QuestionIndexManager,
+    normalize_question,
+    question_index_manager,
+)
+
+
+class _CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.query_calls = 0
+        self.document_calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.document_calls += 1
+        return [[1.0, float(len(text))] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.query_calls += 1
+        return [1.0, 100.0]
+
+
+@pytest.fixture(autouse=True)
+def setup_and_teardown():
+    db.init_db("sqlite:///:memory:")
+    db.create_all()
+    question_index_manager.invalidate()
+
+    yield
+
+
+@pytest.fixture
+def system_app():
+    system_app = SystemApp()
+    system_app.register(DefaultExecutorFactory)
+    return system_app
+
+
+def _create_space():
+    with db.session() as session:
+        session.add(KnowledgeSpaceEntity(id=1, name="space1", vector_type="Chroma"))
+        session.add(
+            KnowledgeDocumentEntity(
+                id=1,
+                doc_name="doc1",
+                space="space1",
+                questions=json.dumps(["How to deploy DB-GPT"]),
+            )
+        )
+        session.add(KnowledgeDocumentEntity(id=2, doc_name="doc2", space="space1"))
+        for i in range(6):
+            session.add(
+                DocumentChunkEntity(
+                    document_id=1,
+                    doc_name="doc1",
+                    content="x" * (i + 1),
+                    meta_info="{}",
+                )
+            )
+        session.add(
+            DocumentChunkEntity(
+                id=100,
+                document_id=2,
+                doc_name="doc2",
+                content="The answer",
+                meta_info="{}",
+                questions=json.dumps(["What is DB-GPT"]),
+            )
+        )
+
+
+def test_normalize_question():
+    assert normalize_question("What is  DB-GPT?") == "what is db-gpt"
+    assert normalize_question(" what is db-gpt。") == "what is db-gpt"
+
+
+def test_index_manager_invalidate():
+    manager = QuestionIndexManager()
+    loads = []
+
+    def _loader():
+        loads.append(1)
+        return QuestionIndex()
+
+    index = manager.get_index("space1", _loader)
+    assert manager.get_index("space1", _loader) is index
+    manager.invalidate("space2")
+    assert manager.get_index("space1", _loader) is index
+    manager.invalidate("space1")
+    assert manager.get_index("space1", _loader) is not index
+    assert len(loads) == 2
+
+
+def test_chunk_question_hit(system_app):
+    _create_space()
+    retriever = QARetriever(
+        space_id="1", top_k=2, embedding_fn=_CountingEmbeddings(), system_app=system_app
+    )
+    chunks = retriever.retrieve_with_scores("what is db-gpt?", 0.0)
+    assert [c.chunk_id for c in chunks] == ["100"]
+    assert chunks[0].content == "The answer"
+    assert retriever.retrieve_with_scores("Who is DB-GPT", 0.0) == []
+
+
+def test_document_question_hit_rerank_in_batch(system_app):
+    _create_space()
+    embeddings = _CountingEmbeddings()
+    retriever = QARetriever(
+        space_id="space1", top_k=2, embedding_fn=embeddings, system_app=system_app
+    )
+    chunks = retriever.retrieve_with_scores("How to deploy DB-GPT", 0.0)
+    # The longest chunks are the closest to the query embedding
+    assert [c.content for c in chunks] == ["x" * 6, "x" * 5]
+    assert embeddings.query_calls == 1
+    assert embeddings.document_calls == 1
+
+
+def test_document_question_hit_limit_per_document(system_app, monkeypatch):
+    _create_space()
+    with db.session() as session:
+        session.add(
+            KnowledgeDocumentEntity(
+                id=3,
+                doc_name="doc3",
+                space="space1",
+                questions=json.dumps(["How to deploy DB-GPT"]),
+            )
+        )
+        for i in range(2):
+            session.add(
+                DocumentChunkEntity(
+                    document_id=3,
+                    doc_name="doc3",
+                    content="y" * (i + 1),
+                    meta_info="{}",
+                )
+            )
+    # Fewer chunks than the chunks of doc1 are loaded for each document
+    monkeypatch.setattr(qa_retriever, "CHUNK_PAGE_SIZE", 4)
+    retriever = QARetriever(
+        space_id="space1",
+        top_k=2,
+        embedding_fn=_CountingEmbeddings(),
+        system_app=system_app,
+    )
+    chunks = retriever.retrieve_with_scores("How to deploy DB-GPT", 0.0)
+    assert [c.content for c in chunks] == ["x" * 4, "x" * 3, "y", "y" * 2]
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+from typing import List, Optional
+
+import pytest
+
+from dbgpt.core import Chunk
+from dbgpt.rag.retriever.base import BaseRetriever
+from dbgpt.storage.vector_store.filters import MetadataFilters
+
+from ..retriever.retriever_chain import RetrieverChain
+
+
+class _MockRetriever(BaseRetriever):
+    def __init__(
+        self,
+        contents: List[str],
+        delay: float = 0.0,
+        error=None,
+        wait_for: Optional["_MockRetriever"] = None,
+        barrier: Optional[threading.Barrier] = None,
+    ):
+        self._contents = contents
+        self._delay = delay
+        self._error = error
+        # Only return after the other retriever has started, or after all the
+        # retrievers of the barrier have started on the sync path
+        self._wait_for = wait_for
+        self._barrier = barrier
+        self.started = asyncio.Event()
+        self.canceled = False
+
+    def _result(self) -> List[Chunk]:
+        if self._error:
+            raise self._error
+        return [
+            Chunk(content=content, score=1.0 - i * 0.1)
+            for i, content in enumerate(self._contents)
+        ]
+
+    def _retrieve(
+        self, query: str, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        if self._barrier:
+            # Broken if the retrievers do not run concurrently
+            self._barrier.wait(timeout=5)
+        time.sleep(self._delay)
+        return self._result()
+
+    def _retrieve_with_score(
+        self,
+        query: str,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        return self._retrieve(query, filters)
+
+    async def _aretrieve(
+        self, query: str, filters: Optional[MetadataFilters] = None
+    ) -> List[Chunk]:
+        self.started.set()
+        try:
+            if self._wait_for:
+                await asyncio.wait_for(self._wait_for.started.wait(), timeout=5)
+            await asyncio.sleep(self._delay)
+        except asyncio.CancelledError:
+            self.canceled = True
+            raise
+        return self._result()
+
+    async def _aretrieve_with_score(
+        self,
+        query: str,
+        score_threshold: float,
+        filters: Optional[MetadataFilters] = None,
+    ) -> List[Chunk]:
+        return await self._aretrieve(query, filters)
+
+
+@pytest.mark.asyncio
+async def test_first_wins_by_priority():
+    slow = _MockRetriever(["qa"], delay=0.2)
+    fast = _MockRetriever(["embedding"], delay=0.01)
+    chain = RetrieverChain(retrievers=[slow, fast])
+    chunks = await chain.aretrieve_with_scores("query", 0.0)
+    # The higher priority retriever wins even if it is slower
+    assert [c.content for c in chunks] == ["qa"]
+
+
+@pytest.mark.asyncio
+async def test_first_wins_cancels_the_rest():
+    slow = _MockRetriever(["slow"], delay=60)
+    # The retrievers run concurrently, the hit returns after the slow one started
+    empty = _MockRetriever([], wait_for=slow)
+    hit = _MockRetriever(["embedding"], wait_for=slow)
+    chain = RetrieverChain(retrievers=[empty, hit, slow])
+    chunks = await asyncio.wait_for(chain.aretrieve("query"), timeout=10)
+    assert [c.content for c in chunks] == ["embedding"]
+    assert slow.canceled
+
+
+@pytest.mark.asyncio
+async def test_first_wins_skips_failures():
+    failed = _MockRetriever([], error=ValueError("db error"))
+    hit = _MockRetriever(["embedding"])
+    chain = RetrieverChain(retrievers=[failed, hit])
+    assert [c.content for c in await chain.aretrieve("query")] == ["embedding"]
+
+    chain = RetrieverChain(retrievers=[failed, _MockRetriever([])])
+    assert await chain.aretrieve("query") == []
+
+    chain = RetrieverChain(retrievers=[failed, failed])
+    with pytest.raises(ValueError):
+        await chain.aretrieve("query")
+
+
+@pytest.mark.asyncio
+async def test_merge_with_rrf():
+    chain = RetrieverChain(
+        retrievers=[
+            _MockRetriever(["a", "b"]),
+            _MockRetriever(["b", "c"]),
+            _MockRetriever([], error=ValueError("db error")),
+        ],
+        mode="merge",
+        top_k=2,
+    )
+    chunks = await chain.aretrieve_with_scores("query", 0.0)
+    assert [c.content for c in chunks] == ["b", "a"]
+
+
+def test_sync_first_wins_and_merge():
+    # The retrievers run concurrently, each waits until all of them started
+    barrier = threading.Barrier(3)
+    retrievers = [
+        _MockRetriever([], barrier=barrier),
+        _MockRetriever(["b", "a"], barrier=barrier),
+        _MockRetriever(["a"], barrier=barrier),
+    ]
+    chunks = RetrieverChain(retrievers=retrievers).retrieve("query")
+    assert [c.content for c in chunks] == ["b", "a"]
+
+    chunks = RetrieverChain(retrievers=retrievers, mode="merge").retrieve("query")
+    assert [c.content for c in chunks] == ["a", "b"]
@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock
+
+from ..api.schemas import SpaceServeResponse
+from ..retriever.space_cache import SpaceResources, SpaceResourcesCache
+
+
+def _loader(name: str, loads: list):
+    def _load():
+        loads.append(name)
+        return SpaceResources(
+            space=SpaceServeResponse(id=len(loads), name=name, vector_type="Chroma"),
+            storage_connector=MagicMock(),
+        )
+
+    return _load
+
+
+def test_get_cached_by_space_and_model():
+    cache = SpaceResourcesCache()
+    loads = []
+    resources = cache.get("1", "model1", _loader("space1", loads))
+    assert cache.get("1", "model1", _loader("space1", loads)) is resources
+    assert cache.get("1", "model2", _loader("space1", loads)) is not resources
+    assert cache.get("space1", "model1", _loader("space1", loads)) is not resources
+    assert len(loads) == 3
+
+
+def test_invalidate_by_space_name():
+    cache = SpaceResourcesCache()
+    loads = []
+    by_id = cache.get("1", None, _loader("space1", loads))
+    other = cache.get("2", None, _loader("space2", loads))
+    cache.invalidate("space1")
+    assert cache.get("1", None, _loader("space1", loads)) is not by_id
+    assert cache.get("2", None, _loader("space2", loads)) is other
+
+    cache.invalidate()
+    assert cache.get("2", None, _loader("space2", loads)) is not other
+    assert loads == ["space1", "space2", "space1", "space2"]
+
+
+def test_not_cached_if_invalidated_while_loading():
+    cache = SpaceResourcesCache()
+    loads = []
+    load = _loader("space1", loads)
+
+    def _load_and_invalidate():
+        resources = load()
+        cache.invalidate("space1")
+        return resources
+
+    cache.get("1", None, _load_and_invalidate)
+    cache.get("1", None, load)
+    assert len(loads) == 2
+
+
+def test_ttl_and_max_size():
+    cache = SpaceResourcesCache(ttl=0)
+    loads = []
+    cache.get("1", None, _loader("space1", loads))
+    cache.get("1", None, _loader("space1", loads))
+    assert len(loads) == 2
+
+    cache = SpaceResourcesCache(ttl=None, max_size=2)
+    loads = []
+    for space_id in ["1", "2", "1", "3", "1", "2"]:
+        cache.get(space_id, None, _loader(f"space{space_id}", loads))
+    # "2" is the least recently used when "3" is added
+    assert loads == ["space1", "space2", "space3", "space2"]
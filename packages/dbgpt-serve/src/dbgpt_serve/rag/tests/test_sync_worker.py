@@ -0,0 +1,222 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from dbgpt.component import SystemApp
+from dbgpt.storage.metadata import db
+from dbgpt.util.executor_utils import DefaultExecutorFactory
+
+from ..api.schemas import DocumentServeResponse
+from ..models.document_db import SyncStatus
+from ..models.sync_job_db import DocumentSyncJobDao
+from ..service.service import Service
+from ..service.sync_worker import DocumentSyncWorker
+
+
+@pytest.fixture(autouse=True)
+def setup_and_teardown(tmp_path):
+    # The jobs are accessed from the executor threads, so not an in-memory database
+    db.init_db(f"sqlite:///{tmp_path}/sync_job.db")
+    db.create_all()
+
+    yield
+
+
+@pytest.fixture
+def system_app():
+    system_app = SystemApp()
+    system_app.register(DefaultExecutorFactory)
+    return system_app
+
+
+@pytest.fixture
+def dao():
+    return DocumentSyncJobDao()
+
+
+async def _wait_jobs(dao, job_ids, status, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        if all(dao.get_job(job_id).status == status for job_id in job_ids):
+            return
+        await asyncio.sleep(0.02)
+    raise AssertionError([dao.get_job(job_id) for job_id in job_ids])
+
+
+def test_claim_retry_and_fail(dao):
+    job_id = dao.create_job(1, 1, "{}", max_retries=1)
+    job = dao.claim_next_job("worker1")
+    assert job.id == job_id
+    assert job.status == SyncStatus.RUNNING.name
+    assert dao.claim_next_job("worker2") is None
+
+    assert dao.fail_job(job_id, "worker1", "embedding failed")
+    job = dao.get_job(job_id)
+    assert job.status == SyncStatus.TODO.name
+    assert job.retry_count == 1
+
+    dao.claim_next_job("worker2")
+    # The job is not running by worker1 anymore
+    assert not dao.finish_job(job_id, "worker1")
+    assert not dao.fail_job(job_id, "worker2", "embedding failed again")
+    job = dao.get_job(job_id)
+    assert job.status == SyncStatus.FAILED.name
+    assert job.error == "embedding failed again"
+
+
+def test_create_job_cancels_active_jobs(dao):
+    old_job_id = dao.create_job(1, 1)
+    new_job_id = dao.create_job(1, 1)
+    assert dao.get_job(old_job_id).status == SyncStatus.CANCELED.name
+    assert dao.claim_next_job("worker1").id == new_job_id
+
+
+def test_requeue_stale_jobs(dao):
+    job_id = dao.create_job(1, 1)
+    dao.claim_next_job("worker1")
+    assert dao.requeue_stale_jobs(datetime.now() - timedelta(seconds=60)) == 0
+    assert dao.requeue_stale_jobs(datetime.now() + timedelta(seconds=1)) == 1
+    job = dao.get_job(job_id)
+    assert job.status == SyncStatus.TODO.name
+    assert job.worker_id is None
+
+
+@pytest.mark.asyncio
+async def test_worker_space_concurrency(system_app, dao):
+    running = defaultdict(int)
+    max_running = defaultdict(int)
+
+    async def _process(job):
+        running[job.space_id] += 1
+        max_running[job.space_id] = max(
+            max_running[job.space_id], running[job.space_id]
+        )
+        await asyncio.sleep(0.1)
+        running[job.space_id] -= 1
+
+    job_ids = [dao.create_job(doc_id, doc_id % 2 + 1) for doc_id in range(8)]
+    worker = DocumentSyncWorker(
+        system_app,
+        dao,
+        _process,
+        max_workers=4,
+        space_concurrency=lambda space_id: 1 if space_id == 1 else 3,
+        poll_interval=0.05,
+    )
+    await worker.start()
+    try:
+        await _wait_jobs(dao, job_ids, SyncStatus.FINISHED.name)
+    finally:
+        await worker.stop()
+    assert max_running[1] == 1
+    assert max_running[2] == 3
+
+
+@pytest.mark.asyncio
+async def test_worker_retry(system_app, dao):
+    attempts = defaultdict(int)
+
+    async def _process(job):
+        attempts[job.id] += 1
+        if job.retry_count == 0:
+            raise ValueError("embedding service unavailable")
+
+    job_id = dao.create_job(1, 1, max_retries=2)
+    worker = DocumentSyncWorker(
+        system_app, dao, _process, poll_interval=0.05, retry_backoff=0
+    )
+    await worker.start()
+    try:
+        await _wait_jobs(dao, [job_id], SyncStatus.FINISHED.name)
+    finally:
+        await worker.stop()
+    assert attempts[job_id] == 2
+    assert dao.get_job(job_id).retry_count == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_cancel(system_app, dao):
+    started = asyncio.Event()
+    canceled = asyncio.Event()
+
+    async def _process(job):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            canceled.set()
+            raise
+
+    job_id = dao.create_job(1, 1)
+    worker = DocumentSyncWorker(system_app, dao, _process, poll_interval=0.05)
+    await worker.start()
+    try:
+        await asyncio.wait_for(started.wait(), 5)
+        assert await worker.cancel(1) == 1
+        await asyncio.wait_for(canceled.wait(), 5)
+        assert dao.get_job(job_id).status == SyncStatus.CANCELED.name
+    finally:
+        await worker.stop()
+    assert worker.running_job_ids() == []
+
+
+@pytest.mark.asyncio
+async def test_worker_stop_releases_job(system_app, dao):
+    started = asyncio.Event()
+
+    async def _process(job):
+        started.set()
+        await asyncio.sleep(10)
+
+    job_id = dao.create_job(1, 1)
+    worker = DocumentSyncWorker(system_app, dao, _process, poll_interval=0.05)
+    await worker.start()
+    await asyncio.wait_for(started.wait(), 5)
+    await worker.stop()
+    job = dao.get_job(job_id)
+    # Run again by the next worker, not counted as a retry
+    assert job.status == SyncStatus.TODO.name
+    assert job.retry_count == 0
+
+
+@pytest.mark.asyncio
+async def test_delete_document_cancels_running_job(system_app, dao):
+    started = asyncio.Event()
+    writes = []
+
+    async def _process(job):
+        started.set()
+        while True:
+            # Write the vectors and the chunks of the document
+            writes.append(job.document_id)
+            await asyncio.sleep(0.01)
+
+    job_id = dao.create_job(2, 1)
+    # No heartbeat during the test, the job is canceled by the delete
+    worker = DocumentSyncWorker(
+        system_app, dao, _process, poll_interval=0.05, heartbeat_interval=60
+    )
+    document = DocumentServeResponse(id=2, space="TestSpace", vector_ids=None)
+    service = Service(
+        system_app,
+        MagicMock(),
+        dao=Mock(get_knowledge_space=Mock(return_value=[Mock(name="TestSpace")])),
+        document_dao=Mock(get_one=Mock(return_value=document)),
+        chunk_dao=Mock(),
+        sync_job_dao=dao,
+    )
+    service._sync_worker = worker
+    await worker.start()
+    try:
+        await asyncio.wait_for(started.wait(), 5)
+        assert await service.adelete_document("2") == document
+        count = len(writes)
+        await asyncio.sleep(0.05)
+        assert len(writes) == count
+    finally:
+        await worker.stop()
+    assert dao.get_job(job_id).status == SyncStatus.CANCELED.name
+    service._chunk_dao.raw_delete.assert_called_once_with(2)